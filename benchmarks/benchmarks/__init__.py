@@ -0,0 +1 @@
+"""Benchmarks of the speed and memory usage of nemos, run with airspeed velocity (asv)."""
@@ -0,0 +1,53 @@
+"""Benchmarks of the feature computation of the bases."""
+
+import inspect
+
+import jax
+import numpy as np
+
+from nemos.basis import basis
+
+from .common import TIMEOUT, compile_time
+
+# all the bases of the public API
+BASIS_CLASSES = sorted(
+    name
+    for name, cls in inspect.getmembers(basis, inspect.isclass)
+    if cls.__module__ == basis.__name__
+)
+
+# constructor arguments, passed to the bases that accept them
+BASIS_KWARGS = dict(
+    n_basis_funcs=10, window_size=100, decay_rates=np.linspace(1, 10, 10)
+)
+
+
+def make_basis(name):
+    """Instantiate a basis with the shared constructor arguments it accepts."""
+    cls = getattr(basis, name)
+    parameters = inspect.signature(cls).parameters
+    return cls(**{key: val for key, val in BASIS_KWARGS.items() if key in parameters})
+
+
+class BasisComputeFeatures:
+    """Feature computation of each basis, scaling the number of samples."""
+
+    params = (BASIS_CLASSES, [10_000, 1_000_000])
+    param_names = ["basis", "n_samples"]
+    timeout = TIMEOUT
+
+    def setup(self, name, n_samples):
+        self.basis = make_basis(name)
+        self.x = np.random.default_rng(0).uniform(size=n_samples)
+        self.basis.compute_features(self.x)
+
+    def time_compute_features(self, *args):
+        jax.block_until_ready(self.basis.compute_features(self.x))
+
+    def peakmem_compute_features(self, *args):
+        jax.block_until_ready(self.basis.compute_features(self.x))
+
+    def track_compile_time(self, *args):
+        return compile_time(self.basis.compute_features, self.x)
+
+    track_compile_time.unit = "seconds"
@@ -0,0 +1,39 @@
+"""Benchmarks of the convolution of time series with a basis."""
+
+import jax
+import numpy as np
+
+from nemos.convolve import create_convolutional_predictor
+
+from .common import TIMEOUT, compile_time
+
+
+class ConvolutionalPredictor:
+    """Convolution of multiple time series, scaling the number of samples and the window."""
+
+    params = ([10_000, 1_000_000], [100, 1000], ["direct", "fft"])
+    param_names = ["n_samples", "window_size", "method"]
+    timeout = TIMEOUT
+
+    def setup(self, n_samples, window_size, method):
+        rng = np.random.default_rng(0)
+        self.basis_matrix = rng.normal(size=(window_size, 10))
+        self.signal = rng.normal(size=(n_samples, 5))
+        self.method = method
+        self.convolve()
+
+    def convolve(self):
+        return create_convolutional_predictor(
+            self.basis_matrix, self.signal, method=self.method
+        )
+
+    def time_create_convolutional_predictor(self, *args):
+        jax.block_until_ready(self.convolve())
+
+    def peakmem_create_convolutional_predictor(self, *args):
+        jax.block_until_ready(self.convolve())
+
+    def track_compile_time(self, *args):
+        return compile_time(self.convolve)
+
+    track_compile_time.unit = "seconds"
@@ -0,0 +1,118 @@
+"""Benchmarks of the GLM and PopulationGLM fit and predict."""
+
+import jax
+import numpy as np
+
+import nemos as nmo
+
+from .common import TIMEOUT, compile_time, poisson_data
+
+# regularizer and number of iterations of each solver, the iterations are fixed so that
+# the timings reflect the cost per iteration rather than the convergence criterion
+SOLVERS = {
+    "GradientDescent": ("Ridge", 100),
+    "LBFGS": ("Ridge", 100),
+    "ProximalGradient": ("Lasso", 100),
+    "SVRG": ("Ridge", 5),
+    "ProxSVRG": ("Lasso", 5),
+    "SGD": ("Ridge", 5),
+    "Adam": ("Ridge", 5),
+}
+
+
+def make_model(model_class, solver_name):
+    """Soft-plus Poisson model, for which SVRG has default hyperparameters."""
+    regularizer, maxiter = SOLVERS[solver_name]
+    return model_class(
+        observation_model=nmo.observation_models.PoissonObservations(jax.nn.softplus),
+        regularizer=regularizer,
+        regularizer_strength=0.01,
+        solver_name=solver_name,
+        solver_kwargs=dict(maxiter=maxiter, tol=0.0),
+    )
+
+
+class GLMFit:
+    """Single neuron fit, scaling the number of samples and features."""
+
+    params = (list(SOLVERS), [10_000, 100_000], [10, 100])
+    param_names = ["solver_name", "n_samples", "n_features"]
+    timeout = TIMEOUT
+
+    def setup(self, solver_name, n_samples, n_features):
+        self.X, self.y = poisson_data(n_samples, n_features)
+        self.model = make_model(nmo.glm.GLM, solver_name)
+        # compile before timing
+        self.model.fit(self.X, self.y)
+
+    def time_fit(self, *args):
+        self.model.fit(self.X, self.y)
+
+    def peakmem_fit(self, *args):
+        self.model.fit(self.X, self.y)
+
+    def track_compile_time(self, *args):
+        return compile_time(self.model.fit, self.X, self.y)
+
+    track_compile_time.unit = "seconds"
+
+    def time_predict(self, *args):
+        jax.block_until_ready(self.model.predict(self.X))
+
+    def time_score(self, *args):
+        jax.block_until_ready(self.model.score(self.X, self.y))
+
+
+class PopulationGLMFit:
+    """Population fit, scaling the number of samples and neurons."""
+
+    params = (list(SOLVERS), [10_000, 100_000], [10, 100])
+    param_names = ["solver_name", "n_samples", "n_neurons"]
+    timeout = TIMEOUT
+
+    def setup(self, solver_name, n_samples, n_neurons):
+        self.X, self.y = poisson_data(n_samples, 20, n_neurons=n_neurons)
+        self.model = make_model(nmo.glm.PopulationGLM, solver_name)
+        self.model.fit(self.X, self.y)
+
+    def time_fit(self, *args):
+        self.model.fit(self.X, self.y)
+
+    def peakmem_fit(self, *args):
+        self.model.fit(self.X, self.y)
+
+    def track_compile_time(self, *args):
+        return compile_time(self.model.fit, self.X, self.y)
+
+    track_compile_time.unit = "seconds"
+
+    def time_predict(self, *args):
+        jax.block_until_ready(self.model.predict(self.X))
+
+
+class PopulationGLMLocalCoupling:
+    """Population fit with a banded feature mask, each neuron sees a few features."""
+
+    params = ([100, 400], [10, 40])
+    param_names = ["n_neurons", "n_active_features"]
+    timeout = TIMEOUT
+
+    def setup(self, n_neurons, n_active_features):
+        n_features = 2 * n_neurons
+        self.X, self.y = poisson_data(10_000, n_features, n_neurons=n_neurons)
+        mask = np.zeros((n_features, n_neurons))
+        for neuron in range(n_neurons):
+            start = min(2 * neuron, n_features - n_active_features)
+            mask[start : start + n_active_features, neuron] = 1
+        self.model = make_model(nmo.glm.PopulationGLM, "GradientDescent")
+        self.model.feature_mask = mask
+        self.model.fit(self.X, self.y)
+
+    def time_fit(self, *args):
+        self.model.fit(self.X, self.y)
+
+    def peakmem_fit(self, *args):
+        self.model.fit(self.X, self.y)
+
+    def time_predict(self, *args):
+        jax.block_until_ready(self.model.predict(self.X))
@@ -0,0 +1,41 @@
+"""Benchmarks of the identifiability constraints."""
+
+import jax
+import numpy as np
+
+from nemos.basis import BSplineEval
+from nemos.identifiability_constraints import apply_identifiability_constraints
+
+from .common import TIMEOUT, compile_time
+
+
+class IdentifiabilityConstraints:
+    """Rank deficient B-spline designs, scaling the number of samples and features."""
+
+    params = ([10_000, 100_000], [20, 100])
+    param_names = ["n_samples", "n_features"]
+    timeout = TIMEOUT
+
+    def setup(self, n_samples, n_features):
+        # each input contributes 10 B-splines summing to one
+        n_inputs = n_features // 10
+        bas = BSplineEval(10)
+        for _ in range(n_inputs - 1):
+            bas = bas + BSplineEval(10)
+        x = np.random.default_rng(0).uniform(size=(n_inputs, n_samples))
+        self.X = np.asarray(bas.compute_features(*x))
+        self.constrain()
+
+    def constrain(self):
+        return apply_identifiability_constraints(self.X, warn_if_float32=False)
+
+    def time_apply_identifiability_constraints(self, *args):
+        jax.block_until_ready(self.constrain())
+
+    def peakmem_apply_identifiability_constraints(self, *args):
+        jax.block_until_ready(self.constrain())
+
+    def track_compile_time(self, *args):
+        return compile_time(self.constrain)
+
+    track_compile_time.unit = "seconds"
@@ -0,0 +1,41 @@
+"""Benchmarks of the recurrent network simulation."""
+
+import jax
+import numpy as np
+
+from nemos.simulation import simulate_recurrent
+
+from .common import TIMEOUT, compile_time
+
+
+class SimulateRecurrent:
+    """Recurrent simulation, scaling the number of time steps and neurons."""
+
+    params = ([1000, 10_000], [10, 100])
+    param_names = ["n_samples", "n_neurons"]
+    timeout = TIMEOUT
+
+    def setup(self, n_samples, n_neurons):
+        rng = np.random.default_rng(0)
+        window_size, n_basis = 100, 5
+        self.kwargs = dict(
+            coupling_coef=0.1 * rng.normal(size=(n_neurons, n_neurons, n_basis)),
+            feedforward_coef=np.ones((n_neurons, 1)),
+            intercepts=-3 * np.ones(n_neurons),
+            random_key=jax.random.key(0),
+            feedforward_input=rng.normal(size=(n_samples, n_neurons, 1)),
+            coupling_basis_matrix=rng.normal(size=(window_size, n_basis)),
+            init_y=np.zeros((window_size, n_neurons)),
+        )
+        simulate_recurrent(**self.kwargs)
+
+    def time_simulate_recurrent(self, *args):
+        jax.block_until_ready(simulate_recurrent(**self.kwargs))
+
+    def peakmem_simulate_recurrent(self, *args):
+        jax.block_until_ready(simulate_recurrent(**self.kwargs))
+
+    def track_compile_time(self, *args):
+        return compile_time(simulate_recurrent, **self.kwargs)
+
+    track_compile_time.unit = "seconds"
@@ -0,0 +1,47 @@
+"""Data generation and timing utilities shared by the benchmarks."""
+
+import time
+
+import jax
+import numpy as np
+
+import nemos as nmo
+
+# seconds after which asv interrupts a benchmark
+TIMEOUT = 600
+
+
+def poisson_data(n_samples: int, n_features: int, n_neurons: int = None, seed=0):
+    """
+    Simulate the predictors and spike counts of a soft-plus Poisson GLM.
+
+    Returns ``X`` of shape ``(n_samples, n_features)`` and ``y`` of shape ``(n_samples,)``,
+    or ``(n_samples, n_neurons)`` if ``n_neurons`` is provided.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_features))
+    coef = rng.normal(scale=1 / np.sqrt(n_features), size=(n_features, n_neurons or 1))
+    y = rng.poisson(jax.nn.softplus(X @ coef - 1))
+    return X, y if n_neurons else y[:, 0]
+
+
+def compile_time(func, *args, **kwargs) -> float:
+    """
+    Seconds spent tracing and compiling the jax functions called by ``func``.
+
+    The jax and nemos caches are cleared, and the compile time is estimated as the
+    difference between the duration of the first call and that of a second call, which
+    reuses the compiled functions.
+    """
+    jax.clear_caches()
+    nmo.compilation_cache.clear_cache()
+    cold = _duration(func, *args, **kwargs)
+    warm = _duration(func, *args, **kwargs)
+    return max(cold - warm, 0.0)
+
+
+def _duration(func, *args, **kwargs) -> float:
+    """Seconds taken by ``func``, waiting for the asynchronous jax computations."""
+    start = time.perf_counter()
+    jax.block_until_ready(func(*args, **kwargs))
+    return time.perf_counter() - start
@@ -3,16 +3,21 @@ __version__ = "0.2.1"
 
 from . import (
     basis,
+    compilation_cache,
     convolve,
     exceptions,
     fetch,
     glm,
     identifiability_constraints,
+    inference,
+    model_selection,
     observation_models,
+    online,
     pytrees,
     regularizer,
     simulation,
     styles,
+    telemetry,
     tree_utils,
     type_casting,
     utils,
@@ -0,0 +1,228 @@
+"""Utilities for iterating over data in chunks along the sample axis."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from .pytrees import FeaturePytree
+from .tree_utils import get_valid_multitree, tree_slice
+
+ChunkFactory = Callable[[], Iterator[Tuple[Any, Any]]]
+
+
+def chunk_slices(
+    n_samples: int, chunk_size: int, overlap: int = 0
+) -> Iterator[Tuple[slice, slice]]:
+    """
+    Generate the slices that split the sample axis into consecutive chunks.
+
+    Parameters
+    ----------
+    n_samples :
+        Number of samples along the sample axis.
+    chunk_size :
+        Number of samples per chunk (excluding the overlap).
+    overlap :
+        Number of samples preceding each chunk that are included in the input slice,
+        e.g. the halo required by a convolution with a window of ``overlap + 1`` samples.
+
+    Yields
+    ------
+    input_slice :
+        Slice selecting the chunk, extended on the left by up to ``overlap`` samples.
+    output_slice :
+        Slice selecting the chunk samples without the overlap.
+
+    Raises
+    ------
+    ValueError
+        If ``chunk_size`` is not a positive integer or ``overlap`` is negative.
+    """
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError(
+            f"`chunk_size` must be a positive integer. {chunk_size} provided instead!"
+        )
+    if overlap < 0:
+        raise ValueError(f"`overlap` must be non-negative. {overlap} provided instead!")
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        yield slice(max(start - overlap, 0), stop), slice(start, stop)
+
+
+def _get_n_samples(tree: Any) -> int:
+    """Return the shared size of the first axis of the leaves of a pytree."""
+    n_samples = {leaf.shape[0] for leaf in jax.tree_util.tree_leaves(tree)}
+    if len(n_samples) != 1:
+        raise ValueError(
+            "All arrays must have the same number of samples along the first axis."
+        )
+    return n_samples.pop()
+
+
+def make_chunk_factory(data: Any, chunk_size: Optional[int] = None) -> ChunkFactory:
+    """
+    Return a callable that creates a fresh iterator over ``(X, y)`` chunks.
+
+    Streaming solvers need multiple passes over the data, so a single-use generator
+    is not sufficient. This function normalizes the supported data sources to a
+    zero-argument callable returning a new iterator at every call.
+
+    Parameters
+    ----------
+    data :
+        One of:
+
+        - A tuple ``(X, y)`` of array-like objects (numpy arrays, ``np.memmap``, or pytrees
+          of arrays sharing the first axis). Chunks are sliced lazily, so that only one
+          chunk is loaded in memory at a time.
+        - A callable with no arguments returning an iterable of ``(X_chunk, y_chunk)``.
+        - A re-iterable (e.g. a list) of ``(X_chunk, y_chunk)`` tuples. A tuple of two
+          chunks is a collection of chunks, since its second element is not an array.
+    chunk_size :
+        Number of samples per chunk. Required when ``data`` is a tuple of arrays,
+        ignored otherwise.
+
+    Returns
+    -------
+    :
+        A callable returning an iterator over ``(X_chunk, y_chunk)``.
+
+    Raises
+    ------
+    TypeError
+        If ``data`` is a one-shot iterator (e.g. a generator object).
+    ValueError
+        If ``data`` is a tuple of arrays and ``chunk_size`` is not provided.
+    """
+    if callable(data):
+        return lambda: iter(data())
+
+    # a tuple of two chunks is a collection of chunks: ``y`` is an array, not a tuple
+    if (
+        isinstance(data, tuple)
+        and len(data) == 2
+        and _is_array_tree(data[0])
+        and hasattr(data[1], "shape")
+    ):
+        if chunk_size is None:
+            raise ValueError(
+                "`chunk_size` must be provided when streaming from arrays."
+            )
+        X, y = data
+        n_samples = _get_n_samples((X, y))
+
+        def factory():
+            for sl, _ in chunk_slices(n_samples, chunk_size):
+                yield tree_slice(X, sl), y[sl]
+
+        return factory
+
+    if iter(data) is data:
+        raise TypeError(
+            "Streaming requires multiple passes over the data, but a one-shot iterator was provided. "
+            "Please provide a callable returning a new iterator (e.g. a generator function) instead."
+        )
+    return lambda: iter(data)
+
+
+def _is_array_tree(tree: Any) -> bool:
+    """Check that all the leaves of a pytree have a ``shape`` attribute."""
+    leaves = jax.tree_util.tree_leaves(tree)
+    return len(leaves) > 0 and all(hasattr(x, "shape") for x in leaves)
+
+
+def iter_valid_chunks(chunk_factory: ChunkFactory) -> Iterator[Tuple[Any, jnp.ndarray]]:
+    """
+    Iterate over chunks, converting to jax arrays and dropping invalid samples.
+
+    Parameters
+    ----------
+    chunk_factory :
+        Callable returning an iterator over ``(X_chunk, y_chunk)``.
+
+    Yields
+    ------
+    X :
+        The valid samples of the chunk predictors. If the chunk is a
+        :class:`nemos.pytrees.FeaturePytree`, the underlying dictionary is returned.
+    y :
+        The valid samples of the chunk neural activity.
+    """
+    for X, y in chunk_factory():
+        X = jax.tree_util.tree_map(lambda x: np.asarray(x, dtype=float), X)
+        y = np.asarray(y, dtype=float)
+        is_valid = np.asarray(get_valid_multitree(X, y))
+        if not np.any(is_valid):
+            continue
+        if not np.all(is_valid):
+            X, y = tree_slice(X, is_valid), y[is_valid]
+        X = jax.tree_util.tree_map(jnp.asarray, X)
+        if isinstance(X, FeaturePytree):
+            X = X.data
+        yield X, jnp.asarray(y)
+
+
+def prefetch_to_device(chunks: Iterable[Any], size: int = 2) -> Iterator[Any]:
+    """
+    Transfer the chunks to the device ahead of their use.
+
+    The transfers are asynchronous, so that copying the next chunks from host memory
+    overlaps with the computation dispatched on the current one.
+
+    Parameters
+    ----------
+    chunks :
+        Iterable over pytrees of arrays.
+    size :
+        Number of chunks held on the device, including the one being processed.
+
+    Yields
+    ------
+    :
+        The chunks, placed on the default device.
+
+    Raises
+    ------
+    ValueError
+        If ``size`` is not a positive integer.
+    """
+    if not isinstance(size, int) or size < 1:
+        raise ValueError(f"`size` must be a positive integer. {size} provided instead!")
+    queue = deque()
+    for chunk in chunks:
+        queue.append(jax.device_put(chunk))
+        if len(queue) == size:
+            yield queue.popleft()
+    while queue:
+        yield queue.popleft()
+
+
+def count_valid_samples(chunk_factory: ChunkFactory) -> Tuple[int, jnp.ndarray]:
+    """
+    Count the valid samples and compute the mean activity in a single pass.
+
+    Parameters
+    ----------
+    chunk_factory :
+        Callable returning an iterator over ``(X_chunk, y_chunk)``.
+
+    Returns
+    -------
+    n_samples :
+        Total number of valid samples.
+    mean_y :
+        Mean activity over the valid samples, shape ``y.shape[1:]``.
+    """
+    n_samples = 0
+    sum_y = 0.0
+    for _, y in iter_valid_chunks(chunk_factory):
+        n_samples += y.shape[0]
+        sum_y = sum_y + jnp.sum(y, axis=0)
+    if n_samples == 0:
+        raise ValueError("At least a NaN or an Inf at all sample points!")
+    return n_samples, sum_y / n_samples
@@ -0,0 +1,132 @@
+"""Utilities for distributing the population GLM inputs across devices."""
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import jax
+import numpy as np
+from jax.sharding import Mesh, NamedSharding, PartitionSpec
+
+from .tree_utils import is_sparse
+from .typing import DESIGN_INPUT_TYPE
+
+#: Mesh axis along which the neurons are split.
+NEURON_AXIS = "neurons"
+#: Mesh axis along which the samples are split.
+SAMPLE_AXIS = "samples"
+
+
+def get_mesh(
+    mesh: Optional[Union[int, Mesh]], axis: str = NEURON_AXIS
+) -> Optional[Mesh]:
+    """
+    Validate a device mesh, or create a mesh splitting one axis across devices.
+
+    Parameters
+    ----------
+    mesh :
+        None, the number of devices across which ``axis`` is split, or a
+        ``jax.sharding.Mesh`` whose axes are named ``"neurons"`` and/or ``"samples"``.
+    axis :
+        The axis split by a mesh created from a number of devices, ``"neurons"`` for
+        a population of neurons, or ``"samples"`` for a single neuron.
+
+    Returns
+    -------
+    :
+        The mesh, or None if ``mesh`` is None.
+
+    Raises
+    ------
+    TypeError
+        If ``mesh`` is neither an integer nor a ``jax.sharding.Mesh``.
+    ValueError
+        If the number of devices is not available, or if the mesh has unknown axis names.
+    """
+    if mesh is None or isinstance(mesh, Mesh):
+        invalid = set(getattr(mesh, "axis_names", ())).difference(
+            (NEURON_AXIS, SAMPLE_AXIS)
+        )
+        if invalid:
+            raise ValueError(
+                f"Invalid mesh axis names {sorted(invalid)}. The mesh axes must be named "
+                f"'{NEURON_AXIS}' or '{SAMPLE_AXIS}'!"
+            )
+        return mesh
+    if not isinstance(mesh, (int, np.integer)) or isinstance(mesh, bool):
+        raise TypeError(
+            "`mesh` must be the number of devices or a `jax.sharding.Mesh`. "
+            f"{type(mesh).__name__} provided instead!"
+        )
+    devices = jax.devices()
+    if not 1 <= mesh <= len(devices):
+        raise ValueError(
+            f"Cannot split the {axis} across {mesh} devices, {len(devices)} devices "
+            "are available!"
+        )
+    return Mesh(np.asarray(devices[:mesh]), (axis,))
+
+
+def shard_array(x: jax.Array, mesh: Mesh, *axes: Optional[str]) -> jax.Array:
+    """
+    Place an array on a mesh, splitting each dimension along the named mesh axis.
+
+    Dimensions whose axis is None, or is not an axis of the mesh, are replicated. The array
+    is assembled from the shards of the local devices, so that in a multi-process run each
+    process only transfers its own shards.
+
+    Parameters
+    ----------
+    x :
+        The array, identical on all the processes.
+    mesh :
+        The device mesh.
+    axes :
+        The mesh axis of each dimension of ``x``.
+
+    Returns
+    -------
+    :
+        The sharded array.
+
+    Raises
+    ------
+    ValueError
+        If a dimension cannot be split evenly across the devices of its mesh axis.
+    """
+    axes = tuple(ax if ax in mesh.axis_names else None for ax in axes)
+    for size, ax in zip(x.shape, axes):
+        if ax is not None and size % mesh.shape[ax] != 0:
+            raise ValueError(
+                f"Cannot split {size} {ax} evenly across the {mesh.shape[ax]} devices of "
+                f"the mesh axis '{ax}'!"
+            )
+    sharding = NamedSharding(mesh, PartitionSpec(*axes))
+    return jax.make_array_from_callback(x.shape, sharding, lambda idx: x[idx])
+
+
+def shard_design(X: DESIGN_INPUT_TYPE, mesh: Mesh) -> DESIGN_INPUT_TYPE:
+    """
+    Split the samples of a design matrix, or a pytree of them, along the sample axis of a mesh.
+
+    Sparse predictors are left on the default device and replicated by the solver, which
+    requires that the mesh does not split the samples.
+
+    Raises
+    ------
+    ValueError
+        If the design is sparse and the mesh splits the samples.
+    """
+
+    def shard_leaf(x):
+        if not is_sparse(x):
+            return shard_array(x, mesh, SAMPLE_AXIS, None)
+        if SAMPLE_AXIS in mesh.axis_names:
+            raise ValueError(
+                "Sparse predictors cannot be split along the sample axis, use a "
+                "dense design or a mesh splitting only the neurons!"
+            )
+        return x
+
+    return jax.tree_util.tree_map(shard_leaf, X, is_leaf=is_sparse)
@@ -8,19 +8,24 @@ import inspect
 import warnings
 from abc import abstractmethod
 from copy import deepcopy
-from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+from functools import partial
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
 import jaxopt
 from numpy.typing import ArrayLike, NDArray
 
-from . import solvers, utils, validation
+from . import compilation_cache, solvers, telemetry, tree_utils, utils, validation
 from ._regularizer_builder import AVAILABLE_REGULARIZERS, create_regularizer
+from .basis._lazy_features import LazyDesignMatrix
 from .base_class import Base
 from .regularizer import Regularizer, UnRegularized
 from .typing import DESIGN_INPUT_TYPE, SolverInit, SolverRun, SolverUpdate
 
+#: Solvers whose updates are steps on mini-batches sampled within ``run``.
+_STOCHASTIC_SOLVERS = ("SVRG", "ProxSVRG", "SGD", "Adam")
+
 
 class BaseRegressor(Base, abc.ABC):
     """Abstract base class for GLM regression models.
@@ -87,6 +92,8 @@ class BaseRegressor(Base, abc.ABC):
         self._solver_init_state = None
         self._solver_update = None
         self._solver_run = None
+        self._telemetry_callbacks = None
+        self.solver_trace_ = None
 
     @property
     def solver_init_state(self) -> Union[None, SolverInit]:
@@ -140,6 +147,109 @@ class BaseRegressor(Base, abc.ABC):
         """
         return self._solver_run
 
+    def enable_telemetry(self, *callbacks: Callable) -> BaseRegressor:
+        """
+        Record the solver iterations of the following fits.
+
+        With telemetry enabled, ``fit`` runs the solver one ``solver_update`` at a time and
+        stores a :class:`nemos.telemetry.SolverTrace` in ``solver_trace_``, with the objective,
+        the error and the wall time of each iteration, and the time spent compiling. See
+        :mod:`nemos.telemetry`.
+
+        The SVRG, ProxSVRG, SGD and Adam solvers, whose updates are mini-batch steps, are not
+        supported.
+
+        Parameters
+        ----------
+        callbacks :
+            Functions called after each iteration as ``callback(record, params, state)``, with
+            ``record`` a :class:`nemos.telemetry.IterationRecord`. If a callback returns True,
+            the fit stops.
+
+        Returns
+        -------
+        :
+            The model itself for method chaining.
+
+        Raises
+        ------
+        TypeError
+            If a callback is not callable.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X, y = np.random.normal(size=(100, 2)), np.random.poisson(size=100)
+        >>> model = nmo.glm.GLM().enable_telemetry().fit(X, y)
+        >>> losses = model.solver_trace_.objective
+        >>> trace_json = model.solver_trace_.to_json()
+        """
+        for callback in callbacks:
+            utils.assert_is_callable(callback, "callback")
+        self._telemetry_callbacks = callbacks
+        return self
+
+    def disable_telemetry(self) -> BaseRegressor:
+        """
+        Stop recording the solver iterations, ``fit`` runs the compiled solver loop.
+
+        Returns
+        -------
+        :
+            The model itself for method chaining.
+        """
+        self._telemetry_callbacks = None
+        return self
+
+    def _run_solver(self, init_params: Any, *args) -> jaxopt.OptStep:
+        """
+        Run the solver, recording the iterations in ``solver_trace_`` if telemetry is enabled.
+
+        Raises
+        ------
+        ValueError
+            If telemetry is enabled and the solver is a mini-batch solver.
+        """
+        if self._telemetry_callbacks is None:
+            self.solver_trace_ = None
+            return self.solver_run(init_params, *args)
+
+        if self.solver_name in _STOCHASTIC_SOLVERS:
+            raise ValueError(
+                f"Telemetry is not available for the {self.solver_name} solver, whose "
+                "updates are mini-batch steps. Disable it with ``disable_telemetry()``."
+            )
+        # the loss of proximal solvers does not include the penalty
+        penalty = None
+        if self.solver_name == "ProximalGradient" and not isinstance(
+            self.regularizer, UnRegularized
+        ):
+            penalty = partial(
+                self.regularizer._penalization,
+                regularizer_strength=self.regularizer_strength,
+            )
+        solver_parameters = inspect.signature(
+            self._get_solver_class(self.solver_name)
+        ).parameters
+        maxiter, tol = (
+            self.solver_kwargs.get(key, solver_parameters[key].default)
+            for key in ("maxiter", "tol")
+        )
+        params, state, self.solver_trace_ = telemetry.run_with_telemetry(
+            self.solver_init_state,
+            self.solver_update,
+            self._solver_loss_fun_,
+            init_params,
+            *args,
+            solver_name=self.solver_name,
+            maxiter=maxiter,
+            tol=tol,
+            penalty=penalty,
+            callbacks=self._telemetry_callbacks,
+        )
+        return jaxopt.OptStep(params=params, state=state)
+
     def set_params(self, **params: Any):
         """Manage warnings in case of multiple parameter settings."""
         # if both regularizer and regularizer_strength are set, then only
@@ -287,6 +397,10 @@ class BaseRegressor(Base, abc.ABC):
         functions are directly usable in optimization loops, simplifying the syntax by pre-setting
         common arguments like regularization strength and other hyperparameters.
 
+        The functions are jitted and stored in :mod:`nemos.compilation_cache`, so that models
+        with the same configuration share them and re-use the compiled executables for inputs
+        of the same shapes and dtypes.
+
         Parameters
         ----------
         *args:
@@ -309,23 +423,10 @@ class BaseRegressor(Base, abc.ABC):
                 f"{self._regularizer.allowed_solvers}."
             )
 
-        # only use penalized loss if not using proximal gradient descent
-        # In proximal method you must use the unpenalized loss independently
-        # of what regularizer you are using.
-        if self.solver_name not in ("ProximalGradient", "ProxSVRG"):
-            loss = self.regularizer.penalized_loss(
-                self._predict_and_compute_loss, self.regularizer_strength
-            )
-        else:
-            loss = self._predict_and_compute_loss
-
         if solver_kwargs is None:
             # copy dictionary of kwargs to avoid modifying user settings
             solver_kwargs = deepcopy(self.solver_kwargs)
 
-        # check that the loss is Callable
-        utils.assert_is_callable(loss, "loss")
-
         # some parsing to make sure solver gets instantiated properly
         if self.solver_name in ("ProximalGradient", "ProxSVRG"):
             if "prox" in self.solver_kwargs:
@@ -334,11 +435,67 @@ class BaseRegressor(Base, abc.ABC):
                     "The proximal operator is automatically determined based on the selected regularizer. "
                     "Please remove the 'prox' argument from the `solver_kwargs` "
                 )
-
-            solver_kwargs.update(prox=self.regularizer.get_proximal_operator())
             # add self.regularizer_strength to args
             args += (self.regularizer_strength,)
 
+        # the jitted solver functions are shared by all the models with the same configuration
+        cache_key = compilation_cache.make_cache_key(self, solver_kwargs, args)
+        solver_functions = compilation_cache._SOLVER_CACHE.get(
+            cache_key,
+            # build from an unfitted model with a copy of the parameters, so that the cache
+            # neither holds the fitted state nor depends on later changes to this model
+            lambda: self.__class__(
+                **deepcopy(self.get_params(deep=False))
+            )._build_solver_functions(args, solver_kwargs),
+        )
+
+        self._solver_loss_fun_ = solver_functions.loss
+        self._solver_init_state = solver_functions.init_state
+        self._solver_update = solver_functions.update
+        self._solver_run = solver_functions.run
+        return self
+
+    def _build_solver_functions(
+        self, args: tuple, solver_kwargs: dict
+    ) -> Tuple[Callable, SolverRun, SolverUpdate, SolverInit]:
+        """
+        Instantiate the solver and wrap its methods.
+
+        Parameters
+        ----------
+        args :
+            Positional arguments for the solver methods, e.g. the regularizing
+            strength for proximal gradient methods.
+        solver_kwargs :
+            The solver kwargs.
+
+        Returns
+        -------
+        loss :
+            The loss optimized by the solver.
+        solver_run :
+            Function running the solver.
+        solver_update :
+            Function performing one solver step.
+        solver_init_state :
+            Function initializing the solver state.
+        """
+        # only use penalized loss if not using proximal gradient descent
+        # In proximal method you must use the unpenalized loss independently
+        # of what regularizer you are using.
+        if self.solver_name not in ("ProximalGradient", "ProxSVRG"):
+            loss = self.regularizer.penalized_loss(
+                self._predict_and_compute_loss, self.regularizer_strength
+            )
+        else:
+            loss = self._predict_and_compute_loss
+            solver_kwargs = dict(
+                solver_kwargs, prox=self.regularizer.get_proximal_operator()
+            )
+
+        # check that the loss is Callable
+        utils.assert_is_callable(loss, "loss")
+
         (
             solver_run_kwargs,
             solver_init_state_kwargs,
@@ -351,8 +508,6 @@ class BaseRegressor(Base, abc.ABC):
             fun=loss, **solver_init_kwargs
         )
 
-        self._solver_loss_fun_ = loss
-
         def solver_run(
             init_params: Tuple[DESIGN_INPUT_TYPE, jnp.ndarray], *run_args: jnp.ndarray
         ) -> jaxopt.OptStep:
@@ -371,10 +526,7 @@ class BaseRegressor(Base, abc.ABC):
                 **solver_init_state_kwargs,
             )
 
-        self._solver_init_state = solver_init_state
-        self._solver_update = solver_update
-        self._solver_run = solver_run
-        return self
+        return loss, solver_run, solver_update, solver_init_state
 
     def _inspect_solver_kwargs(
         self, solver_kwargs: dict
@@ -537,6 +689,24 @@ class BaseRegressor(Base, abc.ABC):
         # error if all samples are invalid
         validation.error_all_invalid(X, y)
 
+        # stochastic solvers slice the design matrix in traced mini-batches
+        is_sparse = tree_utils.pytree_map_and_reduce(tree_utils.is_sparse, any, X)
+        if is_sparse and self.solver_name in _STOCHASTIC_SOLVERS:
+            raise ValueError(
+                f"The {self.solver_name} solver does not support sparse design matrices. "
+                "Convert ``X`` to a dense array or use a different solver."
+            )
+
+        # Newton solvers factorize the Gram matrix of a stored design
+        is_lazy = tree_utils.pytree_map_and_reduce(
+            lambda x: isinstance(x, LazyDesignMatrix), any, X
+        )
+        if is_lazy and self.solver_name in ("GramNewton", "IRLS"):
+            raise ValueError(
+                f"The {self.solver_name} solver does not support lazy design matrices. "
+                "Compute the features with ``lazy=False`` or use a different solver."
+            )
+
         # validate input and params consistency
         init_params = self._check_params(init_params)
 
@@ -1,4 +1,5 @@
 from ._basis import AdditiveBasis, MultiplicativeBasis
+from ._lazy_features import LazyDesignMatrix, LazyFeatureMatrix
 from ._transformer_basis import TransformerBasis
 from .basis import (
     BSplineConv,
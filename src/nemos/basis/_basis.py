@@ -9,6 +9,8 @@ from typing import Callable, Generator, Literal, Optional, Tuple, Union
 
 import jax
 import numpy as np
+import scipy.sparse
+from jax.experimental.sparse import BCOO
 from numpy.typing import ArrayLike, NDArray
 from pynapple import Tsd, TsdFrame, TsdTensor
 
@@ -18,6 +20,16 @@ from ..typing import FeatureMatrix
 from ..utils import format_repr, row_wise_kron
 from ..validation import check_fraction_valid_samples
 from ._basis_mixin import BasisTransformerMixin, CompositeBasisMixin
+from ._lazy_features import (
+    LazyDesignMatrix,
+    LazyFeatureMatrix,
+    _ConcatBlock,
+    _DenseBlock,
+    _ProductBlock,
+)
+
+# number of samples per block when the features are written to a pre-allocated array
+_DEFAULT_CHUNK_SIZE = 10000
 
 
 def add_docstring(method_name, cls):
@@ -196,8 +208,13 @@ class Basis(Base, abc.ABC, BasisTransformerMixin):
 
     @check_transform_input
     def compute_features(
-        self, *xi: ArrayLike | Tsd | TsdFrame | TsdTensor
-    ) -> FeatureMatrix:
+        self,
+        *xi: ArrayLike | Tsd | TsdFrame | TsdTensor,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Apply the basis transformation to the input data.
 
@@ -212,6 +229,25 @@ class Basis(Base, abc.ABC, BasisTransformerMixin):
         *xi :
             Input data arrays to be transformed. The shape and content requirements
             depend on the subclass and mode of operation ('Eval' or 'Conv').
+        sparse :
+            If True, return the features as a ``jax.experimental.sparse.BCOO`` array,
+            storing the non-zero entries only. The sparse features can be passed directly
+            to the ``fit``, ``predict`` and ``score`` methods of the GLM. Default is False.
+        lazy :
+            If True, return a :class:`~nemos.basis.LazyDesignMatrix`, which stores the inputs of
+            the convolutional bases instead of their features and computes the products with the
+            coefficients on the fly. It can be passed to the ``fit``, ``predict`` and ``score``
+            methods of the GLM. Default is False.
+        chunk_size :
+            If provided, the features are computed in blocks of ``chunk_size`` samples.
+            Convolutional bases read ``window_size`` extra input samples on each side of a block,
+            so that the blocks match the full output, NaN padding included. Without ``out``,
+            a :class:`~nemos.basis.LazyFeatureMatrix` is returned, which computes the rows
+            on demand when indexed.
+        out :
+            Array of shape ``(n_samples, n_output_features)``, e.g. a ``np.memmap``, in which the
+            features are written block by block. If ``chunk_size`` is None, the blocks default to
+            10000 samples.
 
         Returns
         -------
@@ -219,17 +255,50 @@ class Basis(Base, abc.ABC, BasisTransformerMixin):
             Transformed features. In 'eval' mode, it corresponds to the basis functions
             evaluated at the input samples. In 'conv' mode, it consists of convolved
             input samples with the basis functions. The output shape varies based on
-            the subclass and mode.
+            the subclass and mode. ``out`` if provided, or a lazy feature matrix if only
+            ``chunk_size`` is provided.
+
+        Raises
+        ------
+        ValueError
+            If ``sparse=True`` or ``lazy=True`` is combined with another output option, or if
+            ``out`` does not have the shape of the features.
 
         Notes
         -----
         Subclasses should implement how to handle the transformation specific to their
         basis function types and operation modes.
+
+        Spline bases in 'eval' mode have at most ``order`` non-zero elements per sample,
+        and the product of two bases has as many non-zero elements per sample as the
+        product of the non-zero elements of its components. With ``sparse=True``, composite
+        bases are assembled from the sparse features of their components, without
+        computing the dense row-wise Kronecker product of ``MultiplicativeBasis``.
+        The time axis of pynapple inputs is not preserved by the sparse output.
         """
         if self._input_shape_product is None:
             self.set_input_shape(*xi)
         self._check_input_shape_consistency(*xi)
         self._set_input_independent_states()
+        if sparse and (chunk_size is not None or out is not None):
+            raise ValueError(
+                "Sparse features cannot be computed in chunks, set `chunk_size` and `out` "
+                "to None when `sparse=True`!"
+            )
+        if lazy and (sparse or chunk_size is not None or out is not None):
+            raise ValueError(
+                "Lazy features are never stored, set `sparse=False`, `chunk_size` and `out` "
+                "to None when `lazy=True`!"
+            )
+        if sparse:
+            return BCOO.from_scipy_sparse(self._compute_sparse_features(*xi))
+        if lazy:
+            return LazyDesignMatrix(*self._compute_lazy_features(*xi))
+        if out is not None:
+            chunk_size = _DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size
+            return LazyFeatureMatrix(self, xi, chunk_size).compute(out=out)
+        if chunk_size is not None:
+            return LazyFeatureMatrix(self, xi, chunk_size)
         return self._compute_features(*xi)
 
     @abc.abstractmethod
@@ -248,6 +317,25 @@ class Basis(Base, abc.ABC, BasisTransformerMixin):
         """
         pass
 
+    def _compute_sparse_features(
+        self, *xi: NDArray | Tsd | TsdFrame | TsdTensor
+    ) -> scipy.sparse.csr_array:
+        """Compute the features as a scipy CSR array.
+
+        Atomic bases compute the features with ``_compute_features`` and store their
+        non-zero entries. Composite bases override this method to combine the sparse
+        features of their components.
+        """
+        return scipy.sparse.csr_array(np.asarray(self._compute_features(*xi)))
+
+    def _compute_lazy_features(self, *xi: NDArray | Tsd | TsdFrame | TsdTensor):
+        """Compute the columns of a lazy design matrix and flag the samples with NaN features.
+
+        Atomic bases store their features, convolutional bases override this method to store
+        their input instead. Composite bases combine the columns of their components.
+        """
+        return _DenseBlock.from_features(self._compute_features(*xi))
+
     @abc.abstractmethod
     def setup_basis(self, *xi: ArrayLike) -> FeatureMatrix:
         """Pre-compute all basis state variables.
@@ -856,8 +944,13 @@ class AdditiveBasis(CompositeBasisMixin, Basis):
 
     @add_docstring("compute_features", Basis)
     def compute_features(
-        self, *xi: ArrayLike | Tsd | TsdFrame | TsdTensor
-    ) -> FeatureMatrix:
+        self,
+        *xi: ArrayLike | Tsd | TsdFrame | TsdTensor,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         r"""
         Examples
         --------
@@ -872,7 +965,9 @@ class AdditiveBasis(CompositeBasisMixin, Basis):
         (20, 17)
 
         """
-        return super().compute_features(*xi)
+        return super().compute_features(
+            *xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     def _compute_features(
         self, *xi: NDArray | Tsd | TsdFrame | TsdTensor
@@ -907,6 +1002,46 @@ class AdditiveBasis(CompositeBasisMixin, Basis):
         )
         return X
 
+    def _compute_sparse_features(
+        self, *xi: NDArray | Tsd | TsdFrame | TsdTensor
+    ) -> scipy.sparse.csr_array:
+        """
+        Compute the sparse features for added bases and concatenate.
+
+        Parameters
+        ----------
+        xi[0], ..., xi[n] : (n_samples,)
+            Tuple of input samples, each with the same number of samples. The
+            number of input arrays must equal the number of combined bases.
+
+        Returns
+        -------
+        :
+            The features as a CSR array, shape (n_samples, n_basis_funcs)
+
+        """
+        return scipy.sparse.hstack(
+            (
+                self.basis1._compute_sparse_features(
+                    *xi[: self.basis1._n_input_dimensionality]
+                ),
+                self.basis2._compute_sparse_features(
+                    *xi[self.basis1._n_input_dimensionality :]
+                ),
+            ),
+            format="csr",
+        )
+
+    def _compute_lazy_features(self, *xi: NDArray | Tsd | TsdFrame | TsdTensor):
+        """Concatenate the lazy columns of the added bases."""
+        block1, invalid1 = self.basis1._compute_lazy_features(
+            *xi[: self.basis1._n_input_dimensionality]
+        )
+        block2, invalid2 = self.basis2._compute_lazy_features(
+            *xi[self.basis1._n_input_dimensionality :]
+        )
+        return _ConcatBlock((block1, block2)), invalid1 | invalid2
+
     def split_by_feature(
         self,
         x: NDArray,
@@ -1286,6 +1421,45 @@ class MultiplicativeBasis(CompositeBasisMixin, Basis):
         )
         return X
 
+    def _compute_sparse_features(
+        self, *xi: NDArray | Tsd | TsdFrame | TsdTensor
+    ) -> scipy.sparse.csr_array:
+        """
+        Compute the sparse features for the multiplied bases, and their outer product.
+
+        Only the products of the non-zero features of the two bases are computed.
+
+        Parameters
+        ----------
+        xi[0], ..., xi[n] : (n_samples,)
+            Tuple of input samples, each with the same number of samples. The
+            number of input arrays must equal the number of combined bases.
+
+        Returns
+        -------
+        :
+            The features as a CSR array, shape (n_samples, n_basis_funcs)
+        """
+        return row_wise_kron(
+            self.basis1._compute_sparse_features(
+                *xi[: self.basis1._n_input_dimensionality]
+            ),
+            self.basis2._compute_sparse_features(
+                *xi[self.basis1._n_input_dimensionality :]
+            ),
+            transpose=False,
+        )
+
+    def _compute_lazy_features(self, *xi: NDArray | Tsd | TsdFrame | TsdTensor):
+        """Combine the lazy columns of the multiplied bases, without computing their product."""
+        block1, invalid1 = self.basis1._compute_lazy_features(
+            *xi[: self.basis1._n_input_dimensionality]
+        )
+        block2, invalid2 = self.basis2._compute_lazy_features(
+            *xi[self.basis1._n_input_dimensionality :]
+        )
+        return _ProductBlock(block1, block2), invalid1 | invalid2
+
     def evaluate_on_grid(self, *n_samples: int) -> Tuple[Tuple[NDArray], NDArray]:
         """Evaluate the basis set on a grid of equi-spaced sample points.
 
@@ -1335,8 +1509,13 @@ class MultiplicativeBasis(CompositeBasisMixin, Basis):
 
     @add_docstring("compute_features", Basis)
     def compute_features(
-        self, *xi: ArrayLike | Tsd | TsdFrame | TsdTensor
-    ) -> FeatureMatrix:
+        self,
+        *xi: ArrayLike | Tsd | TsdFrame | TsdTensor,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1350,8 +1529,20 @@ class MultiplicativeBasis(CompositeBasisMixin, Basis):
         >>> print(X_multi.shape) # num_features: 60 = 5 * 2 * 6
         (20, 60)
 
+        >>> # a product of spline bases has at most 3 * 3 non-zero features per sample
+        >>> from nemos.basis import MSplineEval
+        >>> basis_2d = MSplineEval(20, order=3) * MSplineEval(20, order=3)
+        >>> x, y = np.random.uniform(size=(2, 1000))
+        >>> X_sparse = basis_2d.compute_features(x, y, sparse=True)
+        >>> X_sparse.shape
+        (1000, 400)
+        >>> X_sparse.nse <= 9 * 1000
+        True
+
         """
-        return super().compute_features(*xi)
+        return super().compute_features(
+            *xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", Basis)
     def split_by_feature(
@@ -15,6 +15,7 @@ from pynapple import Tsd, TsdFrame, TsdTensor
 
 from ..convolve import create_convolutional_predictor
 from ..utils import _get_terminal_size
+from ._lazy_features import _ConvBlock
 from ._transformer_basis import TransformerBasis
 
 if TYPE_CHECKING:
@@ -215,7 +216,8 @@ class EvalBasisMixin:
         Returns
         -------
         :
-            A matrix with the transformed features.
+            A matrix with the transformed features. With ``compute_features(..., sparse=True)``,
+            the matrix is a ``jax.experimental.sparse.BCOO`` array storing the non-zero entries only.
 
         """
         out = self._evaluate(*(np.reshape(x, (x.shape[0], -1)) for x in xi))
@@ -244,6 +246,10 @@ class EvalBasisMixin:
         self.set_input_shape(*xi)
         return self
 
+    def _feature_halo(self) -> int:
+        """Number of neighbouring samples, on each side, the features of a sample depend on."""
+        return 0
+
     def _set_input_independent_states(self) -> "EvalBasisMixin":
         """
         Compute all the basis states that do not depend on the input.
@@ -292,6 +298,19 @@ class ConvBasisMixin:
         self.window_size = window_size
         self.conv_kwargs = {} if conv_kwargs is None else conv_kwargs
 
+    def _feature_halo(self) -> int:
+        """Number of neighbouring samples, on each side, the features of a sample depend on.
+
+        A window of ``window_size`` samples on each side covers the causal, acausal and
+        anti-causal convolutions, as well as the NaN padding at the borders of the input.
+        """
+        return self.window_size
+
+    def _compute_lazy_features(self, *xi: NDArray | Tsd | TsdFrame | TsdTensor):
+        """Store the input time series, convolved with the kernels at each product."""
+        self._check_has_kernel()
+        return _ConvBlock.from_input(xi[0], self.kernel_, self._conv_kwargs)
+
     def _compute_features(self, *xi: NDArray | Tsd | TsdFrame | TsdTensor):
         """Convolve basis functions with input time series.
 
@@ -302,6 +321,9 @@ class ConvBasisMixin:
         For example, if inputs are of shape (num_samples, 2, 3), the output will be
         ``(num_samples, num_basis_funcs * 2 * 3)``.
 
+        The convolution backend is selected by :func:`nemos.convolve.create_convolutional_predictor`:
+        long windows are convolved with the FFT unless ``conv_kwargs`` sets ``method="direct"``.
+
         Parameters
         ----------
         *xi:
@@ -582,6 +604,10 @@ class CompositeBasisMixin:
         self.basis1._set_input_independent_states()
         self.basis2._set_input_independent_states()
 
+    def _feature_halo(self) -> int:
+        """Number of neighbouring samples, on each side, the features of a sample depend on."""
+        return max(self.basis1._feature_halo(), self.basis2._feature_halo())
+
     def _check_input_shape_consistency(self, *xi: NDArray):
         """Check the input shape consistency for all basis elements."""
         self.basis1._check_input_shape_consistency(
@@ -0,0 +1,621 @@
+"""Feature matrices evaluated on demand, instead of stored in memory."""
+
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+from jax import lax
+from jax.experimental.sparse import JAXSparse
+from numpy.typing import ArrayLike, NDArray
+
+from .._chunking import chunk_slices
+from ..convolve import create_convolutional_predictor
+from ..type_casting import cast_to_pynapple, is_pynapple_tsd
+
+if TYPE_CHECKING:
+    from ._basis import Basis
+
+
+def _freeze_rescaling(basis: Basis, xi: Tuple) -> Basis:
+    """Set the bounds of the evaluation components without bounds to the range of their input.
+
+    Evaluation bases without bounds rescale each input column to its own range, which must be
+    computed over all the samples, and not over the samples of a chunk.
+    """
+    for component, x in zip(basis._iterate_over_components(), xi):
+        if component.mode == "eval" and component.bounds is None:
+            x = np.reshape(np.asarray(x, dtype=float), (x.shape[0], -1))
+            component._bounds = (np.nanmin(x, axis=0), np.nanmax(x, axis=0))
+    return basis
+
+
+class LazyFeatureMatrix:
+    """
+    Feature matrix of a basis, computed on demand from the inputs.
+
+    The features of a block of samples are computed from the inputs of the block, extended on each
+    side by a halo of ``window_size`` samples for convolutional bases, so that the block matches
+    the corresponding rows of the full ``compute_features`` output, including the NaN padding at the
+    borders of the time series. Evaluation bases without bounds rescale their inputs to the range of
+    all the samples, as ``compute_features`` does. Only one chunk of ``chunk_size`` samples is
+    evaluated at a time.
+
+    Instances are returned by ``compute_features`` when ``chunk_size`` is provided. Indexing along
+    the sample axis returns a NumPy array, so that the matrix can be used as a data source for
+    ``GLM.fit_streaming``, or written to disk with ``compute(out=np.memmap(...))``.
+
+    Parameters
+    ----------
+    basis :
+        The basis, with all its states set. A copy is stored.
+    xi :
+        The inputs of the basis, sharing the same number of samples.
+    chunk_size :
+        Number of samples evaluated at a time. If None, all the samples are evaluated at once.
+
+    Attributes
+    ----------
+    shape :
+        The shape of the feature matrix, ``(n_samples, n_output_features)``.
+    dtype :
+        The data type of the features.
+    chunk_size :
+        Number of samples evaluated at a time.
+
+    Raises
+    ------
+    ValueError
+        If the inputs do not have the same number of samples, if ``chunk_size`` is not a positive
+        integer, or if the features of a sample depend on all the other samples.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from nemos.basis import RaisedCosineLogConv
+    >>> basis = RaisedCosineLogConv(5, window_size=10)
+    >>> x = np.random.normal(size=1000)
+    >>> lazy = basis.compute_features(x, chunk_size=100)
+    >>> lazy.shape
+    (1000, 5)
+    >>> np.allclose(lazy[200:300], basis.compute_features(x)[200:300])
+    True
+    """
+
+    ndim = 2
+
+    def __init__(self, basis: Basis, xi: Tuple, chunk_size: Optional[int] = None):
+        n_samples = {np.shape(x)[0] for x in xi}
+        if len(n_samples) != 1:
+            raise ValueError(
+                "All the inputs must have the same number of samples along the first axis!"
+            )
+        n_samples = n_samples.pop()
+        if chunk_size is None:
+            chunk_size = max(n_samples, 1)
+        if not isinstance(chunk_size, (int, np.integer)) or chunk_size < 1:
+            raise ValueError(
+                f"`chunk_size` must be a positive integer. {chunk_size} provided instead!"
+            )
+        self._basis = _freeze_rescaling(copy.deepcopy(basis), xi)
+        self._halo = self._basis._feature_halo()
+        self._xi = xi
+        # sample index of the start and end of each epoch, the inputs share the time support
+        self._time_support = next(
+            (x.time_support for x in xi if is_pynapple_tsd(x)), None
+        )
+        if self._time_support is not None:
+            times = next(x.t for x in xi if is_pynapple_tsd(x))
+            self._epoch_start = np.searchsorted(times, self._time_support.start, "left")
+            self._epoch_end = np.searchsorted(times, self._time_support.end, "right")
+        self.chunk_size = int(chunk_size)
+        self.shape = (n_samples, basis.n_output_features)
+        self.dtype = np.dtype(float)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return (
+            f"LazyFeatureMatrix(shape={self.shape}, chunk_size={self.chunk_size}, "
+            f"basis={self._basis.__class__.__name__})"
+        )
+
+    def _input_range(self, chunk_start: int, chunk_stop: int) -> Tuple[int, int]:
+        """Range of input samples of a chunk, extended by the halo.
+
+        Pynapple inputs are convolved epoch by epoch, the halo is clipped to the epochs of the
+        first and last samples of the chunk, so that the epochs of the range are either complete
+        or longer than the halo.
+        """
+        in_start = max(chunk_start - self._halo, 0)
+        in_stop = min(chunk_stop + self._halo, self.shape[0])
+        if self._time_support is not None:
+            first = np.searchsorted(self._epoch_end, chunk_start, "right")
+            last = np.searchsorted(self._epoch_start, chunk_stop - 1, "right") - 1
+            in_start = max(in_start, int(self._epoch_start[first]))
+            in_stop = min(in_stop, int(self._epoch_end[last]))
+        return in_start, in_stop
+
+    def _slice_inputs(self, in_start: int, in_stop: int) -> Tuple:
+        """Slice the inputs, restricting the time support of pynapple inputs to the slice."""
+        sliced = []
+        for x in self._xi:
+            x = x[in_start:in_stop]
+            if is_pynapple_tsd(x):
+                epochs = self._time_support
+                keep = (epochs.end >= x.t[0]) & (epochs.start <= x.t[-1])
+                x = x.restrict(
+                    epochs.__class__(
+                        start=np.maximum(epochs.start[keep], x.t[0]),
+                        end=np.minimum(epochs.end[keep], x.t[-1]),
+                    )
+                )
+            sliced.append(x)
+        return tuple(sliced)
+
+    def _compute_rows(self, start: int, stop: int) -> NDArray:
+        """Compute the features of the samples in ``[start, stop)``, chunk by chunk."""
+        blocks = []
+        for _, chunk in chunk_slices(stop - start, self.chunk_size):
+            chunk_start, chunk_stop = start + chunk.start, start + chunk.stop
+            in_start, in_stop = self._input_range(chunk_start, chunk_stop)
+            features = self._basis._compute_features(
+                *self._slice_inputs(in_start, in_stop)
+            )
+            features = np.asarray(features, dtype=self.dtype)
+            blocks.append(
+                features[chunk_start - in_start : chunk_stop - in_start].reshape(
+                    -1, self.shape[1]
+                )
+            )
+        if not blocks:
+            return np.empty((0, self.shape[1]), dtype=self.dtype)
+        return np.concatenate(blocks, axis=0)
+
+    def __getitem__(self, index) -> NDArray:
+        rows, cols = index if isinstance(index, tuple) else (index, slice(None))
+        n_samples = self.shape[0]
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(n_samples)
+            if step < 0:
+                return self[np.arange(start, stop, step), cols]
+            out = self._compute_rows(start, max(start, stop))[::step]
+        elif isinstance(rows, (int, np.integer)):
+            if not -n_samples <= rows < n_samples:
+                raise IndexError(
+                    f"index {rows} is out of bounds for axis 0 with size {n_samples}"
+                )
+            rows = rows % n_samples
+            out = self._compute_rows(rows, rows + 1)[0]
+        else:
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                if rows.shape != (n_samples,):
+                    raise IndexError(
+                        f"boolean index of shape {rows.shape} does not match the "
+                        f"{n_samples} samples"
+                    )
+                rows = np.flatnonzero(rows)
+            rows = np.where(rows < 0, rows + n_samples, rows)
+            if rows.size == 0:
+                out = np.empty((0, self.shape[1]), dtype=self.dtype)
+            else:
+                start = int(rows.min())
+                out = self._compute_rows(start, int(rows.max()) + 1)[rows - start]
+        return out[..., cols]
+
+    def iter_chunks(self) -> Iterator[Tuple[slice, NDArray]]:
+        """
+        Iterate over the chunks of the feature matrix.
+
+        Yields
+        ------
+        sample_slice :
+            The slice of the samples of the chunk.
+        features :
+            The features of the chunk, shape ``(chunk_size, n_output_features)``.
+        """
+        for _, chunk in chunk_slices(self.shape[0], self.chunk_size):
+            yield chunk, self._compute_rows(chunk.start, chunk.stop)
+
+    def compute(self, out: Optional[NDArray] = None) -> NDArray:
+        """
+        Evaluate the full feature matrix, chunk by chunk.
+
+        Parameters
+        ----------
+        out :
+            Array of shape ``(n_samples, n_output_features)`` in which the features are written,
+            e.g. a ``np.memmap``, so that the matrix is never held in memory at once. If None, a
+            new array is allocated.
+
+        Returns
+        -------
+        :
+            The feature matrix, ``out`` if provided.
+
+        Raises
+        ------
+        ValueError
+            If ``out`` does not have the shape of the feature matrix.
+        """
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        elif tuple(np.shape(out)) != self.shape:
+            raise ValueError(
+                f"`out` must have shape {self.shape}. Shape {np.shape(out)} provided instead!"
+            )
+        for chunk, features in self.iter_chunks():
+            out[chunk] = features
+        if hasattr(out, "flush"):
+            out.flush()
+        return out
+
+    def __array__(self, dtype=None, copy=None) -> NDArray:
+        out = self.compute()
+        return out if dtype is None else out.astype(dtype)
+
+
+def _invalid_rows(x: ArrayLike) -> NDArray:
+    """Rows of a 2D array with at least one non-finite entry."""
+    return ~np.all(np.isfinite(x), axis=1)
+
+
+@jax.tree_util.register_pytree_node_class
+class _DenseBlock:
+    """Columns of the design stored in memory, e.g. the features of an evaluation basis."""
+
+    def __init__(self, features: jnp.ndarray):
+        self.features = features
+
+    @classmethod
+    def from_features(cls, features: ArrayLike) -> Tuple[_DenseBlock, NDArray]:
+        """Store the features, with the non-finite rows set to zero and flagged as invalid."""
+        features = np.asarray(features, dtype=float)
+        invalid = _invalid_rows(features)
+        return cls(jnp.asarray(np.where(invalid[:, None], 0.0, features))), invalid
+
+    @property
+    def n_features(self) -> int:
+        return self.features.shape[1]
+
+    def matmul(self, w: jnp.ndarray) -> jnp.ndarray:
+        return self.features @ w
+
+    def tree_flatten(self):
+        return (self.features,), None
+
+    @classmethod
+    def tree_unflatten(cls, aux_data, children):
+        return cls(*children)
+
+
+@jax.tree_util.register_pytree_node_class
+class _ConvBlock:
+    """Convolution of the input time series with a bank of kernels, stored as the raw input.
+
+    The product with the coefficients combines the kernels of each input column first, so that
+    ``X @ w`` costs a single convolution per input column and neither the features nor the
+    ``(n_samples, n_features)`` design are ever stored. Row ``t`` of the output is the valid
+    convolution at ``t - offset``, which places the output as the NaN padding and the shift of
+    ``create_convolutional_predictor`` do.
+    """
+
+    def __init__(self, x: jnp.ndarray, kernel: jnp.ndarray, offset: int):
+        self.x = x
+        self.kernel = kernel
+        self.offset = offset
+
+    @classmethod
+    def from_input(
+        cls, x: ArrayLike, kernel: ArrayLike, conv_kwargs: dict
+    ) -> Tuple[_ConvBlock, NDArray]:
+        """Store the input, and find the rows whose convolution window is not valid.
+
+        The invalid rows are found by convolving an indicator of the finite samples with a
+        single kernel, which reproduces the NaN padding of each epoch of pynapple inputs.
+        """
+        kernel = np.asarray(kernel, dtype=float)
+        window_size = kernel.shape[0]
+        flat = np.reshape(np.asarray(x, dtype=float), (x.shape[0], -1))
+        indicator = np.where(_invalid_rows(flat), np.nan, 0.0)
+        if is_pynapple_tsd(x):
+            indicator = cast_to_pynapple(indicator, x.t, x.time_support)
+        invalid = np.isnan(
+            np.asarray(
+                create_convolutional_predictor(
+                    np.ones((window_size, 1)), indicator, **conv_kwargs
+                )
+            )
+        ).reshape(-1)
+
+        causality = conv_kwargs.get("predictor_causality", "causal")
+        shift = conv_kwargs.get("shift", None)
+        shift = causality != "acausal" if shift is None else shift
+        offset = {
+            "causal": window_size - 1 + shift,
+            "acausal": (window_size - 1) // 2,
+            "anti-causal": -shift,
+        }[causality]
+        x = jnp.asarray(np.where(np.isfinite(flat), flat, 0.0))
+        return cls(x, jnp.asarray(kernel), int(offset)), invalid
+
+    @property
+    def n_features(self) -> int:
+        return self.x.shape[1] * self.kernel.shape[1]
+
+    def matmul(self, w: jnp.ndarray) -> jnp.ndarray:
+        n_samples, n_inputs = self.x.shape
+        window_size, n_kernels = self.kernel.shape
+        w = w.reshape(n_inputs, n_kernels, -1)
+        # one filter per input column and output column, flipped for the cross-correlation
+        filters = jnp.einsum("sk,ckm->mcs", self.kernel, w)[..., ::-1]
+        conv = lax.conv_general_dilated(
+            self.x.T[None],
+            filters,
+            window_strides=(1,),
+            padding="VALID",
+            dimension_numbers=("NCH", "OIH", "NCH"),
+        )[0].T
+        # out[t] = conv[t - offset], zero outside the valid range
+        first = max(-self.offset, 0)
+        left = max(self.offset, 0)
+        conv = conv[first : first + n_samples - left]
+        return jnp.pad(conv, ((left, n_samples - left - conv.shape[0]), (0, 0)))
+
+    def tree_flatten(self):
+        return (self.x, self.kernel), self.offset
+
+    @classmethod
+    def tree_unflatten(cls, aux_data, children):
+        return cls(*children, aux_data)
+
+
+@jax.tree_util.register_pytree_node_class
+class _ConcatBlock:
+    """Horizontal concatenation of blocks, e.g. the features of an additive basis."""
+
+    def __init__(self, blocks: Tuple):
+        self.blocks = tuple(blocks)
+
+    @property
+    def n_features(self) -> int:
+        return sum(block.n_features for block in self.blocks)
+
+    def matmul(self, w: jnp.ndarray) -> jnp.ndarray:
+        splits = np.cumsum([block.n_features for block in self.blocks])[:-1]
+        return sum(
+            block.matmul(wb) for block, wb in zip(self.blocks, jnp.split(w, splits))
+        )
+
+    def tree_flatten(self):
+        return self.blocks, None
+
+    @classmethod
+    def tree_unflatten(cls, aux_data, children):
+        return cls(children)
+
+
+@jax.tree_util.register_pytree_node_class
+class _ProductBlock:
+    """Row-wise Kronecker product of two blocks, e.g. the features of a multiplicative basis.
+
+    With ``A`` and ``B`` the blocks and ``W`` the coefficients reshaped as
+    ``(n_features_A, n_features_B)``, ``X @ w = sum((A @ W) * B, axis=1)``, so that only
+    ``B``, and not the product of the two blocks, is evaluated.
+    """
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+    @property
+    def n_features(self) -> int:
+        return self.left.n_features * self.right.n_features
+
+    def matmul(self, w: jnp.ndarray) -> jnp.ndarray:
+        n_right = self.right.n_features
+        right = self.right.matmul(jnp.eye(n_right, dtype=w.dtype))
+        left = self.left.matmul(w.reshape(self.left.n_features, -1))
+        left = left.reshape(left.shape[0], n_right, -1)
+        return jnp.einsum("tjm,tj->tm", left, right)
+
+    def tree_flatten(self):
+        return (self.left, self.right), None
+
+    @classmethod
+    def tree_unflatten(cls, aux_data, children):
+        return cls(*children)
+
+
+@jax.tree_util.register_pytree_node_class
+class LazyDesignMatrix(JAXSparse):
+    """
+    Design matrix of a basis that is never stored, with products computed on the fly.
+
+    Convolutional bases store their raw input and kernels, and ``X @ w`` is computed by
+    convolving each input column with the kernels combined by the coefficients. Evaluation bases
+    store their features, and the features of a multiplicative basis are combined at each product.
+    The memory scales with the inputs rather than with the ``(n_samples, n_features)`` design.
+
+    Instances are returned by ``compute_features(..., lazy=True)``, and can be passed to the
+    ``fit``, ``predict`` and ``score`` methods of the GLM in place of the features. The object
+    is a JAX pytree, its products can be traced, jit-compiled and differentiated, so that the
+    gradient of the loss computes ``X.T @ r`` by the transposed convolution.
+
+    Parameters
+    ----------
+    block :
+        The columns of the design.
+    invalid :
+        Boolean array flagging the samples with NaN features, e.g. the border of a convolution.
+    rows :
+        Index of the samples selected from the design. If None, all the samples are selected.
+
+    Notes
+    -----
+    The rows with NaN features are NaN in ``X @ w``, as in the stored design, and in all the
+    columns of ``X.todense()``. The product
+    ``r @ X`` (or ``X.T @ r``) excludes them, so that it is the gradient of ``w -> r @ (X @ w)``
+    over the valid rows.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from nemos.basis import RaisedCosineLogConv, BSplineEval
+    >>> basis = RaisedCosineLogConv(8, window_size=50) + BSplineEval(5)
+    >>> x, z = np.random.normal(size=(2, 1000))
+    >>> X = basis.compute_features(x, z, lazy=True)
+    >>> X.shape
+    (1000, 13)
+    >>> w = np.random.normal(size=13)
+    >>> np.allclose(X @ w, basis.compute_features(x, z) @ w, equal_nan=True, atol=1e-5)
+    True
+    """
+
+    # numpy defers the products with NumPy arrays to ``__rmatmul__``
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        block,
+        invalid: ArrayLike,
+        rows: Optional[jnp.ndarray] = None,
+    ):
+        self.block = block
+        self.invalid = jnp.asarray(invalid, dtype=bool)
+        self.rows = rows
+        n_samples = self.invalid.shape[0] if rows is None else rows.shape[0]
+        super().__init__((), shape=(n_samples, block.n_features))
+
+    @property
+    def dtype(self):
+        return jax.tree_util.tree_leaves(self.block)[0].dtype
+
+    @property
+    def nse(self) -> int:
+        """Number of values stored, i.e. the size of the inputs and of the stored features."""
+        return sum(leaf.size for leaf in jax.tree_util.tree_leaves(self.block))
+
+    @property
+    def data(self) -> jnp.ndarray:
+        return jnp.concatenate(
+            [jnp.ravel(leaf) for leaf in jax.tree_util.tree_leaves(self.block)]
+        )
+
+    def __repr__(self) -> str:
+        return f"LazyDesignMatrix(shape={self.shape}, nse={self.nse})"
+
+    def tree_flatten(self):
+        return (self.block, self.invalid, self.rows), None
+
+    @classmethod
+    def tree_unflatten(cls, aux_data, children):
+        return cls(*children)
+
+    def _matmul(self, w: jnp.ndarray, fill_value: Optional[float]) -> jnp.ndarray:
+        """Product with a vector or matrix, setting the invalid rows to ``fill_value``.
+
+        A ``fill_value`` of None multiplies the invalid rows by zero, which keeps the product
+        linear in ``w``.
+        """
+        out = self.block.matmul(w.reshape(self.shape[1], -1))
+        if fill_value is None:
+            out = out * (~self.invalid[:, None])
+        else:
+            out = jnp.where(self.invalid[:, None], fill_value, out)
+        if self.rows is not None:
+            out = out[self.rows]
+        return out.reshape(self.shape[0], *w.shape[1:])
+
+    def __matmul__(self, w: ArrayLike) -> jnp.ndarray:
+        w = jnp.asarray(w)
+        if w.ndim not in (1, 2) or w.shape[0] != self.shape[1]:
+            raise ValueError(
+                f"Cannot multiply a design with {self.shape[1]} features by an array of "
+                f"shape {w.shape}!"
+            )
+        return self._matmul(w, jnp.nan)
+
+    def __rmatmul__(self, r: ArrayLike) -> jnp.ndarray:
+        r = jnp.asarray(r)
+        if r.ndim not in (1, 2) or r.shape[-1] != self.shape[0]:
+            raise ValueError(
+                f"Cannot multiply an array of shape {r.shape} by a design with "
+                f"{self.shape[0]} samples!"
+            )
+        w = jnp.zeros((self.shape[1], *r.shape[:-1]), dtype=r.dtype)
+        (out,) = jax.linear_transpose(lambda v: self._matmul(v, None), w)(r.T)
+        return out.T
+
+    def transpose(self, axes=None) -> _TransposedLazyDesignMatrix:
+        if axes is not None and tuple(axes) != (1, 0):
+            raise ValueError("A design matrix can only be transposed as a whole!")
+        return _TransposedLazyDesignMatrix(self)
+
+    def __getitem__(self, idx) -> LazyDesignMatrix:
+        """Select samples, with a concrete integer or boolean array or a slice."""
+        if isinstance(idx, tuple):
+            if len(idx) > 2 or (len(idx) == 2 and idx[1] != slice(None)):
+                raise IndexError("Lazy design matrices support row indexing only!")
+            idx = idx[0]
+        if not isinstance(idx, slice):
+            idx = np.atleast_1d(np.asarray(idx))
+        rows = jnp.arange(self.shape[0]) if self.rows is None else self.rows
+        return self.__class__(self.block, self.invalid, rows[idx])
+
+    def astype(self, dtype) -> LazyDesignMatrix:
+        return self.__class__(
+            jax.tree_util.tree_map(lambda x: x.astype(dtype), self.block),
+            self.invalid,
+            self.rows,
+        )
+
+    def valid_rows(self) -> jnp.ndarray:
+        """Boolean array flagging the selected samples whose features are all finite."""
+        valid = ~self.invalid
+        return valid if self.rows is None else valid[self.rows]
+
+    def todense(self) -> jnp.ndarray:
+        """Compute the design matrix, of shape ``(n_samples, n_features)``."""
+        return self @ jnp.eye(self.shape[1], dtype=self.dtype)
+
+    @jax.jit
+    def gram(self) -> jnp.ndarray:
+        """
+        Compute ``X.T @ X`` over the valid samples, one feature at a time.
+
+        Only one column of the design is evaluated at a time, so that the memory scales with
+        ``n_samples + n_features ** 2``.
+
+        Returns
+        -------
+        :
+            The Gram matrix, shape ``(n_features, n_features)``.
+        """
+        eye = jnp.eye(self.shape[1], dtype=self.dtype)
+        return lax.map(lambda e: self._matmul(e, None) @ self, eye)
+
+
+class _TransposedLazyDesignMatrix:
+    """Transpose of a lazy design matrix, multiplying the samples by the design."""
+
+    def __init__(self, design: LazyDesignMatrix):
+        self.design = design
+        self.shape = design.shape[::-1]
+        self.ndim = 2
+
+    @property
+    def dtype(self):
+        return self.design.dtype
+
+    @property
+    def T(self) -> LazyDesignMatrix:
+        return self.design
+
+    def __matmul__(self, r: ArrayLike) -> jnp.ndarray:
+        return (jnp.asarray(r).T @ self.design).T
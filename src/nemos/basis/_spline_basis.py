@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import abc
 import copy
+from functools import lru_cache
 from typing import Literal, Optional, Tuple
 
 import numpy as np
@@ -235,37 +236,17 @@ class MSplineBasis(SplineBasis, abc.ABC):
 
         Notes
         -----
-        The implementation uses a recursive definition of M-splines. Boundary
+        All the basis functions are evaluated together with the Cox-de Boor recursion
+        over the spline order, see :func:`mspline_basis`. Boundary
         conditions are handled such that the basis functions are positive and
         integrate to one over the domain defined by the sample points.
         """
-        sample_pts, scaling = min_max_rescale_samples(
-            sample_pts, getattr(self, "bounds", None)
-        )
-        # add knots if not passed
-        knot_locs = self._generate_knots(is_cyclic=False)
-
-        # get the original shape
-        shape = sample_pts.shape
-        X = np.stack(
-            [
-                mspline(
-                    sample_pts.reshape(
-                        -1,
-                    ),
-                    self.order,
-                    i,
-                    knot_locs,
-                )
-                for i in range(self.n_basis_funcs)
-            ],
-            axis=1,
+        return _evaluate_mspline(
+            sample_pts,
+            self.order,
+            self._generate_knots(is_cyclic=False),
+            getattr(self, "bounds", None),
         )
-        X = X.reshape(*shape, X.shape[1])
-        # re-normalize so that it integrates to 1 over the range.
-        X /= scaling[..., None]
-
-        return X
 
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
         """
@@ -290,8 +271,25 @@ class MSplineBasis(SplineBasis, abc.ABC):
         Y : NDArray
             A 2D array where each row corresponds to the evaluated M-spline basis
             function values at the points in X. Shape: ``(n_samples, n_basis_funcs)``.
+
+        Notes
+        -----
+        The evaluations are cached by knots, order and grid, so that repeated calls
+        with the same basis configuration do not re-evaluate the splines.
         """
-        return super().evaluate_on_grid(n_samples)
+        if not isinstance(n_samples, (int, np.integer)) or n_samples <= 0:
+            # let the generic implementation handle the invalid inputs
+            return super().evaluate_on_grid(n_samples)
+        knots = self._generate_knots(is_cyclic=False)
+        bounds = getattr(self, "bounds", None)
+        X, Y = _mspline_on_grid(
+            tuple(knots),
+            self.order,
+            None if bounds is None else tuple(bounds),
+            int(n_samples),
+        )
+        # copy so that the cached arrays cannot be modified in place
+        return X.copy(), Y.copy()
 
 
 class BSplineBasis(SplineBasis, abc.ABC):
@@ -582,26 +580,129 @@ def mspline(x: NDArray, k: int, i: int, T: NDArray) -> NDArray:
     >>> mspline_eval.shape
     (100,)
     """
-    # Boundary conditions.
-    if (T[i + k] - T[i]) < 1e-6:
-        return np.zeros_like(x)
+    x = np.asarray(x, dtype=float)[:, None]
+    # the i-th element only depends on the knots T[i], ..., T[i + k]
+    T = np.asarray(T, dtype=float)[i : i + k + 1]
+
+    # Cox-de Boor recursion over the order, vectorized over the sub-elements:
+    # start from the first-order elements on each knot interval.
+    width = T[1:] - T[:-1]
+    valid = width >= 1e-6
+    v = np.where(
+        (x >= T[:-1]) & (x < T[1:]) & valid, 1 / np.where(valid, width, 1.0), 0.0
+    )
+    for order in range(2, k + 1):
+        width = T[order:] - T[:-order]
+        valid = width >= 1e-6
+        scale = np.where(valid, order / ((order - 1) * np.where(valid, width, 1.0)), 0)
+        v = scale * ((x - T[:-order]) * v[:, :-1] + (T[order:] - x) * v[:, 1:])
+        # boundary conditions
+        v[:, ~valid] = 0.0
+    return v[:, 0]
 
-    # Special base case of first-order spline basis.
-    elif k == 1:
-        v = np.zeros_like(x)
-        v[(x >= T[i]) & (x < T[i + 1])] = 1 / (T[i + 1] - T[i])
-        return v
 
-    # General case, defined recursively
-    else:
-        return (
-            k
-            * (
-                (x - T[i]) * mspline(x, k - 1, i, T)
-                + (T[i + k] - x) * mspline(x, k - 1, i + 1, T)
-            )
-            / ((k - 1) * (T[i + k] - T[i]))
-        )
+def mspline_basis(x: NDArray, k: int, T: NDArray) -> NDArray:
+    """Compute all the M-spline basis functions defined by a knot sequence.
+
+    The basis functions are evaluated with the Cox-de Boor recursion in a single
+    pass over the samples. Only the ``k`` elements that are non-zero at each sample
+    are computed, i.e. the elements supported on the knot interval containing the sample.
+
+    Parameters
+    ----------
+    x
+        Spacing for basis functions, shape (n_sample_points, ).
+    k
+        Order of the spline basis.
+    T
+        knot locations, sorted in ascending order. should lie in interval [0, 1],
+        shape (k + n_basis_funcs,).
+
+    Returns
+    -------
+    spline
+        M-spline basis functions, shape (n_sample_points, n_basis_funcs).
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from nemos.basis._spline_basis import mspline_basis
+    >>> sample_points = np.linspace(0, 1, 100)
+    >>> knots = np.array([0, 0, 0, 0.25, 0.5, 0.75, 1, 1, 1])
+    >>> mspline_basis(sample_points, 3, knots).shape
+    (100, 6)
+    """
+    x = np.asarray(x, dtype=float)
+    T = np.asarray(T, dtype=float)
+    n_knots = T.shape[0]
+
+    # index j of the knot interval [T[j], T[j + 1]) containing each sample
+    j = np.searchsorted(T, x, side="right") - 1
+    in_range = (j >= 0) & (j < n_knots - 1)
+    j = np.clip(j, 0, n_knots - 2)
+    xs = x[:, None]
+
+    # non-zero first-order element: the normalized indicator of the interval
+    width = T[j + 1] - T[j]
+    v = np.where(in_range & (width >= 1e-6), 1 / np.where(width >= 1e-6, width, 1), 0)
+    v = v[:, None]
+
+    # at order m, column r holds the element i = j - m + 1 + r
+    for order in range(2, k + 1):
+        i = j[:, None] - order + 1 + np.arange(order)
+        is_element = (i >= 0) & (i < n_knots - order)
+        lo = T[np.clip(i, 0, n_knots - 1)]
+        hi = T[np.clip(i + order, 0, n_knots - 1)]
+        width = hi - lo
+        valid = is_element & (width >= 1e-6)
+        scale = np.where(valid, order / ((order - 1) * np.where(valid, width, 1)), 0)
+        # elements i and i + 1 of the previous order, zero outside of their support
+        v_prev = np.pad(v, ((0, 0), (1, 0)))
+        v_next = np.pad(v, ((0, 0), (0, 1)))
+        v = scale * ((xs - lo) * v_prev + (hi - xs) * v_next)
+
+    # scatter the non-zero values in the full basis matrix, padded with k - 1 columns
+    # on each side for the elements that fall outside of the basis
+    out = np.zeros((x.shape[0], n_knots + k - 2))
+    out[np.arange(x.shape[0])[:, None], j[:, None] + np.arange(k)] = v
+    out = out[:, k - 1 : n_knots - 1]
+
+    # for order > 1, NaN samples give NaN in all the elements with a non-empty support
+    is_nan = np.isnan(x)
+    if k > 1 and np.any(is_nan):
+        out[is_nan] = np.where(T[k:] - T[:-k] >= 1e-6, np.nan, 0.0)
+    return out
+
+
+def _evaluate_mspline(
+    sample_pts: NDArray,
+    order: int,
+    knots: NDArray,
+    bounds: Optional[Tuple[float, float]],
+) -> NDArray:
+    """Rescale the samples and evaluate the M-spline basis, integrating to one over the bounds."""
+    sample_pts, scaling = min_max_rescale_samples(sample_pts, bounds)
+    # get the original shape
+    shape = sample_pts.shape
+    X = mspline_basis(sample_pts.reshape(-1), order, knots)
+    X = X.reshape(*shape, X.shape[1])
+    # re-normalize so that it integrates to 1 over the range.
+    X /= scaling[..., None]
+    return X
+
+
+@lru_cache(maxsize=32)
+def _mspline_on_grid(
+    knots: Tuple[float, ...],
+    order: int,
+    bounds: Optional[Tuple[float, float]],
+    n_samples: int,
+) -> Tuple[NDArray, NDArray]:
+    """Evaluate the M-spline basis on an equi-spaced grid, caching the results."""
+    mn, mx = (0, 1) if bounds is None else bounds
+    X = np.linspace(mn, mx, n_samples)
+    Y = _evaluate_mspline(X, order, np.array(knots), bounds)
+    return X, Y
 
 
 def bspline(
@@ -12,6 +12,7 @@ from ._basis import add_docstring
 from ._basis_mixin import AtomicBasisMixin, ConvBasisMixin, EvalBasisMixin
 from ._decaying_exponential import OrthExponentialBasis
 from ._identity import HistoryBasis, IdentityBasis
+from ._lazy_features import LazyDesignMatrix, LazyFeatureMatrix
 from ._raised_cosine_basis import RaisedCosineBasisLinear, RaisedCosineBasisLog
 from ._spline_basis import BSplineBasis, CyclicBSplineBasis, MSplineBasis
 from ._transformer_basis import TransformerBasis
@@ -121,7 +122,15 @@ class BSplineEval(EvalBasisMixin, BSplineBasis):
         return super().split_by_feature(x, axis=axis)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -136,8 +145,15 @@ class BSplineEval(EvalBasisMixin, BSplineBasis):
         >>> features.shape
         (1000, 10)
 
+        >>> # store the non-zero entries only, at most ``order`` per sample
+        >>> sparse_features = basis.compute_features(X, sparse=True)
+        >>> sparse_features.shape
+        (1000, 10)
+
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("evaluate_on_grid", BSplineBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
@@ -274,7 +290,15 @@ class BSplineConv(ConvBasisMixin, BSplineBasis):
         return super().split_by_feature(x, axis=axis)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -290,7 +314,9 @@ class BSplineConv(ConvBasisMixin, BSplineBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("evaluate_on_grid", BSplineBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
@@ -414,7 +440,15 @@ class CyclicBSplineEval(EvalBasisMixin, CyclicBSplineBasis):
         return super().split_by_feature(x, axis=axis)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -430,7 +464,9 @@ class CyclicBSplineEval(EvalBasisMixin, CyclicBSplineBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("evaluate_on_grid", CyclicBSplineBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
@@ -559,7 +595,15 @@ class CyclicBSplineConv(ConvBasisMixin, CyclicBSplineBasis):
         return super().split_by_feature(x, axis=axis)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -575,7 +619,9 @@ class CyclicBSplineConv(ConvBasisMixin, CyclicBSplineBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("evaluate_on_grid", CyclicBSplineBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
@@ -723,7 +769,15 @@ class MSplineEval(EvalBasisMixin, MSplineBasis):
         return MSplineBasis.split_by_feature(self, x, axis=axis)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -739,7 +793,9 @@ class MSplineEval(EvalBasisMixin, MSplineBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("evaluate_on_grid", MSplineBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
@@ -892,7 +948,15 @@ class MSplineConv(ConvBasisMixin, MSplineBasis):
         return super().split_by_feature(x, axis=axis)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -908,7 +972,9 @@ class MSplineConv(ConvBasisMixin, MSplineBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("evaluate_on_grid", MSplineBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
@@ -1035,7 +1101,15 @@ class RaisedCosineLinearEval(EvalBasisMixin, RaisedCosineBasisLinear):
         return super().evaluate_on_grid(n_samples)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1051,7 +1125,9 @@ class RaisedCosineLinearEval(EvalBasisMixin, RaisedCosineBasisLinear):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", RaisedCosineBasisLinear)
     def split_by_feature(
@@ -1181,7 +1257,15 @@ class RaisedCosineLinearConv(ConvBasisMixin, RaisedCosineBasisLinear):
         return super().evaluate_on_grid(n_samples)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1197,7 +1281,9 @@ class RaisedCosineLinearConv(ConvBasisMixin, RaisedCosineBasisLinear):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", RaisedCosineBasisLinear)
     def split_by_feature(
@@ -1330,7 +1416,15 @@ class RaisedCosineLogEval(EvalBasisMixin, RaisedCosineBasisLog):
         return super().evaluate_on_grid(n_samples)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1346,7 +1440,9 @@ class RaisedCosineLogEval(EvalBasisMixin, RaisedCosineBasisLog):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", RaisedCosineBasisLog)
     def split_by_feature(
@@ -1488,7 +1584,15 @@ class RaisedCosineLogConv(ConvBasisMixin, RaisedCosineBasisLog):
         return super().evaluate_on_grid(n_samples)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1504,7 +1608,9 @@ class RaisedCosineLogConv(ConvBasisMixin, RaisedCosineBasisLog):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", RaisedCosineBasisLog)
     def split_by_feature(
@@ -1605,6 +1711,13 @@ class OrthExponentialEval(EvalBasisMixin, OrthExponentialBasis):
             label=label,
         )
 
+    def _feature_halo(self) -> int:
+        """The basis is orthogonalized over all the samples, which cannot be split in chunks."""
+        raise ValueError(
+            "OrthExponentialEval features are orthogonalized over all the samples and "
+            "cannot be computed in chunks!"
+        )
+
     @add_docstring("evaluate_on_grid", OrthExponentialBasis)
     def evaluate_on_grid(self, n_samples: int) -> Tuple[NDArray, NDArray]:
         """
@@ -1623,7 +1736,15 @@ class OrthExponentialEval(EvalBasisMixin, OrthExponentialBasis):
         return super().evaluate_on_grid(n_samples=n_samples)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1639,7 +1760,9 @@ class OrthExponentialEval(EvalBasisMixin, OrthExponentialBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", OrthExponentialBasis)
     def split_by_feature(
@@ -1768,7 +1891,15 @@ class OrthExponentialConv(ConvBasisMixin, OrthExponentialBasis):
         return super().evaluate_on_grid(n_samples)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1784,7 +1915,9 @@ class OrthExponentialConv(ConvBasisMixin, OrthExponentialBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", OrthExponentialBasis)
     def split_by_feature(
@@ -1897,7 +2030,15 @@ class IdentityEval(EvalBasisMixin, IdentityBasis):
         return super().evaluate_on_grid(n_samples=n_samples)
 
     @add_docstring("_compute_features", EvalBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -1913,7 +2054,9 @@ class IdentityEval(EvalBasisMixin, IdentityBasis):
         (1000, 1)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", IdentityBasis)
     def split_by_feature(
@@ -2016,7 +2159,15 @@ class HistoryConv(ConvBasisMixin, HistoryBasis):
         return super().evaluate_on_grid(n_samples)
 
     @add_docstring("_compute_features", ConvBasisMixin)
-    def compute_features(self, xi: ArrayLike) -> FeatureMatrix:
+    def compute_features(
+        self,
+        xi: ArrayLike,
+        *,
+        sparse: bool = False,
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        out: Optional[NDArray] = None,
+    ) -> FeatureMatrix | LazyFeatureMatrix | LazyDesignMatrix:
         """
         Examples
         --------
@@ -2032,7 +2183,9 @@ class HistoryConv(ConvBasisMixin, HistoryBasis):
         (1000, 10)
 
         """
-        return super().compute_features(xi)
+        return super().compute_features(
+            xi, sparse=sparse, lazy=lazy, chunk_size=chunk_size, out=out
+        )
 
     @add_docstring("split_by_feature", IdentityBasis)
     def split_by_feature(
@@ -0,0 +1,301 @@
+"""Cache of the compiled solver functions, shared across model instances.
+
+Every call to ``instantiate_solver`` (and hence every ``fit``) builds new closures around a
+new solver, which JAX must trace and compile again, even when the configuration of the model
+and the shape of the data did not change. This module keeps the jitted ``run``, ``update`` and
+``init_state`` functions of the solvers in a least-recently-used cache keyed by the model
+configuration (model class, solver name and kwargs, regularizer, regularizer strength,
+observation model and any other model parameter). JAX then re-uses the compiled executables
+for inputs of the same shapes and dtypes, e.g. across the folds of a cross-validation loop
+or across clones of the same estimator.
+
+Compiled executables can additionally be persisted to disk, and re-used between Python
+sessions, with JAX's persistent compilation cache, see :func:`enable_persistent_cache`.
+
+Examples
+--------
+>>> import numpy as np
+>>> import nemos as nmo
+>>> nmo.compilation_cache.clear_cache()
+>>> X, y = np.random.normal(size=(100, 2)), np.random.poisson(size=100)
+>>> for _ in range(3):
+...     model = nmo.glm.GLM().fit(X, y)
+>>> # the solver is compiled by the first fit only
+>>> info = nmo.compilation_cache.cache_info()
+>>> info.misses, info.hits
+(1, 2)
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple
+
+import jax
+import numpy as np
+
+__all__ = [
+    "CacheInfo",
+    "cache_info",
+    "clear_cache",
+    "set_cache_size",
+    "enable_persistent_cache",
+]
+
+_DEFAULT_MAXSIZE = 128
+
+
+class CacheInfo(NamedTuple):
+    """
+    Statistics of the solver compilation cache.
+
+    Attributes
+    ----------
+    hits :
+        Number of solver calls that re-used a compiled executable.
+    misses :
+        Number of solver calls that required tracing and compiling, i.e. the first call for
+        each combination of model configuration and input shapes and dtypes.
+    maxsize :
+        Maximum number of model configurations stored.
+    currsize :
+        Number of model configurations currently stored.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class SolverFunctions(NamedTuple):
+    """The jitted solver functions and the loss stored in a cache entry."""
+
+    loss: Callable
+    run: Callable
+    update: Callable
+    init_state: Callable
+
+
+class _SolverCache:
+    """Least-recently-used cache of the jitted solver functions."""
+
+    def __init__(self, maxsize: int = _DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(
+        self, key: Optional[Hashable], build: Callable[[], Tuple[Callable, ...]]
+    ) -> SolverFunctions:
+        """
+        Return the solver functions for a configuration, building them on a cache miss.
+
+        Parameters
+        ----------
+        key :
+            The configuration key, or None if the configuration cannot be cached.
+        build :
+            Function returning the un-jitted ``(loss, run, update, init_state)``.
+            ``run`` and ``update`` are jitted.
+
+        Returns
+        -------
+        :
+            The jitted solver functions, instrumented to count hits and misses.
+        """
+        if key is not None and key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        loss, run, update, init_state = build()
+        entry = SolverFunctions(
+            loss,
+            self._instrument(jax.jit(run)),
+            self._instrument(jax.jit(update)),
+            # the state initialization is cheap and may hold python scalars
+            init_state,
+        )
+
+        if key is not None and self.maxsize > 0:
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _instrument(self, func: Callable) -> Callable:
+        """Wrap a jitted function to count the calls re-using a compiled executable."""
+        seen_signatures = set()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            signature = _abstract_signature((args, kwargs))
+            if signature in seen_signatures:
+                self.hits += 1
+            else:
+                seen_signatures.add(signature)
+                self.misses += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    def clear(self):
+        """Drop all the entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_SOLVER_CACHE = _SolverCache()
+
+
+def _abstract_signature(tree: Any) -> Hashable:
+    """Hashable description of the structure, shapes and dtypes of a pytree."""
+    leaves, treedef = jax.tree_util.tree_flatten(tree)
+    return treedef, tuple(
+        ((np.shape(leaf), str(leaf.dtype)) if hasattr(leaf, "dtype") else type(leaf))
+        for leaf in leaves
+    )
+
+
+def _to_hashable(obj: Any) -> Hashable:
+    """
+    Convert a model parameter into a hashable object.
+
+    Arrays are converted to their shape, dtype and content, containers are converted
+    element-wise and nemos objects are converted through their parameters. Objects that
+    cannot be hashed raise a TypeError.
+    """
+    if hasattr(obj, "get_params") and not isinstance(obj, type):
+        return type(obj), _to_hashable(obj.get_params(deep=False))
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _to_hashable(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return type(obj), tuple(_to_hashable(v) for v in obj)
+    if hasattr(obj, "shape") and hasattr(obj, "dtype"):
+        if jax.dtypes.issubdtype(obj.dtype, jax.dtypes.prng_key):
+            obj = jax.random.key_data(obj)
+        obj = np.asarray(obj)
+        return obj.shape, obj.dtype.name, obj.tobytes()
+    hash(obj)
+    return obj
+
+
+def make_cache_key(model: Any, solver_kwargs: dict, args: tuple) -> Optional[Hashable]:
+    """
+    Build the key identifying the solver functions of a model.
+
+    Parameters
+    ----------
+    model :
+        The regression model instantiating the solver.
+    solver_kwargs :
+        The keyword arguments used to instantiate the solver.
+    args :
+        The extra positional arguments of the solver, e.g. the regularizer strength
+        of proximal methods.
+
+    Returns
+    -------
+    :
+        A hashable key, or None if some of the parameters cannot be hashed, in which
+        case the solver functions are not cached.
+    """
+    try:
+        return (
+            type(model),
+            _to_hashable(model.get_params(deep=False)),
+            _to_hashable(solver_kwargs),
+            _to_hashable(args),
+        )
+    except TypeError:
+        return None
+
+
+def cache_info() -> CacheInfo:
+    """
+    Return the statistics of the solver compilation cache.
+
+    Returns
+    -------
+    :
+        The number of hits and misses, the maximum and the current size of the cache.
+
+    Examples
+    --------
+    >>> import nemos as nmo
+    >>> nmo.compilation_cache.clear_cache()
+    >>> nmo.compilation_cache.cache_info()
+    CacheInfo(hits=0, misses=0, maxsize=128, currsize=0)
+    """
+    return CacheInfo(
+        hits=_SOLVER_CACHE.hits,
+        misses=_SOLVER_CACHE.misses,
+        maxsize=_SOLVER_CACHE.maxsize,
+        currsize=len(_SOLVER_CACHE._entries),
+    )
+
+
+def clear_cache():
+    """
+    Clear the solver compilation cache and reset its statistics.
+
+    Models that have already instantiated their solver keep their compiled functions.
+    """
+    _SOLVER_CACHE.clear()
+
+
+def set_cache_size(maxsize: int):
+    """
+    Set the maximum number of model configurations stored in the cache.
+
+    Parameters
+    ----------
+    maxsize :
+        The maximum number of entries. If 0, the solver functions are not cached and
+        each model compiles its own solver, as if no cache was present.
+
+    Raises
+    ------
+    ValueError
+        If ``maxsize`` is not a non-negative integer.
+    """
+    if not isinstance(maxsize, int) or maxsize < 0:
+        raise ValueError(
+            f"`maxsize` must be a non-negative integer. {maxsize} provided instead!"
+        )
+    _SOLVER_CACHE.maxsize = maxsize
+    while len(_SOLVER_CACHE._entries) > maxsize:
+        _SOLVER_CACHE._entries.popitem(last=False)
+
+
+def enable_persistent_cache(
+    cache_dir: str | os.PathLike,
+    min_compile_time_secs: float = 0.0,
+    min_entry_size_bytes: int = 0,
+):
+    """
+    Persist the compiled executables to disk with JAX's persistent compilation cache.
+
+    The executables are then re-used across Python sessions, removing the compilation
+    time from the first ``fit`` of each session.
+
+    Parameters
+    ----------
+    cache_dir :
+        Directory in which the executables are stored.
+    min_compile_time_secs :
+        Only executables that took longer than this to compile are stored.
+    min_entry_size_bytes :
+        Only executables larger than this are stored.
+    """
+    cache_dir = os.fspath(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    jax.config.update("jax_compilation_cache_dir", cache_dir)
+    jax.config.update(
+        "jax_persistent_cache_min_compile_time_secs", min_compile_time_secs
+    )
+    jax.config.update("jax_persistent_cache_min_entry_size_bytes", min_entry_size_bytes)
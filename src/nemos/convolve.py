@@ -19,6 +19,9 @@ _CORR_VEC_BASIS = jax.vmap(partial(jnp.convolve, mode="valid"), (None, 1), 1)
 _CORR_VEC = jax.vmap(partial(jnp.convolve, mode="valid"), (1, None), 1)
 _CORR_VEC = jax.vmap(_CORR_VEC, (None, 1), 2)
 
+# the FFT backend is selected automatically for windows of at least this many samples
+_FFT_MIN_WINDOW_SIZE = 32
+
 
 @jax.jit
 def tensor_convolve(array: NDArray, eval_basis: NDArray):
@@ -62,7 +65,129 @@ def tensor_convolve(array: NDArray, eval_basis: NDArray):
     return conv
 
 
-def _shift_time_axis_and_convolve(array: NDArray, eval_basis: NDArray, axis: int):
+def _get_fft_size(num_samples: int, window_size: int) -> int:
+    """
+    Return the FFT length used by the overlap-save convolution.
+
+    The FFT length is the smallest power of two larger than ``8 * window_size``, which
+    keeps the redundant computation on the overlapping segments below 1/8, capped to the
+    smallest power of two covering the whole signal.
+
+    Parameters
+    ----------
+    num_samples :
+        Number of samples of the signal.
+    window_size :
+        Number of samples of the convolution window.
+
+    Returns
+    -------
+    :
+        The FFT length.
+    """
+    return 1 << int(min(8 * window_size, num_samples) - 1).bit_length()
+
+
+@partial(jax.jit, static_argnums=(2,))
+def fft_tensor_convolve(array: NDArray, eval_basis: NDArray, fft_size: int):
+    """
+    Apply a convolution on the given array with the evaluation basis using the FFT.
+
+    The convolution is computed with the overlap-save method: the signal is split in
+    overlapping segments of ``fft_size`` samples, each segment is convolved in the
+    frequency domain, and the ``window_size - 1`` samples affected by the circular
+    wrap-around are discarded. The cost is ``O(num_samples * log(fft_size))`` instead
+    of the ``O(num_samples * window_size)`` of :func:`tensor_convolve`.
+
+    Parameters
+    ----------
+    array :
+        The input array to convolve. It is expected to be at least 1D. The first axis is expeted to be
+        the sample axis, i.e. the shape of array is ``(num_samples, ...)``.
+    eval_basis :
+        The evaluation basis array for convolution. It should be 2D, where the first dimension
+        represents the window size for convolution. Shape ``(window_size, n_basis_funcs)``.
+    fft_size :
+        The length of the FFT. Must be larger or equal than ``window_size``.
+
+    Returns
+    -------
+    :
+        The convolved array, with the same shape as the output of :func:`tensor_convolve`.
+
+    Notes
+    -----
+    A NaN or Inf in the input would spread over the whole segment in the frequency
+    domain. Non-finite samples are therefore set to zero before the transform, and each
+    output sample whose window overlaps a non-finite input is set to NaN, matching the NaN
+    propagation of the direct convolution.
+    """
+    num_samples, window_size = array.shape[0], eval_basis.shape[0]
+    flat = array.reshape(num_samples, -1)
+
+    # mask the non-finite inputs and flag the output windows that include them
+    is_invalid = ~jnp.isfinite(flat)
+    flat = jnp.where(is_invalid, 0.0, flat)
+    invalid_count = jnp.cumsum(
+        jnp.pad(is_invalid.astype(int), ((1, 0), (0, 0))), axis=0
+    )
+    invalid_window = (invalid_count[window_size:] - invalid_count[:-window_size]) > 0
+
+    # split the signal into segments overlapping by window_size - 1 samples
+    num_valid = num_samples - window_size + 1
+    step = fft_size - window_size + 1
+    num_segments = -(-num_valid // step)
+    pad = num_segments * step + window_size - 1 - num_samples
+    flat = jnp.pad(flat, ((0, pad), (0, 0)))
+    idx = jnp.arange(num_segments)[:, None] * step + jnp.arange(fft_size)[None]
+
+    # convolve in the frequency domain and drop the wrapped-around samples
+    signal_fft = jnp.fft.rfft(flat[idx], n=fft_size, axis=1)
+    basis_fft = jnp.fft.rfft(eval_basis, n=fft_size, axis=0)
+    conv = jnp.fft.irfft(
+        signal_fft[..., None] * basis_fft[None, :, None], n=fft_size, axis=1
+    )
+    conv = conv[:, window_size - 1 :].reshape(num_segments * step, *conv.shape[2:])
+    conv = jnp.where(invalid_window[..., None], jnp.nan, conv[:num_valid])
+
+    # unravel the dimensions
+    return conv.reshape(num_valid, *array.shape[1:], eval_basis.shape[1])
+
+
+def _select_convolution_method(
+    num_samples: int, window_size: int, method: Literal["auto", "direct", "fft"]
+) -> Literal["direct", "fft"]:
+    """
+    Select the convolution backend.
+
+    Parameters
+    ----------
+    num_samples :
+        Number of samples of the signal.
+    window_size :
+        Number of samples of the convolution window.
+    method :
+        The requested method. If ``"auto"``, the FFT is used for windows of at least
+        ``_FFT_MIN_WINDOW_SIZE`` samples, as long as the signal is longer than two windows.
+
+    Returns
+    -------
+    :
+        Either ``"direct"`` or ``"fft"``.
+    """
+    if method != "auto":
+        return method
+    if window_size >= _FFT_MIN_WINDOW_SIZE and num_samples >= 2 * window_size:
+        return "fft"
+    return "direct"
+
+
+def _shift_time_axis_and_convolve(
+    array: NDArray,
+    eval_basis: NDArray,
+    axis: int,
+    method: Literal["auto", "direct", "fft"] = "direct",
+):
     """
     Shifts the specified axis to the first position, applies convolution, and then reverses the shift.
 
@@ -79,6 +204,8 @@ def _shift_time_axis_and_convolve(array: NDArray, eval_basis: NDArray, axis: int
     axis : int
         The axis along which the convolution is applied. This axis is temporarily shifted
         to the first position for the convolution operation.
+    method : str
+        The convolution backend, ``"direct"``, ``"fft"`` or ``"auto"``.
 
     Returns
     -------
@@ -95,7 +222,12 @@ def _shift_time_axis_and_convolve(array: NDArray, eval_basis: NDArray, axis: int
     array = jnp.transpose(array, new_axis)
 
     # convolve
-    if array.ndim > 1:
+    num_samples, window_size = array.shape[0], eval_basis.shape[0]
+    if _select_convolution_method(num_samples, window_size, method) == "fft":
+        conv = fft_tensor_convolve(
+            array, eval_basis, _get_fft_size(num_samples, window_size)
+        )
+    elif array.ndim > 1:
         conv = tensor_convolve(array, eval_basis)
     else:
         conv = _CORR_VEC_BASIS(array, eval_basis)
@@ -134,6 +266,7 @@ def _convolve_pad_and_shift(
     predictor_causality: Literal["causal", "acausal", "anti-causal"] = "causal",
     axis: int = 0,
     shift: Optional[bool] = None,
+    method: Literal["auto", "direct", "fft"] = "direct",
 ):
     """Create predictor by convolving basis_matrix with time_series.
 
@@ -164,6 +297,8 @@ def _convolve_pad_and_shift(
         Whether to shift predictor based on causality (only valid if
         `predictor_causality != 'acausal'`). Default is True for `causal` and
         `anti-causal`, False for `acausal`.
+    method :
+        The convolution backend, `"direct"`, `"fft"` or `"auto"`.
 
     Returns
     -------
@@ -173,7 +308,7 @@ def _convolve_pad_and_shift(
 
     # apply convolution
     def conv(x):
-        return _shift_time_axis_and_convolve(x, basis_matrix, axis=axis)
+        return _shift_time_axis_and_convolve(x, basis_matrix, axis=axis, method=method)
 
     predictor = jax.tree_util.tree_map(conv, time_series)
 
@@ -205,6 +340,7 @@ def create_convolutional_predictor(
     predictor_causality: Literal["causal", "acausal", "anti-causal"] = "causal",
     shift: Optional[bool] = None,
     axis: int = 0,
+    method: Literal["auto", "direct", "fft"] = "auto",
 ):
     """Create a convolutional predictor by convolving a basis matrix with a time series.
 
@@ -239,6 +375,12 @@ def create_convolutional_predictor(
         If None, it defaults to True for 'causal' and 'anti-causal' and to False for 'acausal'.
     axis :
         The axis along which the convolution is applied.
+    method :
+        The convolution backend.
+        - 'direct': Direct convolution, with cost proportional to ``num_samples * window_size``.
+        - 'fft': Overlap-save FFT convolution, with cost proportional to
+          ``num_samples * log(window_size)``. Equivalent to 'direct' up to floating point precision.
+        - 'auto': Use 'fft' for windows of at least 32 samples and 'direct' otherwise.
 
     Returns
     -------
@@ -260,6 +402,8 @@ def create_convolutional_predictor(
         is less than the window size of the `basis_matrix`.
     ValueError:
         If shifting is attempted with 'acausal' causality.
+    ValueError:
+        If `method` is not one of 'auto', 'direct' or 'fft'.
     """
     # convert to jnp.ndarray
     basis_matrix = jnp.asarray(basis_matrix)
@@ -283,6 +427,11 @@ def create_convolutional_predictor(
             "At list one 0-dimensional array provided."
         )
 
+    if method not in ("auto", "direct", "fft"):
+        raise ValueError(
+            f"`method` must be one of 'auto', 'direct' or 'fft'. {method} provided instead!"
+        )
+
     # assign defaults
     if shift is None:
         if predictor_causality == "acausal":
@@ -323,6 +472,7 @@ def create_convolutional_predictor(
         predictor_causality=predictor_causality,
         axis=axis,
         shift=shift,
+        method=method,
     )
 
     #  concatenate back
@@ -3,39 +3,249 @@
 # required to get ArrayLike to render correctly
 from __future__ import annotations
 
+import inspect
+import os
 import warnings
-from functools import wraps
+from functools import partial, wraps
 from typing import Any, Callable, Literal, NamedTuple, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
 import jaxopt
+import numpy as np
 from numpy.typing import ArrayLike
 
 from . import observation_models as obs
-from . import tree_utils, validation
+from . import _sharding, inference, model_selection, solvers, tree_utils, validation
+from ._chunking import count_valid_samples, iter_valid_chunks, make_chunk_factory
 from .base_regressor import BaseRegressor
+from .basis._lazy_features import LazyDesignMatrix
 from .exceptions import NotFittedError
+from .inference import LowRankCovariance, Resampling, _weighted_gram
 from .initialize_regressor import initialize_intercept_matching_mean_rate
+from .model_selection import (
+    CrossValidation,
+    RegularizationPath,
+    StackedFit,
+    StackedScore,
+)
 from .pytrees import FeaturePytree
-from .regularizer import GroupLasso, Lasso, Regularizer, Ridge
+from .regularizer import GroupLasso, Lasso, Regularizer, Ridge, UnRegularized
 from .solvers._compute_defaults import glm_compute_optimal_stepsize_configs
+from .solvers._streaming import (
+    ChunkedObjective,
+    streaming_minibatch,
+    streaming_proximal_gradient,
+    streaming_r_factor,
+    streaming_svrg,
+)
 from .type_casting import jnp_asarray_if, support_pynapple
 from .typing import DESIGN_INPUT_TYPE
 from .utils import format_repr
 
 ModelParams = Tuple[jnp.ndarray, jnp.ndarray]
 
+_STREAMING_SOLVERS = (
+    "GradientDescent",
+    "ProximalGradient",
+    "SVRG",
+    "ProxSVRG",
+    "SGD",
+    "Adam",
+)
+
+# floating point types in which the design matrix can be stored, see ``GLM.precision``
+_DESIGN_PRECISIONS = {"float32": jnp.float32, "bfloat16": jnp.bfloat16}
+
+# fraction of the dense product below which PopulationGLM multiplies each block of
+# neurons by the active features of the block only
+_MASKED_MATMUL_MAX_DENSITY = 0.5
+# maximum number of blocks of neurons multiplied separately
+_MASKED_MATMUL_MAX_BLOCKS = 16
+
+
+def _asarray_float(x: ArrayLike, dtype: Any = float) -> jnp.ndarray:
+    """Cast an array to float, preserving sparse arrays."""
+    return x.astype(dtype) if tree_utils.is_sparse(x) else jnp.asarray(x, dtype=dtype)
+
+
+def _split_matmul(x: jnp.ndarray, w: jnp.ndarray) -> jnp.ndarray:
+    """
+    Product of a low precision matrix by a high precision one, accumulated in high precision.
+
+    ``w`` is split into its rounding to the precision of ``x`` and the rounding error, which
+    are multiplied by ``x`` in a single pass.
+    """
+    high = w.astype(x.dtype)
+    low = (w - high.astype(w.dtype)).astype(x.dtype)
+    out = jnp.matmul(
+        x,
+        jnp.stack((high, low), axis=-1).reshape(w.shape[0], -1),
+        preferred_element_type=w.dtype,
+    )
+    return out.reshape(x.shape[0], *w.shape[1:], 2).sum(axis=-1)
+
+
+@jax.custom_vjp
+def _mixed_precision_matmul(x: jnp.ndarray, w: jnp.ndarray) -> jnp.ndarray:
+    """Product of a low precision design by the coefficients, see ``_design_matmul``."""
+    return _split_matmul(x, w)
+
+
+def _mixed_precision_matmul_fwd(x, w):
+    return _split_matmul(x, w), (x, w)
+
+
+def _mixed_precision_matmul_bwd(residuals, cotangent):
+    x, w = residuals
+    # the cotangent is split as the coefficients, so that ``X.T @ g`` is accumulated in the
+    # precision of the coefficients rather than rounded to the precision of the design
+    grad_w = _split_matmul(x.T, cotangent)
+    grad_x = jnp.tensordot(
+        cotangent, w, axes=(tuple(range(1, cotangent.ndim)), tuple(range(1, w.ndim)))
+    ).astype(x.dtype)
+    return grad_x, grad_w
+
+
+_mixed_precision_matmul.defvjp(_mixed_precision_matmul_fwd, _mixed_precision_matmul_bwd)
+
+
+def _design_matmul(x: jnp.ndarray, w: jnp.ndarray) -> jnp.ndarray:
+    """
+    Multiply a design matrix by the coefficients, accumulating in the precision of the coefficients.
+
+    A dense design stored in a lower precision is not cast. The coefficients are split into
+    their rounding to the precision of the design and the rounding error, which are multiplied
+    by the design in a single pass, so that the product is as accurate as in the precision of
+    the coefficients up to the rounding of the design. The gradient with respect to the
+    coefficients is accumulated in the same way.
+    """
+    if tree_utils.is_sparse(x) or x.dtype == w.dtype:
+        return x @ w
+    return _mixed_precision_matmul(x, w)
+
+
+def _group_neurons_by_mask(
+    mask: Any, n_features: int
+) -> Optional[list[Tuple[Union[slice, np.ndarray], np.ndarray, Optional[np.ndarray]]]]:
+    """
+    Split the neurons into blocks multiplied by the union of their active features.
+
+    Neurons sharing the same active features form exact blocks. With more than
+    ``_MASKED_MATMUL_MAX_BLOCKS`` mask patterns, the neurons are sorted by the location of their
+    active features and split into that many blocks, whose coefficients are masked within the
+    block. Returns a list of ``(features, neurons, block_mask)``, with ``block_mask`` None for
+    exact blocks, or None if the mask is traced, sharded across devices, or too dense for the
+    blocks to save work.
+    """
+    if isinstance(mask, jax.core.Tracer) or (
+        isinstance(mask, jax.Array) and len(mask.sharding.device_set) > 1
+    ):
+        return None
+    mask = np.asarray(mask) != 0
+    if mask.ndim == 1:
+        # pytree masks select all the features of a leaf, (n_neurons,)
+        mask = np.broadcast_to(mask, (n_features, mask.shape[0]))
+    patterns, labels = np.unique(mask.T, axis=0, return_inverse=True)
+    labels = labels.ravel()
+    if len(patterns) <= _MASKED_MATMUL_MAX_BLOCKS:
+        blocks = [np.flatnonzero(labels == label) for label in range(len(patterns))]
+    else:
+        active = np.arange(n_features)[:, None] * mask
+        order = np.lexsort(
+            (active.max(axis=0), active.sum(axis=0) / np.maximum(mask.sum(axis=0), 1))
+        )
+        blocks = np.array_split(order, _MASKED_MATMUL_MAX_BLOCKS)
+
+    groups, cost = [], 0
+    for neurons in blocks:
+        neurons = np.sort(neurons)
+        block_mask = mask[:, neurons]
+        features = np.flatnonzero(block_mask.any(axis=1))
+        cost += len(features) * len(neurons)
+        block_mask = None if np.all(block_mask[features]) else block_mask[features]
+        if len(features) and features[-1] - features[0] + 1 == len(features):
+            # contiguous features are sliced rather than gathered
+            features = slice(features[0], features[-1] + 1)
+        groups.append((features, neurons, block_mask))
+    if cost > _MASKED_MATMUL_MAX_DENSITY * mask.size:
+        return None
+    return groups
+
+
+def _masked_design_matmul(
+    x: jnp.ndarray, w: jnp.ndarray, mask: jnp.ndarray
+) -> jnp.ndarray:
+    """
+    Multiply a design matrix by the coefficients selected by the feature mask of each neuron.
+
+    Each block of neurons is multiplied by the union of the active features of the block only,
+    so that the cost of the product, and of its gradient, scales with the number of active
+    entries of the mask rather than with ``n_features * n_neurons``. Dense masks and sparse
+    designs use the product with the masked coefficients instead.
+    """
+    groups = (
+        None if tree_utils.is_sparse(x) else _group_neurons_by_mask(mask, w.shape[0])
+    )
+    if groups is None:
+        return _design_matmul(x, w * mask)
+    parts = []
+    for features, neurons, block_mask in groups:
+        if isinstance(features, np.ndarray) and not len(features):
+            parts.append(jnp.zeros((x.shape[0], len(neurons)), dtype=w.dtype))
+            continue
+        coef = w[features][:, neurons]
+        if block_mask is not None:
+            coef = coef * block_mask
+        parts.append(_design_matmul(x[:, features], coef))
+    # restore the order of the neurons
+    order = np.argsort(np.concatenate([neurons for _, neurons, _ in groups]))
+    return jnp.take(jnp.concatenate(parts, axis=1), order, axis=1)
+
+
+def _jittered_cholesky(curvature: np.ndarray) -> jnp.ndarray:
+    """
+    Lower Cholesky factor of one or a stack of positive semi-definite matrices.
+
+    A diagonal jitter, relative to the mean diagonal and to the precision of the jax arrays,
+    makes rank deficient matrices (e.g. splines summing to one and an intercept) positive definite.
+    """
+    eps = np.finfo(jnp.zeros(()).dtype).eps
+    scale = np.mean(np.diagonal(curvature, axis1=-2, axis2=-1), axis=-1)
+    jitter = np.sqrt(eps) * scale[..., None, None] * np.eye(curvature.shape[-1])
+    return jnp.asarray(np.linalg.cholesky(curvature + jitter), dtype=float)
+
 
 def cast_to_jax(func):
-    """Cast argument to jax."""
+    """Cast argument to jax, the predictors ``X`` to the design precision of the model."""
+    parameters = list(inspect.signature(func).parameters)
+    x_position = parameters.index("X") if "X" in parameters else None
 
     @wraps(func)
     def wrapper(*args, **kwargs):
+        # the model is the first argument
+        design_dtype = args[0]._get_design_dtype() if x_position is not None else float
+
+        def cast(tree, dtype=float):
+            return jax.tree_util.tree_map(
+                lambda x: (
+                    x.astype(dtype)
+                    if tree_utils.is_sparse(x)
+                    else jnp_asarray_if(x, dtype=dtype)
+                ),
+                tree,
+                is_leaf=tree_utils.is_sparse,
+            )
+
         try:
-            args, kwargs = jax.tree_util.tree_map(
-                lambda x: jnp_asarray_if(x, dtype=float), (args, kwargs)
+            args = tuple(
+                cast(arg, design_dtype if i == x_position else float)
+                for i, arg in enumerate(args)
             )
+            kwargs = {
+                key: cast(value, design_dtype if key == "X" else float)
+                for key, value in kwargs.items()
+            }
         except Exception:
             raise TypeError(
                 "X and y should be array-like object (or trees of array like object) "
@@ -67,6 +277,22 @@ class GLM(BaseRegressor):
     | GroupLasso    | ProximalGradient | ProximalGradient                                            |
     +---------------+------------------+-------------------------------------------------------------+
 
+    **Newton Solvers**
+
+    For unregularized and Ridge models with few features, the ``"IRLS"`` solver takes Newton steps
+    with the closed-form Hessian of the Poisson (exponential link) and Gamma (inverse or exponential
+    link) observation models, and typically converges in a few tens of iterations. The
+    ``"GramNewton"`` solver instead preconditions the gradient with the Gram matrix of the design,
+    which is computed once and cached across fits with the same design; each iteration still
+    evaluates the gradient over all the samples.
+
+    **Mixed Precision**
+
+    With 64-bit floats enabled, ``precision="float32"`` (or ``"bfloat16"``) stores the dense
+    predictors in single (or half) precision, halving (or quartering) the memory of the design
+    matrix, while the parameters, the loss and the gradients are computed in float64. The fit
+    then matches the float64 fit up to the rounding of the predictors.
+
     **Fitting Large Models**
 
     For very large models, you may consider using the Stochastic Variance Reduced Gradient
@@ -97,6 +323,11 @@ class GLM(BaseRegressor):
     | Poisson + soft-plus + GroupLasso      | ✅        | ❌          |
     +---------------------------------------+-----------+-------------+
 
+    For unregularized and Ridge models, the ``"SGD"`` (with momentum) and ``"Adam"`` solvers
+    (:class:`nemos.solvers.SGD`, :class:`nemos.solvers.Adam`) run whole epochs of shuffled
+    mini-batch updates on the device, with ``maxiter`` the maximum number of epochs. With these
+    solvers, ``update`` takes a single step on the passed mini-batch.
+
     Parameters
     ----------
     observation_model :
@@ -118,6 +349,10 @@ class GLM(BaseRegressor):
         Optional dictionary for keyword arguments that are passed to the solver when instantiated.
         E.g. stepsize, acceleration, value_and_grad, etc.
          See the jaxopt documentation for details on each solver's kwargs: https://jaxopt.github.io/stable/
+    precision :
+        Floating point type in which the dense predictors are stored, ``"float32"`` or
+        ``"bfloat16"``. Products with the coefficients are accumulated in float64, which requires
+        64-bit floats to be enabled. Default is ``None``, storing the predictors as float.
 
     Attributes
     ----------
@@ -134,6 +369,9 @@ class GLM(BaseRegressor):
         of the mean :math:`\mu` fully specifies the distribution of the activity :math:`y`.
     dof_resid_:
         Degrees of freedom for the residuals.
+    solver_trace_ :
+        Telemetry of the solver iterations of the last fit, a :class:`nemos.telemetry.SolverTrace`,
+        if enabled with ``enable_telemetry``, otherwise None.
 
 
     Raises
@@ -172,6 +410,7 @@ class GLM(BaseRegressor):
         regularizer_strength: Optional[float] = None,
         solver_name: str = None,
         solver_kwargs: dict = None,
+        precision: Optional[Literal["float32", "bfloat16"]] = None,
     ):
         super().__init__(
             regularizer=regularizer,
@@ -181,6 +420,7 @@ class GLM(BaseRegressor):
         )
 
         self.observation_model = observation_model
+        self.precision = precision
 
         # initialize to None fit output
         self.intercept_ = None
@@ -201,6 +441,47 @@ class GLM(BaseRegressor):
         obs.check_observation_model(observation)
         self._observation_model = observation
 
+    @property
+    def precision(self) -> Union[None, str]:
+        """Getter for the ``precision`` attribute."""
+        return self._precision
+
+    @precision.setter
+    def precision(self, precision: Optional[str]):
+        if precision is not None and precision not in _DESIGN_PRECISIONS:
+            raise ValueError(
+                f"Unknown precision {precision}. Available precisions are "
+                f"{list(_DESIGN_PRECISIONS)}, or None to store the predictors as float."
+            )
+        self._precision = precision
+
+    def _get_design_dtype(self):
+        """
+        Floating point type of the predictors.
+
+        Raises
+        ------
+        ValueError
+            If a ``precision`` is set but 64-bit floats are not enabled.
+        """
+        if self._precision is None:
+            return float
+        if not jax.config.jax_enable_x64:
+            raise ValueError(
+                f"Predictors stored in {self._precision} are accumulated in float64, "
+                "enable 64-bit floats with ``jax.config.update('jax_enable_x64', True)``, "
+                "or set ``precision=None``."
+            )
+        return _DESIGN_PRECISIONS[self._precision]
+
+    def _cast_design(self, X: DESIGN_INPUT_TYPE) -> DESIGN_INPUT_TYPE:
+        """Cast the predictors to their floating point type, preserving sparse arrays."""
+        return jax.tree_util.tree_map(
+            partial(_asarray_float, dtype=self._get_design_dtype()),
+            X,
+            is_leaf=tree_utils.is_sparse,
+        )
+
     @staticmethod
     def _check_params(
         params: Tuple[Union[DESIGN_INPUT_TYPE, ArrayLike], ArrayLike],
@@ -299,7 +580,8 @@ class GLM(BaseRegressor):
                 axis_2=1,
                 err_message="Inconsistent number of features. "
                 f"spike basis coefficients has {jax.tree_util.tree_map(lambda p: p.shape[0], params[0])} features, "
-                f"X has {jax.tree_util.tree_map(lambda x: x.shape[1], X)} features instead!",
+                f"X has {jax.tree_util.tree_map(lambda x: x.shape[1], X, is_leaf=tree_utils.is_sparse)} "
+                "features instead!",
             )
 
     def _check_is_fit(self):
@@ -338,7 +620,7 @@ class GLM(BaseRegressor):
             # First, multiply each feature by its corresponding coefficient,
             # then sum across all features and add the intercept, before
             # passing to the inverse link function
-            tree_utils.pytree_map_and_reduce(lambda x, w: jnp.dot(x, w), sum, X, Ws)
+            tree_utils.pytree_map_and_reduce(_design_matmul, sum, X, Ws)
             + bs
         )
 
@@ -399,7 +681,7 @@ class GLM(BaseRegressor):
         # extract model params
         params = self._get_coef_and_intercept()
 
-        X = jax.tree_util.tree_map(lambda x: jnp.asarray(x, dtype=float), X)
+        X = self._cast_design(X)
 
         # check input dimensionality
         self._check_input_dimensionality(X=X)
@@ -441,6 +723,45 @@ class GLM(BaseRegressor):
         predicted_rate = self._predict(params, X)
         return self._observation_model._negative_log_likelihood(y, predicted_rate)
 
+    def _predict_and_compute_weighted_loss(
+        self,
+        params: Tuple[DESIGN_INPUT_TYPE, jnp.ndarray],
+        X: DESIGN_INPUT_TYPE,
+        y_and_weights: Tuple[jnp.ndarray, jnp.ndarray],
+    ) -> jnp.ndarray:
+        """Predict the rate and compute the negative log-likelihood weighting each sample.
+
+        Same as ``_predict_and_compute_loss``, but each sample score is multiplied by a weight before
+        averaging. Used to exclude invalid samples with a zero weight without changing the shape of
+        the inputs; rescaling the weights of the valid samples to average one over all the samples
+        recovers the loss of the valid samples, and keeps mini-batch estimates unbiased.
+
+        Parameters
+        ----------
+        params :
+            2-tuple containing the spike basis coefficients and bias terms.
+        X :
+            Predictors.
+        y_and_weights :
+            2-tuple containing the target neural activity and the sample weights, shape ``(n_time_bins,)``.
+
+        Returns
+        -------
+        :
+            The weighted model negative log-likehood.
+        """
+        y, weights = y_and_weights
+
+        def weighted_mean(scores):
+            return jnp.mean(
+                scores * weights.reshape(weights.shape + (1,) * (scores.ndim - 1))
+            )
+
+        predicted_rate = self._predict(params, X)
+        return self._observation_model._negative_log_likelihood(
+            y, predicted_rate, aggregate_sample_scores=weighted_mean
+        )
+
     def score(
         self,
         X: Union[DESIGN_INPUT_TYPE, ArrayLike],
@@ -539,7 +860,7 @@ class GLM(BaseRegressor):
         self._check_is_fit()
         params = self._get_coef_and_intercept()
 
-        X = jax.tree_util.tree_map(lambda x: jnp.asarray(x, dtype=float), X)
+        X = self._cast_design(X)
         y = jnp.asarray(y, dtype=float)
 
         self._check_input_dimensionality(X, y)
@@ -550,7 +871,7 @@ class GLM(BaseRegressor):
         is_valid = tree_utils.get_valid_multitree(X, y)
 
         # filter for valid
-        X = jax.tree_util.tree_map(lambda x: x[is_valid], X)
+        X = tree_utils.tree_slice(X, is_valid)
         y = jax.tree_util.tree_map(lambda x: x[is_valid], y)
 
         if isinstance(X, FeaturePytree):
@@ -558,19 +879,33 @@ class GLM(BaseRegressor):
         else:
             data = X
 
+        return self._compute_score(
+            params, self.scale_, data, y, score_type, aggregate_sample_scores
+        )
+
+    def _compute_score(
+        self,
+        params: Tuple[DESIGN_INPUT_TYPE, jnp.ndarray],
+        scale: Union[float, jnp.ndarray],
+        X: DESIGN_INPUT_TYPE,
+        y: jnp.ndarray,
+        score_type: str,
+        aggregate_sample_scores: Callable = jnp.mean,
+    ) -> jnp.ndarray:
+        """Score validated inputs with explicit parameters and scale, see ``score``."""
         if score_type == "log-likelihood":
             score = self._observation_model.log_likelihood(
                 y,
-                self._predict(params, data),
-                self.scale_,
+                self._predict(params, X),
+                scale,
                 aggregate_sample_scores=aggregate_sample_scores,
             )
         elif score_type.startswith("pseudo-r2"):
             score = self._observation_model.pseudo_r2(
                 y,
-                self._predict(params, data),
+                self._predict(params, X),
                 score_type=score_type,
-                scale=self.scale_,
+                scale=scale,
                 aggregate_sample_scores=aggregate_sample_scores,
             )
         else:
@@ -581,6 +916,73 @@ class GLM(BaseRegressor):
             )
         return score
 
+    def score_stacked(
+        self,
+        X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+        y: ArrayLike,
+        params: Any,
+        scale: Optional[ArrayLike] = None,
+    ) -> StackedScore:
+        r"""Score many parameter sets on their held-out sets in a single compiled pass.
+
+        The log-likelihood, the deviance and both pseudo-:math:`R^2` of all the models are computed
+        together, with the inputs validated once. The parameters can be the output of
+        ``fit_stacked``, ``cross_validate``, ``fit_path`` or any stack of fits. The null model
+        (a constant rate matching the mean of the held-out activity) is scored once per held-out
+        set, and cached by the content of ``y`` so that repeated calls on the same data re-use it.
+
+        Invalid samples (NaN or Inf) are excluded from the scores, so that held-out sets of
+        different sizes can be stacked by setting the samples outside of each set to NaN, e.g.
+        in ``y`` for cross-validation folds sharing the same predictors.
+
+        The model attributes are not used, the model does not need to be fit.
+
+        Parameters
+        ----------
+        X :
+            Predictors, shared by all the models with shape ``(n_time_bins, n_features)``, or
+            stacked with shape ``(n_models, n_time_bins, n_features)``, or pytrees of the same shape.
+        y :
+            Held-out neural activity, shared by all the models with shape ``(n_time_bins,)``
+            (``(n_time_bins, n_neurons)`` for a PopulationGLM), or stacked along a leading
+            axis of size ``n_models``.
+        params :
+            The stacked parameters, either a 2-tuple ``(coef, intercept)`` or an object with
+            ``coef`` and ``intercept`` attributes (and optionally ``scale``), stacked along a
+            leading axis of size ``n_models``.
+        scale :
+            The scale parameter of each model, shape ``(n_models,)`` (``(n_models, n_neurons)``
+            for a PopulationGLM). Defaults to ``params.scale`` if available, else to one.
+
+        Returns
+        -------
+        :
+            The scores of each model, shape ``(n_models,)``.
+
+        Raises
+        ------
+        ValueError
+            If the stacked inputs or the scale do not have one entry per model.
+        ValueError
+            If the inputs of a single model are invalid, see ``score``.
+        ValueError
+            If a held-out set has no valid samples.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X, y = np.random.normal(size=(500, 5)), np.random.poisson(size=500)
+        >>> model = nmo.glm.GLM(regularizer="Ridge", regularizer_strength=0.1)
+        >>> cv = model.cross_validate(X, y, n_folds=5)
+        >>> # score each fold on its own held-out samples
+        >>> y_folds = np.where(cv.fold_labels == np.arange(5)[:, None], y, np.nan)
+        >>> scores = model.score_stacked(X, y_folds, cv)
+        >>> scores.pseudo_r2_mcfadden.shape
+        (5,)
+        """
+        return model_selection.score_stacked(self, X, y, params=params, scale=scale)
+
     def _initialize_parameters(
         self, X: DESIGN_INPUT_TYPE, y: jnp.ndarray
     ) -> Tuple[Union[dict, jnp.ndarray], jnp.ndarray]:
@@ -641,7 +1043,9 @@ class GLM(BaseRegressor):
             # - If X is an array of shape (n_timebins,
             #   n_features), this will be an array of shape (n_features,).
             jax.tree_util.tree_map(
-                lambda x: jnp.zeros((*x[0].shape, *y.shape[1:])), data
+                lambda x: jnp.zeros((*x.shape[1:], *y.shape[1:])),
+                data,
+                is_leaf=tree_utils.is_sparse,
             ),
             # intercept, bias terms, keepdims=False needed by PopulationGLM
             initial_intercept,
@@ -654,6 +1058,7 @@ class GLM(BaseRegressor):
         X: Union[DESIGN_INPUT_TYPE, ArrayLike],
         y: ArrayLike,
         init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+        mesh: Optional[Union[int, jax.sharding.Mesh]] = None,
     ):
         """Fit GLM to neural activity.
 
@@ -664,7 +1069,10 @@ class GLM(BaseRegressor):
         ----------
         X :
             Predictors, array of shape (n_time_bins, n_features) or pytree of the same
-            shape.
+            shape. A ``jax.experimental.sparse.BCOO`` array, e.g. the output of
+            ``basis.compute_features(..., sparse=True)``, is multiplied without densifying,
+            and a :class:`~nemos.basis.LazyDesignMatrix`, the output of
+            ``basis.compute_features(..., lazy=True)``, without computing the features.
         y :
             Target neural activity arranged in a matrix, shape (n_time_bins, ).
         init_params :
@@ -673,6 +1081,12 @@ class GLM(BaseRegressor):
             log of the mean neural activity. coefficients is an array of shape
             (n_features,) or pytree of same, intercepts is an array
             of shape (1, )
+        mesh :
+            Devices across which the fit is distributed, either the number of devices across which
+            the time bins are split, or a ``jax.sharding.Mesh`` with an axis named ``"samples"``
+            splitting the time bins. The number of time bins (after dropping invalid samples) must
+            be divisible by the number of devices. See ``PopulationGLM.fit`` for splitting the
+            neurons. If None, the model is fit on the default device.
 
         Raises
         ------
@@ -713,7 +1127,7 @@ class GLM(BaseRegressor):
         is_valid = tree_utils.get_valid_multitree(X, y)
 
         # drop nans
-        X = jax.tree_util.tree_map(lambda x: x[is_valid], X)
+        X = tree_utils.tree_slice(X, is_valid)
         y = jax.tree_util.tree_map(lambda x: x[is_valid], y)
 
         # grab data if needed (tree map won't function because param is never a FeaturePytree).
@@ -722,9 +1136,11 @@ class GLM(BaseRegressor):
         else:
             data = X
 
+        if mesh is not None:
+            data, y, init_params = self._shard_fit_inputs(data, y, init_params, mesh)
         self.initialize_state(data, y, init_params)
 
-        params, state = self.solver_run(init_params, data, y)
+        params, state = self._run_solver(init_params, data, y)
 
         if tree_utils.pytree_map_and_reduce(
             lambda x: jnp.any(jnp.isnan(x)), any, params
@@ -748,6 +1164,705 @@ class GLM(BaseRegressor):
         self.solver_state_ = state
         return self
 
+    def fit_streaming(
+        self,
+        data: Any,
+        init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+        chunk_size: Optional[int] = None,
+        prefetch: int = 2,
+    ):
+        """Fit GLM to neural activity streamed in chunks along the sample axis.
+
+        Unlike ``fit``, the design matrix and the neural activity are never loaded in memory
+        at once: losses and gradients are accumulated chunk by chunk, so that the peak memory
+        is bounded by the chunk size rather than the recording length. Invalid samples are
+        dropped chunk-wise.
+
+        The optimization is driven by the ``solver_name`` of the model:
+
+        - ``"GradientDescent"`` and ``"ProximalGradient"``: full-batch (accelerated) proximal
+          gradient with a backtracking line-search, each function evaluation being a pass over the data.
+        - ``"SVRG"`` and ``"ProxSVRG"``: the full gradient at the reference point is accumulated over
+          the chunks, and the inner loop samples mini-batches within each chunk.
+        - ``"SGD"`` and ``"Adam"``: each epoch runs the mini-batch updates over the shuffled samples
+          of one chunk after the other, while the next chunks are copied to the device.
+
+        Parameters
+        ----------
+        data :
+            The data source, one of:
+
+            - A tuple ``(X, y)`` of arrays that can be sliced along the first axis without loading them,
+              e.g. ``np.memmap`` objects or pytrees of them. ``chunk_size`` must be provided.
+            - A callable with no arguments returning an iterable of ``(X_chunk, y_chunk)`` tuples,
+              e.g. a generator function.
+            - A re-iterable collection (e.g. a list) of ``(X_chunk, y_chunk)`` tuples.
+
+            Chunks must have the same structure as the inputs of ``fit``.
+        init_params :
+            2-tuple of initial parameter values: (coefficients, intercepts). If
+            None, we initialize coefficients with zeros, intercepts with the
+            inverse link of the mean neural activity.
+        chunk_size :
+            Number of samples per chunk when ``data`` is a tuple of arrays.
+        prefetch :
+            Number of chunks held on the device by the ``"SGD"`` and ``"Adam"`` solvers,
+            including the one being processed.
+
+        Raises
+        ------
+        ValueError
+            If the solver does not support streaming.
+        ValueError
+            If all the samples are invalid.
+        ValueError
+            If solver returns at least one NaN parameter.
+        TypeError
+            If ``data`` is a one-shot iterator, such as a generator object.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X, y = np.random.normal(size=(1000, 2)), np.random.poisson(size=1000)
+        >>> model = nmo.glm.GLM(solver_name="ProximalGradient")
+        >>> model = model.fit_streaming((X, y), chunk_size=250)
+        >>> # or from a generator function
+        >>> def chunks():
+        ...     for start in range(0, 1000, 250):
+        ...         yield X[start:start + 250], y[start:start + 250]
+        >>> model = model.fit_streaming(chunks)
+        """
+        if self.solver_name not in _STREAMING_SOLVERS:
+            raise ValueError(
+                f"The solver: {self.solver_name} does not support streaming. "
+                f"Available solvers are {_STREAMING_SOLVERS}."
+            )
+
+        chunk_factory = make_chunk_factory(data, chunk_size)
+        n_samples, mean_y = count_valid_samples(chunk_factory)
+
+        # validate on the first chunk with valid samples
+        X0, y0 = next(iter_valid_chunks(chunk_factory))
+        if init_params is None:
+            # intercept matching the mean rate of the whole stream
+            init_params = self._initialize_parameters(X0, jnp.expand_dims(mean_y, 0))
+        else:
+            init_params = validation.convert_tree_leaves_to_jax_array(
+                init_params,
+                err_message="Initial parameters must be array-like objects (or pytrees of array-like objects) "
+                "with numeric data-type!",
+                data_type=float,
+            )
+        self._validate(X0, y0, init_params)
+        self._initialize_group_lasso_mask(X0)
+
+        # same loss/prox pairing as in ``instantiate_solver``
+        if self.solver_name in ("ProximalGradient", "ProxSVRG"):
+            loss = self._predict_and_compute_loss
+            penalty = None
+            prox = self.regularizer.get_proximal_operator()
+            hyperparams_prox = self.regularizer_strength
+        else:
+            loss = self.regularizer.penalized_loss(
+                self._predict_and_compute_loss, self.regularizer_strength
+            )
+            penalty = None
+            if not isinstance(self.regularizer, UnRegularized):
+                penalty = partial(
+                    self.regularizer._penalization,
+                    regularizer_strength=self.regularizer_strength,
+                )
+            prox = jaxopt.prox.prox_none
+            hyperparams_prox = None
+
+        # the penalty is added once to the average over chunks of the unpenalized loss
+        objective = ChunkedObjective(
+            self._predict_and_compute_loss, chunk_factory, n_samples, penalty=penalty
+        )
+
+        if self.solver_name in ("SVRG", "ProxSVRG"):
+            # mini-batch updates use the same objective as the in-memory solver
+            solver = solvers.ProxSVRG(fun=loss, prox=prox, **self.solver_kwargs)
+            params, state = streaming_svrg(
+                solver, objective, init_params, hyperparams_prox
+            )
+        elif self.solver_name in ("SGD", "Adam"):
+            solver = self._get_solver_class(self.solver_name)(
+                fun=loss, **self.solver_kwargs
+            )
+            params, state = streaming_minibatch(
+                solver, chunk_factory, init_params, prefetch=prefetch
+            )
+        else:
+            solver_kwargs = {
+                key: value
+                for key, value in self.solver_kwargs.items()
+                if key in inspect.signature(streaming_proximal_gradient).parameters
+            }
+            ignored_kwargs = set(self.solver_kwargs).difference(solver_kwargs)
+            if ignored_kwargs:
+                warnings.warn(
+                    f"solver_kwargs {ignored_kwargs} are not supported by the streaming "
+                    f"solver and will be ignored.",
+                    UserWarning,
+                )
+            params, state = streaming_proximal_gradient(
+                objective, init_params, prox, hyperparams_prox, **solver_kwargs
+            )
+
+        if tree_utils.pytree_map_and_reduce(
+            lambda x: jnp.any(jnp.isnan(x)), any, params
+        ):
+            raise ValueError(
+                "Solver returned at least one NaN parameter, so solution is invalid!"
+                " Try tuning optimization hyperparameters, specifically try decreasing the `stepsize` "
+                "and/or setting `acceleration=False`."
+            )
+
+        self._set_coef_and_intercept(params)
+
+        # the rank of X matches that of its R factor, which is accumulated over chunks
+        self.dof_resid_ = self._estimate_resid_degrees_of_freedom(
+            X0, n_samples=n_samples, r_factor=streaming_r_factor(chunk_factory)
+        )
+        # split the residual dof proportionally to the chunk size, and average the chunk
+        # estimates; this is exact for estimates that are either constant or
+        # sums of per-sample terms divided by the dof.
+        scale = 0.0
+        for X, y in iter_valid_chunks(chunk_factory):
+            weight = y.shape[0] / n_samples
+            scale += weight * self.observation_model.estimate_scale(
+                y, self._predict(params, X), dof_resid=self.dof_resid_ * weight
+            )
+        self.scale_ = scale
+        self.solver_state_ = state
+        return self
+
+    @cast_to_jax
+    def fit_path(
+        self,
+        X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+        y: ArrayLike,
+        regularizer_strengths: ArrayLike,
+        init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+        score_data: Optional[
+            Tuple[Union[DESIGN_INPUT_TYPE, ArrayLike], ArrayLike]
+        ] = None,
+        score_type: Literal[
+            "log-likelihood", "pseudo-r2-McFadden", "pseudo-r2-Cohen"
+        ] = "log-likelihood",
+        vectorize: bool = False,
+    ) -> RegularizationPath:
+        """Fit the GLM for a sequence of regularizer strengths.
+
+        The solver is instantiated and compiled once for the whole path, with the regularizer
+        strength passed as a traced argument. By default, the strengths are fit sequentially
+        within a single ``jax.lax.scan``, warm-starting each fit from the solution at the
+        previous strength; sorting the strengths in decreasing order yields the usual path
+        from the sparsest to the densest solution. With ``vectorize=True``, all fits
+        start from ``init_params`` and run in parallel with ``jax.vmap``, which is
+        advantageous for smooth problems such as ``Ridge``.
+
+        The model attributes are not modified, call ``fit`` with the selected strength to
+        store the parameters.
+
+        Parameters
+        ----------
+        X :
+            Predictors, array of shape (n_time_bins, n_features) or pytree of the same
+            shape.
+        y :
+            Target neural activity arranged in a matrix, shape (n_time_bins, ).
+        regularizer_strengths :
+            One-dimensional array of regularizer strengths.
+        init_params :
+            2-tuple of initial parameter values: (coefficients, intercepts). If
+            None, we initialize coefficients with zeros, intercepts with the
+            log of the mean neural activity.
+        score_data :
+            Optional ``(X, y)`` tuple of held-out data used for scoring each fit. If None,
+            the fits are scored on the training data.
+        score_type :
+            Type of scoring: either log-likelihood or pseudo-:math:`R^2`.
+        vectorize :
+            If True, fit all the strengths in parallel with ``jax.vmap`` instead of
+            sequentially with warm starts.
+
+        Returns
+        -------
+        :
+            The regularization path, with parameters and scores stacked along a leading
+            axis of size ``n_strengths``.
+
+        Raises
+        ------
+        ValueError
+            If the regularizer is ``UnRegularized``, or if the solver is ``SVRG``, whose
+            mini-batch sampling does not allow a traced regularizer strength.
+        ValueError
+            If ``regularizer_strengths`` is not a non-empty one-dimensional array.
+        ValueError
+            If the inputs or ``init_params`` are invalid, see ``fit``.
+        ValueError
+            If the solver returns at least one NaN parameter.
+        NotImplementedError
+            If ``score_type`` is not implemented.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X, y = np.random.normal(size=(100, 5)), np.random.poisson(size=100)
+        >>> model = nmo.glm.GLM(regularizer="Lasso", solver_name="ProximalGradient")
+        >>> path = model.fit_path(X, y, [1.0, 0.1, 0.01])
+        >>> path.coef.shape
+        (3, 5)
+        >>> path.score.shape
+        (3,)
+        """
+        return model_selection.fit_path(
+            self,
+            X,
+            y,
+            regularizer_strengths=regularizer_strengths,
+            init_params=init_params,
+            score_data=score_data,
+            score_type=score_type,
+            vectorize=vectorize,
+        )
+
+    def fit_stacked(
+        self,
+        X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+        y: ArrayLike,
+        init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+    ) -> StackedFit:
+        """Fit independent models to stacked inputs in a single vectorized solver run.
+
+        Each slice ``X[i], y[i]`` along the leading axis is an independent dataset (e.g. a
+        session or a neuron with its own predictors), fit with the configuration of this model.
+        The solver is compiled once and ``jax.vmap``-ed over the models. Invalid samples
+        (NaN or Inf) are excluded by a zero weight in the loss, so that all models keep the
+        same shape.
+
+        The model attributes are not modified.
+
+        Parameters
+        ----------
+        X :
+            Predictors, array of shape ``(n_models, n_time_bins, n_features)`` or pytree of the
+            same shape.
+        y :
+            Target neural activity, shape ``(n_models, n_time_bins)``, or
+            ``(n_models, n_time_bins, n_neurons)`` for a PopulationGLM.
+        init_params :
+            2-tuple of initial parameter values, stacked along a leading axis of size ``n_models``.
+            If None, we initialize coefficients with zeros, intercepts with the inverse link of
+            the mean neural activity of each model.
+
+        Returns
+        -------
+        :
+            The parameters, scale, and convergence information of each model, stacked along
+            a leading axis of size ``n_models``.
+
+        Raises
+        ------
+        ValueError
+            If the leaves of ``X`` and ``y`` have a different number of models.
+        ValueError
+            If all the samples of a model are invalid.
+        ValueError
+            If the leaves of ``init_params`` do not have a leading axis of size ``n_models``,
+            followed by the shapes of the parameters of a single model.
+        ValueError
+            If the inputs of a single model, or ``init_params``, are invalid, see ``fit``.
+        ValueError
+            If the solver returns at least one NaN parameter.
+
+        Notes
+        -----
+        The stepsize and batch size defaults of SVRG and ProxSVRG are computed on the samples
+        of all the models pooled together.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X = np.random.normal(size=(20, 100, 3))
+        >>> y = np.random.poisson(np.exp(0.2 * X.sum(axis=2)))
+        >>> fits = nmo.glm.GLM().fit_stacked(X, y)
+        >>> fits.coef.shape
+        (20, 3)
+        >>> fits.converged.shape
+        (20,)
+        """
+        return model_selection.fit_stacked(self, X, y, init_params=init_params)
+
+    def cross_validate(
+        self,
+        X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+        y: ArrayLike,
+        n_folds: int = 5,
+        fold_labels: Optional[ArrayLike] = None,
+        score_type: Literal[
+            "log-likelihood", "pseudo-r2-McFadden", "pseudo-r2-Cohen"
+        ] = "log-likelihood",
+        init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+        vectorize: bool = True,
+    ) -> CrossValidation:
+        """K-fold cross-validate the GLM on precomputed features.
+
+        The predictors are validated and transferred to the device once, and the folds share
+        them: the training set of each fold is selected by a sample weight of zero on its
+        held-out samples, so that no training copy of ``X`` is made and all folds have the same
+        shape. The solver is compiled once and, by default, the folds are fit in parallel with
+        ``jax.vmap``. Each fold is then scored on its held-out samples as in ``score``.
+
+        The model attributes are not modified.
+
+        Parameters
+        ----------
+        X :
+            Predictors, array of shape (n_time_bins, n_features) or pytree of the same
+            shape, e.g. the output of ``compute_features``, computed once for all the folds.
+        y :
+            Target neural activity, shape ``(n_time_bins,)``, or ``(n_time_bins, n_neurons)``
+            for a PopulationGLM.
+        n_folds :
+            Number of folds. Ignored if ``fold_labels`` is provided. The samples are split in
+            ``n_folds`` contiguous blocks of time, which keeps the temporal correlations
+            within the folds.
+        fold_labels :
+            Optional integer array of shape ``(n_time_bins,)`` assigning each sample to a fold,
+            e.g. its trial or session. The folds are the unique labels, in sorted order.
+        score_type :
+            Type of scoring: either log-likelihood or pseudo-:math:`R^2`.
+        init_params :
+            2-tuple of initial parameter values, shared by all folds. If None, we initialize
+            coefficients with zeros, intercepts with the inverse link of the mean neural activity.
+        vectorize :
+            If True, fit the folds in parallel with ``jax.vmap``, otherwise fit them sequentially
+            with ``jax.lax.map``, which requires less memory.
+
+        Returns
+        -------
+        :
+            The held-out scores and the parameters of each fold, stacked along a leading axis
+            of size ``n_folds``.
+
+        Raises
+        ------
+        ValueError
+            If ``n_folds`` is not an integer larger than one, or ``fold_labels`` does not have
+            one label per sample or defines fewer than two folds.
+        ValueError
+            If a fold has no valid training or held-out samples.
+        ValueError
+            If the inputs or ``init_params`` are invalid, see ``fit``.
+        ValueError
+            If the solver returns at least one NaN parameter.
+        NotImplementedError
+            If ``score_type`` is not implemented.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X, y = np.random.normal(size=(500, 5)), np.random.poisson(size=500)
+        >>> model = nmo.glm.GLM(regularizer="Ridge", regularizer_strength=0.1)
+        >>> cv = model.cross_validate(X, y, n_folds=5)
+        >>> cv.score.shape
+        (5,)
+        >>> cv.coef.shape
+        (5, 5)
+        """
+        return model_selection.cross_validate(
+            self,
+            X,
+            y,
+            n_folds=n_folds,
+            fold_labels=fold_labels,
+            score_type=score_type,
+            init_params=init_params,
+            vectorize=vectorize,
+        )
+
+    def resample(
+        self,
+        X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+        y: ArrayLike,
+        n_replicates: int = 100,
+        method: Literal["parametric", "block", "jackknife"] = "parametric",
+        block_size: int = 1,
+        random_key: Optional[jax.Array] = None,
+        batch_size: Optional[int] = None,
+        output: Optional[Union[str, os.PathLike]] = None,
+    ) -> Resampling:
+        """Refit the model to resampled data, e.g. for confidence intervals on ``coef_``.
+
+        All the replicates are refit by a single compiled solver, ``jax.vmap``-ed over the
+        replicates and warm-started from the fitted parameters. The predictors are shared by all
+        the replicates, and only the neural activity or the sample weights differ:
+
+        - ``"parametric"``: bootstrap replicates of ``y`` are drawn from the fitted model, with
+          the ``sample_generator`` of the observation model.
+        - ``"block"``: non-parametric bootstrap, resampling with replacement blocks of
+          ``block_size`` consecutive samples, which preserves the temporal correlations
+          within the blocks. A block drawn ``k`` times gets a sample weight ``k``.
+        - ``"jackknife"``: one replicate per block of ``block_size`` samples, leaving the block out.
+
+        The scale of each replicate is estimated on its distinct samples. The model attributes
+        are not modified.
+
+        Parameters
+        ----------
+        X :
+            Predictors, array of shape ``(n_time_bins, n_features)`` or pytree of the same shape.
+        y :
+            Target neural activity, shape ``(n_time_bins,)``, or ``(n_time_bins, n_neurons)``
+            for a PopulationGLM.
+        n_replicates :
+            Number of bootstrap replicates. Ignored by the jackknife, which has one replicate
+            per block.
+        method :
+            The resampling method, ``"parametric"``, ``"block"`` or ``"jackknife"``.
+        block_size :
+            Number of consecutive samples per block for the ``"block"`` and ``"jackknife"``
+            methods.
+        random_key :
+            jax.random.key for seeding the resampling. Defaults to ``jax.random.key(0)``.
+        batch_size :
+            Number of replicates fit together. Defaults to all the replicates; smaller batches
+            bound the memory used by the solver.
+        output :
+            Optional directory where the results are written batch by batch, as one ``.npy``
+            file per array (e.g. ``coef.npy``). The returned arrays are then memory-maps of
+            these files.
+
+        Returns
+        -------
+        :
+            The parameters, scale, and convergence information of each replicate, stacked along
+            a leading axis of size ``n_replicates``.
+
+        Raises
+        ------
+        NotFittedError
+            If ``fit`` has not been called first with this instance.
+        ValueError
+            If ``method`` is unknown, or ``n_replicates``, ``block_size`` or ``batch_size``
+            are not positive integers.
+        ValueError
+            If the inputs are invalid, see ``score``.
+        ValueError
+            If the solver returns at least one NaN parameter.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X = np.random.normal(size=(500, 3))
+        >>> y = np.random.poisson(np.exp(0.2 * X.sum(axis=1)))
+        >>> model = nmo.glm.GLM().fit(X, y)
+        >>> boot = model.resample(X, y, n_replicates=50)
+        >>> boot.coef.shape
+        (50, 3)
+        >>> (coef_se, intercept_se) = boot.standard_error()
+        >>> (coef_low, _), (coef_high, _) = boot.percentile_interval(0.95)
+        """
+        return inference.resample(
+            self,
+            X,
+            y,
+            n_replicates=n_replicates,
+            method=method,
+            block_size=block_size,
+            random_key=random_key,
+            batch_size=batch_size,
+            output=output,
+        )
+
+    def compute_covariance(
+        self,
+        X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+        y: ArrayLike,
+        chunk_size: Optional[int] = None,
+        rank: Optional[int] = None,
+        random_key: Optional[jax.Array] = None,
+    ) -> Union[jnp.ndarray, LowRankCovariance]:
+        r"""Laplace approximation of the covariance of the fitted parameters.
+
+        The covariance is the inverse of the observed information at the fitted parameters,
+
+        .. math::
+            I = \frac{1}{\phi} \left( Z^\top W Z + T \alpha D \right),
+
+        with :math:`Z = [X, 1]`, :math:`W` the closed-form second derivatives of the negative
+        log-likelihood with respect to the linear predictor, :math:`\phi` the fitted ``scale_``,
+        :math:`T` the number of valid samples, and :math:`\alpha D` the Ridge penalty on the
+        coefficients, if any. The Lasso and GroupLasso penalties have no curvature, and only the
+        likelihood contributes to the information. The square root of the diagonal of the
+        covariance is the standard error of the parameters.
+
+        The information :math:`Z^\top W Z` is accumulated over chunks of ``chunk_size``
+        samples, which can be sliced from memory-mapped arrays, so that the peak memory scales
+        with the chunk size rather than the recording length. For a large number of features,
+        ``rank`` selects a low-rank approximation computed by the Lanczos iteration from products
+        of the information by vectors, which never form the dense matrix. The weights :math:`W`
+        are cached after the first pass, and each product is a pass over the chunks of ``X``.
+
+        For a PopulationGLM, the information of all the neurons is computed in the same passes,
+        and the coefficients excluded by the ``feature_mask`` have zero variance.
+
+        Parameters
+        ----------
+        X :
+            Predictors, array of shape ``(n_time_bins, n_features)`` or pytree of the same shape.
+        y :
+            Target neural activity, shape ``(n_time_bins,)``, or ``(n_time_bins, n_neurons)``
+            for a PopulationGLM.
+        chunk_size :
+            Number of samples per chunk. Defaults to all the samples in a single chunk.
+        rank :
+            Number of eigenpairs of the low-rank approximation, at most ``n_features + 1``.
+            Defaults to the dense covariance.
+        random_key :
+            jax.random.key for the starting vector of the Lanczos iteration. Defaults to
+            ``jax.random.key(0)``.
+
+        Returns
+        -------
+        :
+            The dense covariance, shape ``(n_features + 1, n_features + 1)``, or
+            ``(n_neurons, n_features + 1, n_features + 1)`` for a PopulationGLM, with the
+            coefficients stacked in the order of the leaves of ``X`` and the intercept last.
+            If ``rank`` is provided, the low-rank approximation of the covariance instead.
+
+        Raises
+        ------
+        NotFittedError
+            If ``fit`` has not been called first with this instance.
+        ValueError
+            If ``chunk_size`` or ``rank`` are not positive integers, or ``rank`` exceeds the
+            number of parameters.
+        ValueError
+            If the inputs are invalid, see ``score``.
+        ValueError
+            If the second derivatives of the negative log-likelihood are not available in
+            closed form for the observation model and inverse link function.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import nemos as nmo
+        >>> X = np.random.normal(size=(500, 3))
+        >>> y = np.random.poisson(np.exp(0.2 * X.sum(axis=1)))
+        >>> model = nmo.glm.GLM().fit(X, y)
+        >>> cov = model.compute_covariance(X, y, chunk_size=100)
+        >>> cov.shape
+        (4, 4)
+        >>> standard_error = np.sqrt(np.diag(cov))
+        >>> low_rank = model.compute_covariance(X, y, rank=2)
+        >>> low_rank.eigenvectors.shape
+        (4, 2)
+        """
+        return inference.compute_covariance(
+            self, X, y, chunk_size=chunk_size, rank=rank, random_key=random_key
+        )
+
+    def _instantiate_solver_run(
+        self,
+        solver_kwargs: dict,
+        loss: Callable,
+        traced_strength: bool = False,
+    ) -> Tuple[Any, Callable]:
+        """
+        Instantiate a solver on a custom unpenalized loss.
+
+        Mirrors ``instantiate_solver``, but returns the solver and its ``run`` instead of
+        storing them, and optionally leaves the regularizer strength as an argument of the
+        returned ``solver_run``, so that a single compiled solver can be used for many strengths.
+
+        Parameters
+        ----------
+        solver_kwargs :
+            The solver keyword arguments.
+        loss :
+            The unpenalized loss, of the form ``loss(params, X, y)``.
+        traced_strength :
+            If True, the returned function has signature
+            ``solver_run(init_params, regularizer_strength, X, y)``, otherwise the
+            ``regularizer_strength`` of the model is used and the signature is
+            ``solver_run(init_params, X, y)``.
+
+        Returns
+        -------
+        solver :
+            The solver instance.
+        solver_run :
+            The function running the solver.
+        """
+        if self.solver_name not in self.regularizer.allowed_solvers:
+            raise ValueError(
+                f"The solver: {self.solver_name} is not allowed for "
+                f"{self._regularizer.__class__.__name__} regularization. Allowed solvers are "
+                f"{self._regularizer.allowed_solvers}."
+            )
+
+        solver_kwargs = solver_kwargs.copy()
+        is_proximal = self.solver_name in ("ProximalGradient", "ProxSVRG")
+        if is_proximal:
+            if "prox" in self.solver_kwargs:
+                raise ValueError(
+                    "Proximal operator specification is not permitted. "
+                    "The proximal operator is automatically determined based on the selected regularizer. "
+                    "Please remove the 'prox' argument from the `solver_kwargs` "
+                )
+            solver_kwargs.update(prox=self.regularizer.get_proximal_operator())
+            # the strength is passed as the proximal operator hyperparameter
+            solver_loss = loss
+        elif traced_strength:
+
+            def solver_loss(params, strength, X, y):
+                return self.regularizer.penalized_loss(loss, strength)(params, X, y)
+
+        else:
+            solver_loss = self.regularizer.penalized_loss(
+                loss, self.regularizer_strength
+            )
+
+        if self.solver_name == "IRLS" and "hessian" not in solver_kwargs:
+            if traced_strength:
+
+                def hessian(params, strength, X, y):
+                    return self._predict_and_compute_hessian(params, X, y, strength)
+
+            else:
+                hessian = self._predict_and_compute_hessian
+            solver_kwargs.update(hessian=hessian)
+
+        solver_run_kwargs, _, _, solver_init_kwargs = self._inspect_solver_kwargs(
+            solver_kwargs
+        )
+        solver = self._get_solver_class(self.solver_name)(
+            fun=solver_loss, **solver_init_kwargs
+        )
+
+        if traced_strength:
+
+            def solver_run(init_params, strength, X, y) -> jaxopt.OptStep:
+                return solver.run(init_params, strength, X, y, **solver_run_kwargs)
+
+        else:
+            args = (self.regularizer_strength,) if is_proximal else ()
+
+            def solver_run(init_params, X, y) -> jaxopt.OptStep:
+                return solver.run(init_params, *args, X, y, **solver_run_kwargs)
+
+        return solver, solver_run
+
     def _get_coef_and_intercept(self):
         """Pack coef_ and intercept_  into a params pytree.
 
@@ -841,7 +1956,12 @@ class GLM(BaseRegressor):
         )
 
     def _estimate_resid_degrees_of_freedom(
-        self, X: DESIGN_INPUT_TYPE, n_samples: Optional[int] = None
+        self,
+        X: DESIGN_INPUT_TYPE,
+        n_samples: Optional[int] = None,
+        gram_matrix: Optional[jnp.ndarray] = None,
+        params: Optional[ModelParams] = None,
+        r_factor: Optional[jnp.ndarray] = None,
     ):
         """
         Estimate the degrees of freedom of the residuals.
@@ -855,6 +1975,17 @@ class GLM(BaseRegressor):
         n_samples :
             The number of samples observed. If not provided, n_samples is set to ``X.shape[0]``. If the fit is
             batched, the n_samples could be larger than ``X.shape[0]``.
+        gram_matrix :
+            Optional ``X.T @ X`` over all the samples. If provided, the rank is computed on the Gram matrix,
+            which has the same rank as the full design matrix, and ``X`` can be a single batch.
+        params :
+            The parameters for which the degrees of freedom are estimated. If not provided, the
+            fitted ``coef_`` and ``intercept_`` are used.
+        r_factor :
+            Optional triangular factor of the QR decomposition of the design over all the samples
+            (see :func:`nemos.tree_utils.design_r_factor`). If provided, the rank is computed on
+            the factor, which has the same singular values as the full design matrix, and ``X``
+            can be a single batch.
 
         Returns
         -------
@@ -862,10 +1993,28 @@ class GLM(BaseRegressor):
             An estimate of the degrees of freedom of the residuals.
         """
         # Convert a pytree to a design-matrix with pytrees
-        X = jnp.hstack(jax.tree_util.tree_leaves(X))
+        if tree_utils.is_sparse(X):
+            # the rank of a sparse design is computed on its (small) Gram matrix
+            if isinstance(X, LazyDesignMatrix) and gram_matrix is None:
+                gram_matrix = X.gram()
+            elif gram_matrix is None:
+                X_csr = tree_utils._to_scipy_csr(X)
+                gram_matrix = jnp.asarray((X_csr.T @ X_csr).toarray())
+        else:
+            leaves = jax.tree_util.tree_leaves(X, is_leaf=tree_utils.is_sparse)
+            if len(leaves) == 1 and not tree_utils.is_sparse(leaves[0]):
+                X = leaves[0]
+            elif gram_matrix is None and r_factor is None:
+                if any(tree_utils.is_sparse(leaf) for leaf in leaves):
+                    gram_matrix = tree_utils.design_gram(X)
+                else:
+                    # the rank of a pytree design is computed on the R factor assembled chunk
+                    # by chunk: unlike the Gram matrix, it does not square the condition number
+                    r_factor = tree_utils.design_r_factor(X)
 
         if n_samples is None:
-            n_samples = X.shape[0]
+            first_leaf = jax.tree_util.tree_leaves(X, is_leaf=tree_utils.is_sparse)[0]
+            n_samples = first_leaf.shape[0]
         else:
             if not isinstance(n_samples, int):
                 raise TypeError(
@@ -873,7 +2022,8 @@ class GLM(BaseRegressor):
                     "instead!"
                 )
 
-        params = self._get_coef_and_intercept()
+        if params is None:
+            params = self._get_coef_and_intercept()
         # if the regularizer is lasso use the non-zero
         # coeff as an estimate of the dof
         # see https://arxiv.org/abs/0712.0881
@@ -887,10 +2037,18 @@ class GLM(BaseRegressor):
 
         elif isinstance(self.regularizer, Ridge):
             # for Ridge, use the tot parameters (X.shape[1] + intercept)
-            return (n_samples - X.shape[1] - 1) * jnp.ones_like(params[1])
+            n_features = tree_utils.design_n_features(X)
+            return (n_samples - n_features - 1) * jnp.ones_like(params[1])
         else:
             # for UnRegularized, use the rank
-            rank = jnp.linalg.matrix_rank(X)
+            if r_factor is not None:
+                # same tolerance as the rank of the (n_samples, n_features) design
+                rtol = max(n_samples, r_factor.shape[0]) * jnp.finfo(r_factor.dtype).eps
+                rank = jnp.linalg.matrix_rank(r_factor, rtol=rtol)
+            elif gram_matrix is not None:
+                rank = jnp.linalg.matrix_rank(gram_matrix)
+            else:
+                rank = jnp.linalg.matrix_rank(X)
             return (n_samples - rank - 1) * jnp.ones_like(params[1])
 
     @cast_to_jax
@@ -1005,8 +2163,18 @@ class GLM(BaseRegressor):
         else:
             data = X
 
-        # check if mask has been set is using group lasso
-        # if mask has not been set, use a single group as default
+        self._initialize_group_lasso_mask(data)
+
+        opt_solver_kwargs = self._optimize_solver_params(data, y)
+
+        #  set up the solver init/run/update attrs
+        self.instantiate_solver(solver_kwargs=opt_solver_kwargs)
+
+        opt_state = self.solver_init_state(init_params, data, y)
+        return opt_state
+
+    def _initialize_group_lasso_mask(self, data: DESIGN_INPUT_TYPE):
+        """Default to a single group if the mask of a GroupLasso regularizer has not been set."""
         if isinstance(self.regularizer, GroupLasso):
             if self.regularizer.mask is None:
                 warnings.warn(
@@ -1018,14 +2186,6 @@ class GLM(BaseRegressor):
                 )
                 self.regularizer.mask = jnp.ones((1, data.shape[1]))
 
-        opt_solver_kwargs = self._optimize_solver_params(data, y)
-
-        #  set up the solver init/run/update attrs
-        self.instantiate_solver(solver_kwargs=opt_solver_kwargs)
-
-        opt_state = self.solver_init_state(init_params, data, y)
-        return opt_state
-
     @cast_to_jax
     def update(
         self,
@@ -1096,7 +2256,7 @@ class GLM(BaseRegressor):
         is_valid = tree_utils.get_valid_multitree(X, y)
 
         # drop nans
-        X = jax.tree_util.tree_map(lambda x: x[is_valid], X)
+        X = tree_utils.tree_slice(X, is_valid)
         y = jax.tree_util.tree_map(lambda x: x[is_valid], y)
 
         # grab the data
@@ -1123,6 +2283,121 @@ class GLM(BaseRegressor):
         """Return the functions for computing default step and batch size for the solver."""
         return glm_compute_optimal_stepsize_configs(self)
 
+    def _optimize_solver_params(self, X: DESIGN_INPUT_TYPE, y: jnp.ndarray) -> dict:
+        """Compute the solver defaults, and the preconditioner of the GramNewton solver."""
+        solver_kwargs = super()._optimize_solver_params(X, y)
+        if (
+            self.solver_name == "GramNewton"
+            and solver_kwargs.get("preconditioner") is None
+        ):
+            solver_kwargs["preconditioner"] = self._gram_preconditioner(X, y)
+        return solver_kwargs
+
+    def _gram_curvature(self, X: DESIGN_INPUT_TYPE) -> np.ndarray:
+        """Gram matrix of the design with an intercept, plus the Ridge penalty of a neuron."""
+        curvature = solvers.gram_matrix(X)
+        if isinstance(self.regularizer, Ridge):
+            # the intercept, last row and column, is not penalized
+            penalty = np.full(curvature.shape[0], self.regularizer_strength)
+            penalty[-1] = 0.0
+            curvature = curvature + np.diag(penalty)
+        return curvature
+
+    def _gram_preconditioner(self, X: DESIGN_INPUT_TYPE, y: jnp.ndarray) -> jnp.ndarray:
+        """
+        Cholesky factor of the curvature used by the GramNewton solver.
+
+        The Gram matrix is cached across fits with the same design, see
+        :func:`nemos.solvers.gram_matrix`.
+        """
+        n_neurons = y.shape[1] if y.ndim > 1 else 1
+        curvature = self._mask_curvature(self._gram_curvature(X), X, n_neurons)
+        return _jittered_cholesky(curvature)
+
+    def _coefficient_mask(
+        self, X: DESIGN_INPUT_TYPE, n_neurons: int
+    ) -> Optional[np.ndarray]:
+        """Mask of the coefficients and intercept of each neuron, see PopulationGLM."""
+        return None
+
+    def _mask_curvature(self, curvature, X: DESIGN_INPUT_TYPE, n_neurons: int):
+        """Restrict the curvature of each neuron to its coefficients, see PopulationGLM."""
+        return curvature
+
+    def _shard_fit_inputs(
+        self,
+        X: DESIGN_INPUT_TYPE,
+        y: jnp.ndarray,
+        params: Tuple[DESIGN_INPUT_TYPE, jnp.ndarray],
+        mesh: Union[int, jax.sharding.Mesh],
+    ) -> Tuple[DESIGN_INPUT_TYPE, jnp.ndarray, Tuple[DESIGN_INPUT_TYPE, jnp.ndarray]]:
+        """
+        Split the samples across the devices of the mesh.
+
+        The solver is then compiled for the sharded inputs, and the reductions over the
+        samples are computed across devices. A number of devices splits the samples.
+        """
+        mesh = _sharding.get_mesh(mesh, _sharding.SAMPLE_AXIS)
+        X = _sharding.shard_design(X, mesh)
+        y = _sharding.shard_array(y, mesh, _sharding.SAMPLE_AXIS)
+        return X, y, params
+
+    def _predict_and_compute_hessian(
+        self,
+        params: Tuple[DESIGN_INPUT_TYPE, jnp.ndarray],
+        X: DESIGN_INPUT_TYPE,
+        y: Union[jnp.ndarray, Tuple[jnp.ndarray, jnp.ndarray]],
+        regularizer_strength: Optional[float] = None,
+    ) -> jnp.ndarray:
+        """
+        Hessian of the penalized loss of each neuron, used by the IRLS solver.
+
+        The Hessian is computed in closed form from the weights of the observation model.
+
+        Parameters
+        ----------
+        params :
+            2-tuple containing the spike basis coefficients and bias terms.
+        X :
+            Predictors.
+        y :
+            Target neural activity, or a 2-tuple containing the neural activity and the sample
+            weights, as for ``_predict_and_compute_weighted_loss``.
+        regularizer_strength :
+            The Ridge strength, if different from the model strength.
+
+        Returns
+        -------
+        :
+            The Hessian, shape ``(n_neurons, n_features + 1, n_features + 1)``, with the
+            intercept last.
+        """
+        y, weights = y if isinstance(y, tuple) else (y, None)
+        hessian_weights = self._observation_model._hessian_weights(
+            y, self._predict(params, X)
+        )
+        hessian_weights = hessian_weights.reshape(y.shape[0], -1) / y.shape[0]
+        if weights is not None:
+            hessian_weights = hessian_weights * weights[:, None]
+        hessian = _weighted_gram(X, hessian_weights)
+        if isinstance(self.regularizer, Ridge):
+            if regularizer_strength is None:
+                regularizer_strength = self.regularizer_strength
+            # the intercept, last row and column, is not penalized
+            penalty = jnp.ones(hessian.shape[-1]).at[-1].set(0.0)
+            hessian = hessian + regularizer_strength * jnp.diag(penalty)
+        return self._mask_curvature(hessian, X, hessian.shape[0])
+
+    def _build_solver_functions(
+        self, args: tuple, solver_kwargs: dict
+    ) -> Tuple[Callable, Callable, Callable, Callable]:
+        """Instantiate the solver, providing the closed-form Hessian to the IRLS solver."""
+        if self.solver_name == "IRLS" and "hessian" not in solver_kwargs:
+            solver_kwargs = dict(
+                solver_kwargs, hessian=self._predict_and_compute_hessian
+            )
+        return super()._build_solver_functions(args, solver_kwargs)
+
     def __repr__(self):
         return format_repr(self, multiline=True)
 
@@ -1157,6 +2432,15 @@ class PopulationGLM(GLM):
     | GroupLasso    | ProximalGradient | ProximalGradient                                            |
     +---------------+------------------+-------------------------------------------------------------+
 
+    **Newton Solvers**
+
+    For unregularized and Ridge models with few features, the ``"IRLS"`` solver takes Newton steps
+    with the closed-form Hessian of the Poisson (exponential link) and Gamma (inverse or exponential
+    link) observation models, and typically converges in a few tens of iterations. The
+    ``"GramNewton"`` solver instead preconditions the gradient with the Gram matrix of the design,
+    which is computed once and cached across fits with the same design; each iteration still
+    evaluates the gradient over all the samples.
+
     **Fitting Large Models**
 
     For very large models, you may consider using the Stochastic Variance Reduced Gradient
@@ -1212,6 +2496,10 @@ class PopulationGLM(GLM):
         Either a matrix of shape (num_features, num_neurons) or a :meth:`nemos.pytrees.FeaturePytree` of 0s and 1s, with
         ``feature_mask[feature_name]`` of shape (num_neurons, ).
         The mask will be used to select which features are used as predictors for which neuron.
+    precision :
+        Floating point type in which the dense predictors are stored, ``"float32"`` or
+        ``"bfloat16"``. Products with the coefficients are accumulated in float64, which requires
+        64-bit floats to be enabled. Default is ``None``, storing the predictors as float.
 
     Attributes
     ----------
@@ -1222,6 +2510,9 @@ class PopulationGLM(GLM):
         Basis coefficients for the model.
     solver_state_ :
         State of the solver after fitting. May include details like optimization error.
+    solver_trace_ :
+        Telemetry of the solver iterations of the last fit, a :class:`nemos.telemetry.SolverTrace`,
+        if enabled with ``enable_telemetry``, otherwise None.
 
     Raises
     ------
@@ -1289,6 +2580,7 @@ class PopulationGLM(GLM):
         solver_name: str = None,
         solver_kwargs: dict = None,
         feature_mask: Optional[jnp.ndarray] = None,
+        precision: Optional[Literal["float32", "bfloat16"]] = None,
         **kwargs,
     ):
         super().__init__(
@@ -1297,6 +2589,7 @@ class PopulationGLM(GLM):
             regularizer=regularizer,
             solver_name=solver_name,
             solver_kwargs=solver_kwargs,
+            precision=precision,
             **kwargs,
         )
         self.feature_mask = feature_mask
@@ -1450,7 +2743,8 @@ class PopulationGLM(GLM):
                 axis_2=1,
                 err_message="Inconsistent number of features. "
                 f"spike basis coefficients has {jax.tree_util.tree_map(lambda p: p.shape[0], params[0])} features, "
-                f"X has {jax.tree_util.tree_map(lambda x: x.shape[1], X)} features instead!",
+                f"X has {jax.tree_util.tree_map(lambda x: x.shape[1], X, is_leaf=tree_utils.is_sparse)} "
+                "features instead!",
             )
 
         if y is not None:
@@ -1495,7 +2789,8 @@ class PopulationGLM(GLM):
                 axis_2=0,
                 err_message="Inconsistent number of features. "
                 f"feature_mask has {jax.tree_util.tree_map(lambda m: m.shape[0], self.feature_mask)} neurons, "
-                f"model coefficients have {jax.tree_util.tree_map(lambda x: x.shape[1], X)}  instead!",
+                "model coefficients have "
+                f"{jax.tree_util.tree_map(lambda x: x.shape[1], X, is_leaf=tree_utils.is_sparse)}  instead!",
             )
         # check the consistency of the feature axis
         validation.check_tree_axis_consistency(
@@ -1514,6 +2809,7 @@ class PopulationGLM(GLM):
         X: Union[DESIGN_INPUT_TYPE, ArrayLike],
         y: ArrayLike,
         init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+        mesh: Optional[Union[int, jax.sharding.Mesh]] = None,
     ):
         """Fit GLM to the activity of a population of neurons.
 
@@ -1526,7 +2822,8 @@ class PopulationGLM(GLM):
         ----------
         X :
             Predictors, array of shape (n_timebins, n_features) or pytree of the same
-            shape.
+            shape. A ``jax.experimental.sparse.BCOO`` array, e.g. the output of
+            ``basis.compute_features(..., sparse=True)``, is multiplied without densifying.
         y :
             Target neural activity arranged in a matrix, shape (n_timebins, n_neurons).
         init_params :
@@ -1535,6 +2832,12 @@ class PopulationGLM(GLM):
             log of the mean neural activity. coefficients is an array of shape
             (n_features, n_neurons) or pytree of the same shape, intercepts is an array
             of shape (n_neurons, )
+        mesh :
+            Devices across which the fit is distributed. Either the number of devices across which
+            the neurons are split, or a ``jax.sharding.Mesh`` with axes named ``"neurons"`` and/or
+            ``"samples"``, splitting the neurons and the time bins respectively. The number of
+            neurons and of (valid) time bins must be divisible by the size of their mesh axis.
+            If None, the model is fit on the default device.
 
         Raises
         ------
@@ -1548,6 +2851,8 @@ class PopulationGLM(GLM):
             If ``y`` is not two-dimensional.
         ValueError
             If the ``feature_mask`` is not of the right shape.
+        ValueError
+            If the neurons or the time bins cannot be split evenly across the ``mesh``.
         ValueError
             If solver returns at least one NaN parameter, which means it found
             an invalid solution. Try tuning optimization hyperparameters.
@@ -1567,6 +2872,13 @@ class PopulationGLM(GLM):
         - If the mask is a :class:``nemos.pytrees.FeaturePytree``, then
           ``"feature_name"`` is a predictor of neuron ``j`` if ``feature_mask["feature_name"][j] == 1``.
 
+        On a multi-core CPU, JAX exposes several devices if the environment variable
+        ``XLA_FLAGS="--xla_force_host_platform_device_count=<n>"`` is set before importing JAX. In a
+        multi-process run (see ``jax.distributed.initialize``) the mesh can span the devices of all the
+        processes, each process passing the full data and transferring only its own shards. The
+        fitted parameters are identical to those of a single-device fit, up to the order of the
+        floating point reductions.
+
         Examples
         --------
         >>> # Generate sample data
@@ -1586,8 +2898,39 @@ class PopulationGLM(GLM):
         >>> model = PopulationGLM(feature_mask=feature_mask).fit(X, y)
         >>> print(model.coef_.shape)
         (3, 2)
+        >>> # Split the neurons across the available devices
+        >>> import jax
+        >>> from jax.sharding import Mesh
+        >>> mesh = Mesh(np.array(jax.devices()[:1]), ("neurons",))
+        >>> model = PopulationGLM(feature_mask=feature_mask).fit(X, y, mesh=mesh)
+        """
+        return super().fit(X, y, init_params, mesh=mesh)
+
+    def _shard_fit_inputs(
+        self,
+        X: DESIGN_INPUT_TYPE,
+        y: jnp.ndarray,
+        params: Tuple[DESIGN_INPUT_TYPE, jnp.ndarray],
+        mesh: Union[int, jax.sharding.Mesh],
+    ) -> Tuple[DESIGN_INPUT_TYPE, jnp.ndarray, Tuple[DESIGN_INPUT_TYPE, jnp.ndarray]]:
+        """
+        Split the neurons and the samples across the devices of the mesh.
+
+        The neural activity, the coefficients and the intercept are split along the neuron
+        axis, the predictors and the neural activity along the sample axis. The solver is then
+        compiled for the sharded inputs, and the reductions over the samples and the neurons
+        are computed across devices. The feature mask, a constant of the compiled loss, is
+        left unchanged and replicated on the devices.
         """
-        return super().fit(X, y, init_params)
+        neurons, samples = _sharding.NEURON_AXIS, _sharding.SAMPLE_AXIS
+        mesh = _sharding.get_mesh(mesh, neurons)
+        X = _sharding.shard_design(X, mesh)
+        y = _sharding.shard_array(y, mesh, samples, neurons)
+        coef = jax.tree_util.tree_map(
+            lambda c: _sharding.shard_array(c, mesh, None, neurons), params[0]
+        )
+        intercept = _sharding.shard_array(params[1], mesh, neurons)
+        return X, y, (coef, intercept)
 
     def _initialize_feature_mask(self, X, y):
         if self.feature_mask is None:
@@ -1613,8 +2956,9 @@ class PopulationGLM(GLM):
         mask and model design matrix ``X``. It is a streamlined version used internally within
         optimization routines, where it serves as the loss function. Unlike the ``GLM.predict``
         method, it does not perform any input validation, assuming that the inputs are pre-validated.
-        The parameters are first element-wise multiplied with the mask, then the canonical
-        linear-non-linear GLM map is applied.
+        Each neuron is multiplied by its active features only, grouping the neurons that share
+        the same features when the mask is sparse, then the canonical linear-non-linear GLM map
+        is applied.
 
         Parameters
         ----------
@@ -1634,11 +2978,49 @@ class PopulationGLM(GLM):
             # then sum across all features and add the intercept, before
             # passing to the inverse link function
             tree_utils.pytree_map_and_reduce(
-                lambda x, w, m: jnp.dot(x, w * m), sum, X, Ws, self._feature_mask
+                _masked_design_matmul,
+                sum,
+                X,
+                Ws,
+                self._feature_mask,
             )
             + bs
         )
 
+    def _coefficient_mask(
+        self, X: DESIGN_INPUT_TYPE, n_neurons: int
+    ) -> Optional[np.ndarray]:
+        """
+        Mask of the coefficients and intercept of each neuron.
+
+        Returns None if no coefficient is masked, or an array of shape
+        ``(n_neurons, n_features + 1)`` with the intercept last.
+        """
+        # mask of the stacked coefficients and intercept, (n_features + 1, n_neurons)
+        mask = jax.tree_util.tree_map(
+            lambda x, m: np.broadcast_to(np.asarray(m), (x.shape[1], n_neurons)),
+            X,
+            self._feature_mask,
+            is_leaf=tree_utils.is_sparse,
+        )
+        mask = np.vstack(jax.tree_util.tree_leaves(mask) + [np.ones((1, n_neurons))])
+        return None if np.all(mask == 1) else mask.T
+
+    def _mask_curvature(self, curvature, X: DESIGN_INPUT_TYPE, n_neurons: int):
+        """
+        Restrict the curvature of each neuron to its coefficients.
+
+        Masked coefficients do not affect the loss of a neuron, their rows and columns of the
+        curvature are replaced by the identity, so that their gradient, which is zero, is not
+        mixed with that of the other coefficients. Returns ``curvature`` unchanged if no
+        coefficient is masked, or an array of shape ``(n_neurons, n_features + 1, n_features + 1)``.
+        """
+        mask = self._coefficient_mask(X, n_neurons)
+        if mask is None:
+            return curvature
+        identity = (1 - mask)[:, :, None] * np.eye(mask.shape[1])
+        return mask[:, :, None] * curvature * mask[:, None, :] + identity
+
     def __sklearn_clone__(self) -> PopulationGLM:
         """Clone the PopulationGLM, dropping feature_mask"""
         params = self.get_params(deep=False)
@@ -8,6 +8,7 @@ from typing import Callable, Tuple
 import jax
 import jax.numpy as jnp
 import numpy as np
+import scipy.linalg
 from jax.typing import ArrayLike as JaxArray
 from numpy.typing import NDArray
 
@@ -114,6 +115,63 @@ def _find_drop_column(
     return final_state[3]
 
 
+def _find_drop_column_gram(
+    feature_matrix: JaxArray,
+    preprocessing_func: Callable = add_constant,
+) -> NDArray:
+    """
+    Find the linearly dependent columns with a single pass over the Gram matrix.
+
+    Selects the same columns as ``_find_drop_column``: a column is dropped if it is a linear combination
+    of the columns that follow it and of the columns that precede it and were not dropped. Equivalently,
+    the columns are added in reverse order to a basis of the column space, after the columns prepended
+    by the preprocessing (e.g. the intercept), and a column is dropped if it does not increase the rank.
+
+    The residual of each column after projection onto the selected ones is computed by an incremental
+    Cholesky factorization of the Gram matrix in float64. Forming the Gram matrix costs a single
+    ``T x F`` by ``F x T`` product; the factorization is independent of the number of samples.
+
+    Parameters
+    ----------
+    feature_matrix:
+        The rank deficient feature matrix, shape ``(T, F)``.
+    preprocessing_func:
+        Additional processing of the feature matrix. The processed matrix must have the ``F`` transformed
+        features as its last columns, preceded by any added column, as for ``add_constant``.
+
+    Returns
+    -------
+    drop_cols:
+        A boolean vector, True if the column should be dropped, False otherwise.
+
+    """
+    n_features = feature_matrix.shape[1]
+    processed = np.asarray(preprocessing_func(feature_matrix), dtype=np.float64)
+    n_added = processed.shape[1] - n_features
+    gram = processed.T @ processed
+
+    # relative tolerance on the squared residuals, which have the roundoff of the Gram matrix
+    tol = np.sqrt(np.finfo(np.float64).eps)
+    # cholesky factor of the Gram matrix of the selected columns
+    chol = np.zeros(gram.shape)
+    selected = []
+    drop_cols = np.zeros(n_features, dtype=bool)
+    for col in [*range(n_added), *range(processed.shape[1] - 1, n_added - 1, -1)]:
+        n_sel = len(selected)
+        proj = scipy.linalg.solve_triangular(
+            chol[:n_sel, :n_sel], gram[selected, col], lower=True
+        )
+        resid = gram[col, col] - proj @ proj
+        if resid <= tol * gram[col, col]:
+            if col >= n_added:
+                drop_cols[col - n_added] = True
+            continue
+        chol[n_sel, :n_sel] = proj
+        chol[n_sel, n_sel] = np.sqrt(resid)
+        selected.append(col)
+    return drop_cols
+
+
 def _add_invalid_entries(feature_matrix, shape_first_axis, is_valid):
     """Add invalid entries to match original shape."""
     feature_matrix = (
@@ -158,13 +216,18 @@ def _apply_identifiability_constraints(
 
     max_drop = feature_matrix_with_intercept.shape[1] - rank
 
-    # run the search
-    drop_cols = _find_drop_column(
-        feature_matrix,
-        rank=int(rank),
-        max_drop=int(max_drop),
-        preprocessing_func=preprocessing_func,
-    )
+    # single pass on the Gram matrix, check that the kept columns are full rank
+    drop_cols = _find_drop_column_gram(feature_matrix, preprocessing_func)
+    if drop_cols.sum() != max_drop or jnp.linalg.matrix_rank(
+        preprocessing_func(feature_matrix[:, ~drop_cols])
+    ) != int(rank):
+        # numerically borderline columns, run the search column by column
+        drop_cols = _find_drop_column(
+            feature_matrix,
+            rank=int(rank),
+            max_drop=int(max_drop),
+            preprocessing_func=preprocessing_func,
+        )
 
     # return the output matrix and the dropped indices
     feature_matrix = _add_invalid_entries(
@@ -232,10 +295,11 @@ def apply_identifiability_constraints(
 
     Notes
     -----
-    Compilation is triggered at every loop. This can be slower than pure python for low number
-    of samples and low dimension for the feature matrix.
-    Usually, the design matrices we work with have a large number of samples.
-    Running the code on GPU will reduce the computation time significantly.
+    The columns to drop are found in a single pass over the Gram matrix ``X^T X``, whose cost beyond
+    the matrix product does not depend on the number of samples. If the rank of the kept columns
+    does not match the rank of ``X``, which may happen for nearly collinear columns, the columns
+    are checked one at the time by recomputing the rank of ``X`` without them. Compilation is then
+    triggered at every loop, and running the code on GPU will reduce the computation time significantly.
     """
     if add_intercept:
         preproc_design = add_constant
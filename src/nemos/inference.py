@@ -0,0 +1,560 @@
+"""Uncertainty of the parameters of a fitted GLM: resampling and Laplace approximation."""
+
+# required to get ArrayLike to render correctly
+from __future__ import annotations
+
+import os
+import re
+from typing import TYPE_CHECKING, Callable, Literal, NamedTuple, Optional, Tuple, Union
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+from numpy.typing import ArrayLike
+
+from . import tree_utils, validation
+from ._chunking import iter_valid_chunks, make_chunk_factory
+from .pytrees import FeaturePytree
+from .regularizer import Ridge
+from .typing import DESIGN_INPUT_TYPE
+
+if TYPE_CHECKING:
+    from .glm import GLM
+
+
+class Resampling(NamedTuple):
+    """
+    Result of refitting a GLM to resampled data, see ``GLM.resample``.
+
+    Attributes
+    ----------
+    coef :
+        The coefficients of each replicate, stacked along a leading axis of size ``n_replicates``.
+    intercept :
+        The intercepts of each replicate, stacked along a leading axis of size ``n_replicates``.
+    scale :
+        The scale parameter of each replicate.
+    n_iter :
+        Number of solver iterations for each replicate, shape ``(n_replicates,)``.
+    converged :
+        Whether the solver error reached the tolerance for each replicate, shape ``(n_replicates,)``.
+    method :
+        The resampling method, ``"parametric"``, ``"block"`` or ``"jackknife"``.
+    """
+
+    coef: DESIGN_INPUT_TYPE
+    intercept: jnp.ndarray
+    scale: jnp.ndarray
+    n_iter: jnp.ndarray
+    converged: jnp.ndarray
+    method: str
+
+    def standard_error(self) -> Tuple[DESIGN_INPUT_TYPE, jnp.ndarray]:
+        r"""
+        Standard error of the coefficients and of the intercepts.
+
+        The standard deviation of the bootstrap replicates, or the jackknife estimate
+        :math:`\sqrt{\frac{n - 1}{n} \sum_i (\theta_i - \bar{\theta})^2}`.
+
+        Returns
+        -------
+        :
+            The standard errors of the coefficients and of the intercepts.
+        """
+        n = self.intercept.shape[0]
+
+        def std(x):
+            x = np.asarray(x)
+            if self.method == "jackknife":
+                return np.sqrt((n - 1) * np.var(x, axis=0))
+            return np.std(x, axis=0, ddof=1)
+
+        return jax.tree_util.tree_map(std, (self.coef, self.intercept))
+
+    def percentile_interval(
+        self, confidence: float = 0.95
+    ) -> Tuple[
+        Tuple[DESIGN_INPUT_TYPE, jnp.ndarray], Tuple[DESIGN_INPUT_TYPE, jnp.ndarray]
+    ]:
+        """
+        Percentile bootstrap confidence interval of the coefficients and of the intercepts.
+
+        Parameters
+        ----------
+        confidence :
+            The confidence level, in (0, 1).
+
+        Returns
+        -------
+        lower :
+            The lower bounds of the coefficients and of the intercepts.
+        upper :
+            The upper bounds of the coefficients and of the intercepts.
+
+        Raises
+        ------
+        ValueError
+            If the replicates are jackknife replicates, or ``confidence`` is not in (0, 1).
+        """
+        if self.method == "jackknife":
+            raise ValueError(
+                "Percentile intervals require bootstrap replicates, use "
+                "``standard_error`` for jackknife replicates."
+            )
+        if not 0 < confidence < 1:
+            raise ValueError(
+                f"`confidence` must be in (0, 1). {confidence} provided instead!"
+            )
+        alpha = 100 * (1 - confidence) / 2
+        params = (self.coef, self.intercept)
+        lower = jax.tree_util.tree_map(
+            lambda x: np.percentile(x, alpha, axis=0), params
+        )
+        upper = jax.tree_util.tree_map(
+            lambda x: np.percentile(x, 100 - alpha, axis=0), params
+        )
+        return lower, upper
+
+
+def _allocate_results(
+    template: dict, n_replicates: int, output: Optional[Union[str, os.PathLike]]
+) -> dict:
+    """
+    Allocate the arrays storing the results of all the replicates.
+
+    Parameters
+    ----------
+    template :
+        Pytree with the results of a batch of replicates, stacked along the first axis.
+    n_replicates :
+        Total number of replicates.
+    output :
+        Directory where each leaf is memory-mapped to a ``.npy`` file named after its path in
+        ``template``, or None to keep the results in memory.
+
+    Returns
+    -------
+    :
+        Pytree of arrays of the same structure of ``template``, with ``n_replicates`` entries.
+    """
+    if output is not None:
+        os.makedirs(output, exist_ok=True)
+
+    def allocate(path, x):
+        shape = (n_replicates, *x.shape[1:])
+        if output is None:
+            return np.empty(shape, dtype=x.dtype)
+        name = re.sub(r"\W+", "_", jax.tree_util.keystr(path)).strip("_")
+        return np.lib.format.open_memmap(
+            os.path.join(output, f"{name}.npy"), mode="w+", dtype=x.dtype, shape=shape
+        )
+
+    return jax.tree_util.tree_map_with_path(allocate, template)
+
+
+class LowRankCovariance(NamedTuple):
+    r"""
+    Low-rank Laplace approximation of the covariance of the parameters, see ``GLM.compute_covariance``.
+
+    The observed information is approximated by its leading eigenpairs,
+    :math:`I \approx U \Lambda U^\top`, and the covariance by the pseudo-inverse
+    :math:`U \Lambda^{-1} U^\top`, which restricts the posterior to the best-determined
+    directions of the parameter space.
+
+    Attributes
+    ----------
+    eigenvalues :
+        The leading eigenvalues of the observed information in decreasing order, shape
+        ``(rank,)``, or ``(n_neurons, rank)`` for a PopulationGLM.
+    eigenvectors :
+        The corresponding eigenvectors, shape ``(n_features + 1, rank)``, or
+        ``(n_neurons, n_features + 1, rank)`` for a PopulationGLM, with the intercept last.
+    """
+
+    eigenvalues: jnp.ndarray
+    eigenvectors: jnp.ndarray
+
+    def _inverse_eigenvalues(self) -> jnp.ndarray:
+        # directions with no information (e.g. masked coefficients) get no variance
+        tol = (
+            self.eigenvectors.shape[-2]
+            * jnp.finfo(self.eigenvalues.dtype).eps
+            * jnp.max(self.eigenvalues, axis=-1, keepdims=True)
+        )
+        return jnp.where(
+            self.eigenvalues > tol,
+            1 / jnp.where(self.eigenvalues > tol, self.eigenvalues, 1),
+            0.0,
+        )
+
+    def variance(self) -> jnp.ndarray:
+        """
+        Diagonal of the covariance, without forming the dense matrix.
+
+        Returns
+        -------
+        :
+            The variance of each parameter, shape ``(n_features + 1,)``, or
+            ``(n_neurons, n_features + 1)`` for a PopulationGLM.
+        """
+        return jnp.einsum(
+            "...kr,...r->...k", self.eigenvectors**2, self._inverse_eigenvalues()
+        )
+
+    def todense(self) -> jnp.ndarray:
+        """
+        Dense covariance matrix.
+
+        Returns
+        -------
+        :
+            The covariance, shape ``(n_features + 1, n_features + 1)``, or
+            ``(n_neurons, n_features + 1, n_features + 1)`` for a PopulationGLM.
+        """
+        return jnp.einsum(
+            "...kr,...r,...lr->...kl",
+            self.eigenvectors,
+            self._inverse_eigenvalues(),
+            self.eigenvectors,
+        )
+
+
+def _weighted_gram(X: DESIGN_INPUT_TYPE, weights: jnp.ndarray) -> jnp.ndarray:
+    """
+    Weighted Gram matrix of each neuron, ``Z.T @ diag(weights[:, n]) @ Z`` with ``Z = [X, 1]``.
+
+    Pytree predictors are stacked in the order of their leaves, without concatenating the
+    design. Returns an array of shape ``(n_neurons, n_features + 1, n_features + 1)``.
+    """
+    blocks = jax.tree_util.tree_leaves(X, is_leaf=tree_utils.is_sparse)
+    blocks.append(jnp.ones((weights.shape[0], 1), dtype=weights.dtype))
+
+    def cross_product(a, b, w):
+        # sparse-sparse products scale with the product of the number of non-zeros,
+        # densify one of the factors to get a sparse-dense product instead
+        if tree_utils.is_sparse(a) and tree_utils.is_sparse(b):
+            b = b.todense()
+        return (a * w[:, None]).T @ b
+
+    def neuron_gram(w):
+        rows = [
+            [cross_product(bi, bj, w) for bj in blocks[: i + 1]]
+            for i, bi in enumerate(blocks)
+        ]
+        # fill the upper triangle by symmetry
+        return jnp.block(
+            [
+                [rows[i][j] if j <= i else rows[j][i].T for j in range(len(blocks))]
+                for i in range(len(blocks))
+            ]
+        )
+
+    return jax.vmap(neuron_gram, in_axes=1)(weights)
+
+
+@jax.jit
+def _weighted_gram_product(
+    X: DESIGN_INPUT_TYPE, weights: jnp.ndarray, vectors: jnp.ndarray
+) -> jnp.ndarray:
+    """
+    Product of the weighted Gram matrix of each neuron by a vector, without forming the matrix.
+
+    Computes ``Z.T @ diag(weights[:, n]) @ Z @ vectors[n]`` with ``Z = [X, 1]``, for vectors
+    of shape ``(n_neurons, n_features + 1)`` with the intercept last.
+    """
+    blocks = jax.tree_util.tree_leaves(X, is_leaf=tree_utils.is_sparse)
+    splits = np.cumsum([block.shape[1] for block in blocks])
+    coef = jnp.split(vectors, splits, axis=1)
+    # (n_samples, n_neurons) linear predictor of each vector
+    linear = sum(block @ c.T for block, c in zip(blocks, coef)) + coef[-1].T
+    linear = weights * linear
+    return jnp.concatenate(
+        [(block.T @ linear).T for block in blocks] + [linear.sum(axis=0)[:, None]],
+        axis=1,
+    )
+
+
+def _lanczos(
+    matvec: Callable[[jnp.ndarray], jnp.ndarray], init: jnp.ndarray, n_iter: int
+) -> Tuple[jnp.ndarray, jnp.ndarray]:
+    """
+    Lanczos iteration with full re-orthogonalization, batched over the first axis.
+
+    Parameters
+    ----------
+    matvec :
+        Product of a batch of symmetric matrices by vectors of shape ``(n_batch, n)``.
+    init :
+        Starting vectors, shape ``(n_batch, n)``.
+    n_iter :
+        Number of matrix-vector products, at most ``n``.
+
+    Returns
+    -------
+    eigenvalues :
+        The Ritz values in decreasing order, shape ``(n_batch, n_iter)``.
+    eigenvectors :
+        The Ritz vectors, shape ``(n_batch, n, n_iter)``.
+    """
+    eps = jnp.finfo(init.dtype).eps * init.shape[1]
+    vector = init / jnp.linalg.norm(init, axis=1, keepdims=True)
+    basis, alphas, betas = [], [], []
+    for _ in range(n_iter):
+        basis.append(vector)
+        product = matvec(vector)
+        alphas.append(jnp.sum(product * vector, axis=1))
+        # orthogonalize against the whole basis, twice for numerical stability
+        stacked = jnp.stack(basis, axis=1)
+        residual = product
+        for _ in range(2):
+            residual = residual - jnp.einsum(
+                "bj,bjk->bk", jnp.einsum("bjk,bk->bj", stacked, residual), stacked
+            )
+        beta = jnp.linalg.norm(residual, axis=1)
+        betas.append(beta)
+        # the Krylov subspace is invariant on breakdown, the next vectors are set to zero
+        converged = beta <= eps * jnp.linalg.norm(product, axis=1)
+        vector = jnp.where(
+            converged[:, None], 0.0, residual / jnp.where(converged, 1.0, beta)[:, None]
+        )
+    alphas, betas = jnp.stack(alphas, axis=1), jnp.stack(betas, axis=1)[:, :-1]
+    tridiagonal = jax.vmap(lambda a, b: jnp.diag(a) + jnp.diag(b, 1) + jnp.diag(b, -1))(
+        alphas, betas
+    )
+    eigenvalues, rotation = jnp.linalg.eigh(tridiagonal)
+    eigenvectors = jnp.einsum("bjk,bjr->bkr", jnp.stack(basis, axis=1), rotation)
+    return eigenvalues[:, ::-1], eigenvectors[:, :, ::-1]
+
+
+def resample(
+    model: GLM,
+    X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+    y: ArrayLike,
+    n_replicates: int = 100,
+    method: Literal["parametric", "block", "jackknife"] = "parametric",
+    block_size: int = 1,
+    random_key: Optional[jax.Array] = None,
+    batch_size: Optional[int] = None,
+    output: Optional[Union[str, os.PathLike]] = None,
+) -> Resampling:
+    """
+    Refit a fitted GLM to resampled data.
+
+    Engine of :meth:`nemos.glm.GLM.resample`, see its documentation for the other
+    parameters, the returned values and the errors raised.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM. The attributes of ``model`` are not modified.
+    """
+    model._check_is_fit()
+    if method not in ("parametric", "block", "jackknife"):
+        raise ValueError(
+            f"Unknown resampling method {method}. `method` must be either "
+            "'parametric', 'block', or 'jackknife'."
+        )
+    for name, value in (("n_replicates", n_replicates), ("block_size", block_size)):
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(
+                f"`{name}` must be a positive integer. {value} provided instead!"
+            )
+    params = model._get_coef_and_intercept()
+
+    X = model._cast_design(X)
+    y = jnp.asarray(y, dtype=float)
+    model._check_input_dimensionality(X, y)
+    model._check_input_n_timepoints(X, y)
+    model._check_input_and_params_consistency(params, X=X, y=y)
+    data = X.data if isinstance(X, FeaturePytree) else X
+
+    n_samples = y.shape[0]
+    block = jnp.arange(n_samples) // block_size
+    n_blocks = int(block[-1]) + 1
+    if method == "jackknife":
+        n_replicates = n_blocks
+    batch_size = n_replicates if batch_size is None else batch_size
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError(
+            f"`batch_size` must be a positive integer. {batch_size} provided instead!"
+        )
+    batch_size = min(batch_size, n_replicates)
+
+    # invalid samples are weighted out, keeping the same shape for all the replicates
+    is_valid = tree_utils.get_valid_multitree(data, y)
+    validation.error_all_invalid(data, y)
+    data = jax.tree_util.tree_map(lambda x: jnp.where(is_valid[:, None], x, 0.0), data)
+    y = jnp.where(is_valid.reshape(-1, *(1,) * (y.ndim - 1)), y, 0.0)
+    rate = model._predict(params, data)
+
+    model._initialize_group_lasso_mask(data)
+    solver, solver_run = model._instantiate_solver_run(
+        model._optimize_solver_params(
+            tree_utils.tree_slice(data, is_valid), y[is_valid]
+        ),
+        model._predict_and_compute_weighted_loss,
+    )
+    dof_resid = model._estimate_resid_degrees_of_freedom(data, params=params)
+    obs_model = model._observation_model
+    model_scale = model.scale_
+
+    def fit_replicate(key, index):
+        # sample counts of the replicate
+        if method == "parametric":
+            counts = is_valid.astype(float)
+            y_rep = obs_model.sample_generator(key, rate, scale=model_scale)
+        else:
+            if method == "block":
+                draws = jax.random.randint(key, (n_blocks,), 0, n_blocks)
+                block_counts = jnp.zeros(n_blocks).at[draws].add(1.0)
+            else:
+                block_counts = (jnp.arange(n_blocks) != index).astype(float)
+            counts = block_counts[block] * is_valid
+            y_rep = y
+        weights = counts / jnp.mean(counts)
+        rep_params, state = solver_run(params, data, (y_rep, weights))
+        # excluded samples get a zero residual by matching the prediction
+        rep_rate = model._predict(rep_params, data)
+        excluded = counts.reshape(-1, *(1,) * (y.ndim - 1)) == 0
+        scale = obs_model.estimate_scale(
+            jnp.where(excluded, rep_rate, y_rep),
+            rep_rate,
+            dof_resid=dof_resid - jnp.sum(counts == 0),
+        )
+        return dict(
+            coef=rep_params[0],
+            intercept=rep_params[1],
+            scale=scale,
+            n_iter=state.iter_num,
+            converged=state.error <= solver.tol,
+        )
+
+    fit_batch = jax.jit(jax.vmap(fit_replicate))
+    keys = jax.random.split(
+        jax.random.key(0) if random_key is None else random_key, n_replicates
+    )
+    indices = jnp.arange(n_replicates)
+    results = None
+    for start in range(0, n_replicates, batch_size):
+        # the last batch is padded, so that all the batches share the compiled solver
+        batch = jnp.arange(start, start + batch_size) % n_replicates
+        batch_results = fit_batch(keys[batch], indices[batch])
+        if tree_utils.pytree_map_and_reduce(
+            lambda x: jnp.any(jnp.isnan(x)), any, batch_results
+        ):
+            raise ValueError(
+                "Solver returned at least one NaN parameter, so solution is invalid!"
+                " Try tuning optimization hyperparameters, specifically try decreasing the `stepsize` "
+                "and/or setting `acceleration=False`."
+            )
+        if results is None:
+            results = _allocate_results(batch_results, n_replicates, output)
+        stop = min(start + batch_size, n_replicates)
+
+        def store(out, x):
+            out[start:stop] = np.asarray(x[: stop - start])
+
+        jax.tree_util.tree_map(store, results, batch_results)
+
+    if output is not None:
+        jax.tree_util.tree_map(lambda x: x.flush(), results)
+    return Resampling(**results, method=method)
+
+
+def compute_covariance(
+    model: GLM,
+    X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+    y: ArrayLike,
+    chunk_size: Optional[int] = None,
+    rank: Optional[int] = None,
+    random_key: Optional[jax.Array] = None,
+) -> Union[jnp.ndarray, LowRankCovariance]:
+    """
+    Laplace approximation of the covariance of the parameters of a fitted GLM.
+
+    Engine of :meth:`nemos.glm.GLM.compute_covariance`, see its documentation for the other
+    parameters, the returned values and the errors raised.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM.
+    """
+    model._check_is_fit()
+    params = model._get_coef_and_intercept()
+    if rank is not None and (not isinstance(rank, int) or rank < 1):
+        raise ValueError(f"`rank` must be a positive integer. {rank} provided instead!")
+    n_params = sum(x.shape[0] for x in jax.tree_util.tree_leaves(params[0])) + 1
+    if rank is not None and rank > n_params:
+        raise ValueError(
+            f"`rank` must be at most the number of parameters, {n_params}. "
+            f"{rank} provided instead!"
+        )
+    chunk_factory = make_chunk_factory(
+        (X, y), len(y) if chunk_size is None else chunk_size
+    )
+
+    obs_model = model._observation_model
+    hessian_weights = jax.jit(
+        lambda params, X, y: obs_model._hessian_weights(
+            y, model._predict(params, X)
+        ).reshape(y.shape[0], -1)
+    )
+    weighted_gram = jax.jit(_weighted_gram)
+
+    def valid_chunks():
+        for X_chunk, y_chunk in iter_valid_chunks(chunk_factory):
+            yield model._cast_design(X_chunk), y_chunk
+
+    n_samples = 0
+    information = None
+    cached_weights = []
+    for X_chunk, y_chunk in valid_chunks():
+        if n_samples == 0:
+            model._check_input_dimensionality(X_chunk, y_chunk)
+            model._check_input_and_params_consistency(params, X=X_chunk, y=y_chunk)
+            X0, y0 = X_chunk, y_chunk
+        weights = hessian_weights(params, X_chunk, y_chunk)
+        n_samples += y_chunk.shape[0]
+        if rank is None:
+            gram = weighted_gram(X_chunk, weights)
+            information = gram if information is None else information + gram
+        else:
+            cached_weights.append(weights)
+    if n_samples == 0:
+        raise ValueError("At least a NaN or an Inf at all sample points!")
+
+    n_neurons = 1 if y0.ndim == 1 else y0.shape[1]
+    scale = jnp.broadcast_to(jnp.asarray(model.scale_, dtype=float), (n_neurons,))
+    mask = model._coefficient_mask(X0, n_neurons)
+    mask = jnp.ones((n_neurons, n_params)) if mask is None else jnp.asarray(mask)
+    # Ridge prior precision, the intercept is not penalized
+    penalty = jnp.zeros(n_params)
+    if isinstance(model.regularizer, Ridge):
+        penalty = n_samples * model.regularizer_strength * penalty.at[:-1].set(1.0)
+
+    if rank is None:
+        information = model._mask_curvature(
+            information + jnp.diag(penalty), X0, n_neurons
+        )
+        covariance = jnp.linalg.inv(information) * scale[:, None, None]
+        covariance = mask[:, :, None] * covariance * mask[:, None, :]
+        return covariance[0] if y0.ndim == 1 else covariance
+
+    def matvec(vectors):
+        vectors = mask * vectors
+        product = penalty * vectors
+        for (X_chunk, _), weights in zip(valid_chunks(), cached_weights):
+            product = product + _weighted_gram_product(X_chunk, weights, vectors)
+        return mask * product / scale[:, None]
+
+    init = jax.random.normal(
+        jax.random.key(0) if random_key is None else random_key,
+        (n_neurons, n_params),
+    )
+    # extra iterations improve the convergence of the leading eigenpairs
+    eigenvalues, eigenvectors = _lanczos(matvec, mask * init, min(2 * rank, n_params))
+    eigenvalues, eigenvectors = eigenvalues[:, :rank], eigenvectors[:, :, :rank]
+    if y0.ndim == 1:
+        eigenvalues, eigenvectors = eigenvalues[0], eigenvectors[0]
+    return LowRankCovariance(eigenvalues=eigenvalues, eigenvectors=eigenvectors)
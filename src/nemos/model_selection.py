@@ -0,0 +1,705 @@
+"""Fit and score many GLMs at once: regularization paths, stacked fits and cross-validation."""
+
+# required to get ArrayLike to render correctly
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import partial
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Optional, Tuple, Union
+
+import jax
+import jax.numpy as jnp
+from numpy.typing import ArrayLike
+
+from . import tree_utils, validation
+from .initialize_regressor import initialize_intercept_matching_mean_rate
+from .pytrees import FeaturePytree
+from .regularizer import UnRegularized
+from .solvers._gram_newton import _fingerprint
+from .typing import DESIGN_INPUT_TYPE
+
+if TYPE_CHECKING:
+    from .glm import GLM
+
+# null-model scores of the held-out sets, see ``score_stacked``
+_NULL_MODEL_CACHE_MAXSIZE = 16
+_NULL_MODEL_CACHE = OrderedDict()
+
+
+class RegularizationPath(NamedTuple):
+    """
+    Result of fitting a GLM over a sequence of regularizer strengths.
+
+    Attributes
+    ----------
+    regularizer_strength :
+        The regularizer strengths, shape ``(n_strengths,)``.
+    coef :
+        The coefficients stacked along a leading axis of size ``n_strengths``.
+    intercept :
+        The intercepts stacked along a leading axis of size ``n_strengths``.
+    score :
+        The score of the model for each strength, shape ``(n_strengths,)``.
+    n_iter :
+        Number of solver iterations for each strength, shape ``(n_strengths,)``.
+    """
+
+    regularizer_strength: jnp.ndarray
+    coef: DESIGN_INPUT_TYPE
+    intercept: jnp.ndarray
+    score: jnp.ndarray
+    n_iter: jnp.ndarray
+
+
+class StackedFit(NamedTuple):
+    """
+    Result of fitting independent GLMs to stacked inputs.
+
+    Attributes
+    ----------
+    coef :
+        The coefficients stacked along a leading axis of size ``n_models``.
+    intercept :
+        The intercepts stacked along a leading axis of size ``n_models``.
+    scale :
+        The scale parameter of each model.
+    dof_resid :
+        The residual degrees of freedom of each model.
+    n_iter :
+        Number of solver iterations for each model, shape ``(n_models,)``.
+    error :
+        The solver error at the last iteration for each model, shape ``(n_models,)``.
+    converged :
+        Whether the solver error reached the tolerance for each model, shape ``(n_models,)``.
+    """
+
+    coef: DESIGN_INPUT_TYPE
+    intercept: jnp.ndarray
+    scale: jnp.ndarray
+    dof_resid: jnp.ndarray
+    n_iter: jnp.ndarray
+    error: jnp.ndarray
+    converged: jnp.ndarray
+
+
+class StackedScore(NamedTuple):
+    """
+    Scores of stacked models on their held-out sets.
+
+    Attributes
+    ----------
+    log_likelihood :
+        The mean log-likelihood of each model, shape ``(n_models,)``.
+    deviance :
+        The mean residual deviance of each model, shape ``(n_models,)``.
+    pseudo_r2_mcfadden :
+        The McFadden pseudo-:math:`R^2` of each model, shape ``(n_models,)``.
+    pseudo_r2_cohen :
+        The Cohen pseudo-:math:`R^2` of each model, shape ``(n_models,)``.
+    """
+
+    log_likelihood: jnp.ndarray
+    deviance: jnp.ndarray
+    pseudo_r2_mcfadden: jnp.ndarray
+    pseudo_r2_cohen: jnp.ndarray
+
+
+class CrossValidation(NamedTuple):
+    """
+    Result of a K-fold cross-validation of a GLM.
+
+    Attributes
+    ----------
+    score :
+        The score of each fold on its held-out samples, shape ``(n_folds,)``.
+    coef :
+        The coefficients fit on the training samples of each fold, stacked along a
+        leading axis of size ``n_folds``.
+    intercept :
+        The intercepts fit on the training samples of each fold, stacked along a
+        leading axis of size ``n_folds``.
+    scale :
+        The scale parameter of each fold.
+    n_iter :
+        Number of solver iterations for each fold, shape ``(n_folds,)``.
+    fold_labels :
+        The fold of each sample, shape ``(n_time_bins,)``.
+    """
+
+    score: jnp.ndarray
+    coef: DESIGN_INPUT_TYPE
+    intercept: jnp.ndarray
+    scale: jnp.ndarray
+    n_iter: jnp.ndarray
+    fold_labels: jnp.ndarray
+
+
+def _weighted_mean(
+    x: jnp.ndarray, weights: jnp.ndarray, axis: Optional[int] = None
+) -> jnp.ndarray:
+    """Average over the samples with non-negative sample weights, of shape ``(n_samples,)``."""
+    weights = weights.reshape(weights.shape + (1,) * (x.ndim - 1))
+    weights = jnp.broadcast_to(weights, x.shape)
+    return jnp.sum(weights * x, axis=axis) / jnp.sum(weights, axis=axis)
+
+
+def fit_path(
+    model: GLM,
+    X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+    y: ArrayLike,
+    regularizer_strengths: ArrayLike,
+    init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+    score_data: Optional[Tuple[Union[DESIGN_INPUT_TYPE, ArrayLike], ArrayLike]] = None,
+    score_type: Literal[
+        "log-likelihood", "pseudo-r2-McFadden", "pseudo-r2-Cohen"
+    ] = "log-likelihood",
+    vectorize: bool = False,
+) -> RegularizationPath:
+    """
+    Fit a GLM for a sequence of regularizer strengths.
+
+    Engine of :meth:`nemos.glm.GLM.fit_path`, see its documentation for the other
+    parameters, the returned values and the errors raised.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM. The attributes of ``model`` are not modified.
+    """
+    if isinstance(model.regularizer, UnRegularized):
+        raise ValueError(
+            "`fit_path` requires a regularizer with a strength parameter. "
+            "The regularizer is `UnRegularized`."
+        )
+    if model.solver_name == "SVRG":
+        raise ValueError(
+            "The solver: SVRG does not support `fit_path`, since the regularizer strength "
+            "cannot be passed to its loss as an argument. Please use a different solver."
+        )
+    if score_type not in (
+        "log-likelihood",
+        "pseudo-r2-McFadden",
+        "pseudo-r2-Cohen",
+    ):
+        raise NotImplementedError(
+            f"Scoring method {score_type} not implemented! "
+            "`score_type` must be either 'log-likelihood', 'pseudo-r2-McFadden', "
+            "or 'pseudo-r2-Cohen'."
+        )
+    regularizer_strengths = jnp.asarray(regularizer_strengths, dtype=float)
+    if regularizer_strengths.ndim != 1 or regularizer_strengths.shape[0] == 0:
+        raise ValueError(
+            "`regularizer_strengths` must be a non-empty 1-dimensional array. "
+            f"Array of shape {regularizer_strengths.shape} provided instead!"
+        )
+
+    # validate the inputs & initialize parameters
+    init_params = model.initialize_params(X, y, init_params=init_params)
+
+    # drop nans
+    is_valid = tree_utils.get_valid_multitree(X, y)
+    X = tree_utils.tree_slice(X, is_valid)
+    y = y[is_valid]
+    data = X.data if isinstance(X, FeaturePytree) else X
+
+    if score_data is None:
+        score_X, score_y = data, y
+    else:
+        score_X, score_y = score_data
+        model._check_input_dimensionality(score_X, score_y)
+        model._check_input_n_timepoints(score_X, score_y)
+        model._check_input_and_params_consistency(init_params, X=score_X, y=score_y)
+        is_valid = tree_utils.get_valid_multitree(score_X, score_y)
+        score_X = tree_utils.tree_slice(score_X, is_valid)
+        score_y = score_y[is_valid]
+        if isinstance(score_X, FeaturePytree):
+            score_X = score_X.data
+
+    model._initialize_group_lasso_mask(data)
+    _, solver_run = model._instantiate_solver_run(
+        model._optimize_solver_params(data, y),
+        model._predict_and_compute_loss,
+        traced_strength=True,
+    )
+
+    if vectorize:
+
+        def path_run(params, strengths, X, y):
+            params, state = jax.vmap(solver_run, in_axes=(None, 0, None, None))(
+                params, strengths, X, y
+            )
+            return params, state.iter_num
+
+    else:
+
+        def path_run(params, strengths, X, y):
+            def fit_strength(warm_start, strength):
+                params, state = solver_run(warm_start, strength, X, y)
+                return params, (params, state.iter_num)
+
+            return jax.lax.scan(fit_strength, params, strengths)[1]
+
+    params, n_iter = jax.jit(path_run)(init_params, regularizer_strengths, data, y)
+
+    if tree_utils.pytree_map_and_reduce(lambda x: jnp.any(jnp.isnan(x)), any, params):
+        raise ValueError(
+            "Solver returned at least one NaN parameter, so solution is invalid!"
+            " Try tuning optimization hyperparameters, specifically try decreasing the `stepsize` "
+            "and/or setting `acceleration=False`."
+        )
+
+    def score_strength(params):
+        dof_resid = model._estimate_resid_degrees_of_freedom(data, params=params)
+        scale = model.observation_model.estimate_scale(
+            y, model._predict(params, data), dof_resid=dof_resid
+        )
+        if score_type == "log-likelihood":
+            return model.observation_model.log_likelihood(
+                score_y, model._predict(params, score_X), scale
+            )
+        return model.observation_model.pseudo_r2(
+            score_y,
+            model._predict(params, score_X),
+            score_type=score_type,
+            scale=scale,
+        )
+
+    score = jax.jit(jax.vmap(score_strength))(params)
+    return RegularizationPath(
+        regularizer_strength=regularizer_strengths,
+        coef=params[0],
+        intercept=params[1],
+        score=score,
+        n_iter=n_iter,
+    )
+
+
+def fit_stacked(
+    model: GLM,
+    X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+    y: ArrayLike,
+    init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+) -> StackedFit:
+    """
+    Fit independent GLMs to stacked inputs in a single vectorized solver run.
+
+    Engine of :meth:`nemos.glm.GLM.fit_stacked`, see its documentation for the other
+    parameters, the returned values and the errors raised.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM. The attributes of ``model`` are not modified.
+    """
+    X = model._cast_design(X)
+    y = jnp.asarray(y, dtype=float)
+    data = X.data if isinstance(X, FeaturePytree) else X
+
+    n_models = {x.shape[0] for x in jax.tree_util.tree_leaves((data, y))}
+    if len(n_models) != 1:
+        raise ValueError(
+            "The leaves of `X` and `y` must have the same number of models along the first axis. "
+            f"Numbers of models provided: {sorted(n_models)}."
+        )
+
+    # validate a single model, this sets the defaults of the regularizer and feature mask
+    data_0 = jax.tree_util.tree_map(lambda x: x[0], data)
+    params_0 = (
+        None
+        if init_params is None
+        else jax.tree_util.tree_map(lambda x: jnp.asarray(x)[0], init_params)
+    )
+    params_0 = model.initialize_params(data_0, y[0], init_params=params_0)
+    model._initialize_group_lasso_mask(data_0)
+
+    # weight out invalid samples, keeping the same shape for all models
+    is_valid = jax.vmap(tree_utils.get_valid_multitree)(data, y)
+    if jnp.any(~jnp.any(is_valid, axis=1)):
+        raise ValueError(
+            "At least a NaN or an Inf at all sample points for models "
+            f"{jnp.where(~jnp.any(is_valid, axis=1))[0].tolist()}!"
+        )
+    weights = is_valid / jnp.mean(is_valid, axis=1, keepdims=True)
+    data = jax.tree_util.tree_map(
+        lambda x: jnp.where(jnp.expand_dims(is_valid, (2,)), x, 0.0), data
+    )
+    y = jnp.where(is_valid.reshape(is_valid.shape + (1,) * (y.ndim - 2)), y, 0.0)
+
+    if init_params is None:
+        # intercept matching the mean rate of each model, in a single call
+        n_models, n_samples = is_valid.shape
+        y_nan = jnp.where(
+            is_valid.reshape(is_valid.shape + (1,) * (y.ndim - 2)), y, jnp.nan
+        )
+        y_nan = jnp.moveaxis(y_nan, 0, 1).reshape(n_samples, -1)
+        intercept = initialize_intercept_matching_mean_rate(
+            model.observation_model.inverse_link_function, y_nan
+        ).reshape(n_models, *params_0[1].shape)
+        coef = jax.tree_util.tree_map(
+            lambda p: jnp.zeros((n_models, *p.shape)), params_0[0]
+        )
+        init_params = (coef, intercept)
+    else:
+        err_message = (
+            "Initial parameters must be array-like objects (or pytrees of array-like objects) "
+            "with numeric data-type!"
+        )
+        init_params = validation.convert_tree_leaves_to_jax_array(
+            init_params, err_message=err_message, data_type=float
+        )
+        # the parameters of every model must have the shapes of the validated first model
+        shapes = [p.shape for p in jax.tree_util.tree_leaves(init_params)]
+        expected_shapes = [
+            (is_valid.shape[0], *p.shape) for p in jax.tree_util.tree_leaves(params_0)
+        ]
+        if shapes != expected_shapes:
+            raise ValueError(
+                "The leaves of `init_params` must be stacked along a leading axis of size "
+                f"{is_valid.shape[0]}, with shapes {expected_shapes}. Shapes {shapes} "
+                "provided instead!"
+            )
+
+    # solver defaults are computed on the pooled valid samples
+    pooled_valid = is_valid.reshape(-1)
+    pooled_data = jax.tree_util.tree_map(
+        lambda x: x.reshape(-1, *x.shape[2:])[pooled_valid], data
+    )
+    pooled_y = y.reshape(-1, *y.shape[2:])[pooled_valid]
+    solver, solver_run = model._instantiate_solver_run(
+        model._optimize_solver_params(pooled_data, pooled_y),
+        model._predict_and_compute_weighted_loss,
+    )
+
+    def fit_model(params, X, y, weights):
+        params, state = solver_run(params, X, (y, weights))
+        # the dof are linear in the number of samples, correct for the invalid ones
+        n_invalid = jnp.sum(weights == 0)
+        dof_resid = (
+            model._estimate_resid_degrees_of_freedom(X, params=params) - n_invalid
+        )
+        # invalid samples get a zero residual by matching the prediction
+        rate = model._predict(params, X)
+        y = jnp.where(weights.reshape(weights.shape + (1,) * (y.ndim - 1)) > 0, y, rate)
+        scale = model.observation_model.estimate_scale(y, rate, dof_resid=dof_resid)
+        return params, scale, dof_resid, state.iter_num, state.error
+
+    params, scale, dof_resid, n_iter, error = jax.jit(jax.vmap(fit_model))(
+        init_params, data, y, weights
+    )
+
+    if tree_utils.pytree_map_and_reduce(lambda x: jnp.any(jnp.isnan(x)), any, params):
+        raise ValueError(
+            "Solver returned at least one NaN parameter, so solution is invalid!"
+            " Try tuning optimization hyperparameters, specifically try decreasing the `stepsize` "
+            "and/or setting `acceleration=False`."
+        )
+
+    return StackedFit(
+        coef=params[0],
+        intercept=params[1],
+        scale=scale,
+        dof_resid=dof_resid,
+        n_iter=n_iter,
+        error=error,
+        converged=error <= solver.tol,
+    )
+
+
+def cross_validate(
+    model: GLM,
+    X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+    y: ArrayLike,
+    n_folds: int = 5,
+    fold_labels: Optional[ArrayLike] = None,
+    score_type: Literal[
+        "log-likelihood", "pseudo-r2-McFadden", "pseudo-r2-Cohen"
+    ] = "log-likelihood",
+    init_params: Optional[Tuple[Union[dict, ArrayLike], ArrayLike]] = None,
+    vectorize: bool = True,
+) -> CrossValidation:
+    """
+    K-fold cross-validate a GLM on precomputed features.
+
+    Engine of :meth:`nemos.glm.GLM.cross_validate`, see its documentation for the other
+    parameters, the returned values and the errors raised.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM. The attributes of ``model`` are not modified.
+    """
+    if score_type not in (
+        "log-likelihood",
+        "pseudo-r2-McFadden",
+        "pseudo-r2-Cohen",
+    ):
+        raise NotImplementedError(
+            f"Scoring method {score_type} not implemented! "
+            "`score_type` must be either 'log-likelihood', 'pseudo-r2-McFadden', "
+            "or 'pseudo-r2-Cohen'."
+        )
+
+    # validate the inputs & initialize parameters
+    X = model._cast_design(X)
+    y = jnp.asarray(y, dtype=float)
+    init_params = model.initialize_params(X, y, init_params=init_params)
+    data = X.data if isinstance(X, FeaturePytree) else X
+    n_samples = y.shape[0]
+
+    if fold_labels is None:
+        if not isinstance(n_folds, int) or n_folds < 2 or n_folds > n_samples:
+            raise ValueError(
+                "`n_folds` must be an integer between 2 and the number of samples. "
+                f"{n_folds} provided instead!"
+            )
+        # contiguous blocks of (almost) equal size
+        fold_labels = (jnp.arange(n_samples) * n_folds) // n_samples
+    else:
+        fold_labels = jnp.asarray(fold_labels)
+        if fold_labels.shape != (n_samples,):
+            raise ValueError(
+                "`fold_labels` must have one label per sample, shape "
+                f"({n_samples},). Shape {fold_labels.shape} provided instead!"
+            )
+        # relabel as 0, ..., n_folds - 1
+        _, fold_labels = jnp.unique(fold_labels, return_inverse=True)
+        fold_labels = fold_labels.reshape(n_samples)
+        n_folds = int(jnp.max(fold_labels)) + 1
+        if n_folds < 2:
+            raise ValueError("`fold_labels` must define at least two folds!")
+
+    # (n_folds, n_samples) masks of the held-out valid samples
+    is_valid = tree_utils.get_valid_multitree(data, y)
+    is_test = (fold_labels == jnp.arange(n_folds)[:, None]) & is_valid
+    is_train = ~is_test & is_valid
+    empty = jnp.where(~jnp.any(is_train, axis=1) | ~jnp.any(is_test, axis=1))[0]
+    if empty.shape[0]:
+        raise ValueError(
+            f"Folds {empty.tolist()} have no valid training or held-out samples!"
+        )
+    # training weights averaging one over all the samples
+    weights = is_train / jnp.mean(is_train, axis=1, keepdims=True)
+
+    if jnp.all(is_valid):
+        valid_data, valid_y = data, y
+    else:
+        valid_data = tree_utils.tree_slice(data, is_valid)
+        valid_y = y[is_valid]
+        # zero out invalid samples, which are weighted out of the loss
+        data = jax.tree_util.tree_map(
+            lambda x: jnp.where(is_valid[:, None], x, 0.0), data
+        )
+        y = jnp.where(is_valid.reshape(-1, *(1,) * (y.ndim - 1)), y, 0.0)
+
+    model._initialize_group_lasso_mask(data)
+    _, solver_run = model._instantiate_solver_run(
+        model._optimize_solver_params(valid_data, valid_y),
+        model._predict_and_compute_weighted_loss,
+    )
+
+    def fit_fold(weights):
+        params, state = solver_run(init_params, data, (y, weights))
+        # the dof are linear in the number of samples, correct for the excluded ones
+        n_excluded = jnp.sum(weights == 0)
+        dof_resid = (
+            model._estimate_resid_degrees_of_freedom(data, params=params) - n_excluded
+        )
+        # excluded samples get a zero residual by matching the prediction
+        rate = model._predict(params, data)
+        y_train = jnp.where(weights.reshape(-1, *(1,) * (y.ndim - 1)) > 0, y, rate)
+        scale = model.observation_model.estimate_scale(
+            y_train, rate, dof_resid=dof_resid
+        )
+        return params, scale, state.iter_num
+
+    map_folds = jax.vmap(fit_fold) if vectorize else partial(jax.lax.map, fit_fold)
+    params, scale, n_iter = jax.jit(map_folds)(weights)
+
+    if tree_utils.pytree_map_and_reduce(lambda x: jnp.any(jnp.isnan(x)), any, params):
+        raise ValueError(
+            "Solver returned at least one NaN parameter, so solution is invalid!"
+            " Try tuning optimization hyperparameters, specifically try decreasing the `stepsize` "
+            "and/or setting `acceleration=False`."
+        )
+
+    # the held-out sets partition the samples, slicing them copies the data once
+    score = jnp.stack(
+        [
+            model._compute_score(
+                jax.tree_util.tree_map(lambda p: p[k], params),
+                scale[k],
+                tree_utils.tree_slice(data, is_test[k]),
+                y[is_test[k]],
+                score_type,
+            )
+            for k in range(n_folds)
+        ]
+    )
+    return CrossValidation(
+        score=score,
+        coef=params[0],
+        intercept=params[1],
+        scale=scale,
+        n_iter=n_iter,
+        fold_labels=fold_labels,
+    )
+
+
+def score_stacked(
+    model: GLM,
+    X: Union[DESIGN_INPUT_TYPE, ArrayLike],
+    y: ArrayLike,
+    params: Any,
+    scale: Optional[ArrayLike] = None,
+) -> StackedScore:
+    """
+    Score many parameter sets of a GLM on their held-out sets in a single compiled pass.
+
+    Engine of :meth:`nemos.glm.GLM.score_stacked`, see its documentation for the other
+    parameters, the returned values and the errors raised.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM, it does not need to be fit.
+    """
+    if hasattr(params, "coef") and hasattr(params, "intercept"):
+        if scale is None:
+            scale = getattr(params, "scale", None)
+        params = (params.coef, params.intercept)
+    validation.check_length(params, 2, "Params must have length two.")
+    params = validation.convert_tree_leaves_to_jax_array(
+        params,
+        err_message="Params must be array-like objects (or pytrees of array-like objects) "
+        "with numeric data-type!",
+        data_type=float,
+    )
+    n_models = params[1].shape[0]
+    params_0 = jax.tree_util.tree_map(lambda p: p[0], params)
+    scale = jnp.asarray(1.0 if scale is None else scale, dtype=float)
+    try:
+        scale = jnp.broadcast_to(scale, (n_models, *params_0[1].shape))
+    except ValueError:
+        raise ValueError(
+            f"The scale must have one entry per model, shape {(n_models, *params_0[1].shape)}. "
+            f"Shape {scale.shape} provided instead!"
+        )
+
+    X = model._cast_design(X)
+    y = jnp.asarray(y, dtype=float)
+    stack_X = tree_utils.pytree_map_and_reduce(lambda x: x.ndim == 3, all, X)
+    try:
+        model._check_input_dimensionality(y=y)
+        stack_y = False
+    except ValueError:
+        stack_y = True
+    for stacked, tree in ((stack_X, X), (stack_y, y)):
+        n_stacked = {x.shape[0] for x in jax.tree_util.tree_leaves(tree)}
+        if stacked and n_stacked != {n_models}:
+            raise ValueError(
+                f"Stacked inputs must have one entry per model, {n_models} models "
+                "provided!"
+            )
+
+    # validate the inputs of a single model
+    X_0 = jax.tree_util.tree_map(lambda x: x[0], X) if stack_X else X
+    y_0 = y[0] if stack_y else y
+    model._check_input_dimensionality(X_0, y_0)
+    model._check_input_n_timepoints(X_0, y_0)
+    model._check_input_and_params_consistency(params_0, X=X_0, y=y_0)
+    data = X.data if isinstance(X, FeaturePytree) else X
+
+    # held-out sets as (n_sets, n_time_bins) masks, a single set if both inputs are shared
+    X_axis, y_axis = (0 if stack_X else None), (0 if stack_y else None)
+    get_valid = tree_utils.get_valid_multitree
+    if stack_X or stack_y:
+        is_valid = jax.vmap(get_valid, in_axes=(X_axis, y_axis))(data, y)
+    else:
+        is_valid = get_valid(data, y)[None]
+    empty = jnp.where(~jnp.any(is_valid, axis=1))[0]
+    if empty.shape[0]:
+        raise ValueError(f"The held-out sets {empty.tolist()} have no valid samples!")
+
+    # invalid samples get zero predictors and the mean activity, and are weighted out
+    weights = is_valid.reshape(is_valid.shape + (1,) * (y.ndim - stack_y - 1))
+    y = jnp.where(weights, y, 0.0)
+    mean_y = jnp.sum(y, axis=1) / jnp.sum(weights, axis=1)
+    y = jnp.where(weights, y, jnp.expand_dims(mean_y, 1))
+    if not stack_y:
+        y = y[0]
+    data = jax.tree_util.tree_map(
+        lambda x: (x if tree_utils.is_sparse(x) else jnp.where(jnp.isfinite(x), x, 0)),
+        data,
+        is_leaf=tree_utils.is_sparse,
+    )
+    if not (stack_X or stack_y):
+        is_valid = is_valid[0]
+
+    sets_axis = 0 if (stack_X or stack_y) else None
+    ll_null, dev_null = _null_model_scores(
+        model, y, is_valid, scale, stack_y, sets_axis
+    )
+
+    def score_model(params, scale, X, y, is_valid):
+        rate = model._predict(params, X)
+        aggregate = partial(_weighted_mean, weights=is_valid)
+        ll = model._observation_model.log_likelihood(
+            y, rate, scale, aggregate_sample_scores=aggregate
+        )
+        dev = aggregate(model._observation_model.deviance(y, rate))
+        return ll, dev
+
+    ll, dev = jax.jit(jax.vmap(score_model, in_axes=(0, 0, X_axis, y_axis, sets_axis)))(
+        params, scale, data, y, is_valid
+    )
+    return StackedScore(
+        log_likelihood=ll,
+        deviance=dev,
+        pseudo_r2_mcfadden=1 - ll / ll_null,
+        pseudo_r2_cohen=(dev_null - dev) / dev_null,
+    )
+
+
+def _null_model_scores(
+    model: GLM,
+    y: jnp.ndarray,
+    is_valid: jnp.ndarray,
+    scale: jnp.ndarray,
+    stack_y: bool,
+    sets_axis: Optional[int],
+) -> Tuple[jnp.ndarray, jnp.ndarray]:
+    """
+    Score the null model of each held-out set, caching the result by the content of the inputs.
+
+    Returns
+    -------
+    ll_null :
+        The null log-likelihood for each model, shape ``(n_models,)``.
+    dev_null :
+        The null deviance for each model, shape ``(n_models,)``.
+    """
+    obs_model = model._observation_model
+    key = (
+        type(obs_model),
+        obs_model.inverse_link_function,
+        _fingerprint((y, is_valid, scale)),
+    )
+    if key in _NULL_MODEL_CACHE:
+        _NULL_MODEL_CACHE.move_to_end(key)
+        return _NULL_MODEL_CACHE[key]
+
+    def score_null(scale, y, is_valid):
+        aggregate = partial(_weighted_mean, weights=is_valid)
+        mean_y = jnp.ones(y.shape) * aggregate(y, axis=0)
+        ll = obs_model.log_likelihood(
+            y, mean_y, scale, aggregate_sample_scores=aggregate
+        )
+        return ll, aggregate(obs_model.deviance(y, mean_y))
+
+    scores = jax.jit(
+        jax.vmap(score_null, in_axes=(0, 0 if stack_y else None, sets_axis))
+    )(scale, y, is_valid)
+    _NULL_MODEL_CACHE[key] = scores
+    if len(_NULL_MODEL_CACHE) > _NULL_MODEL_CACHE_MAXSIZE:
+        _NULL_MODEL_CACHE.popitem(last=False)
+    return scores
@@ -17,6 +17,17 @@ def __dir__():
     return __all__
 
 
+def _is_inverse_link(inverse_link_function: Callable, reference: Callable) -> bool:
+    """Check numerically if an inverse link function matches a reference function."""
+    # evaluated eagerly, also when called while tracing a jitted solver
+    with jax.ensure_compile_time_eval():
+        x = jnp.array([-1.5, -0.5, 0.25, 1.0, 2.0])
+        try:
+            return bool(jnp.allclose(inverse_link_function(x), reference(x)))
+        except Exception:
+            return False
+
+
 class Observations(Base, abc.ABC):
     """
     Abstract observation model class for neural data processing.
@@ -262,6 +273,36 @@ class Observations(Base, abc.ABC):
         """
         pass
 
+    def _hessian_weights(
+        self, y: jnp.ndarray, predicted_rate: jnp.ndarray
+    ) -> jnp.ndarray:
+        r"""Second derivative of the negative log-likelihood with respect to the linear predictor.
+
+        The Hessian of the GLM negative log-likelihood of each neuron is
+        :math:`\frac{1}{T} Z^\top W Z`, with :math:`Z` the design matrix and :math:`W` a diagonal
+        matrix of these weights. Used by the ``IRLS`` solver.
+
+        Parameters
+        ----------
+        y :
+            Observed neural activity. Shape ``(n_time_bins, )`` or ``(n_time_bins, n_neurons)``.
+        predicted_rate :
+            The predicted rate. Shape ``(n_time_bins, )`` or ``(n_time_bins, n_neurons)``.
+
+        Returns
+        -------
+        :
+            The weight of each sample, same shape as ``predicted_rate``.
+
+        Raises
+        ------
+        ValueError
+            If the weights are not available in closed form for the inverse link function.
+        """
+        raise ValueError(
+            f"The Hessian of {self.__class__.__name__} is not available in closed form!"
+        )
+
     def pseudo_r2(
         self,
         y: jnp.ndarray,
@@ -644,6 +685,38 @@ class PoissonObservations(Observations):
         """
         return jnp.ones_like(jnp.atleast_1d(y[0]))
 
+    def _hessian_weights(
+        self, y: jnp.ndarray, predicted_rate: jnp.ndarray
+    ) -> jnp.ndarray:
+        r"""Second derivative of the negative log-likelihood with respect to the linear predictor.
+
+        For the canonical inverse link :math:`\mu = \exp(\eta)`, the weights are the rates,
+        :math:`w_{tn} = \mu_{tn}`.
+
+        Parameters
+        ----------
+        y :
+            Observed spike counts. Shape ``(n_time_bins, )`` or ``(n_time_bins, n_neurons)``.
+        predicted_rate :
+            The predicted rate. Shape ``(n_time_bins, )`` or ``(n_time_bins, n_neurons)``.
+
+        Returns
+        -------
+        :
+            The weight of each sample, same shape as ``predicted_rate``.
+
+        Raises
+        ------
+        ValueError
+            If the inverse link function is not the exponential.
+        """
+        if not _is_inverse_link(self.inverse_link_function, jnp.exp):
+            raise ValueError(
+                "The Hessian of PoissonObservations is available in closed form only "
+                "for the exponential inverse link function!"
+            )
+        return predicted_rate
+
 
 class GammaObservations(Observations):
     """
@@ -727,11 +800,8 @@ class GammaObservations(Observations):
 
         """
         k = 1 / scale
-        norm = (
-            (k - 1) * jnp.mean(jnp.log(y))
-            + k * jnp.log(k)
-            - jax.scipy.special.gammaln(k)
-        )
+        # per-sample normalization, so that all the terms are aggregated alike
+        norm = (k - 1) * jnp.log(y) + k * jnp.log(k) - jax.scipy.special.gammaln(k)
         return aggregate_sample_scores(
             norm - k * self._negative_log_likelihood(y, predicted_rate, lambda x: x)
         )
@@ -850,6 +920,44 @@ class GammaObservations(Observations):
             jnp.sum(resid * jnp.power(predicted_rate, -2), axis=0) / dof_resid
         )  # pearson residuals
 
+    def _hessian_weights(
+        self, y: jnp.ndarray, predicted_rate: jnp.ndarray
+    ) -> jnp.ndarray:
+        r"""Second derivative of the negative log-likelihood with respect to the linear predictor.
+
+        For the canonical inverse link :math:`\mu = 1 / \eta` the weights are
+        :math:`w_{tn} = \mu_{tn}^2`, for the exponential inverse link they are
+        :math:`w_{tn} = y_{tn} / \mu_{tn}`.
+
+        Parameters
+        ----------
+        y :
+            Observed neural activity. Shape ``(n_time_bins, )`` or ``(n_time_bins, n_neurons)``.
+        predicted_rate :
+            The predicted rate. Shape ``(n_time_bins, )`` or ``(n_time_bins, n_neurons)``.
+
+        Returns
+        -------
+        :
+            The weight of each sample, same shape as ``predicted_rate``.
+
+        Raises
+        ------
+        ValueError
+            If the inverse link function is neither the inverse nor the exponential.
+        """
+        if _is_inverse_link(self.inverse_link_function, lambda x: jnp.power(x, -1)):
+            return jnp.power(predicted_rate, 2)
+        if _is_inverse_link(self.inverse_link_function, jnp.exp):
+            predicted_rate = jnp.clip(
+                predicted_rate, min=jnp.finfo(predicted_rate.dtype).eps
+            )
+            return y / predicted_rate
+        raise ValueError(
+            "The Hessian of GammaObservations is available in closed form only for the "
+            "inverse and the exponential inverse link functions!"
+        )
+
 
 def check_observation_model(observation_model):
     r"""
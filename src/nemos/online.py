@@ -0,0 +1,434 @@
+"""Online learning of GLMs from streaming neural data."""
+
+# required to get ArrayLike to render correctly
+from __future__ import annotations
+
+import time
+from typing import Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+from numpy.typing import ArrayLike
+
+from . import tree_utils
+from .base_class import Base
+from .glm import GLM, ModelParams, PopulationGLM
+from .pytrees import FeaturePytree
+from .utils import format_repr
+
+
+class OnlineGLM(Base):
+    r"""
+    Online learner for GLMs and PopulationGLMs.
+
+    The learner keeps, for each neuron, the current parameters and the running
+    inverse Fisher information of the cumulative negative log-likelihood. New time bins
+    are processed one at the time with a recursive Newton (adaptive point-process filter)
+    update,
+
+    .. math::
+        \begin{aligned}
+        P_t &= \frac{P_{t-1}}{\lambda} - \frac{c_t \, P_{t-1} \tilde{x}_t \tilde{x}_t^\top P_{t-1} / \lambda^2}
+        {1 + c_t \, \tilde{x}_t^\top P_{t-1} \tilde{x}_t / \lambda} \\\
+        \theta_t &= \theta_{t-1} - P_t \tilde{x}_t \, g_t,
+        \end{aligned}
+
+    where :math:`\tilde{x}_t` are the predictors of the bin augmented with a constant
+    for the intercept, :math:`g_t` and :math:`c_t` are the first and (non-negative) second
+    derivatives of the negative log-likelihood of the bin with respect to the linear
+    predictor, and :math:`\lambda` is the forgetting factor. The rank-one structure of
+    the update makes the cost per bin ``O(n_neurons * n_features ** 2)``, independently
+    of the number of bins seen so far.
+
+    Parameters
+    ----------
+    model :
+        The GLM or PopulationGLM to update. Its observation model defines the likelihood,
+        its regularizer and solver are used for the warm-start fit in :meth:`initialize`.
+    forgetting_factor :
+        Exponential forgetting factor in ``(0, 1]``. Values smaller than one discount past
+        bins, with an effective memory of ``1 / (1 - forgetting_factor)`` bins, allowing the
+        parameters to track non-stationary responses.
+    prior_precision :
+        Precision of an isotropic Gaussian prior on the parameters, added to the
+        information of the warm-start data to make it invertible.
+
+    Attributes
+    ----------
+    n_bins_ :
+        Number of valid time bins seen, including the warm-start bins.
+    covariance_ :
+        Running inverse Fisher information of the coefficients and intercept, shape
+        ``(n_features + 1, n_features + 1)`` for a GLM or
+        ``(n_neurons, n_features + 1, n_features + 1)`` for a PopulationGLM. The last
+        row and column refer to the intercept.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import nemos as nmo
+    >>> np.random.seed(123)
+    >>> X = np.random.normal(size=(1000, 3))
+    >>> y = np.random.poisson(np.exp(X.dot([0.2, -0.1, 0.3])))
+    >>> learner = nmo.online.OnlineGLM(nmo.glm.GLM()).initialize(X[:100], y[:100])
+    >>> for t in range(100, 1000, 100):
+    ...     learner = learner.partial_fit(X[t: t + 100], y[t: t + 100])
+    >>> learner.n_bins_
+    1000
+    >>> learner.model.coef_.shape
+    (3,)
+    """
+
+    def __init__(
+        self,
+        model: GLM,
+        forgetting_factor: float = 1.0,
+        prior_precision: float = 1e-6,
+    ):
+        self.model = model
+        self.forgetting_factor = forgetting_factor
+        self.prior_precision = prior_precision
+
+        self.n_bins_ = 0
+        self._covariance = None
+        self._params = None
+        self._mask = None
+        self._update_fn = None
+        self._update_time = 0.0
+        self._n_updated_bins = 0
+
+    @property
+    def model(self) -> GLM:
+        """The GLM or PopulationGLM updated online."""
+        return self._model
+
+    @model.setter
+    def model(self, model: GLM):
+        if not isinstance(model, GLM):
+            raise TypeError(
+                f"`model` must be a GLM or a PopulationGLM. {type(model)} provided instead!"
+            )
+        self._model = model
+        # the compiled update traces the observation model, and the state of the previous
+        # model does not apply to the new one
+        self._update_fn = None
+
+    @property
+    def forgetting_factor(self) -> float:
+        """Exponential forgetting factor of the past time bins."""
+        return self._forgetting_factor
+
+    @forgetting_factor.setter
+    def forgetting_factor(self, forgetting_factor: float):
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError(
+                f"`forgetting_factor` must be in the interval (0, 1]. {forgetting_factor} provided instead!"
+            )
+        self._forgetting_factor = float(forgetting_factor)
+
+    @property
+    def prior_precision(self) -> float:
+        """Precision of the Gaussian prior on the parameters."""
+        return self._prior_precision
+
+    @prior_precision.setter
+    def prior_precision(self, prior_precision: float):
+        if not prior_precision > 0:
+            raise ValueError(
+                f"`prior_precision` must be positive. {prior_precision} provided instead!"
+            )
+        self._prior_precision = float(prior_precision)
+
+    @property
+    def covariance_(self) -> Optional[jnp.ndarray]:
+        """Running inverse Fisher information of the coefficients and intercept."""
+        if self._covariance is None or self._is_population():
+            return self._covariance
+        return self._covariance[0]
+
+    @property
+    def throughput_(self) -> float:
+        """
+        Number of time bins processed per second by :meth:`partial_fit`.
+
+        The time spent validating the input is included, the warm-start fit is not.
+        """
+        if self._update_time == 0:
+            return 0.0
+        return self._n_updated_bins / self._update_time
+
+    def _is_population(self) -> bool:
+        return isinstance(self.model, PopulationGLM)
+
+    def _to_internal_params(self, params: ModelParams) -> jnp.ndarray:
+        """Stack coefficients and intercept into an array of shape ``(n_neurons, n_features + 1)``."""
+        coef, intercept = params
+        if self._is_population():
+            return jnp.concatenate([coef.T, intercept[:, None]], axis=1)
+        return jnp.concatenate([coef, intercept])[None]
+
+    def _to_model_params(self, params: jnp.ndarray) -> ModelParams:
+        """Split the internal parameters into coefficients and intercept."""
+        if self._is_population():
+            return params[:, :-1].T, params[:, -1]
+        return params[0, :-1], params[0, -1:]
+
+    def _prepare_inputs(
+        self, X: ArrayLike, y: ArrayLike
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Validate the inputs and augment the predictors with a constant.
+
+        The inputs are kept as numpy arrays, since the per-call overhead of eager jax
+        operations would dominate the update time of a few bins.
+        """
+        if isinstance(X, (FeaturePytree, dict)):
+            raise TypeError(
+                "OnlineGLM requires the predictors to be a 2-dimensional array. "
+                "FeaturePytree inputs are not supported."
+            )
+        X, y = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+        self.model._check_input_dimensionality(X, y)
+        self.model._check_input_n_timepoints(X, y)
+        if not self._is_population():
+            y = y[:, None]
+
+        is_valid = np.all(np.isfinite(X), axis=1) & np.all(np.isfinite(y), axis=1)
+        X = np.concatenate([X, np.ones((X.shape[0], 1))], axis=1)
+        return X, y, is_valid
+
+    def _neuron_derivatives(self, eta: jnp.ndarray, y: jnp.ndarray):
+        """First and non-negative second derivative of the bin likelihood wrt the linear predictor."""
+        observation_model = self.model.observation_model
+
+        def neg_log_likelihood(lin_pred):
+            return observation_model._negative_log_likelihood(
+                y[None],
+                observation_model.inverse_link_function(lin_pred)[None],
+                aggregate_sample_scores=jnp.sum,
+            )
+
+        grad = jax.grad(neg_log_likelihood)(eta)
+        curvature = jax.grad(jax.grad(neg_log_likelihood))(eta)
+        # clip to keep the covariance positive definite for non-canonical links
+        return grad, jnp.maximum(curvature, 0.0)
+
+    def _neuron_step(
+        self,
+        params: jnp.ndarray,
+        covariance: jnp.ndarray,
+        x: jnp.ndarray,
+        y: jnp.ndarray,
+        mask: jnp.ndarray,
+        forgetting_factor: float,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray]:
+        """Recursive Newton update of a single neuron for a single bin."""
+        x = x * mask
+        grad, curvature = self._neuron_derivatives(jnp.dot(x, params), y)
+        covariance = covariance / forgetting_factor
+        cov_x = covariance.dot(x)
+        covariance = covariance - curvature * jnp.outer(cov_x, cov_x) / (
+            1.0 + curvature * jnp.dot(x, cov_x)
+        )
+        # symmetrize to prevent the round-off errors from accumulating
+        covariance = 0.5 * (covariance + covariance.T)
+        params = params - covariance.dot(x) * grad
+        return params, covariance
+
+    def _update(
+        self,
+        params: jnp.ndarray,
+        covariance: jnp.ndarray,
+        X: jnp.ndarray,
+        y: jnp.ndarray,
+        is_valid: jnp.ndarray,
+        mask: jnp.ndarray,
+        forgetting_factor: float,
+    ) -> Tuple[jnp.ndarray, jnp.ndarray, ModelParams]:
+        """Scan the recursive update over the bins, vectorized over the neurons."""
+        neuron_step = jax.vmap(self._neuron_step, in_axes=(0, 0, None, 0, 0, None))
+
+        def step(carry, bin_data):
+            x, y, valid = bin_data
+            # invalid bins leave the state untouched
+            x, y = jnp.where(valid, x, 0.0), jnp.where(valid, y, 0.0)
+            new_carry = neuron_step(*carry, x, y, mask, forgetting_factor)
+            return (
+                jax.tree_util.tree_map(
+                    lambda new, old: jnp.where(valid, new, old), new_carry, carry
+                ),
+                None,
+            )
+
+        (params, covariance), _ = jax.lax.scan(
+            step, (params, covariance), (X, y, is_valid)
+        )
+        return params, covariance, self._to_model_params(params)
+
+    def _information(
+        self, params: jnp.ndarray, X: jnp.ndarray, y: jnp.ndarray
+    ) -> jnp.ndarray:
+        """Fisher information of each neuron accumulated over a batch of bins."""
+        X_masked = X[None] * self._mask[:, None]
+        eta = jnp.einsum("nti,ni->tn", X_masked, params)
+        _, curvature = jax.vmap(jax.vmap(self._neuron_derivatives))(eta, y)
+        return jnp.einsum("tn,nti,ntj->nij", curvature, X_masked, X_masked)
+
+    def initialize(
+        self,
+        X: ArrayLike,
+        y: ArrayLike,
+        init_params: Optional[ModelParams] = None,
+    ) -> OnlineGLM:
+        """
+        Warm-start the online learner on an initial batch of bins.
+
+        The model is fit to the initial batch with its own solver and regularizer, then the
+        Fisher information of the batch initializes the running covariance. Fitting the
+        model is skipped if ``init_params`` is provided.
+
+        Parameters
+        ----------
+        X :
+            Predictors of the initial bins, shape ``(n_time_bins, n_features)``.
+        y :
+            Neural activity of the initial bins, shape ``(n_time_bins,)`` for a GLM or
+            ``(n_time_bins, n_neurons)`` for a PopulationGLM.
+        init_params :
+            Optional ``(coef, intercept)`` to start from instead of fitting the model.
+
+        Returns
+        -------
+        :
+            The initialized learner.
+
+        Raises
+        ------
+        TypeError
+            If ``X`` is a FeaturePytree.
+        ValueError
+            If the inputs or the parameters have inconsistent shapes.
+        """
+        if isinstance(X, (FeaturePytree, dict)):
+            raise TypeError(
+                "OnlineGLM requires the predictors to be a 2-dimensional array. "
+                "FeaturePytree inputs are not supported."
+            )
+        if init_params is None:
+            self.model.fit(X, y)
+        else:
+            init_params = self.model.initialize_params(X, y, init_params=init_params)
+            if self._is_population():
+                self.model._initialize_feature_mask(X, y)
+            self.model._set_coef_and_intercept(init_params)
+        params = self._to_internal_params(
+            (self.model.coef_, jnp.atleast_1d(self.model.intercept_))
+        )
+
+        X, y, is_valid = self._prepare_inputs(X, y)
+        X, y = X[is_valid], y[is_valid]
+        n_neurons = y.shape[1]
+        if self._is_population():
+            mask = jnp.asarray(self.model.feature_mask, dtype=float).T
+        else:
+            mask = jnp.ones((n_neurons, X.shape[1] - 1))
+        self._mask = jnp.concatenate([mask, jnp.ones((n_neurons, 1))], axis=1)
+
+        information = self._information(params, X, y)
+        eye = jnp.eye(X.shape[1])
+        self._covariance = jnp.linalg.inv(information + self.prior_precision * eye)
+        self._params = params
+        self.n_bins_ = X.shape[0]
+        self._update_time = 0.0
+        self._n_updated_bins = 0
+
+        # compile the single-bin update, the typical closed-loop use; the forgetting factor
+        # is an argument, so that it can be changed without recompiling
+        self._update_fn = jax.jit(self._update)
+        self._update_fn(
+            params,
+            self._covariance,
+            X[:1],
+            y[:1],
+            is_valid[:1],
+            self._mask,
+            self.forgetting_factor,
+        )
+        return self
+
+    def partial_fit(self, X: ArrayLike, y: ArrayLike) -> OnlineGLM:
+        """
+        Update the parameters with newly acquired time bins.
+
+        Bins containing NaNs or Infs are skipped. Splitting the bins across calls does not
+        affect the result.
+
+        Parameters
+        ----------
+        X :
+            Predictors of the new bins, shape ``(n_time_bins, n_features)``.
+        y :
+            Neural activity of the new bins, shape ``(n_time_bins,)`` for a GLM or
+            ``(n_time_bins, n_neurons)`` for a PopulationGLM.
+
+        Returns
+        -------
+        :
+            The updated learner.
+
+        Raises
+        ------
+        ValueError
+            If the learner was not initialized, or if the inputs have inconsistent shapes.
+        TypeError
+            If ``X`` is a FeaturePytree.
+        """
+        if self._update_fn is None:
+            raise ValueError(
+                "The online learner must be initialized with `initialize` before calling `partial_fit`."
+            )
+        start = time.perf_counter()
+        X, y, is_valid = self._prepare_inputs(X, y)
+        if X.shape[1] != self._params.shape[1] or y.shape[1] != self._params.shape[0]:
+            raise ValueError(
+                f"The model was initialized with {self._params.shape[1] - 1} features and "
+                f"{self._params.shape[0]} neurons, but the inputs have {X.shape[1] - 1} features "
+                f"and {y.shape[1]} neurons."
+            )
+        if X.shape[0] > 0:
+            params, covariance, model_params = self._update_fn(
+                self._params,
+                self._covariance,
+                X,
+                y,
+                is_valid,
+                self._mask,
+                self.forgetting_factor,
+            )
+            params.block_until_ready()
+            self._params, self._covariance = params, covariance
+            self.model._set_coef_and_intercept(model_params)
+        self._update_time += time.perf_counter() - start
+        self._n_updated_bins += X.shape[0]
+        self.n_bins_ += int(is_valid.sum())
+        return self
+
+    def predict(self, X: ArrayLike) -> jnp.ndarray:
+        """
+        Predict rates with the current parameters.
+
+        Parameters
+        ----------
+        X :
+            Predictors, shape ``(n_time_bins, n_features)``.
+
+        Returns
+        -------
+        :
+            The predicted rates.
+        """
+        return self.model.predict(X)
+
+    def __repr__(self):
+        return format_repr(self)
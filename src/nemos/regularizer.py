@@ -114,6 +114,10 @@ class UnRegularized(Regularizer):
         "ProximalGradient",
         "SVRG",
         "ProxSVRG",
+        "GramNewton",
+        "IRLS",
+        "SGD",
+        "Adam",
     )
 
     _default_solver = "GradientDescent"
@@ -160,6 +164,10 @@ class Ridge(Regularizer):
         "ProximalGradient",
         "SVRG",
         "ProxSVRG",
+        "GramNewton",
+        "IRLS",
+        "SGD",
+        "Adam",
     )
 
     _default_solver = "GradientDescent"
@@ -2,15 +2,15 @@
 
 from __future__ import annotations
 
-from typing import Callable, Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 import jax
 import jax.numpy as jnp
 import numpy as np
 import scipy.stats as sts
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 
-from . import convolve, validation
+from . import validation
 from .pytrees import FeaturePytree
 
 
@@ -214,8 +214,9 @@ def simulate_recurrent(
     coupling_basis_matrix: Union[NDArray, jnp.ndarray],
     init_y: Union[NDArray, jnp.ndarray],
     inverse_link_function: Callable = jax.nn.softplus,
+    decay_rates: Optional[ArrayLike] = None,
 ):
-    """
+    r"""
     Simulate neural activity using the GLM as a recurrent network.
 
     This function projects neural activity into the future, employing the fitted
@@ -247,6 +248,12 @@ def simulate_recurrent(
         and auto-correlations. Expected shape: ``(window_size, n_basis_coupling)``.
     inverse_link_function :
         The inverse link function for the observation model.
+    decay_rates :
+        Decay rates of an exponential basis, e.g. the ``decay_rates`` of
+        :class:`nemos.basis.OrthExponentialConv`. If provided, ``coupling_basis_matrix``
+        must be a linear combination of the decaying exponentials ``exp(-decay_rates * x)``,
+        with ``x`` spanning the window from 0 (the most recent sample) to 1, and the
+        coupling is computed by a recursive filter, see Notes.
 
     Returns
     -------
@@ -262,6 +269,20 @@ def simulate_recurrent(
         If there's an inconsistency between the number of neurons in model parameters.
     ValueError
         If the number of neurons in input arguments doesn't match with model parameters.
+    ValueError
+        If ``coupling_basis_matrix`` is not a combination of exponentials with ``decay_rates``.
+
+    Notes
+    -----
+    The activity history is stored in a ring buffer of ``window_size`` samples, in which
+    each new sample overwrites the oldest one. Each time step projects the buffer on the
+    coupling basis, with a cost of ``window_size * n_neurons * n_basis_coupling``.
+
+    With ``decay_rates``, each neuron's history is summarized by its filtered state
+    :math:`s_k(t) = \sum_{l=0}^{W-1} \lambda_k^l y(t - l)`, with :math:`\lambda_k` the
+    per-sample decay of the k-th exponential. The state is updated recursively as
+    :math:`s_k(t) = \lambda_k s_k(t-1) + y(t) - \lambda_k^W y(t-W)`, which costs
+    ``n_neurons * len(decay_rates)`` operations per time step regardless of the window size.
 
     Examples
     --------
@@ -293,6 +314,222 @@ def simulate_recurrent(
     >>> _ = plt.legend()
     >>> _ = plt.title("Simulated firing rates")
     >>> _ = plt.show()
+
+    With an exponential coupling basis, the coupling is filtered recursively.
+
+    >>> from nemos.basis import OrthExponentialConv
+    >>> decay_rates = np.array([1.0, 3.0, 10.0])
+    >>> basis = OrthExponentialConv(3, coupling_duration, decay_rates=decay_rates)
+    >>> coupling_coef = 0.1 * np.random.normal(size=(n_neurons, n_neurons, 3))
+    >>> spikes, rates = simulate_recurrent(
+    ...     coupling_coef=coupling_coef,
+    ...     feedforward_coef=np.ones((n_neurons, 1)),
+    ...     intercepts=intercept,
+    ...     random_key=random_key,
+    ...     feedforward_input=feedforward_input,
+    ...     coupling_basis_matrix=basis.evaluate_on_grid(coupling_duration)[1],
+    ...     init_y=init_spikes,
+    ...     decay_rates=decay_rates,
+    ... )
+    >>> spikes.shape
+    (1000, 2)
+    """
+    (
+        coupling_coef,
+        feedforward_coef,
+        intercepts,
+        feedforward_input,
+        coupling_basis_matrix,
+        init_y,
+    ) = _check_recurrent_inputs(
+        coupling_coef,
+        feedforward_coef,
+        intercepts,
+        feedforward_input,
+        coupling_basis_matrix,
+        init_y,
+    )
+    validation.error_invalid_entry(feedforward_input)
+
+    subkeys = jax.random.split(random_key, num=feedforward_input.shape[0])
+    # (n_samples, n_neurons)
+    feed_forward_contrib = jnp.einsum("ik,tik->ti", feedforward_coef, feedforward_input)
+
+    scan_fn, init_carry = _get_recurrent_step(
+        coupling_coef,
+        intercepts,
+        coupling_basis_matrix,
+        init_y,
+        inverse_link_function,
+        decay_rates,
+    )
+    _, outputs = jax.lax.scan(scan_fn, init_carry, (subkeys, feed_forward_contrib))
+    simulated_activity, firing_rates = outputs
+    return simulated_activity, firing_rates
+
+
+def simulate_recurrent_trials(
+    coupling_coef: NDArray,
+    feedforward_coef: NDArray,
+    intercepts: NDArray,
+    random_key: jax.Array,
+    feedforward_input: Union[NDArray, jnp.ndarray],
+    coupling_basis_matrix: Union[NDArray, jnp.ndarray],
+    init_y: Union[NDArray, jnp.ndarray],
+    inverse_link_function: Callable = jax.nn.softplus,
+    decay_rates: Optional[ArrayLike] = None,
+):
+    """
+    Simulate independent trials of a recurrent network in a single vectorized call.
+
+    Each trial is simulated as in :func:`nemos.simulation.simulate_recurrent`, with its
+    own feedforward input, initial activity and random key. All trials are advanced
+    together at every time step.
+
+    Parameters
+    ----------
+    coupling_coef :
+        Coefficients for the coupling (recurrent connections) between neurons.
+        Expected shape: (n_neurons (receiver), n_neurons (sender), n_basis_coupling).
+    feedforward_coef :
+        Coefficients for the feedforward inputs to each neuron.
+        Expected shape: ``(n_neurons, n_basis_input)``.
+    intercepts :
+        Bias term for each neuron. Expected shape: ``(n_neurons,)``.
+    random_key :
+        jax.random.key for seeding the simulation. It is split into one key per trial.
+    feedforward_input :
+        External input to the model for each trial.
+        Expected shape: ``(n_trials, n_time_bins, n_neurons, n_basis_input)``.
+    coupling_basis_matrix :
+        Basis matrix for coupling, representing between-neuron couplings
+        and auto-correlations. Expected shape: ``(window_size, n_basis_coupling)``.
+    init_y :
+        Initial observation that kickstarts the simulation, either shared by all trials,
+        shape ``(window_size, n_neurons)``, or one per trial,
+        shape ``(n_trials, window_size, n_neurons)``.
+    inverse_link_function :
+        The inverse link function for the observation model.
+    decay_rates :
+        Decay rates of an exponential coupling basis, enabling the recursive filtering of
+        the coupling, see :func:`nemos.simulation.simulate_recurrent`.
+
+    Returns
+    -------
+    simulated_activity :
+        Simulated activity for each trial and neuron over time.
+        Shape, ``(n_trials, n_time_bins, n_neurons)``.
+    firing_rates :
+        Simulated rates for each trial and neuron over time.
+        Shape, ``(n_trials, n_time_bins, n_neurons)``.
+
+    Raises
+    ------
+    ValueError
+        If ``feedforward_input`` is not four-dimensional.
+    ValueError
+        If the number of trials of ``init_y`` and ``feedforward_input`` differ.
+    ValueError
+        If the inputs are inconsistent, see :func:`nemos.simulation.simulate_recurrent`.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import jax
+    >>> from nemos.simulation import simulate_recurrent_trials
+    >>> n_trials, n_neurons, coupling_duration = 20, 3, 50
+    >>> feedforward_input = np.random.normal(size=(n_trials, 500, n_neurons, 1))
+    >>> coupling_basis = np.random.normal(size=(coupling_duration, 4))
+    >>> coupling_coef = 0.1 * np.random.normal(size=(n_neurons, n_neurons, 4))
+    >>> spikes, rates = simulate_recurrent_trials(
+    ...     coupling_coef=coupling_coef,
+    ...     feedforward_coef=np.ones((n_neurons, 1)),
+    ...     intercepts=-2 * np.ones(n_neurons),
+    ...     random_key=jax.random.key(123),
+    ...     feedforward_input=feedforward_input,
+    ...     coupling_basis_matrix=coupling_basis,
+    ...     init_y=np.zeros((coupling_duration, n_neurons)),
+    ... )
+    >>> spikes.shape
+    (20, 500, 3)
+    """
+    feedforward_input = jnp.asarray(feedforward_input, dtype=float)
+    init_y = jnp.asarray(init_y, dtype=float)
+    if feedforward_input.ndim != 4:
+        raise ValueError(
+            "`feedforward_input` must be four-dimensional, with shape "
+            "(n_trials, n_timebins, n_neurons, n_features)."
+        )
+    n_trials = feedforward_input.shape[0]
+    if init_y.ndim == 2:
+        init_y = jnp.broadcast_to(init_y, (n_trials, *init_y.shape))
+    elif init_y.ndim != 3 or init_y.shape[0] != n_trials:
+        raise ValueError(
+            "`init_y` must have shape (window_size, n_neurons) or "
+            f"(n_trials, window_size, n_neurons), with {n_trials} trials. "
+            f"`init_y` has shape {init_y.shape} instead!"
+        )
+
+    (
+        coupling_coef,
+        feedforward_coef,
+        intercepts,
+        _,
+        coupling_basis_matrix,
+        _,
+    ) = _check_recurrent_inputs(
+        coupling_coef,
+        feedforward_coef,
+        intercepts,
+        feedforward_input[0],
+        coupling_basis_matrix,
+        init_y[0],
+    )
+    validation.error_invalid_entry(feedforward_input)
+
+    n_time_bins = feedforward_input.shape[1]
+    subkeys = jax.vmap(lambda key: jax.random.split(key, num=n_time_bins))(
+        jax.random.split(random_key, num=n_trials)
+    )
+    # (n_trials, n_samples, n_neurons)
+    feed_forward_contrib = jnp.einsum(
+        "ik,ntik->nti", feedforward_coef, feedforward_input
+    )
+
+    def simulate_trial(keys, contrib, trial_init_y):
+        scan_fn, init_carry = _get_recurrent_step(
+            coupling_coef,
+            intercepts,
+            coupling_basis_matrix,
+            trial_init_y,
+            inverse_link_function,
+            decay_rates,
+        )
+        _, outputs = jax.lax.scan(scan_fn, init_carry, (keys, contrib))
+        return outputs
+
+    simulated_activity, firing_rates = jax.vmap(simulate_trial)(
+        subkeys, feed_forward_contrib, init_y
+    )
+    return simulated_activity, firing_rates
+
+
+def _check_recurrent_inputs(
+    coupling_coef: NDArray,
+    feedforward_coef: NDArray,
+    intercepts: NDArray,
+    feedforward_input: Union[NDArray, jnp.ndarray],
+    coupling_basis_matrix: Union[NDArray, jnp.ndarray],
+    init_y: Union[NDArray, jnp.ndarray],
+) -> Tuple[jnp.ndarray, ...]:
+    """
+    Convert to float arrays and validate the inputs of a single-trial recurrent simulation.
+
+    Returns
+    -------
+    :
+        The converted ``coupling_coef``, ``feedforward_coef``, ``intercepts``,
+        ``feedforward_input``, ``coupling_basis_matrix`` and ``init_y``.
     """
     if isinstance(feedforward_input, FeaturePytree):
         raise ValueError(
@@ -339,8 +576,6 @@ def simulate_recurrent(
         f"X has {jax.tree_util.tree_map(lambda x: x.shape[2], feedforward_input)} features instead!",
     )
 
-    validation.error_invalid_entry(feedforward_input)
-
     # validate y
     validation.check_tree_leaves_dimensionality(
         init_y,
@@ -348,9 +583,8 @@ def simulate_recurrent(
         err_message="`init_y` must be two-dimensional, with shape (n_timebins, ).",
     )
     n_basis = coupling_coef.shape[-1]
-    coupling_coef = coupling_coef.reshape(n_neurons, -1)
 
-    if coupling_basis_matrix.shape[1] * n_neurons != coupling_coef.shape[1]:
+    if coupling_basis_matrix.shape[1] != n_basis:
         raise ValueError(
             f"Inconsistent number of features. `coupling_basis_matrix` assumes "
             f"{coupling_basis_matrix.shape[1]} basis functions for the coupling filters, "
@@ -365,53 +599,119 @@ def simulate_recurrent(
             f"`coupling_basis_matrix` window size: {coupling_basis_matrix.shape[0]}"
         )
 
-    subkeys = jax.random.split(random_key, num=feedforward_input.shape[0])
-    # (n_samples, n_neurons)
-    feed_forward_contrib = jnp.einsum("ik,tik->ti", feedforward_coef, feedforward_input)
+    return (
+        coupling_coef,
+        feedforward_coef,
+        intercepts,
+        feedforward_input,
+        coupling_basis_matrix,
+        init_y,
+    )
 
-    def scan_fn(
-        data: Tuple[jnp.ndarray, int], key: jax.Array
-    ) -> Tuple[Tuple[jnp.ndarray, int], Tuple[jnp.ndarray, jnp.ndarray]]:
-        """Scan over time steps and simulate activity and rates.
-
-        This function simulates the neural activity and firing rates for each time step
-        based on the previous activity, feedforward input, and model coefficients.
-        """
-        activity, t_sample = data
-
-        # Convolve the neural activity with the coupling basis matrix
-        # Output of shape (1, n_neuron, n_basis_coupling)
-        # 1. The first dimension is time, and 1 is by construction since we are simulating 1
-        #    sample
-        # 2. Flatten to shape (n_neuron * n_basis_coupling, )
-        conv_act = convolve.tensor_convolve(activity, coupling_basis_matrix).reshape(
-            -1,
-        )
 
-        # Extract the slice of the feedforward input for the current time step
-        input_slice = jax.lax.dynamic_slice(
-            feed_forward_contrib,
-            (t_sample, 0),
-            (1, feed_forward_contrib.shape[1]),
-        ).squeeze(axis=0)
+def _get_recurrent_step(
+    coupling_coef: jnp.ndarray,
+    intercepts: jnp.ndarray,
+    coupling_basis_matrix: jnp.ndarray,
+    init_y: jnp.ndarray,
+    inverse_link_function: Callable,
+    decay_rates: Optional[ArrayLike] = None,
+) -> Tuple[Callable, Tuple]:
+    """
+    Build the step function of the recurrent simulation and its initial carry.
+
+    The step function takes the carry and a ``(key, feedforward_contribution)`` pair for
+    the current time step, and returns the updated carry and the ``(activity, rate)``
+    pair. The carry holds the ring buffer of the last ``window_size`` samples, the index
+    of its oldest sample, and, if ``decay_rates`` is provided, the exponentially
+    filtered activity.
+
+    Parameters
+    ----------
+    coupling_coef :
+        Coupling coefficients, shape ``(n_neurons, n_neurons, n_basis_coupling)``.
+    intercepts :
+        Bias term for each neuron, shape ``(n_neurons,)``.
+    coupling_basis_matrix :
+        Coupling basis, shape ``(window_size, n_basis_coupling)``.
+    init_y :
+        Initial activity, shape ``(window_size, n_neurons)``.
+    inverse_link_function :
+        The inverse link function for the observation model.
+    decay_rates :
+        Decay rates of the exponentials spanning the coupling basis. If None, the
+        ring buffer is projected on the basis at each step.
+
+    Returns
+    -------
+    scan_fn :
+        The step function for ``jax.lax.scan``.
+    init_carry :
+        The initial carry.
 
-        # Predict the firing rate using the model coefficients
-        # Doesn't use predict because the non-linearity needs
-        # to be applied after we add the feed forward input
+    Raises
+    ------
+    ValueError
+        If ``coupling_basis_matrix`` is not a combination of exponentials with ``decay_rates``.
+    """
+    window_size = coupling_basis_matrix.shape[0]
+
+    if decay_rates is None:
+        # row r of the ring buffer holds the sample at lag (oldest - 1 - r) % window_size,
+        # where lag 0 is the most recent sample, weighted by coupling_basis_matrix[0]
+        lags = jnp.arange(window_size)
+
+        def scan_fn(carry, inputs):
+            ring, oldest = carry
+            key, feedforward = inputs
+            # (n_basis_coupling, n_neurons)
+            conv_act = coupling_basis_matrix[(oldest - 1 - lags) % window_size].T @ ring
+            firing_rate = inverse_link_function(
+                jnp.einsum("ijb,bj->i", coupling_coef, conv_act)
+                + feedforward
+                + intercepts
+            )
+            new_act = jax.random.poisson(key, firing_rate)
+            # overwrite the oldest sample
+            ring = ring.at[oldest].set(new_act)
+            return (ring, (oldest + 1) % window_size), (new_act, firing_rate)
+
+        return scan_fn, (init_y, 0)
+
+    decay_rates = np.asarray(decay_rates, dtype=float).reshape(-1)
+    # exponentials at the lags, shape (window_size, n_exponentials)
+    exp_basis = np.exp(-np.outer(np.linspace(0, 1, window_size), decay_rates))
+    basis_matrix = np.asarray(coupling_basis_matrix, dtype=float)
+    # coupling_basis_matrix = exp_basis @ projection
+    projection = np.linalg.lstsq(exp_basis, basis_matrix, rcond=None)[0]
+    if not np.allclose(
+        exp_basis @ projection,
+        basis_matrix,
+        atol=1e-4 * np.max(np.abs(basis_matrix)),
+        rtol=0,
+    ):
+        raise ValueError(
+            "`coupling_basis_matrix` is not a linear combination of decaying exponentials "
+            "with the provided `decay_rates`!"
+        )
+    # coupling weights of the filtered activity, shape (n_neurons, n_neurons, n_exponentials)
+    exp_coef = jnp.einsum("ijb,kb->ijk", coupling_coef, jnp.asarray(projection))
+    # decay per sample, and over the full window
+    decay = jnp.asarray(exp_basis[1] if window_size > 1 else exp_basis[0])[:, None]
+    decay_window = decay**window_size
+    # filtered initial activity, shape (n_exponentials, n_neurons)
+    init_state = jnp.asarray(exp_basis).T @ init_y[::-1]
+
+    def scan_fn(carry, inputs):
+        ring, oldest, state = carry
+        key, feedforward = inputs
         firing_rate = inverse_link_function(
-            coupling_coef.dot(conv_act) + input_slice + intercepts
+            jnp.einsum("ijk,kj->i", exp_coef, state) + feedforward + intercepts
         )
-
-        # Simulate activity based on the predicted firing rate
         new_act = jax.random.poisson(key, firing_rate)
+        # add the new sample and remove the one leaving the window
+        state = decay * state - decay_window * ring[oldest] + new_act
+        ring = ring.at[oldest].set(new_act)
+        return (ring, (oldest + 1) % window_size, state), (new_act, firing_rate)
 
-        # Shift of one sample the spike count window
-        # for the next iteration (i.e. remove the first counts, and
-        # stack the newly generated sample)
-        # Increase the t_sample by one
-        carry = jnp.vstack((activity[1:], new_act)), t_sample + 1
-        return carry, (new_act, firing_rate)
-
-    _, outputs = jax.lax.scan(scan_fn, (init_y, 0), subkeys)
-    simulated_activity, firing_rates = outputs
-    return simulated_activity, firing_rates
+    return scan_fn, (init_y, 0, init_state)
@@ -1,3 +1,6 @@
+from ._gram_newton import GramNewton, clear_gram_cache, gram_matrix
+from ._irls import IRLS
+from ._minibatch import SGD, Adam
 from ._svrg import SVRG, ProxSVRG
 from ._svrg_defaults import (
     glm_softplus_poisson_l_max_and_l,
@@ -0,0 +1,435 @@
+"""Gradient solver for GLMs preconditioned by the cached Gram matrix of the design."""
+
+import hashlib
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, NamedTuple, Tuple
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+from jax import jit, lax
+from jax.scipy.linalg import cho_solve
+from jaxopt import OptStep
+
+from ..tree_utils import _to_scipy_csr, design_rmatvec, is_sparse
+from ..typing import Pytree
+
+_GRAM_CACHE_MAXSIZE = 16
+_GRAM_CACHE = OrderedDict()
+
+
+def _fingerprint(X: Pytree) -> Tuple:
+    """Hash the content, shapes and dtypes of a design matrix or of a pytree of them."""
+    leaves = jax.tree_util.tree_leaves(X, is_leaf=is_sparse)
+    digest = hashlib.blake2b(digest_size=32)
+    for leaf in leaves:
+        if is_sparse(leaf):
+            leaf = _to_scipy_csr(leaf)
+            arrays = (leaf.data, leaf.indices, leaf.indptr)
+        else:
+            arrays = (leaf,)
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(str((array.shape, array.dtype.str)).encode())
+            digest.update(array.data)
+    return jax.tree_util.tree_structure(X, is_leaf=is_sparse), digest.hexdigest()
+
+
+def _sketch(X: Pytree) -> Tuple:
+    """
+    Identify a design matrix, or a pytree of them, by its projection on random vectors.
+
+    The projection is a product of the design by a ``(n_samples, 2)`` matrix, computed on
+    the device of the design, rather than a hash of its content on the host. Distinct
+    designs have the same projection with probability zero, up to the rounding of the
+    product.
+    """
+    leaves = jax.tree_util.tree_leaves(X, is_leaf=is_sparse)
+    projection = jax.random.normal(
+        jax.random.PRNGKey(0), (leaves[0].shape[0], 2), dtype=float
+    )
+    sketch = np.asarray(design_rmatvec(X, projection))
+    return (
+        jax.tree_util.tree_structure(X, is_leaf=is_sparse),
+        tuple((leaf.shape, str(leaf.dtype)) for leaf in leaves),
+        sketch.tobytes(),
+    )
+
+
+def gram_matrix(X: Pytree) -> np.ndarray:
+    """
+    Return the Gram matrix of a GLM design with an intercept column, caching the result.
+
+    The matrix is ``Z.T @ Z / n_samples`` with ``Z = [X, 1]``, computed in float64. Pytree
+    predictors are stacked horizontally in the order of their leaves. The result is cached
+    by the shapes of ``X`` and its product with a fixed random matrix, so that fits sharing
+    the same design, e.g. with different targets, compute it once, and the cache is looked up
+    with a single product by the design instead of hashing it. Call :func:`clear_gram_cache`
+    to release the memory.
+
+    Parameters
+    ----------
+    X :
+        Predictors, array of shape ``(n_samples, n_features)``, sparse array, or pytree of them.
+
+    Returns
+    -------
+    :
+        The Gram matrix, shape ``(n_features + 1, n_features + 1)``.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from nemos.solvers import gram_matrix
+    >>> X = np.random.normal(size=(100, 3))
+    >>> gram_matrix(X).shape
+    (4, 4)
+    """
+    key = _sketch(X)
+    if key in _GRAM_CACHE:
+        _GRAM_CACHE.move_to_end(key)
+        return _GRAM_CACHE[key]
+
+    leaves = jax.tree_util.tree_leaves(X, is_leaf=is_sparse)
+    n_samples = leaves[0].shape[0]
+    blocks = [
+        (
+            _to_scipy_csr(x).astype(np.float64)
+            if is_sparse(x)
+            else np.asarray(x, dtype=np.float64)
+        )
+        for x in leaves
+    ]
+    blocks.append(np.ones((n_samples, 1)))
+    n_cols = [b.shape[1] for b in blocks]
+    edges = np.cumsum([0] + n_cols)
+    gram = np.zeros((edges[-1], edges[-1]))
+    for i, bi in enumerate(blocks):
+        for j, bj in enumerate(blocks[: i + 1]):
+            block = bi.T @ bj
+            block = block.toarray() if hasattr(block, "toarray") else block
+            gram[edges[i] : edges[i + 1], edges[j] : edges[j + 1]] = block
+            gram[edges[j] : edges[j + 1], edges[i] : edges[i + 1]] = block.T
+    gram /= n_samples
+
+    _GRAM_CACHE[key] = gram
+    if len(_GRAM_CACHE) > _GRAM_CACHE_MAXSIZE:
+        _GRAM_CACHE.popitem(last=False)
+    return gram
+
+
+def clear_gram_cache():
+    """
+    Clear the cache of the Gram matrices computed by :func:`gram_matrix`.
+
+    The cache is keyed by the projection of the design on random vectors, so it does not
+    return the matrix of a modified design; clearing it releases the memory of designs that
+    are no longer used.
+    """
+    _GRAM_CACHE.clear()
+
+
+def _stack_glm_params(params: Tuple[Pytree, jnp.ndarray]) -> jnp.ndarray:
+    """Stack the GLM coefficients and intercept in a ``(n_features + 1, n_neurons)`` matrix."""
+    coef, intercept = params
+    n_neurons = intercept.shape[0]
+    blocks = [
+        c.reshape(c.shape[0], -1) * jnp.ones((1, n_neurons), dtype=c.dtype)
+        for c in jax.tree_util.tree_leaves(coef)
+    ]
+    return jnp.vstack(blocks + [intercept.reshape(1, -1)])
+
+
+def _unstack_glm_params(
+    stacked: jnp.ndarray, params: Tuple[Pytree, jnp.ndarray]
+) -> Tuple[Pytree, jnp.ndarray]:
+    """Inverse of ``_stack_glm_params``, with the structure of ``params``."""
+    coef, intercept = params
+    leaves, treedef = jax.tree_util.tree_flatten(coef)
+    edges = np.cumsum([0] + [c.shape[0] for c in leaves])
+    new_leaves = [
+        stacked[edges[i] : edges[i + 1]].reshape(c.shape) for i, c in enumerate(leaves)
+    ]
+    return (
+        jax.tree_util.tree_unflatten(treedef, new_leaves),
+        stacked[-1].reshape(intercept.shape),
+    )
+
+
+def _solve_neurons(cholesky: jnp.ndarray, rhs: jnp.ndarray) -> jnp.ndarray:
+    """Solve the system of each neuron, ``rhs`` has shape ``(n_features + 1, n_neurons)``."""
+    if cholesky.ndim == 2:
+        return cho_solve((cholesky, True), rhs)
+    return jax.vmap(lambda c, r: cho_solve((c, True), r), in_axes=(0, 1), out_axes=1)(
+        cholesky, rhs
+    )
+
+
+def _armijo_backtracking(
+    fun: Callable,
+    params: Tuple[Pytree, jnp.ndarray],
+    direction: jnp.ndarray,
+    value: jnp.ndarray,
+    slope: jnp.ndarray,
+    stepsize: jnp.ndarray,
+    args: tuple,
+    max_backtrack: int,
+    stepsize_decrease: float,
+) -> jnp.ndarray:
+    """
+    Backtracking line-search along ``-direction`` from the stacked GLM parameters.
+
+    The step size is reduced until the objective, averaged over the neurons, satisfies the
+    Armijo condition, or ``max_backtrack`` reductions are performed. ``slope`` is the inner
+    product of the direction and of the gradient of the summed neuron objectives.
+    """
+    stacked = _stack_glm_params(params)
+    n_neurons = params[1].shape[0]
+
+    def candidate_value(t):
+        return fun(_unstack_glm_params(stacked - t * direction, params), *args)
+
+    def not_sufficient_decrease(carry):
+        t, new_value, n_backtrack = carry
+        armijo = new_value <= value - 1e-4 * t * slope / n_neurons
+        return (~armijo | ~jnp.isfinite(new_value)) & (n_backtrack < max_backtrack)
+
+    def backtrack(carry):
+        t, _, n_backtrack = carry
+        t = t * stepsize_decrease
+        return t, candidate_value(t), n_backtrack + 1
+
+    stepsize, _, _ = lax.while_loop(
+        not_sufficient_decrease, backtrack, (stepsize, candidate_value(stepsize), 0)
+    )
+    return stepsize
+
+
+class GramNewtonState(NamedTuple):
+    """
+    Optimizer state for GramNewton.
+
+    Attributes
+    ----------
+    iter_num :
+        Number of iterations performed.
+    error :
+        Norm of the gradient at the current parameters, used to monitor convergence.
+    stepsize :
+        Step size accepted at the last iteration.
+    value :
+        Objective at the current parameters.
+    grad :
+        Gradient at the current parameters, stacked as ``(n_features + 1, n_neurons)``.
+    prev_grad :
+        Gradient at the previous parameters.
+    step :
+        Last parameter update, stacked as the gradient.
+    """
+
+    iter_num: int
+    error: float
+    stepsize: float
+    value: float
+    grad: jnp.ndarray
+    prev_grad: jnp.ndarray
+    step: jnp.ndarray
+
+
+class GramNewton:
+    """
+    Gradient solver for GLMs preconditioned by a fixed, precomputed curvature.
+
+    The Hessian of a GLM negative log-likelihood is ``Z.T @ W @ Z / n_samples``, with ``Z`` the
+    design with an intercept column and ``W`` a diagonal matrix of weights that depend on the
+    parameters. This solver preconditions the gradient with the Gram matrix ``Z.T @ Z / n_samples``
+    (plus the Ridge penalty) instead, which is factorized once, and corrects for the scale of the
+    weights with a Barzilai-Borwein step size and a backtracking line-search. Each iteration solves
+    a ``(n_features + 1)`` system with the cached Cholesky factor, without forming any new
+    ``n_features x n_features`` matrix, but evaluates the objective and its gradient over all the
+    samples: the preconditioner reduces the number of iterations on ill-conditioned designs, not
+    their cost. Only for a least-squares objective is the preconditioner the exact Hessian, and
+    a single step converges.
+
+    The parameters must be a GLM ``(coef, intercept)`` tuple, with ``coef`` of shape
+    ``(n_features,)`` or ``(n_features, n_neurons)``, or a pytree of them.
+
+    Attributes
+    ----------
+    fun :
+        Smooth objective of the form ``fun(params, *args)``, averaged over the samples and the neurons.
+    preconditioner :
+        Lower Cholesky factor of the curvature, of shape ``(n_features + 1, n_features + 1)``, or
+        ``(n_neurons, n_features + 1, n_features + 1)`` for a curvature specific to each neuron.
+        The intercept is the last row and column.
+    maxiter :
+        Maximum number of iterations.
+    tol :
+        Tolerance on the norm of the gradient.
+    max_backtrack :
+        Maximum number of step size reductions of the line-search at each iteration.
+    stepsize_decrease :
+        Factor by which the step size is reduced at each backtracking iteration.
+    max_stepsize :
+        Upper bound of the step size.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import jax.numpy as jnp
+    >>> from nemos.solvers import GramNewton, gram_matrix
+    >>> X = np.random.normal(size=(500, 3))
+    >>> y = np.random.poisson(np.exp(X @ np.array([0.2, -0.1, 0.3])))
+    >>> def loss(params, X, y):
+    ...     rate = jnp.exp(X @ params[0] + params[1])
+    ...     return jnp.mean(rate - y * jnp.log(rate))
+    >>> solver = GramNewton(loss, np.linalg.cholesky(gram_matrix(X)))
+    >>> params, state = solver.run((np.zeros(3), np.zeros(1)), X, y)
+    >>> bool(state.error < solver.tol)
+    True
+    """
+
+    def __init__(
+        self,
+        fun: Callable,
+        preconditioner: jnp.ndarray,
+        maxiter: int = 500,
+        tol: float = 1e-6,
+        max_backtrack: int = 30,
+        stepsize_decrease: float = 0.5,
+        max_stepsize: float = 1e6,
+    ):
+        self.fun = fun
+        self.preconditioner = preconditioner
+        self.maxiter = maxiter
+        self.tol = tol
+        self.max_backtrack = max_backtrack
+        self.stepsize_decrease = stepsize_decrease
+        self.max_stepsize = max_stepsize
+
+    def _value_and_grad(self, params, *args):
+        """Objective and gradient stacked as ``(n_features + 1, n_neurons)``."""
+        value, grad = jax.value_and_grad(self.fun)(params, *args)
+        # the objective averages over the neurons, the curvature is that of a single neuron
+        return value, _stack_glm_params(grad) * params[1].shape[0]
+
+    def init_state(self, init_params: Pytree, *args) -> GramNewtonState:
+        """
+        Initialize the solver state.
+
+        Parameters
+        ----------
+        init_params :
+            The initial ``(coef, intercept)``.
+        args :
+            Positional arguments passed to ``fun``, for GLMs the predictors and the neural activity.
+
+        Returns
+        -------
+        :
+            The initial state.
+        """
+        value, grad = self._value_and_grad(init_params, *args)
+        return GramNewtonState(
+            iter_num=jnp.asarray(0),
+            error=jnp.linalg.norm(grad) / init_params[1].shape[0],
+            stepsize=jnp.asarray(1.0, dtype=grad.dtype),
+            value=value,
+            grad=grad,
+            prev_grad=grad,
+            step=jnp.zeros_like(grad),
+        )
+
+    @partial(jit, static_argnums=(0,))
+    def update(self, params: Pytree, state: GramNewtonState, *args) -> OptStep:
+        """
+        Perform one preconditioned step with a backtracking line-search.
+
+        Parameters
+        ----------
+        params :
+            The current ``(coef, intercept)``.
+        state :
+            The current solver state.
+        args :
+            Positional arguments passed to ``fun``.
+
+        Returns
+        -------
+        :
+            The updated parameters and state.
+        """
+        direction = _solve_neurons(self.preconditioner, state.grad)
+        slope = jnp.sum(direction * state.grad)
+
+        # the step size estimates the inverse scale of the GLM weights, (s' P s) / (s' dg)
+        # since P s = -stepsize * prev_grad, s' P s = -stepsize * s' prev_grad
+        curvature = jnp.sum(state.step * (state.grad - state.prev_grad))
+        step_norm = -state.stepsize * jnp.sum(state.step * state.prev_grad)
+        stepsize = jnp.where(
+            (curvature > 0) & (step_norm > 0),
+            step_norm / jnp.where(curvature > 0, curvature, 1.0),
+            state.stepsize,
+        )
+        stepsize = jnp.clip(stepsize, 1e-12, self.max_stepsize)
+
+        stepsize = _armijo_backtracking(
+            self.fun,
+            params,
+            direction,
+            state.value,
+            slope,
+            stepsize,
+            args,
+            self.max_backtrack,
+            self.stepsize_decrease,
+        )
+
+        stacked = _stack_glm_params(params)
+        new_params = _unstack_glm_params(stacked - stepsize * direction, params)
+        value, grad = self._value_and_grad(new_params, *args)
+        new_state = GramNewtonState(
+            iter_num=state.iter_num + 1,
+            error=jnp.linalg.norm(grad) / params[1].shape[0],
+            stepsize=stepsize,
+            value=value,
+            grad=grad,
+            prev_grad=state.grad,
+            step=-stepsize * direction,
+        )
+        return OptStep(params=new_params, state=new_state)
+
+    def run(self, init_params: Pytree, *args) -> OptStep:
+        """
+        Run the solver until the gradient norm is below ``tol`` or ``maxiter`` is reached.
+
+        Parameters
+        ----------
+        init_params :
+            The initial ``(coef, intercept)``.
+        args :
+            Positional arguments passed to ``fun``, for GLMs the predictors and the neural activity.
+
+        Returns
+        -------
+        :
+            The final parameters and state.
+        """
+        return self._run(init_params, self.init_state(init_params, *args), *args)
+
+    @partial(jit, static_argnums=(0,))
+    def _run(self, init_params: Pytree, init_state: GramNewtonState, *args) -> OptStep:
+        """Loop the updates from an initialized state."""
+
+        def cond_fun(step):
+            _, state = step
+            return (state.iter_num < self.maxiter) & (state.error > self.tol)
+
+        def body_fun(step):
+            params, state = step
+            return self.update(params, state, *args)
+
+        return lax.while_loop(
+            cond_fun, body_fun, OptStep(params=init_params, state=init_state)
+        )
@@ -0,0 +1,233 @@
+"""Newton solver for GLMs with a closed-form Hessian, a.k.a. iteratively re-weighted least squares."""
+
+from functools import partial
+from typing import Callable, NamedTuple
+
+import jax
+import jax.numpy as jnp
+from jax import jit, lax
+from jax.scipy.linalg import cho_solve
+from jaxopt import OptStep
+
+from ..typing import Pytree
+from ._gram_newton import _armijo_backtracking, _stack_glm_params, _unstack_glm_params
+
+
+class IRLSState(NamedTuple):
+    """
+    Optimizer state for IRLS.
+
+    Attributes
+    ----------
+    iter_num :
+        Number of iterations performed.
+    error :
+        Norm of the gradient at the current parameters, used to monitor convergence.
+    stepsize :
+        Step size accepted at the last iteration, 1 for a full Newton step.
+    value :
+        Objective at the current parameters.
+    grad :
+        Gradient at the current parameters, stacked as ``(n_features + 1, n_neurons)``.
+    """
+
+    iter_num: int
+    error: float
+    stepsize: float
+    value: float
+    grad: jnp.ndarray
+
+
+class IRLS:
+    """
+    Newton solver for GLMs, with one Cholesky factorization of the Hessian of each neuron.
+
+    The Hessian of a GLM negative log-likelihood is ``Z.T @ W @ Z / n_samples``, with ``Z`` the
+    design with an intercept column and ``W`` a diagonal matrix of weights available in closed form
+    for the canonical links. Each iteration computes the Hessian of every neuron, factorizes it with
+    a batched Cholesky decomposition and takes the Newton step, damped by a backtracking line-search
+    when the full step does not decrease the objective. This is equivalent to iteratively
+    re-weighted least squares, and converges quadratically close to the optimum.
+
+    The parameters must be a GLM ``(coef, intercept)`` tuple, with ``coef`` of shape
+    ``(n_features,)`` or ``(n_features, n_neurons)``, or a pytree of them. GLMs provide the
+    ``hessian`` function when the solver is selected with ``solver_name="IRLS"``.
+
+    Attributes
+    ----------
+    fun :
+        Smooth objective of the form ``fun(params, *args)``, averaged over the samples and the neurons.
+    hessian :
+        Function of the form ``hessian(params, *args)`` returning the Hessian of the objective of each
+        neuron (the summand of the average over the neurons), of shape
+        ``(n_neurons, n_features + 1, n_features + 1)``. The intercept is the last row and column.
+    maxiter :
+        Maximum number of iterations.
+    tol :
+        Tolerance on the norm of the gradient.
+    max_backtrack :
+        Maximum number of step size reductions of the line-search at each iteration.
+    stepsize_decrease :
+        Factor by which the step size is reduced at each backtracking iteration.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import jax.numpy as jnp
+    >>> from nemos.solvers import IRLS
+    >>> X = np.random.normal(size=(500, 3))
+    >>> y = np.random.poisson(np.exp(X @ np.array([0.2, -0.1, 0.3])))
+    >>> def loss(params, X, y):
+    ...     rate = jnp.exp(X @ params[0] + params[1])
+    ...     return jnp.mean(rate - y * jnp.log(rate))
+    >>> def hessian(params, X, y):
+    ...     Z = jnp.hstack((X, jnp.ones((X.shape[0], 1))))
+    ...     rate = jnp.exp(X @ params[0] + params[1])
+    ...     return ((Z * rate[:, None]).T @ Z / X.shape[0])[None]
+    >>> solver = IRLS(loss, hessian)
+    >>> params, state = solver.run((np.zeros(3), np.zeros(1)), X, y)
+    >>> bool(state.error < solver.tol)
+    True
+    """
+
+    def __init__(
+        self,
+        fun: Callable,
+        hessian: Callable,
+        maxiter: int = 100,
+        tol: float = 1e-6,
+        max_backtrack: int = 30,
+        stepsize_decrease: float = 0.5,
+    ):
+        self.fun = fun
+        self.hessian = hessian
+        self.maxiter = maxiter
+        self.tol = tol
+        self.max_backtrack = max_backtrack
+        self.stepsize_decrease = stepsize_decrease
+
+    def _value_and_grad(self, params, *args):
+        """Objective and gradient stacked as ``(n_features + 1, n_neurons)``."""
+        value, grad = jax.value_and_grad(self.fun)(params, *args)
+        # the objective averages over the neurons, the Hessian is that of a single neuron
+        return value, _stack_glm_params(grad) * params[1].shape[0]
+
+    def _newton_direction(self, params, grad, *args) -> jnp.ndarray:
+        """Solve the Newton system of each neuron with a batched Cholesky factorization."""
+        hessian = self.hessian(params, *args)
+        # a jitter relative to the diagonal makes rank deficient designs positive definite
+        eps = jnp.finfo(hessian.dtype).eps
+        scale = jnp.mean(jnp.diagonal(hessian, axis1=-2, axis2=-1), axis=-1)
+        hessian = hessian + jnp.sqrt(eps) * scale[:, None, None] * jnp.eye(
+            hessian.shape[-1], dtype=hessian.dtype
+        )
+        cholesky = jnp.linalg.cholesky(hessian)
+        return jax.vmap(
+            lambda c, g: cho_solve((c, True), g), in_axes=(0, 1), out_axes=1
+        )(cholesky, grad)
+
+    def init_state(self, init_params: Pytree, *args) -> IRLSState:
+        """
+        Initialize the solver state.
+
+        Parameters
+        ----------
+        init_params :
+            The initial ``(coef, intercept)``.
+        args :
+            Positional arguments passed to ``fun`` and ``hessian``, for GLMs the predictors
+            and the neural activity.
+
+        Returns
+        -------
+        :
+            The initial state.
+        """
+        value, grad = self._value_and_grad(init_params, *args)
+        return IRLSState(
+            iter_num=jnp.asarray(0),
+            error=jnp.linalg.norm(grad) / init_params[1].shape[0],
+            stepsize=jnp.asarray(1.0, dtype=grad.dtype),
+            value=value,
+            grad=grad,
+        )
+
+    @partial(jit, static_argnums=(0,))
+    def update(self, params: Pytree, state: IRLSState, *args) -> OptStep:
+        """
+        Perform one damped Newton step.
+
+        Parameters
+        ----------
+        params :
+            The current ``(coef, intercept)``.
+        state :
+            The current solver state.
+        args :
+            Positional arguments passed to ``fun`` and ``hessian``.
+
+        Returns
+        -------
+        :
+            The updated parameters and state.
+        """
+        direction = self._newton_direction(params, state.grad, *args)
+        stepsize = _armijo_backtracking(
+            self.fun,
+            params,
+            direction,
+            state.value,
+            jnp.sum(direction * state.grad),
+            jnp.asarray(1.0, dtype=direction.dtype),
+            args,
+            self.max_backtrack,
+            self.stepsize_decrease,
+        )
+
+        new_params = _unstack_glm_params(
+            _stack_glm_params(params) - stepsize * direction, params
+        )
+        value, grad = self._value_and_grad(new_params, *args)
+        new_state = IRLSState(
+            iter_num=state.iter_num + 1,
+            error=jnp.linalg.norm(grad) / params[1].shape[0],
+            stepsize=stepsize,
+            value=value,
+            grad=grad,
+        )
+        return OptStep(params=new_params, state=new_state)
+
+    def run(self, init_params: Pytree, *args) -> OptStep:
+        """
+        Run the solver until the gradient norm is below ``tol`` or ``maxiter`` is reached.
+
+        Parameters
+        ----------
+        init_params :
+            The initial ``(coef, intercept)``.
+        args :
+            Positional arguments passed to ``fun`` and ``hessian``, for GLMs the predictors
+            and the neural activity.
+
+        Returns
+        -------
+        :
+            The final parameters and state.
+        """
+        return self._run(init_params, self.init_state(init_params, *args), *args)
+
+    @partial(jit, static_argnums=(0,))
+    def _run(self, init_params: Pytree, init_state: IRLSState, *args) -> OptStep:
+        """Loop the updates from an initialized state."""
+
+        def cond_fun(step):
+            _, state = step
+            return (state.iter_num < self.maxiter) & (state.error > self.tol)
+
+        def body_fun(step):
+            params, state = step
+            return self.update(params, state, *args)
+
+        return lax.while_loop(
+            cond_fun, body_fun, OptStep(params=init_params, state=init_state)
+        )
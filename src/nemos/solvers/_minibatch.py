@@ -0,0 +1,391 @@
+"""Mini-batch stochastic gradient solvers running whole epochs on the device."""
+
+from functools import partial
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+from jax import grad, jit, lax, random
+from jaxopt import OptStep
+from jaxopt._src import loop
+
+from ..tree_utils import tree_l2_norm, tree_slice, tree_sub, tree_zeros_like
+from ..typing import KeyArrayLike, Pytree
+
+
+class MinibatchState(NamedTuple):
+    """
+    Optimizer state for the mini-batch solvers.
+
+    Attributes
+    ----------
+    iter_num :
+        Number of epochs run by ``run``, or of steps taken by ``update``.
+    num_steps :
+        Total number of mini-batch steps taken, used for the bias correction of Adam.
+    key :
+        Random key used to shuffle the samples at each epoch.
+    error :
+        Scaled difference (~distance) between the parameters at the start and at the end
+        of the last epoch, used to monitor convergence.
+    stepsize :
+        Step size of the individual gradient steps.
+    first_moment :
+        Running average of the gradients (the velocity for SGD with momentum).
+    second_moment :
+        Running average of the squared gradients, None for SGD.
+    """
+
+    iter_num: int
+    num_steps: int
+    key: KeyArrayLike
+    error: float
+    stepsize: float
+    first_moment: Pytree
+    second_moment: Optional[Pytree] = None
+
+
+class _MinibatchSolver:
+    """
+    Base class for the solvers taking a gradient step per mini-batch.
+
+    Each epoch shuffles the samples on the device, splits them into mini-batches of
+    ``batch_size`` samples, and scans over the mini-batches with ``jax.lax.scan``, so that
+    a whole epoch is a single compiled call. The samples left over by the split are seen
+    in the following epochs, since the permutation changes at every epoch.
+
+    Subclasses implement ``_step``, mapping the mini-batch gradient to a parameter update.
+    """
+
+    def __init__(
+        self,
+        fun: Callable,
+        stepsize: float = 1e-3,
+        batch_size: int = 32,
+        maxiter: int = 100,
+        tol: float = 1e-4,
+        key: Optional[KeyArrayLike] = None,
+    ):
+        self.fun = fun
+        self.stepsize = stepsize
+        self.batch_size = batch_size
+        self.maxiter = maxiter
+        self.tol = tol
+        self.key = key
+        self.loss_gradient = jit(grad(self.fun))
+
+    def init_state(self, init_params: Pytree, *args) -> MinibatchState:
+        """
+        Initialize the solver state.
+
+        Parameters
+        ----------
+        init_params :
+            Pytree containing the initial parameters.
+            For GLMs it's a tuple of (W, b)
+        args:
+            Positional arguments passed to loss function `fun`, unused.
+
+        Returns
+        -------
+        state :
+            Initialized optimizer state
+        """
+        return MinibatchState(
+            iter_num=0,
+            num_steps=0,
+            key=self.key if self.key is not None else random.key(123),
+            error=jnp.inf,
+            stepsize=self.stepsize,
+            first_moment=tree_zeros_like(init_params),
+            second_moment=self._init_second_moment(init_params),
+        )
+
+    def _init_second_moment(self, init_params: Pytree) -> Optional[Pytree]:
+        return None
+
+    def _step(
+        self, params: Pytree, state: MinibatchState, gradient: Pytree
+    ) -> Tuple[Pytree, MinibatchState]:
+        raise NotImplementedError
+
+    @partial(jit, static_argnums=(0,))
+    def update(self, params: Pytree, state: MinibatchState, *args) -> OptStep:
+        """
+        Take a single step on the passed mini-batch and increment `state.iter_num`.
+
+        This gets called by `BaseRegressor._solver_update` (e.g. as called by `GLM.update`);
+        the moment estimates are carried over between calls through the state.
+
+        Parameters
+        ----------
+        params :
+            Parameters at the end of the previous update.
+        state :
+            Optimizer state at the end of the previous update.
+        args:
+            Positional arguments passed to loss function `fun` and its gradient
+            (e.g. `fun(params, *args)`), the mini-batch of input and output data.
+
+        Returns
+        -------
+        OptStep
+            params :
+                Parameters after the step.
+            state :
+                Updated state.
+        """
+        params, state = self._step(params, state, self.loss_gradient(params, *args))
+        return OptStep(params=params, state=state._replace(iter_num=state.iter_num + 1))
+
+    @partial(jit, static_argnums=(0,))
+    def run_epoch(self, params: Pytree, state: MinibatchState, *args) -> OptStep:
+        """
+        Sweep once through the data in shuffled mini-batches.
+
+        The data stays on the device: the mini-batches are gathered from a permutation of the
+        sample indices within a ``jax.lax.scan``.
+
+        Parameters
+        ----------
+        params :
+            Parameters at the start of the epoch.
+        state :
+            Optimizer state at the start of the epoch.
+        args:
+            Positional arguments passed to loss function `fun` and its gradient
+            (e.g. `fun(params, *args)`), most likely input and output data.
+            All of their leaves must have the same sized first dimension.
+
+        Returns
+        -------
+        OptStep
+            params :
+                Parameters at the end of the epoch.
+            state :
+                Updated state, with `state.iter_num` incremented and the error of the epoch.
+
+        Raises
+        ------
+        ValueError
+            If not all arguments in args have the same sized first dimension.
+        """
+        n_points_per_arg = {leaf.shape[0] for leaf in jax.tree.leaves(args)}
+        if not len(n_points_per_arg) == 1:
+            raise ValueError("All arguments must have the same sized first dimension.")
+        n_samples = n_points_per_arg.pop()
+        batch_size = min(self.batch_size, n_samples)
+        n_batches = n_samples // batch_size
+
+        key, subkey = random.split(state.key)
+        batches = random.permutation(subkey, n_samples)[: n_batches * batch_size]
+
+        def body_fun(carry, idx):
+            params, state = carry
+            batch = tree_slice(args, idx)
+            gradient = self.loss_gradient(params, *batch)
+            return self._step(params, state, gradient), None
+
+        (next_params, state), _ = lax.scan(
+            body_fun, (params, state), batches.reshape(n_batches, batch_size)
+        )
+        state = state._replace(
+            iter_num=state.iter_num + 1,
+            key=key,
+            error=self._error(next_params, params, state.stepsize),
+        )
+        return OptStep(params=next_params, state=state)
+
+    @partial(jit, static_argnums=(0,))
+    def run(self, init_params: Pytree, *args) -> OptStep:
+        """
+        Run epochs until convergence or until `maxiter` epochs are reached.
+
+        Called by `BaseRegressor._solver_run` (e.g. as called by `GLM.fit`), and assumes
+        that the arguments are the full data set.
+
+        Parameters
+        ----------
+        init_params :
+            Initial parameters to start from.
+        args:
+            Positional arguments passed to loss function `fun` and its gradient
+            (e.g. `fun(params, *args)`), most likely input and output data.
+
+        Returns
+        -------
+        OptStep
+            final_params :
+                Parameters at the end of the last epoch.
+            final_state :
+                Final optimizer state.
+        """
+
+        def body_fun(step):
+            return self.run_epoch(*step, *args)
+
+        def cond_fun(step):
+            _, state = step
+            return (state.iter_num < self.maxiter) & (state.error >= self.tol)
+
+        return loop.while_loop(
+            cond_fun=cond_fun,
+            body_fun=body_fun,
+            init_val=OptStep(params=init_params, state=self.init_state(init_params)),
+            maxiter=self.maxiter,
+            jit=True,
+        )
+
+    @staticmethod
+    def _error(x, x_prev, stepsize):
+        """Magnitude of the update over an epoch relative to the stepsize."""
+        return tree_l2_norm(tree_sub(x, x_prev)) / stepsize
+
+
+class SGD(_MinibatchSolver):
+    """
+    Mini-batch stochastic gradient descent with (heavy-ball) momentum.
+
+    At each step, the velocity and the parameters are updated as
+
+        velocity = momentum * velocity + gradient
+        params = params - stepsize * velocity
+
+    with ``gradient`` the gradient of ``fun`` on a mini-batch of samples.
+
+    Attributes
+    ----------
+    fun: Callable
+        Smooth function of the form ``fun(x, *args)``.
+    stepsize : float
+        Constant step size to use.
+    batch_size: int
+        Number of samples per mini-batch.
+    maxiter : int
+        Maximum number of epochs to run the optimization for.
+    tol: float
+        Tolerance level for the error when comparing parameters
+        at the end of consecutive epochs to check for convergence.
+    key : jax.random.PRNGkey
+        jax PRNGKey to start with. Used for shuffling the samples.
+    momentum : float
+        Momentum coefficient in [0, 1), 0 corresponds to plain SGD.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> loss_fn = lambda params, X, y: ((X.dot(params) - y)**2).mean()
+    >>> sgd = SGD(loss_fn, stepsize=0.01, batch_size=4)
+    >>> params, state = sgd.run(np.zeros(2), np.ones((10, 2)), np.zeros(10))
+    """
+
+    def __init__(
+        self,
+        fun: Callable,
+        stepsize: float = 1e-3,
+        batch_size: int = 32,
+        maxiter: int = 100,
+        tol: float = 1e-4,
+        key: Optional[KeyArrayLike] = None,
+        momentum: float = 0.9,
+    ):
+        super().__init__(fun, stepsize, batch_size, maxiter, tol, key)
+        self.momentum = momentum
+
+    def _step(self, params, state, gradient):
+        velocity = jax.tree_util.tree_map(
+            lambda v, g: self.momentum * v + g, state.first_moment, gradient
+        )
+        params = jax.tree_util.tree_map(
+            lambda p, v: p - state.stepsize * v, params, velocity
+        )
+        state = state._replace(num_steps=state.num_steps + 1, first_moment=velocity)
+        return params, state
+
+
+class Adam(_MinibatchSolver):
+    """
+    Mini-batch Adam solver [1].
+
+    The gradient of ``fun`` on a mini-batch of samples is rescaled by bias-corrected running
+    averages of the gradients and of the squared gradients.
+
+    Attributes
+    ----------
+    fun: Callable
+        Smooth function of the form ``fun(x, *args)``.
+    stepsize : float
+        Constant step size to use.
+    batch_size: int
+        Number of samples per mini-batch.
+    maxiter : int
+        Maximum number of epochs to run the optimization for.
+    tol: float
+        Tolerance level for the error when comparing parameters
+        at the end of consecutive epochs to check for convergence.
+    key : jax.random.PRNGkey
+        jax PRNGKey to start with. Used for shuffling the samples.
+    b1 : float
+        Decay rate of the running average of the gradients.
+    b2 : float
+        Decay rate of the running average of the squared gradients.
+    eps : float
+        Constant added to the denominator for numerical stability.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> loss_fn = lambda params, X, y: ((X.dot(params) - y)**2).mean()
+    >>> adam = Adam(loss_fn, stepsize=0.01, batch_size=4)
+    >>> params, state = adam.run(np.zeros(2), np.ones((10, 2)), np.zeros(10))
+
+    References
+    ----------
+    [1] [Kingma, Diederik P., and Jimmy Ba. "Adam: A method for stochastic optimization."
+    arXiv preprint arXiv:1412.6980 (2014).](https://arxiv.org/abs/1412.6980)
+    """
+
+    def __init__(
+        self,
+        fun: Callable,
+        stepsize: float = 1e-3,
+        batch_size: int = 32,
+        maxiter: int = 100,
+        tol: float = 1e-4,
+        key: Optional[KeyArrayLike] = None,
+        b1: float = 0.9,
+        b2: float = 0.999,
+        eps: float = 1e-8,
+    ):
+        super().__init__(fun, stepsize, batch_size, maxiter, tol, key)
+        self.b1 = b1
+        self.b2 = b2
+        self.eps = eps
+
+    def _init_second_moment(self, init_params):
+        return tree_zeros_like(init_params)
+
+    def _step(self, params, state, gradient):
+        num_steps = state.num_steps + 1
+        first_moment = jax.tree_util.tree_map(
+            lambda m, g: self.b1 * m + (1 - self.b1) * g, state.first_moment, gradient
+        )
+        second_moment = jax.tree_util.tree_map(
+            lambda v, g: self.b2 * v + (1 - self.b2) * g**2,
+            state.second_moment,
+            gradient,
+        )
+        # bias correction of the moments initialized at zero
+        scale_m = 1 / (1 - self.b1**num_steps)
+        scale_v = 1 / (1 - self.b2**num_steps)
+        params = jax.tree_util.tree_map(
+            lambda p, m, v: p
+            - state.stepsize * scale_m * m / (jnp.sqrt(scale_v * v) + self.eps),
+            params,
+            first_moment,
+            second_moment,
+        )
+        state = state._replace(
+            num_steps=num_steps, first_moment=first_moment, second_moment=second_moment
+        )
+        return params, state
@@ -0,0 +1,337 @@
+"""Solvers that stream the data in chunks instead of holding it in memory."""
+
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import jax
+import jax.numpy as jnp
+from jaxopt import OptStep
+
+from .._chunking import ChunkFactory, iter_valid_chunks, prefetch_to_device
+from ..tree_utils import (
+    design_r_factor,
+    tree_add,
+    tree_add_scalar_mul,
+    tree_l2_norm,
+    tree_sub,
+    tree_sum,
+    tree_zeros_like,
+)
+from ..typing import Pytree
+
+
+class StreamingState(NamedTuple):
+    """
+    Optimizer state for the streaming proximal gradient solver.
+
+    Attributes
+    ----------
+    iter_num :
+        Number of iterations performed.
+    error :
+        Scaled norm of the last parameter update, used to monitor convergence.
+    stepsize :
+        Step size of the last iteration.
+    num_fun_eval :
+        Number of full passes over the data.
+    """
+
+    iter_num: int
+    error: float
+    stepsize: float
+    num_fun_eval: int
+
+
+class ChunkedObjective:
+    """
+    Objective accumulated over the chunks of a data stream.
+
+    The objective is the sample-weighted average of a per-chunk loss plus a penalty
+    evaluated once, so that it matches the loss computed over the full (valid) data
+    while keeping in memory a single chunk at the time.
+
+    Parameters
+    ----------
+    loss :
+        Loss of the form ``loss(params, X, y)``, averaging over the samples of a chunk.
+    chunk_factory :
+        Callable returning an iterator over ``(X_chunk, y_chunk)``.
+    n_samples :
+        Total number of valid samples in the stream.
+    penalty :
+        Optional function of the parameters added to the averaged loss.
+    """
+
+    def __init__(
+        self,
+        loss: Callable,
+        chunk_factory: ChunkFactory,
+        n_samples: int,
+        penalty: Optional[Callable] = None,
+    ):
+        self.chunk_factory = chunk_factory
+        self.n_samples = n_samples
+        self._value = jax.jit(loss)
+        self._value_and_grad = jax.jit(jax.value_and_grad(loss))
+        if penalty is None:
+            self._penalty = None
+            self._penalty_value_and_grad = None
+        else:
+            self._penalty = jax.jit(penalty)
+            self._penalty_value_and_grad = jax.jit(jax.value_and_grad(penalty))
+
+    def value(self, params: Pytree) -> jnp.ndarray:
+        """Evaluate the objective with a single pass over the data."""
+        value = 0.0
+        for X, y in iter_valid_chunks(self.chunk_factory):
+            value += self._value(params, X, y) * (y.shape[0] / self.n_samples)
+        if self._penalty is not None:
+            value += self._penalty(params)
+        return value
+
+    def value_and_grad(self, params: Pytree) -> Tuple[jnp.ndarray, Pytree]:
+        """Evaluate the objective and its gradient with a single pass over the data."""
+        value = 0.0
+        grad = tree_zeros_like(params)
+        for X, y in iter_valid_chunks(self.chunk_factory):
+            weight = y.shape[0] / self.n_samples
+            val, g = self._value_and_grad(params, X, y)
+            value += val * weight
+            grad = tree_add_scalar_mul(grad, weight, g)
+        if self._penalty_value_and_grad is not None:
+            val, g = self._penalty_value_and_grad(params)
+            value += val
+            grad = tree_add(grad, g)
+        return value, grad
+
+
+def streaming_proximal_gradient(
+    objective: ChunkedObjective,
+    init_params: Pytree,
+    prox: Callable,
+    hyperparams_prox=None,
+    maxiter: int = 500,
+    tol: float = 1e-3,
+    stepsize: float = 0.0,
+    maxls: int = 15,
+    decrease_factor: float = 0.5,
+    acceleration: bool = True,
+) -> OptStep:
+    """
+    Run (accelerated) proximal gradient descent over a chunked objective.
+
+    The loop is driven from the host: each iteration accumulates the full gradient
+    over the data chunks and, if ``stepsize <= 0``, performs a backtracking line-search
+    where each trial step costs one pass over the data. The algorithm and its defaults
+    mirror ``jaxopt.ProximalGradient``.
+
+    Parameters
+    ----------
+    objective :
+        The chunked smooth objective.
+    init_params :
+        Initial parameters.
+    prox :
+        Proximal operator of the form ``prox(params, hyperparams_prox, scaling=1.0)``.
+    hyperparams_prox :
+        Hyperparameters of the proximal operator, e.g. the regularizer strength.
+    maxiter :
+        Maximum number of iterations.
+    tol :
+        Tolerance on the scaled norm of the update.
+    stepsize :
+        Fixed step size. If ``stepsize <= 0``, the step size is found by backtracking.
+    maxls :
+        Maximum number of line-search steps per iteration.
+    decrease_factor :
+        Factor by which the step size is decreased during the line-search.
+    acceleration :
+        Whether to use FISTA acceleration.
+
+    Returns
+    -------
+    :
+        The final parameters and a :class:`StreamingState`.
+    """
+    use_linesearch = stepsize <= 0
+    current_stepsize = 1.0 if use_linesearch else stepsize
+    params = init_params
+    velocity = init_params
+    t = 1.0
+    error = jnp.inf
+    num_fun_eval = 0
+    iter_num = 0
+
+    for iter_num in range(1, maxiter + 1):
+        value, grad = objective.value_and_grad(velocity)
+        num_fun_eval += 1
+
+        for _ in range(maxls if use_linesearch else 1):
+            next_params = prox(
+                tree_add_scalar_mul(velocity, -current_stepsize, grad),
+                hyperparams_prox,
+                current_stepsize,
+            )
+            if not use_linesearch:
+                break
+            diff = tree_sub(next_params, velocity)
+            upper_bound = (
+                value
+                + tree_sum(jax.tree_util.tree_map(jnp.vdot, grad, diff))
+                + 0.5 * tree_l2_norm(diff, squared=True) / current_stepsize
+            )
+            num_fun_eval += 1
+            if objective.value(next_params) <= upper_bound:
+                break
+            current_stepsize *= decrease_factor
+
+        error = tree_l2_norm(tree_sub(next_params, velocity)) / current_stepsize
+
+        if acceleration:
+            next_t = 0.5 * (1 + jnp.sqrt(1 + 4 * t**2))
+            velocity = tree_add_scalar_mul(
+                next_params, (t - 1) / next_t, tree_sub(next_params, params)
+            )
+            t = next_t
+        else:
+            velocity = next_params
+        params = next_params
+
+        if error < tol:
+            break
+
+        if use_linesearch:
+            # allow the step size to grow back after a successful step
+            current_stepsize /= decrease_factor
+
+    state = StreamingState(
+        iter_num=iter_num,
+        error=error,
+        stepsize=current_stepsize,
+        num_fun_eval=num_fun_eval,
+    )
+    return OptStep(params=params, state=state)
+
+
+def streaming_svrg(
+    solver,
+    objective: ChunkedObjective,
+    init_params: Pytree,
+    hyperparams_prox=None,
+) -> OptStep:
+    """
+    Run (Prox-)SVRG over a chunked objective.
+
+    The full gradient at each reference point is accumulated over the chunks, then
+    the inner loop of the solver sweeps the chunks one after the other, sampling
+    mini-batches within each chunk.
+
+    Parameters
+    ----------
+    solver :
+        An instance of :class:`nemos.solvers.ProxSVRG` or :class:`nemos.solvers.SVRG`.
+        Its ``fun`` must be the per-chunk smooth objective optimized by ``objective``.
+    objective :
+        The chunked objective, used to compute the full gradient.
+    init_params :
+        Initial parameters.
+    hyperparams_prox :
+        Hyperparameters of the proximal operator, ``None`` for SVRG.
+
+    Returns
+    -------
+    :
+        The final parameters and the final ``SVRGState``.
+    """
+    params = init_params
+    state = solver.init_state(init_params)
+
+    for epoch in range(solver.maxiter):
+        _, full_grad = objective.value_and_grad(params)
+        state = state._replace(
+            reference_point=params, full_grad_at_reference_point=full_grad
+        )
+        prev_reference_point = params
+        for X, y in iter_valid_chunks(objective.chunk_factory):
+            params, state = solver._update_per_random_samples(
+                params, state, hyperparams_prox, X, y
+            )
+
+        state = state._replace(
+            iter_num=epoch + 1,
+            reference_point=params,
+            error=solver._error(params, prev_reference_point, state.stepsize),
+        )
+        if state.error < solver.tol:
+            break
+
+    return OptStep(params=params, state=state)
+
+
+def streaming_minibatch(
+    solver,
+    chunk_factory: ChunkFactory,
+    init_params: Pytree,
+    prefetch: int = 2,
+) -> OptStep:
+    """
+    Run a mini-batch solver (SGD or Adam) over a chunked data stream.
+
+    Each epoch sweeps the chunks one after the other, running a compiled epoch of shuffled
+    mini-batches on each chunk, while the following chunks are transferred to the device.
+
+    Parameters
+    ----------
+    solver :
+        An instance of :class:`nemos.solvers.SGD` or :class:`nemos.solvers.Adam`.
+        Its ``fun`` must be the per-chunk objective, including the penalty.
+    chunk_factory :
+        Callable returning an iterator over ``(X_chunk, y_chunk)``.
+    init_params :
+        Initial parameters.
+    prefetch :
+        Number of chunks held on the device, including the one being processed.
+
+    Returns
+    -------
+    :
+        The final parameters and the final ``MinibatchState``.
+    """
+    params = init_params
+    state = solver.init_state(init_params)
+
+    for epoch in range(solver.maxiter):
+        prev_params = params
+        for X, y in prefetch_to_device(iter_valid_chunks(chunk_factory), prefetch):
+            params, state = solver.run_epoch(params, state, X, y)
+
+        state = state._replace(
+            iter_num=epoch + 1,
+            error=solver._error(params, prev_params, state.stepsize),
+        )
+        if state.error < solver.tol:
+            break
+
+    return OptStep(params=params, state=state)
+
+
+def streaming_r_factor(chunk_factory: ChunkFactory) -> jnp.ndarray:
+    """
+    Accumulate the triangular factor of the QR decomposition of the design over the chunks.
+
+    Parameters
+    ----------
+    chunk_factory :
+        Callable returning an iterator over ``(X_chunk, y_chunk)``.
+
+    Returns
+    -------
+    :
+        The ``(n_features, n_features)`` factor ``R`` of the valid samples, with
+        ``R.T @ R = X.T @ X``. Its singular values are those of the design, so its rank
+        is not underestimated as that of the Gram matrix is for ill-conditioned designs.
+        The columns of pytree predictors are stacked in the order of the leaves.
+    """
+    r_factor = None
+    for X, _ in iter_valid_chunks(chunk_factory):
+        r_factor = design_r_factor(X, r_factor)
+    return r_factor
@@ -8,7 +8,7 @@ import jax
 import jax.numpy as jnp
 from numpy.typing import NDArray
 
-from .. import pytrees
+from .. import tree_utils
 
 
 def _convert_to_float(func):
@@ -177,10 +177,8 @@ def glm_softplus_poisson_l_max_and_l(
     # takes care of population glm (see bound found on overleaf)
     y = jnp.max(y, axis=tuple(range(1, y.ndim)))
 
-    # concatenate all data (if X is FeaturePytree)
-    if isinstance(X, (pytrees.FeaturePytree, dict)):
-        X = jnp.hstack(jax.tree_util.tree_leaves(X))
-
+    # pytree predictors (e.g. FeaturePytree) are multiplied leaf by leaf, without
+    # concatenating them
     l_smooth = _glm_softplus_poisson_l_smooth(
         X, y, n_power_iters=n_power_iters, batch_size=batch_size
     )
@@ -201,7 +199,7 @@ def _glm_softplus_poisson_l_smooth_multiply(
     Parameters
     ----------
     X :
-        Input data matrix (N x d).
+        Input data matrix (N x d), or pytree of matrices sharing the first axis.
     y :
         Output data vector (N,).
     v :
@@ -212,11 +210,14 @@ def _glm_softplus_poisson_l_smooth_multiply(
     :
         Result of the multiplication (X.T @ D @ X) @ v.
     """
-    N, K = X.shape
+    N, K = y.shape[0], tree_utils.design_n_features(X)
     out = jnp.zeros((K,))
     for i in range(0, N, batch_size):
-        xb, yb = X[i : i + batch_size], y[i : i + batch_size]
-        out = out + xb.T.dot((0.17 * yb + 0.25) * xb.dot(v))
+        xb = tree_utils.tree_slice(X, slice(i, i + batch_size))
+        yb = y[i : i + batch_size]
+        out = out + tree_utils.design_rmatvec(
+            xb, (0.17 * yb + 0.25) * tree_utils.design_matvec(xb, v)
+        )
     out = out / N
     return out
 
@@ -234,7 +235,7 @@ def _glm_softplus_poisson_l_smooth_with_power_iteration(
     Parameters
     ----------
     X :
-        Input data matrix (N x d).
+        Input data matrix (N x d), or pytree of matrices sharing the first axis.
     y :
         Output data vector (N,).
     n_power_iters :
@@ -249,9 +250,9 @@ def _glm_softplus_poisson_l_smooth_with_power_iteration(
     """
 
     if batch_size is None:
-        batch_size = X.shape[0]
+        batch_size = y.shape[0]
 
-    _, d = X.shape
+    d = tree_utils.design_n_features(X)
 
     # Initialize a random d-dimensional vector for power iteration
     v = jnp.ones((d,))
@@ -283,7 +284,7 @@ def _glm_softplus_poisson_l_smooth(
     Parameters
     ----------
     X :
-        Input data matrix (N x d).
+        Input data matrix (N x d), or pytree of matrices sharing the first axis.
     y :
         Output data vector (N,).
     batch_size :
@@ -318,7 +319,7 @@ def _glm_softplus_poisson_l_smooth(
                 UserWarning,
             )
             # Calculate the Hessian directly and find the largest eigenvalue
-            XDX = X.T.dot((0.17 * y.reshape(y.shape[0], 1) + 0.25) * X) / y.shape[0]
+            XDX = tree_utils.design_gram(X, 0.17 * y + 0.25) / y.shape[0]
             return jnp.sort(jnp.linalg.eigvalsh(XDX))[-1]
         except RuntimeError as e:
             raise RuntimeError(
@@ -346,7 +347,7 @@ def _glm_softplus_poisson_l_smooth_max(
     Parameters
     ----------
     X :
-        Input data matrix (N x d).
+        Input data matrix (N x d), or pytree of matrices sharing the first axis.
     y :
         Output data vector (N,).
     batch_size:
@@ -357,14 +358,17 @@ def _glm_softplus_poisson_l_smooth_max(
     l_max :
         Maximum smoothness constant `L_max`.
     """
-    N, _ = X.shape
+    N = y.shape[0]
 
     l_max = jnp.array([0])
     for nb in range(0, N, batch_size):
-        xb, yb = X[nb : nb + batch_size], y[nb : nb + batch_size]
-        l_max = jnp.maximum(
-            l_max, jnp.max(jnp.linalg.norm(xb, axis=1) ** 2 * (0.17 * yb + 0.25))
+        xb = tree_utils.tree_slice(X, slice(nb, nb + batch_size))
+        yb = y[nb : nb + batch_size]
+        # squared norm of the rows, summed over the leaves of pytree predictors
+        sq_norm = tree_utils.pytree_map_and_reduce(
+            lambda x: jnp.sum(x**2, axis=1), sum, xb
         )
+        l_max = jnp.maximum(l_max, jnp.max(sq_norm * (0.17 * yb + 0.25)))
 
     return l_max[0]
 
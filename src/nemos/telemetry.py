@@ -0,0 +1,413 @@
+"""Instrumentation of the solver iterations of a model fit.
+
+Telemetry is opt-in. Once enabled with :meth:`nemos.glm.GLM.enable_telemetry`, ``fit`` drives the
+solver from Python, one ``solver_update`` at a time, instead of running the compiled optimization
+loop. After each iteration, it records the objective, the error and the wall time of the update,
+and calls the user callbacks. The time that JAX spends tracing and compiling is recorded
+separately from the run time. The records are stored in the ``solver_trace_`` attribute of the
+model as a :class:`SolverTrace`, which can be exported as JSON or as a Chrome trace, viewable in
+``chrome://tracing`` or `Perfetto <https://ui.perfetto.dev>`_.
+
+Evaluating the objective costs one extra pass over the data per iteration, and the Python loop
+adds a dispatch overhead to each iteration. Leave telemetry disabled for production fits that do
+not need it.
+
+Examples
+--------
+>>> import numpy as np
+>>> import nemos as nmo
+>>> X, y = np.random.normal(size=(100, 2)), np.random.poisson(size=100)
+>>> model = nmo.glm.GLM(solver_name="LBFGS").enable_telemetry()
+>>> model = model.fit(X, y)
+>>> trace = model.solver_trace_
+>>> bool(trace.n_iter == model.solver_state_.iter_num)
+True
+>>> trace.stop_reason
+'converged'
+>>> # stop the fit after 5 iterations with a callback
+>>> def stop_early(record, params, state):
+...     return record.iter_num >= 5
+>>> model = nmo.glm.GLM(solver_kwargs=dict(tol=1e-12)).enable_telemetry(stop_early)
+>>> model = model.fit(X, y)
+>>> model.solver_trace_.n_iter, model.solver_trace_.stop_reason
+(5, 'callback')
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import weakref
+from typing import Any, Callable, List, NamedTuple, Optional
+
+import jax
+import numpy as np
+
+__all__ = ["IterationRecord", "SolverTrace"]
+
+# durations recorded by JAX while tracing, lowering and compiling a function
+_COMPILE_EVENTS = (
+    "/jax/core/compile/jaxpr_trace_duration",
+    "/jax/core/compile/jaxpr_to_mlir_module_duration",
+    "/jax/core/compile/backend_compile_duration",
+)
+
+# traces currently recording, the compile events are attributed to all of them
+_ACTIVE_TRACES: List[SolverTrace] = []
+_LISTENER_REGISTERED = False
+
+# jitted losses, the losses of the compilation cache are re-used across fits
+_JITTED_LOSSES = weakref.WeakKeyDictionary()
+
+
+class IterationRecord(NamedTuple):
+    """
+    Record of a solver iteration.
+
+    Attributes
+    ----------
+    iter_num :
+        Number of iterations performed, starting at 1.
+    objective :
+        The objective at the updated parameters, i.e. the loss plus the penalty of the regularizer.
+    error :
+        The error of the solver state, compared to the tolerance to stop the iterations.
+    stepsize :
+        The step size of the solver state, or None if the solver does not store it.
+    start :
+        Seconds from the start of the fit to the start of the iteration.
+    duration :
+        Wall time of the update in seconds, including the compilation at the first iteration.
+    """
+
+    iter_num: int
+    objective: float
+    error: float
+    stepsize: Optional[float]
+    start: float
+    duration: float
+
+
+class SolverTrace:
+    """
+    Telemetry of a model fit.
+
+    Parameters
+    ----------
+    solver_name :
+        The name of the solver.
+
+    Attributes
+    ----------
+    solver_name :
+        The name of the solver.
+    iterations :
+        The record of each iteration.
+    init_time :
+        Wall time of the initialization of the solver state in seconds.
+    total_time :
+        Wall time of the fit in seconds, from the initialization of the solver state to
+        the last iteration.
+    compile_events :
+        The ``(name, start, duration)`` of each compilation step, in seconds from the start
+        of the fit. Tracing a function also traces the functions it calls, so that the
+        events may overlap.
+    stop_reason :
+        Why the iterations stopped: ``"converged"`` if the error is below the tolerance,
+        ``"maxiter"`` if the maximum number of iterations is reached, or ``"callback"`` if a
+        callback stopped the fit.
+    """
+
+    def __init__(self, solver_name: str):
+        self.solver_name = solver_name
+        self.iterations: List[IterationRecord] = []
+        self.init_time = 0.0
+        self.total_time = 0.0
+        self.compile_events = []
+        self.stop_reason = None
+        self._t0 = None
+
+    def __repr__(self):
+        return (
+            f"SolverTrace(solver_name={self.solver_name!r}, n_iter={self.n_iter}, "
+            f"stop_reason={self.stop_reason!r}, total_time={self.total_time:.3g}s, "
+            f"compile_time={self.compile_time:.3g}s)"
+        )
+
+    @property
+    def n_iter(self) -> int:
+        """Number of iterations performed."""
+        return len(self.iterations)
+
+    @property
+    def compile_time(self) -> float:
+        """Seconds spent by JAX tracing and compiling during the fit."""
+        # length of the union of the, possibly nested, compilation intervals
+        total, end = 0.0, -np.inf
+        for _, start, duration in sorted(self.compile_events, key=lambda e: e[1]):
+            total += max(start + duration - max(start, end), 0.0)
+            end = max(end, start + duration)
+        return total
+
+    @property
+    def run_time(self) -> float:
+        """Wall time of the fit in seconds, excluding the compilation."""
+        return self.total_time - self.compile_time
+
+    @property
+    def objective(self) -> np.ndarray:
+        """The objective after each iteration, shape ``(n_iter,)``."""
+        return np.array([rec.objective for rec in self.iterations])
+
+    @property
+    def error(self) -> np.ndarray:
+        """The error after each iteration, shape ``(n_iter,)``."""
+        return np.array([rec.error for rec in self.iterations])
+
+    @property
+    def step_time(self) -> np.ndarray:
+        """The wall time of each iteration in seconds, shape ``(n_iter,)``."""
+        return np.array([rec.duration for rec in self.iterations])
+
+    def _now(self) -> float:
+        """Seconds from the start of the fit."""
+        return time.perf_counter() - self._t0
+
+    def _record_compile_event(self, event: str, duration: float):
+        """Attribute a JAX compilation step to the fit."""
+        name = event.rsplit("/", 1)[-1].removesuffix("_duration")
+        self.compile_events.append((name, self._now() - duration, duration))
+
+    def to_dict(self) -> dict:
+        """
+        Convert the trace to a dictionary of python scalars and lists.
+
+        Returns
+        -------
+        :
+            The attributes of the trace, with the iterations as a list of dictionaries.
+        """
+        return dict(
+            solver_name=self.solver_name,
+            n_iter=self.n_iter,
+            stop_reason=self.stop_reason,
+            init_time=self.init_time,
+            total_time=self.total_time,
+            compile_time=self.compile_time,
+            run_time=self.run_time,
+            compile_events=[
+                dict(name=name, start=start, duration=duration)
+                for name, start, duration in self.compile_events
+            ],
+            iterations=[rec._asdict() for rec in self.iterations],
+        )
+
+    def to_json(self, path: Optional[str] = None, **kwargs) -> str:
+        """
+        Export the trace as JSON.
+
+        Parameters
+        ----------
+        path :
+            If provided, the JSON is also written to this file.
+        kwargs :
+            Keyword arguments of ``json.dumps``, e.g. ``indent``.
+
+        Returns
+        -------
+        :
+            The JSON string of :meth:`to_dict`.
+        """
+        out = json.dumps(self.to_dict(), **kwargs)
+        if path is not None:
+            with open(path, "w") as fh:
+                fh.write(out)
+        return out
+
+    def to_chrome_trace(self, path: Optional[str] = None) -> dict:
+        """
+        Export the trace in the Chrome trace event format.
+
+        The initialization, the compilation steps and the iterations are exported as duration
+        events, the objective and the error as counters. Load the file in ``chrome://tracing``
+        or in Perfetto to visualize the fit.
+
+        Parameters
+        ----------
+        path :
+            If provided, the trace is written to this file as JSON.
+
+        Returns
+        -------
+        :
+            The trace, a dictionary with the list of ``"traceEvents"``.
+        """
+
+        def event(name, start, duration, tid, args=None):
+            # timestamps are in microseconds
+            return dict(
+                name=name,
+                cat=self.solver_name,
+                ph="X",
+                ts=start * 1e6,
+                dur=duration * 1e6,
+                pid=0,
+                tid=tid,
+                args=args or {},
+            )
+
+        events = [event("init_state", 0.0, self.init_time, 0)]
+        events += [
+            event(name, start, duration, 1)
+            for name, start, duration in self.compile_events
+        ]
+        for rec in self.iterations:
+            events.append(
+                event(
+                    f"iteration {rec.iter_num}",
+                    rec.start,
+                    rec.duration,
+                    0,
+                    rec._asdict(),
+                )
+            )
+            for name in ("objective", "error"):
+                events.append(
+                    dict(
+                        name=name,
+                        ph="C",
+                        ts=(rec.start + rec.duration) * 1e6,
+                        pid=0,
+                        args={name: getattr(rec, name)},
+                    )
+                )
+        trace = dict(traceEvents=events, displayTimeUnit="ms")
+        if path is not None:
+            with open(path, "w") as fh:
+                json.dump(trace, fh)
+        return trace
+
+
+def _compile_listener(event: str, duration: float, **kwargs):
+    """Attribute the compilation steps recorded by JAX to the active traces."""
+    if event in _COMPILE_EVENTS:
+        for trace in _ACTIVE_TRACES:
+            trace._record_compile_event(event, duration)
+
+
+def _register_listener():
+    """Register the compilation listener once, JAX does not allow to unregister it."""
+    global _LISTENER_REGISTERED
+    if not _LISTENER_REGISTERED:
+        jax.monitoring.register_event_duration_secs_listener(_compile_listener)
+        _LISTENER_REGISTERED = True
+
+
+def _to_float(x: Any) -> Optional[float]:
+    """Convert a scalar array to float, None stays None."""
+    return None if x is None else float(np.asarray(x))
+
+
+def _jit_loss(loss: Callable) -> Callable:
+    """Jit a loss, re-using the compiled function across fits when possible."""
+    try:
+        return _JITTED_LOSSES.setdefault(loss, jax.jit(loss))
+    except TypeError:
+        # the loss cannot be weakly referenced
+        return jax.jit(loss)
+
+
+def run_with_telemetry(
+    solver_init_state: Callable,
+    solver_update: Callable,
+    loss: Callable,
+    init_params: Any,
+    *args,
+    solver_name: str,
+    maxiter: int,
+    tol: float,
+    penalty: Optional[Callable] = None,
+    callbacks: tuple = (),
+) -> tuple:
+    """
+    Run a solver from Python, recording each iteration.
+
+    Iterates ``solver_update`` while the number of iterations is below ``maxiter`` and the error
+    of the state is above ``tol``, as the compiled ``run`` of the solvers does.
+
+    Parameters
+    ----------
+    solver_init_state :
+        Function initializing the solver state, ``solver_init_state(init_params, *args)``.
+    solver_update :
+        Function performing one iteration, ``solver_update(params, state, *args)``.
+    loss :
+        The loss optimized by the solver, ``loss(params, *args)``.
+    init_params :
+        The initial parameters.
+    args :
+        The data passed to the solver functions.
+    solver_name :
+        The name of the solver, stored in the trace.
+    maxiter :
+        Maximum number of iterations.
+    tol :
+        Tolerance on the error of the solver state.
+    penalty :
+        The penalty of the regularizer, ``penalty(params)``, added to the loss to compute the
+        objective when the solver handles the regularizer with a proximal operator.
+    callbacks :
+        Functions called after each iteration as ``callback(record, params, state)``, with
+        ``record`` an :class:`IterationRecord`. If a callback returns True, the iterations stop.
+
+    Returns
+    -------
+    params :
+        The final parameters.
+    state :
+        The final solver state.
+    trace :
+        The telemetry of the run.
+    """
+    _register_listener()
+    trace = SolverTrace(solver_name)
+    trace._t0 = time.perf_counter()
+    loss = _jit_loss(loss)
+
+    def objective(params):
+        value = loss(params, *args)
+        return value if penalty is None else value + penalty(params)
+
+    _ACTIVE_TRACES.append(trace)
+    try:
+        params = init_params
+        state = jax.block_until_ready(solver_init_state(params, *args))
+        trace.init_time = trace._now()
+        trace.stop_reason = "maxiter"
+        while int(state.iter_num) < maxiter:
+            if float(state.error) <= tol:
+                trace.stop_reason = "converged"
+                break
+            start = trace._now()
+            params, state = jax.block_until_ready(solver_update(params, state, *args))
+            record = IterationRecord(
+                iter_num=int(state.iter_num),
+                objective=_to_float(objective(params)),
+                error=_to_float(state.error),
+                stepsize=_to_float(getattr(state, "stepsize", None)),
+                start=start,
+                duration=trace._now() - start,
+            )
+            trace.iterations.append(record)
+            # evaluate all the callbacks before stopping
+            stop = [callback(record, params, state) for callback in callbacks]
+            if any(stop):
+                trace.stop_reason = "callback"
+                break
+        else:
+            if float(state.error) <= tol:
+                trace.stop_reason = "converged"
+        trace.total_time = trace._now()
+    finally:
+        _ACTIVE_TRACES.remove(trace)
+    return params, state, trace
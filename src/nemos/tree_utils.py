@@ -6,6 +6,95 @@ from typing import Any, Callable, Optional
 
 import jax
 import jax.numpy as jnp
+import numpy as np
+import scipy.sparse
+from jax.experimental import sparse
+
+
+def is_sparse(x: Any) -> bool:
+    """
+    Check if an object is a JAX sparse array.
+
+    Sparse arrays are registered as pytrees by JAX, the utilities in this module
+    treat them as leaves instead. Lazy design matrices, which compute their products
+    on the fly, are sparse arrays as well.
+
+    Parameters
+    ----------
+    x :
+        The object to check.
+
+    Returns
+    -------
+    :
+        True if ``x`` is a sparse array (e.g. a ``jax.experimental.sparse.BCOO`` or a
+        ``nemos.basis.LazyDesignMatrix``).
+    """
+    return isinstance(x, sparse.JAXSparse)
+
+
+def _get_valid_sparse_rows(array: sparse.BCOO) -> jnp.ndarray:
+    """
+    Identify the rows of a 2D sparse array with finite stored values.
+
+    Parameters
+    ----------
+    array :
+        A sparse array of shape (n_samples, n_features).
+
+    Returns
+    -------
+    :
+        A 1D boolean array of length n_samples, True if all the stored values of the
+        row are finite.
+    """
+    if not isinstance(array, sparse.BCOO):
+        # designs computed on the fly, e.g. a lazy design matrix, track their valid rows
+        return array.valid_rows()
+    is_invalid = ~jnp.isfinite(array.data)
+    # padding indices are out-of-bound and dropped by the scatter
+    return (
+        ~jnp.zeros(array.shape[0], dtype=bool)
+        .at[array.indices[:, 0]]
+        .max(is_invalid, mode="drop")
+    )
+
+
+def _to_scipy_csr(array: Any) -> scipy.sparse.csr_array:
+    """Convert a dense, scipy sparse or ``BCOO`` 2D array to a scipy CSR array."""
+    if is_sparse(array):
+        array = array.sum_duplicates()
+        indices = np.asarray(array.indices)
+        return scipy.sparse.csr_array(
+            (np.asarray(array.data), (indices[:, 0], indices[:, 1])),
+            shape=array.shape,
+        )
+    return scipy.sparse.csr_array(array)
+
+
+def _slice_sparse_rows(array: sparse.BCOO, idx) -> sparse.BCOO:
+    """
+    Index the rows of a 2D sparse array.
+
+    Parameters
+    ----------
+    array :
+        A sparse array of shape (n_samples, n_features).
+    idx :
+        A concrete row index: an integer, a slice, or an integer or boolean array.
+
+    Returns
+    -------
+    :
+        The selected rows, as a sparse array.
+    """
+    if not isinstance(array, sparse.BCOO):
+        return array[idx]
+    csr = _to_scipy_csr(array)
+    if not isinstance(idx, slice):
+        idx = np.atleast_1d(np.asarray(idx))
+    rows = np.arange(array.shape[0])[idx]
+    return sparse.BCOO.from_scipy_sparse(csr[rows])
 
 
 def _get_not_inf(array: jnp.ndarray) -> jnp.ndarray:
@@ -72,7 +161,15 @@ def _get_valid_tree(tree: Any) -> jnp.ndarray:
         while False indicates an invalid (NaN or infinite) entry.
     """
     valid = jax.tree_util.tree_leaves(
-        jax.tree_util.tree_map(lambda x: _get_not_inf(x) & _get_not_nan(x), tree)
+        jax.tree_util.tree_map(
+            lambda x: (
+                _get_valid_sparse_rows(x)
+                if is_sparse(x)
+                else _get_not_inf(x) & _get_not_nan(x)
+            ),
+            tree,
+            is_leaf=is_sparse,
+        )
     )
     return reduce(jnp.logical_and, valid)
 
@@ -122,7 +219,8 @@ def pytree_map_and_reduce(
     *pytrees :
         One or more pytrees to which the map and reduce functions are applied.
     is_leaf :
-        Callable, returns true if sub-tree is a leaf.
+        Callable, returns true if sub-tree is a leaf. Default treats sparse arrays
+        as leaves.
 
     Returns
     -------
@@ -138,6 +236,8 @@ def pytree_map_and_reduce(
     >>> # Example usage
     >>> result_any = pytree_map_and_reduce(map_fn, any, pytree1, pytree2)
     """
+    if is_leaf is None:
+        is_leaf = is_sparse
     cond_tree = jax.tree_util.tree_map(map_fn, *pytrees, is_leaf=is_leaf)
     # for some reason, tree_reduce doesn't work well with any.
     return reduce_fn(jax.tree_util.tree_leaves(cond_tree))
@@ -154,15 +254,165 @@ def tree_slice(data: Any, idx, is_leaf: Optional[Callable] = None):
     idx :
         The indexing operation to apply. This can be an integer, slice,
         NumPy array (boolean or integer), tuple of indexing operations, ellipsis, or None.
+        Sparse arrays support row indexing only.
     is_leaf :
-        Callable, returns true if sub-tree is a leaf.
+        Callable, returns true if sub-tree is a leaf. Default treats sparse arrays
+        as leaves.
 
     Returns
     -------
     Any
         A nested structure with the same format as `data`, where each array has been sliced according to `idx`.
     """
-    return jax.tree_util.tree_map(lambda x: x[idx], data, is_leaf=is_leaf)
+    if is_leaf is None:
+        is_leaf = is_sparse
+    return jax.tree_util.tree_map(
+        lambda x: _slice_sparse_rows(x, idx) if is_sparse(x) else x[idx],
+        data,
+        is_leaf=is_leaf,
+    )
+
+
+def design_n_features(X: Any) -> int:
+    """Number of columns of a design matrix, summed over the leaves of a pytree design."""
+    return sum(x.shape[1] for x in jax.tree_util.tree_leaves(X, is_leaf=is_sparse))
+
+
+def design_matvec(X: Any, v: jnp.ndarray) -> jnp.ndarray:
+    """
+    Product of a design matrix by a vector, leaf by leaf.
+
+    Parameters
+    ----------
+    X :
+        Array of shape ``(n_samples, n_features)``, or pytree of arrays sharing the first axis,
+        whose columns are stacked in the order of the leaves.
+    v :
+        Vector of shape ``(n_features,)``, or matrix of shape ``(n_features, k)``.
+
+    Returns
+    -------
+    :
+        The product ``X @ v``, computed without concatenating the leaves of ``X``.
+    """
+    leaves = jax.tree_util.tree_leaves(X, is_leaf=is_sparse)
+    splits = np.cumsum([x.shape[1] for x in leaves])[:-1]
+    return sum(x @ w for x, w in zip(leaves, jnp.split(v, splits)))
+
+
+def design_rmatvec(X: Any, u: jnp.ndarray) -> jnp.ndarray:
+    """
+    Product of the transposed design matrix by a vector, leaf by leaf.
+
+    Parameters
+    ----------
+    X :
+        Array of shape ``(n_samples, n_features)``, or pytree of arrays sharing the first axis,
+        whose columns are stacked in the order of the leaves.
+    u :
+        Vector of shape ``(n_samples,)``, or matrix of shape ``(n_samples, k)``.
+
+    Returns
+    -------
+    :
+        The product ``X.T @ u``, of shape ``(n_features,)`` or ``(n_features, k)``.
+    """
+    leaves = jax.tree_util.tree_leaves(X, is_leaf=is_sparse)
+    return jnp.concatenate([x.T @ u for x in leaves])
+
+
+def design_gram(X: Any, weights: Optional[jnp.ndarray] = None) -> jnp.ndarray:
+    """
+    Gram matrix of a design matrix, assembled from the cross-products of its leaves.
+
+    Parameters
+    ----------
+    X :
+        Array of shape ``(n_samples, n_features)``, or pytree of arrays sharing the first axis,
+        whose columns are stacked in the order of the leaves.
+    weights :
+        Optional sample weights, shape ``(n_samples,)``.
+
+    Returns
+    -------
+    :
+        The ``(n_features, n_features)`` matrix ``X.T @ diag(weights) @ X``, computed without
+        concatenating the leaves of ``X``.
+    """
+    leaves = jax.tree_util.tree_leaves(X, is_leaf=is_sparse)
+
+    def cross_product(a, b):
+        # sparse-sparse products scale with the product of the number of non-zeros
+        if is_sparse(a) and is_sparse(b):
+            b = b.todense()
+        if weights is not None:
+            b = b * weights[:, None]
+        return a.T @ b
+
+    rows = [
+        [cross_product(a, b) for b in leaves[: i + 1]] for i, a in enumerate(leaves)
+    ]
+    # fill the upper triangle by symmetry
+    return jnp.block(
+        [
+            [rows[i][j] if j <= i else rows[j][i].T for j in range(len(leaves))]
+            for i in range(len(leaves))
+        ]
+    )
+
+
+def design_r_factor(
+    X: Any, r_factor: Optional[jnp.ndarray] = None, chunk_size: int = 1024
+) -> jnp.ndarray:
+    """
+    Triangular factor of the QR decomposition of a design matrix, updated chunk by chunk.
+
+    The singular values of the factor are those of the design, so that its rank can be
+    computed with the same tolerance as that of the design, while the Gram matrix squares
+    the condition number. Only a chunk of rows of the concatenated leaves is formed at a time.
+
+    Parameters
+    ----------
+    X :
+        Array of shape ``(n_samples, n_features)``, or pytree of dense arrays sharing the first
+        axis, whose columns are stacked in the order of the leaves.
+    r_factor :
+        Optional factor of the preceding samples, shape ``(n_features, n_features)``.
+    chunk_size :
+        Number of rows stacked at a time, at least ``n_features``.
+
+    Returns
+    -------
+    :
+        The ``(n_features, n_features)`` factor of the QR decomposition of the samples of
+        ``r_factor`` followed by those of ``X``.
+    """
+    leaves = jax.tree_util.tree_leaves(X)
+    n_samples = leaves[0].shape[0]
+    n_features = sum(x.shape[1] for x in leaves)
+    dtype = jnp.result_type(*leaves)
+    if r_factor is None:
+        # zero rows do not change the factor
+        r_factor = jnp.zeros((n_features, n_features), dtype=dtype)
+    chunk_size = max(chunk_size, n_features)
+
+    def update(r, start, size):
+        rows = [jax.lax.dynamic_slice_in_dim(x, start, size) for x in leaves]
+        rows = jnp.concatenate([r] + [jnp.concatenate(rows, axis=1).astype(dtype)])
+        return jnp.linalg.qr(rows, mode="r")
+
+    n_chunks = n_samples // chunk_size
+    if n_chunks:
+        r_factor, _ = jax.lax.scan(
+            lambda r, i: (update(r, i * chunk_size, chunk_size), None),
+            r_factor,
+            jnp.arange(n_chunks),
+        )
+    if n_samples % chunk_size:
+        r_factor = update(
+            r_factor, n_chunks * chunk_size, n_samples - n_chunks * chunk_size
+        )
+    return r_factor
 
 
 # The following functions are adapted from jaxopt.tree_utils
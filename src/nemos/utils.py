@@ -8,10 +8,12 @@ from typing import Any, Callable, List, Literal, Optional, Union
 import jax
 import jax.numpy as jnp
 import numpy as np
+import scipy.sparse
+from jax.experimental import sparse
 from numpy.typing import NDArray
 
 from .base_class import Base
-from .tree_utils import pytree_map_and_reduce
+from .tree_utils import _to_scipy_csr, is_sparse, pytree_map_and_reduce
 from .type_casting import is_numpy_array_like, support_pynapple
 
 
@@ -369,29 +371,38 @@ def row_wise_kron(
     Parameters
     ----------
     A : jax.numpy.ndarray
-        The first matrix.
+        The first matrix. Can be a scipy sparse matrix or a ``jax.experimental.sparse.BCOO``.
     C : jax.numpy.ndarray
-        The second matrix.
+        The second matrix. Can be a scipy sparse matrix or a ``jax.experimental.sparse.BCOO``.
     jit : bool, optional
-        Activate Just-in-Time (JIT) compilation. Default is False.
+        Activate Just-in-Time (JIT) compilation. Default is False. Ignored for sparse inputs.
     transpose : bool, optional
         Transpose matrices A and C before computation. Default is True.
 
     Returns
     -------
     K : jnp.nparray
-        The resulting matrix with row-wise Kronecker product.
+        The resulting matrix with row-wise Kronecker product. If any of the inputs is sparse,
+        ``K`` is sparse: a ``BCOO`` if any of the inputs is a ``BCOO``, a scipy CSR array
+        otherwise.
 
     Notes
     -----
     This function computes the row-wise Kronecker product between dense matrices A and C
     using JAX for automatic differentiation and GPU acceleration.
 
+    For sparse inputs, only the products of the non-zero entries are computed: a row with
+    :math:`a` and :math:`c` non-zero entries in A and C has :math:`a \cdot c` non-zero entries
+    in K, instead of the product of the number of columns.
+
     # References
     ------------
     [1] Petersen, Kaare Brandt, and Michael Syskind Pedersen. "The matrix cookbook."
     Technical University of Denmark 7.15 (2008): 510.
     """
+    if any(is_sparse(x) or scipy.sparse.issparse(x) for x in (A, C)):
+        return _sparse_row_wise_kron(A, C, transpose=transpose)
+
     if transpose:
         A = A.T
         C = C.T
@@ -408,6 +419,65 @@ def row_wise_kron(
     return K
 
 
+def _sparse_row_wise_kron(A: Any, C: Any, transpose: bool = True) -> Any:
+    """
+    Compute the row-wise Kronecker product of sparse matrices.
+
+    The non-zero entries of each output row are the products of the non-zero entries
+    of the corresponding rows of A and C, computed at once for all rows from the CSR
+    index pointers.
+
+    Parameters
+    ----------
+    A :
+        The first matrix, dense, scipy sparse or ``BCOO``.
+    C :
+        The second matrix, dense, scipy sparse or ``BCOO``.
+    transpose :
+        Transpose matrices A and C before computation, and the result after.
+
+    Returns
+    -------
+    :
+        The row-wise Kronecker product, a ``BCOO`` if any of the inputs is a ``BCOO``,
+        a scipy CSR array otherwise.
+    """
+    return_bcoo = is_sparse(A) or is_sparse(C)
+    A, C = _to_scipy_csr(A), _to_scipy_csr(C)
+    if transpose:
+        A, C = A.T.tocsr(), C.T.tocsr()
+    if A.shape[0] != C.shape[0]:
+        raise ValueError(
+            "A and C must have the same number of rows. "
+            f"A has {A.shape[0]} rows, C has {C.shape[0]} instead!"
+        )
+    A.sort_indices()
+    C.sort_indices()
+    n_rows, n_cols_c = C.shape
+
+    nnz_a, nnz_c = np.diff(A.indptr), np.diff(C.indptr)
+    nnz_k = nnz_a * nnz_c
+    indptr = np.concatenate(([0], np.cumsum(nnz_k)))
+
+    # for each output entry: its row, and the position of its factors in A and C
+    rows = np.repeat(np.arange(n_rows), nnz_k)
+    offset = np.arange(indptr[-1]) - indptr[rows]
+    pos_a = A.indptr[rows] + offset // nnz_c[rows]
+    pos_c = C.indptr[rows] + offset % nnz_c[rows]
+
+    K = scipy.sparse.csr_array(
+        (
+            A.data[pos_a] * C.data[pos_c],
+            A.indices[pos_a] * n_cols_c + C.indices[pos_c],
+            indptr,
+        ),
+        shape=(n_rows, A.shape[1] * n_cols_c),
+    )
+    if transpose:
+        K = K.T.tocsr()
+    return sparse.BCOO.from_scipy_sparse(K) if return_bcoo else K
+
+
 def assert_has_attribute(obj: Any, attr_name: str):
     """Ensure the object has the given attribute."""
     if not hasattr(obj, attr_name):
@@ -8,7 +8,7 @@ import jax.numpy as jnp
 from numpy.typing import DTypeLike, NDArray
 
 from .pytrees import FeaturePytree
-from .tree_utils import get_valid_multitree, pytree_map_and_reduce
+from .tree_utils import get_valid_multitree, is_sparse, pytree_map_and_reduce
 
 
 def error_invalid_entry(*pytree: Any):
@@ -274,7 +274,9 @@ def check_tree_structure(tree_1: Any, tree_2: Any, err_message: str):
     TypeError
         If the structures of the pytrees do not match.
     """
-    if jax.tree_util.tree_structure(tree_1) != jax.tree_util.tree_structure(tree_2):
+    if jax.tree_util.tree_structure(
+        tree_1, is_leaf=is_sparse
+    ) != jax.tree_util.tree_structure(tree_2, is_leaf=is_sparse):
         raise TypeError(err_message)
 
 
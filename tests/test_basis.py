@@ -5,11 +5,13 @@ from contextlib import nullcontext as does_not_raise
 from functools import partial, reduce
 from typing import Literal
 
+import jax
 import jax.numpy
 import numpy as np
 import pynapple as nap
 import pytest
 from conftest import BasisFuncsTesting, CombinedBasis, list_all_basis_classes
+from jax.experimental.sparse import BCOO
 
 import nemos._inspect_utils as inspect_utils
 import nemos.basis.basis as basis
@@ -18,11 +20,19 @@ from nemos.basis import HistoryConv, IdentityEval
 from nemos.basis._basis import AdditiveBasis, MultiplicativeBasis, add_docstring
 from nemos.basis._decaying_exponential import OrthExponentialBasis
 from nemos.basis._identity import HistoryBasis, IdentityBasis
+from nemos.basis._lazy_features import LazyDesignMatrix, LazyFeatureMatrix
 from nemos.basis._raised_cosine_basis import (
     RaisedCosineBasisLinear,
     RaisedCosineBasisLog,
 )
-from nemos.basis._spline_basis import BSplineBasis, CyclicBSplineBasis, MSplineBasis
+from nemos.basis._spline_basis import (
+    BSplineBasis,
+    CyclicBSplineBasis,
+    MSplineBasis,
+    _mspline_on_grid,
+    mspline,
+    mspline_basis,
+)
 from nemos.utils import pynapple_concatenate_numpy
 
 
@@ -607,6 +617,7 @@ class TestSharedMethods:
                 pytest.raises(ValueError, match="Unrecognized keyword arguments"),
             ),
             (dict(shift=True, predictor_causality="causal"), does_not_raise()),
+            (dict(method="fft"), does_not_raise()),
             (
                 dict(shift=True, time_series=np.arange(10)),
                 pytest.raises(ValueError, match="Unrecognized keyword arguments"),
@@ -2098,6 +2109,37 @@ class TestMSplineBasis(BasisFuncsTesting):
         _, out2 = bas_no_range.evaluate_on_grid(10)
         assert np.allclose(out1 * scaling, out2)
 
+    @pytest.mark.parametrize("order", [1, 2, 3, 5])
+    def test_mspline_basis_matches_single_elements(self, order):
+        """All the elements evaluated at once match the elements evaluated one by one."""
+        knots = np.array([0, 0, 0, 0, 0.1, 0.3, 0.3, 0.6, 1, 1, 1, 1])
+        x = np.hstack([np.linspace(-0.1, 1.1, 200), [np.nan]])
+        out = mspline_basis(x, order, knots)
+        assert out.shape == (x.shape[0], knots.shape[0] - order)
+        for i in range(out.shape[1]):
+            np.testing.assert_allclose(out[:, i], mspline(x, order, i, knots))
+
+    @pytest.mark.parametrize("order", [1, 2, 3, 4])
+    def test_mspline_integrates_to_one(self, order):
+        x, out = self.cls["eval"](n_basis_funcs=6, order=order).evaluate_on_grid(10**5)
+        assert np.allclose(out.sum(axis=0) * (x[1] - x[0]), 1, atol=10**-3)
+
+    def test_evaluate_on_grid_cache(self):
+        _mspline_on_grid.cache_clear()
+        bas = self.cls["eval"](n_basis_funcs=6, order=3)
+        x, out = bas.evaluate_on_grid(100)
+        # modifying the output must not alter the cached values
+        out[:] = 0
+        x2, out2 = self.cls["eval"](n_basis_funcs=6, order=3).evaluate_on_grid(100)
+        assert _mspline_on_grid.cache_info().hits == 1
+        assert np.all(out2.sum(axis=0) > 0)
+        assert np.all(x2 == x)
+        # a different configuration is evaluated again
+        bas.order = 2
+        _, out3 = bas.evaluate_on_grid(100)
+        assert _mspline_on_grid.cache_info().misses == 2
+        assert not np.allclose(out3, out2)
+
 
 class TestOrthExponentialBasis(BasisFuncsTesting):
     cls = {"eval": basis.OrthExponentialEval, "conv": basis.OrthExponentialConv}
@@ -4660,6 +4702,212 @@ def test_power_of_basis(exponent, basis_class, basis_class_specific_params):
         assert np.all(np.isnan(out[~non_nan]))
 
 
+@pytest.mark.parametrize("basis_class", list_all_basis_classes())
+def test_compute_features_sparse(basis_class, basis_class_specific_params):
+    basis_obj = CombinedBasis.instantiate_basis(
+        5, basis_class, basis_class_specific_params, window_size=10
+    )
+    samples = [np.linspace(0, 1, 50)] * basis_obj._n_input_dimensionality
+    dense = basis_obj.compute_features(*samples)
+    out = basis_obj.compute_features(*samples, sparse=True)
+    assert isinstance(out, BCOO)
+    assert out.shape == dense.shape
+    out = np.asarray(out.todense())
+    # the zeros multiplying a NaN are not stored, check the NaN rows only
+    is_valid = ~np.any(np.isnan(dense), axis=1)
+    assert np.array_equal(is_valid, ~np.any(np.isnan(out), axis=1))
+    assert np.allclose(out[is_valid], dense[is_valid], atol=10**-6)
+
+
+def test_compute_features_sparse_tensor_product():
+    bas = basis.BSplineEval(10, order=3) * basis.MSplineEval(12, order=4)
+    x, y = np.random.uniform(size=(2, 200))
+    out = bas.compute_features(x, y, sparse=True)
+    assert out.shape == (200, 120)
+    assert out.nse <= 3 * 4 * 200
+    assert np.allclose(out.todense(), bas.compute_features(x, y), atol=10**-6)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 50, 1000])
+@pytest.mark.parametrize("basis_class", list_all_basis_classes())
+def test_compute_features_chunked(basis_class, chunk_size, basis_class_specific_params):
+    basis_obj = CombinedBasis.instantiate_basis(
+        5, basis_class, basis_class_specific_params, window_size=10
+    )
+    n_input = basis_obj._n_input_dimensionality
+    samples = [np.random.uniform(size=113) for _ in range(n_input)]
+    if any(
+        isinstance(bas, basis.OrthExponentialEval)
+        for bas in basis_obj._iterate_over_components()
+    ):
+        with pytest.raises(ValueError, match="cannot be computed in chunks"):
+            basis_obj.compute_features(*samples, chunk_size=chunk_size)
+        return
+    dense = np.asarray(basis_obj.compute_features(*samples))
+    lazy = basis_obj.compute_features(*samples, chunk_size=chunk_size)
+    assert isinstance(lazy, LazyFeatureMatrix)
+    assert lazy.shape == dense.shape
+    assert np.allclose(lazy[:], dense, equal_nan=True)
+    assert np.allclose(np.asarray(lazy), dense, equal_nan=True)
+    idx = np.array([0, 5, 112, -1])
+    assert np.allclose(lazy[idx], dense[idx], equal_nan=True)
+    assert np.allclose(lazy[10:90:3, 1:], dense[10:90:3, 1:], equal_nan=True)
+    assert np.allclose(lazy[-3], dense[-3], equal_nan=True)
+
+
+@pytest.mark.parametrize(
+    "conv_kwargs",
+    [
+        dict(predictor_causality="causal", shift=True),
+        dict(predictor_causality="causal", shift=False),
+        dict(predictor_causality="acausal"),
+        dict(predictor_causality="anti-causal"),
+    ],
+)
+def test_compute_features_chunked_nan_pad(conv_kwargs):
+    bas = basis.BSplineConv(
+        5, window_size=11, conv_kwargs=conv_kwargs
+    ) * basis.MSplineEval(4)
+    x, y = np.random.normal(size=(2, 200))
+    dense = np.asarray(bas.compute_features(x, y))
+    out = bas.compute_features(x, y, chunk_size=6, out=np.empty(dense.shape))
+    assert np.array_equal(np.isnan(out), np.isnan(dense))
+    assert np.allclose(out, dense, equal_nan=True)
+
+
+def test_compute_features_chunked_memmap(tmp_path):
+    bas = basis.RaisedCosineLogConv(6, window_size=20) + basis.BSplineEval(5)
+    x, y = np.random.normal(size=(2, 1000))
+    out = np.memmap(tmp_path / "X.dat", dtype=float, mode="w+", shape=(1000, 11))
+    res = bas.compute_features(x, y, out=out, chunk_size=128)
+    assert res is out
+    stored = np.memmap(tmp_path / "X.dat", dtype=float, mode="r", shape=(1000, 11))
+    assert np.allclose(stored, bas.compute_features(x, y), equal_nan=True)
+
+
+def test_compute_features_chunked_pynapple():
+    tsd = nap.Tsd(
+        t=np.arange(300),
+        d=np.random.normal(size=300),
+        time_support=nap.IntervalSet(start=[0, 120, 135], end=[100, 131, 299]),
+    )
+    tsd = tsd.restrict(tsd.time_support)
+    bas = basis.RaisedCosineLinearConv(
+        5, window_size=8, conv_kwargs=dict(predictor_causality="acausal")
+    ) * basis.HistoryConv(4)
+    dense = bas.compute_features(tsd, tsd).d
+    for chunk_size in [1, 9, 64]:
+        lazy = bas.compute_features(tsd, tsd, chunk_size=chunk_size)
+        assert np.array_equal(np.isnan(lazy[:]), np.isnan(dense))
+        assert np.allclose(lazy[:], dense, equal_nan=True)
+
+
+@pytest.mark.parametrize(
+    "kwargs, expectation",
+    [
+        (dict(chunk_size=10), does_not_raise()),
+        (
+            dict(chunk_size=0),
+            pytest.raises(ValueError, match="`chunk_size` must be a positive integer"),
+        ),
+        (
+            dict(chunk_size=10, sparse=True),
+            pytest.raises(ValueError, match="Sparse features cannot be computed"),
+        ),
+        (
+            dict(out=np.empty((100, 5)), sparse=True),
+            pytest.raises(ValueError, match="Sparse features cannot be computed"),
+        ),
+        (
+            dict(out=np.empty((99, 5))),
+            pytest.raises(ValueError, match="`out` must have shape"),
+        ),
+    ],
+)
+def test_compute_features_chunked_errors(kwargs, expectation):
+    bas = basis.BSplineConv(5, window_size=10)
+    with expectation:
+        bas.compute_features(np.random.normal(size=100), **kwargs)
+
+
+@pytest.mark.parametrize("basis_class", list_all_basis_classes())
+def test_compute_features_lazy(basis_class, basis_class_specific_params):
+    basis_obj = CombinedBasis.instantiate_basis(
+        5, basis_class, basis_class_specific_params, window_size=10
+    )
+    n_input = basis_obj._n_input_dimensionality
+    samples = [np.random.uniform(size=100) for _ in range(n_input)]
+    samples[0][40] = np.nan
+    dense = np.asarray(basis_obj.compute_features(*samples))
+    lazy = basis_obj.compute_features(*samples, lazy=True)
+    assert isinstance(lazy, LazyDesignMatrix)
+    assert lazy.shape == dense.shape
+    valid = ~np.any(np.isnan(dense), axis=1)
+    assert np.array_equal(lazy.valid_rows(), valid)
+    assert np.allclose(lazy.todense()[valid], dense[valid], atol=10**-5)
+    w = np.random.normal(size=(dense.shape[1], 2))
+    assert np.allclose(lazy @ w, dense @ w, equal_nan=True, atol=10**-5)
+    assert np.allclose(lazy @ w[:, 0], dense @ w[:, 0], equal_nan=True, atol=10**-5)
+    r = np.random.normal(size=(2, 100))
+    expected = r[:, valid] @ dense[valid]
+    assert np.allclose(r @ lazy, expected, atol=10**-4)
+    assert np.allclose(lazy.T @ r[0], expected[0], atol=10**-4)
+    assert np.allclose(lazy[valid].gram(), dense[valid].T @ dense[valid], atol=10**-3)
+
+
+@pytest.mark.parametrize(
+    "conv_kwargs",
+    [
+        dict(predictor_causality="causal", shift=True),
+        dict(predictor_causality="causal", shift=False),
+        dict(predictor_causality="acausal"),
+        dict(predictor_causality="anti-causal", shift=True),
+        dict(predictor_causality="anti-causal", shift=False),
+    ],
+)
+def test_compute_features_lazy_pynapple(conv_kwargs):
+    tsd = nap.Tsd(
+        t=np.arange(300),
+        d=np.random.normal(size=300),
+        time_support=nap.IntervalSet(start=[0, 120, 135], end=[100, 131, 299]),
+    )
+    tsd = tsd.restrict(tsd.time_support)
+    bas = basis.RaisedCosineLinearConv(5, window_size=9, conv_kwargs=conv_kwargs)
+    dense = bas.compute_features(tsd).d
+    lazy = bas.compute_features(tsd, lazy=True)
+    assert np.array_equal(np.isnan(lazy.todense()), np.isnan(dense))
+    assert np.allclose(lazy.todense(), dense, equal_nan=True, atol=10**-5)
+
+
+def test_compute_features_lazy_jit():
+    bas = basis.BSplineConv(5, window_size=10) * basis.MSplineEval(4)
+    x, z = np.random.uniform(size=(2, 200))
+    lazy = bas.compute_features(x, z, lazy=True)
+    lazy = lazy[lazy.valid_rows()]
+    r = np.random.normal(size=lazy.shape[0])
+
+    def loss(w, design):
+        return 0.5 * jax.numpy.sum((design @ w - r) ** 2)
+
+    w = np.random.normal(size=20)
+    grad = jax.jit(jax.grad(loss))(w, lazy)
+    assert np.allclose(grad, (lazy @ w - r) @ lazy, atol=10**-4)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(lazy=True, sparse=True),
+        dict(lazy=True, chunk_size=10),
+        dict(lazy=True, out=np.empty((100, 5))),
+    ],
+)
+def test_compute_features_lazy_errors(kwargs):
+    bas = basis.BSplineConv(5, window_size=10)
+    with pytest.raises(ValueError, match="Lazy features are never stored"):
+        bas.compute_features(np.random.normal(size=100), **kwargs)
+
+
 @pytest.mark.parametrize(
     "basis_cls",
     list_all_basis_classes(),
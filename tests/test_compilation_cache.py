@@ -0,0 +1,219 @@
+from contextlib import nullcontext as does_not_raise
+
+import jax
+import numpy as np
+import pytest
+
+import nemos as nmo
+from nemos.compilation_cache import make_cache_key
+
+
+@pytest.fixture
+def poisson_data():
+    np.random.seed(123)
+    X = np.random.normal(size=(200, 3))
+    y = np.random.poisson(np.exp(X.dot([0.2, -0.1, 0.3])))
+    return X, y
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    nmo.compilation_cache.clear_cache()
+    yield
+    nmo.compilation_cache.set_cache_size(128)
+    nmo.compilation_cache.clear_cache()
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("UnRegularized", "GradientDescent"),
+        ("Ridge", "LBFGS"),
+        ("Lasso", "ProximalGradient"),
+        ("Ridge", "SVRG"),
+        ("Lasso", "ProxSVRG"),
+    ],
+)
+def test_refit_hits_cache(regularizer, solver_name, poisson_data):
+    X, y = poisson_data
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+        solver_name=solver_name,
+    )
+    model = nmo.glm.GLM(**kwargs).fit(X, y)
+    info = nmo.compilation_cache.cache_info()
+    assert info.currsize == 1
+    assert info.hits == 0
+    # a new instance with the same configuration re-uses the compiled solver
+    model_new = nmo.glm.GLM(**kwargs).fit(X, y)
+    info_new = nmo.compilation_cache.cache_info()
+    assert info_new.currsize == 1
+    assert info_new.misses == info.misses
+    assert info_new.hits == info.misses
+    assert model_new.solver_run is model.solver_run
+    assert np.allclose(model_new.coef_, model.coef_)
+
+
+def test_results_match_uncached(poisson_data):
+    X, y = poisson_data
+    model = nmo.glm.GLM(regularizer="Ridge", regularizer_strength=0.1).fit(X, y)
+    nmo.compilation_cache.set_cache_size(0)
+    model_uncached = nmo.glm.GLM(regularizer="Ridge", regularizer_strength=0.1)
+    model_uncached.fit(X, y)
+    assert nmo.compilation_cache.cache_info().currsize == 0
+    assert model_uncached.solver_run is not model.solver_run
+    assert np.allclose(model_uncached.coef_, model.coef_)
+    assert np.allclose(model_uncached.intercept_, model.intercept_)
+
+
+def test_new_shape_is_a_miss(poisson_data):
+    X, y = poisson_data
+    nmo.glm.GLM().fit(X, y)
+    misses = nmo.compilation_cache.cache_info().misses
+    nmo.glm.GLM().fit(X[:100], y[:100])
+    info = nmo.compilation_cache.cache_info()
+    assert info.currsize == 1
+    assert info.misses == 2 * misses
+
+
+@pytest.mark.parametrize(
+    "params_1, params_2",
+    [
+        (
+            dict(regularizer="Ridge", regularizer_strength=0.1),
+            dict(regularizer="Ridge", regularizer_strength=0.2),
+        ),
+        (dict(solver_name="GradientDescent"), dict(solver_name="LBFGS")),
+        (dict(solver_kwargs=dict(tol=1e-4)), dict(solver_kwargs=dict(tol=1e-5))),
+        (
+            dict(observation_model=nmo.observation_models.PoissonObservations()),
+            dict(
+                observation_model=nmo.observation_models.PoissonObservations(
+                    inverse_link_function=jax.nn.softplus
+                )
+            ),
+        ),
+        (
+            dict(
+                regularizer=nmo.regularizer.GroupLasso(
+                    mask=np.array([[1.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+                ),
+                regularizer_strength=0.1,
+            ),
+            dict(
+                regularizer=nmo.regularizer.GroupLasso(
+                    mask=np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 1.0]])
+                ),
+                regularizer_strength=0.1,
+            ),
+        ),
+    ],
+)
+def test_configuration_in_key(params_1, params_2, poisson_data):
+    X, y = poisson_data
+    model_1 = nmo.glm.GLM(**params_1).fit(X, y)
+    model_2 = nmo.glm.GLM(**params_2).fit(X, y)
+    assert nmo.compilation_cache.cache_info().currsize == 2
+    assert model_1.solver_run is not model_2.solver_run
+    assert make_cache_key(model_1, {}, ()) != make_cache_key(model_2, {}, ())
+
+
+def test_population_feature_mask_in_key(poisson_data):
+    X, _ = poisson_data
+    y = np.random.poisson(size=(X.shape[0], 2))
+    mask_1, mask_2 = np.ones((3, 2)), np.ones((3, 2))
+    mask_2[0, 1] = 0
+    model_1 = nmo.glm.PopulationGLM(feature_mask=mask_1).fit(X, y)
+    model_2 = nmo.glm.PopulationGLM(feature_mask=mask_2).fit(X, y)
+    assert model_1.solver_run is not model_2.solver_run
+    assert model_2.coef_[0, 1] == 0
+
+
+def test_entry_isolated_from_model_changes(poisson_data):
+    """Modifying a model after the fit must not affect the cached functions."""
+    X, y = poisson_data
+    model = nmo.glm.GLM(observation_model=nmo.observation_models.PoissonObservations())
+    model.fit(X, y)
+    model.observation_model.inverse_link_function = jax.nn.softplus
+    model_new = nmo.glm.GLM().fit(X, y)
+    model_ref = nmo.glm.GLM()
+    nmo.compilation_cache.set_cache_size(0)
+    model_ref.fit(X, y)
+    assert np.allclose(model_new.coef_, model_ref.coef_)
+
+
+def test_entry_does_not_hold_fitted_model(poisson_data):
+    """The cached functions are built from an unfitted copy of the configuration."""
+    X, y = poisson_data
+    model = nmo.glm.GLM(regularizer="Lasso", solver_name="ProximalGradient")
+    model.regularizer_strength = 0.1
+    model.fit(X, y)
+    # refit the fitted model with a new configuration
+    model.regularizer_strength = 0.2
+    model.fit(X, y)
+    builder = model._solver_loss_fun_.__self__
+    assert builder is not model
+    assert builder.coef_ is None and builder.intercept_ is None
+
+
+def test_update_hits_cache(poisson_data):
+    X, y = poisson_data
+    model = nmo.glm.GLM()
+    params = model.initialize_params(X, y)
+    state = model.initialize_state(X, y, params)
+    for _ in range(3):
+        params, state = model.update(params, state, X, y)
+    info = nmo.compilation_cache.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_lru_eviction(poisson_data):
+    X, y = poisson_data
+    nmo.compilation_cache.set_cache_size(2)
+    for strength in [0.1, 0.2, 0.3]:
+        nmo.glm.GLM(regularizer="Ridge", regularizer_strength=strength).fit(X, y)
+    assert nmo.compilation_cache.cache_info().currsize == 2
+
+
+def test_unhashable_configuration_not_cached(poisson_data):
+    X, y = poisson_data
+
+    class Unhashable:
+        __hash__ = None
+
+    model = nmo.glm.GLM()
+    assert make_cache_key(model, dict(unused=Unhashable()), ()) is None
+    assert make_cache_key(model, dict(tol=1e-4), ()) is not None
+
+
+@pytest.mark.parametrize(
+    "maxsize, expectation",
+    [
+        (0, does_not_raise()),
+        (10, does_not_raise()),
+        (
+            -1,
+            pytest.raises(ValueError, match="`maxsize` must be a non-negative integer"),
+        ),
+        (
+            1.5,
+            pytest.raises(ValueError, match="`maxsize` must be a non-negative integer"),
+        ),
+    ],
+)
+def test_set_cache_size(maxsize, expectation):
+    with expectation:
+        nmo.compilation_cache.set_cache_size(maxsize)
+        assert nmo.compilation_cache.cache_info().maxsize == maxsize
+
+
+def test_enable_persistent_cache(tmp_path):
+    previous = jax.config.jax_compilation_cache_dir
+    try:
+        nmo.compilation_cache.enable_persistent_cache(tmp_path / "cache")
+        assert jax.config.jax_compilation_cache_dir == str(tmp_path / "cache")
+        assert (tmp_path / "cache").is_dir()
+    finally:
+        jax.config.update("jax_compilation_cache_dir", previous)
@@ -99,6 +99,62 @@ class TestShiftTimeAxisAndConvolve:
             '"valid" mode.'
         )
 
+    @pytest.mark.parametrize("window_size", [2, 5, 33, 100])
+    @pytest.mark.parametrize(
+        "time_series, axis",
+        [
+            (np.random.normal(size=(250,)), 0),
+            (np.random.normal(size=(250, 3)), 0),
+            (np.random.normal(size=(2, 250, 3)), 1),
+        ],
+    )
+    def test_fft_matches_direct(self, time_series, axis, window_size):
+        """Check that the FFT backend matches the direct convolution."""
+        basis_matrix = np.random.normal(size=(window_size, 4))
+        direct = convolve._shift_time_axis_and_convolve(
+            time_series, basis_matrix, axis=axis, method="direct"
+        )
+        fft = convolve._shift_time_axis_and_convolve(
+            time_series, basis_matrix, axis=axis, method="fft"
+        )
+        assert fft.shape == direct.shape
+        np.testing.assert_allclose(fft, direct, rtol=1e-4, atol=1e-4)
+
+    @pytest.mark.parametrize("window_size", [3, 40])
+    def test_fft_nan_propagation(self, window_size):
+        """Check that the FFT backend propagates NaNs as the direct convolution."""
+        time_series = np.random.normal(size=(300, 2))
+        time_series[[10, 150], 0] = np.nan
+        time_series[299, 1] = np.inf
+        basis_matrix = np.random.normal(size=(window_size, 3))
+        direct = np.asarray(convolve.tensor_convolve(time_series, basis_matrix))
+        fft = np.asarray(
+            convolve.fft_tensor_convolve(
+                time_series, basis_matrix, convolve._get_fft_size(300, window_size)
+            )
+        )
+        assert np.array_equal(np.isfinite(fft), np.isfinite(direct))
+        is_finite = np.isfinite(direct)
+        np.testing.assert_allclose(fft[is_finite], direct[is_finite], atol=1e-4)
+
+    @pytest.mark.parametrize(
+        "num_samples, window_size, method, expected",
+        [
+            (1000, 10, "auto", "direct"),
+            (1000, 32, "auto", "fft"),
+            (40, 32, "auto", "direct"),
+            (1000, 100, "direct", "direct"),
+            (40, 3, "fft", "fft"),
+        ],
+    )
+    def test_select_convolution_method(
+        self, num_samples, window_size, method, expected
+    ):
+        assert (
+            convolve._select_convolution_method(num_samples, window_size, method)
+            == expected
+        )
+
 
 class TestCreateConvolutionalPredictor:
 
@@ -410,3 +466,38 @@ class TestCreateConvolutionalPredictor:
         times_nan_found = res[np.isnan(res.d[:, 0])].t
         assert len(times_nan_found) == len(nan_index)
         assert all(times_nan_found == np.array(nan_index))
+
+    @pytest.mark.parametrize("window_size", [3, 51])
+    @pytest.mark.parametrize(
+        "shift, predictor_causality",
+        [(True, "causal"), (False, "causal"), (True, "anti-causal"), (None, "acausal")],
+    )
+    def test_fft_method_matches_direct(self, window_size, shift, predictor_causality):
+        """Check that the backends agree, including NaN padding and shift."""
+        tsd = nap.TsdFrame(
+            t=np.arange(300),
+            d=np.random.normal(size=(300, 2)),
+            time_support=nap.IntervalSet(start=[0, 150], end=[120, 299]),
+        )
+        basis = np.random.normal(size=(window_size, 3))
+        res = {
+            method: convolve.create_convolutional_predictor(
+                basis,
+                tsd,
+                predictor_causality=predictor_causality,
+                shift=shift,
+                method=method,
+            )
+            for method in ["direct", "fft", "auto"]
+        }
+        for method in ["fft", "auto"]:
+            np.testing.assert_allclose(
+                res[method].d, res["direct"].d, rtol=1e-4, atol=1e-4
+            )
+            assert np.array_equal(res[method].t, res["direct"].t)
+
+    def test_invalid_method(self):
+        with pytest.raises(ValueError, match="`method` must be one of"):
+            convolve.create_convolutional_predictor(
+                np.ones((3, 2)), np.ones((10,)), method="overlap-add"
+            )
@@ -1,6 +1,11 @@
 import inspect
+import os
+import subprocess
+import sys
+import textwrap
 import warnings
 from contextlib import nullcontext as does_not_raise
+from copy import deepcopy
 from typing import Callable
 
 import jax
@@ -9,6 +14,7 @@ import numpy as np
 import pytest
 import sklearn
 import statsmodels.api as sm
+from jax.experimental import sparse
 from pynapple import Tsd, TsdFrame
 from sklearn.linear_model import GammaRegressor, PoissonRegressor
 from sklearn.model_selection import GridSearchCV
@@ -135,6 +141,7 @@ class TestGLM:
         expected_keys = {
             "observation_model__inverse_link_function",
             "observation_model",
+            "precision",
             "regularizer",
             "regularizer_strength",
             "solver_kwargs",
@@ -146,6 +153,7 @@ class TestGLM:
         expected_values = [
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -161,6 +169,7 @@ class TestGLM:
         expected_values = [
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -176,6 +185,7 @@ class TestGLM:
         expected_values = [
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -191,6 +201,7 @@ class TestGLM:
         expected_values = [
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -1861,7 +1872,9 @@ class TestGLM:
             regularizer_strength=None if reg == "UnRegularized" else 1.0,
         )
         opt_state = model.initialize_state(X, y, true_params)
-        solver = inspect.getclosurevars(model._solver_run).nonlocals["solver"]
+        solver = inspect.getclosurevars(inspect.unwrap(model._solver_run)).nonlocals[
+            "solver"
+        ]
 
         if stepsize is not None:
             assert opt_state.stepsize == stepsize
@@ -1914,7 +1927,9 @@ class TestGLM:
             regularizer_strength=None if reg == "UnRegularized" else 1.0,
         )
         opt_state = model.initialize_state(X, y, true_params)
-        solver = inspect.getclosurevars(model._solver_run).nonlocals["solver"]
+        solver = inspect.getclosurevars(inspect.unwrap(model._solver_run)).nonlocals[
+            "solver"
+        ]
 
         if stepsize is not None:
             assert opt_state.stepsize == stepsize
@@ -2153,6 +2168,7 @@ class TestPopulationGLM:
             "feature_mask",
             "observation_model__inverse_link_function",
             "observation_model",
+            "precision",
             "regularizer",
             "regularizer_strength",
             "solver_kwargs",
@@ -2165,6 +2181,7 @@ class TestPopulationGLM:
             model.feature_mask,
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -2181,6 +2198,7 @@ class TestPopulationGLM:
             model.feature_mask,
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -2197,6 +2215,7 @@ class TestPopulationGLM:
             model.feature_mask,
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -2213,6 +2232,7 @@ class TestPopulationGLM:
             model.feature_mask,
             model.observation_model.inverse_link_function,
             model.observation_model,
+            model.precision,
             model.regularizer,
             model.regularizer_strength,
             model.solver_kwargs,
@@ -3909,7 +3929,9 @@ class TestPopulationGLM:
             regularizer_strength=None if reg == "UnRegularized" else 1.0,
         )
         opt_state = model.initialize_state(X, y, true_params)
-        solver = inspect.getclosurevars(model._solver_run).nonlocals["solver"]
+        solver = inspect.getclosurevars(inspect.unwrap(model._solver_run)).nonlocals[
+            "solver"
+        ]
 
         if stepsize is not None:
             assert opt_state.stepsize == stepsize
@@ -3962,7 +3984,9 @@ class TestPopulationGLM:
             regularizer_strength=None if reg == "UnRegularized" else 1.0,
         )
         opt_state = model.initialize_state(X, y, true_params)
-        solver = inspect.getclosurevars(model._solver_run).nonlocals["solver"]
+        solver = inspect.getclosurevars(inspect.unwrap(model._solver_run)).nonlocals[
+            "solver"
+        ]
 
         if stepsize is not None:
             assert opt_state.stepsize == stepsize
@@ -4313,3 +4337,1290 @@ def test_optimal_config_outputs(
     assert isinstance(
         convexity, expected_type_convexity
     ), f"convexity type: {type(convexity)}, expected type: {expected_type_convexity}"
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("UnRegularized", "GradientDescent"),
+        ("Ridge", "GradientDescent"),
+        ("Lasso", "ProximalGradient"),
+    ],
+)
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_fit_streaming_matches_fit(
+    regularizer, solver_name, glm_type, request, glm_class, population_glm_class
+):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model_class = population_glm_class
+    else:
+        X, y, _, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+        model_class = glm_class
+    X = X.copy()
+    X[:3] = np.nan
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+        solver_name=solver_name,
+        solver_kwargs=dict(tol=10**-12, maxiter=1000),
+    )
+    model = model_class(**kwargs).fit(X, y)
+    model_stream = model_class(**kwargs).fit_streaming((X, y), chunk_size=30)
+    assert np.allclose(model.coef_, model_stream.coef_, atol=10**-5)
+    assert np.allclose(model.intercept_, model_stream.intercept_, atol=10**-5)
+    assert np.allclose(model.dof_resid_, model_stream.dof_resid_)
+    assert np.allclose(model.scale_, model_stream.scale_)
+
+
+def test_fit_streaming_gamma_scale(gammaGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = gammaGLM_model_instantiation
+    model.set_params(solver_kwargs=dict(tol=10**-12, maxiter=1000))
+    model.fit(X, y)
+    coef, scale = model.coef_, model.scale_
+    model.fit_streaming((X, y), chunk_size=17)
+    assert np.allclose(coef, model.coef_, atol=10**-5)
+    assert np.allclose(scale, model.scale_, atol=10**-5)
+
+
+def test_fit_streaming_dof_ill_conditioned():
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(0)
+    X = np.random.normal(size=(500, 6))
+    # full rank design whose Gram matrix is numerically rank deficient
+    X[:, [2, 5]] *= 1e-9
+    y = np.random.poisson(np.exp(0.1 * X[:, :2].sum(axis=1)))
+    model = nmo.glm.GLM(solver_kwargs=dict(maxiter=5))
+    model.fit_streaming((X, y), chunk_size=100)
+    assert np.allclose(model.dof_resid_, X.shape[0] - X.shape[1] - 1)
+
+
+def test_fit_streaming_svrg(poissonGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    reference = nmo.glm.GLM(solver_name="LBFGS", solver_kwargs=dict(tol=10**-12))
+    reference.fit(X, y)
+    model = nmo.glm.GLM(
+        solver_name="SVRG",
+        solver_kwargs=dict(stepsize=0.01, batch_size=8, maxiter=200, tol=10**-8),
+    ).fit_streaming((X, y), chunk_size=25)
+    assert np.allclose(reference.coef_, model.coef_, atol=10**-2)
+    assert model.solver_state_.iter_num > 0
+
+
+@pytest.mark.parametrize("solver_name, stepsize", [("SGD", 10**-3), ("Adam", 10**-2)])
+def test_fit_streaming_minibatch(solver_name, stepsize, poissonGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    reference = nmo.glm.GLM(solver_name="LBFGS", solver_kwargs=dict(tol=10**-12))
+    reference.fit(X, y)
+    model = nmo.glm.GLM(
+        solver_name=solver_name,
+        solver_kwargs=dict(stepsize=stepsize, batch_size=8, maxiter=200),
+    ).fit_streaming((X, y), chunk_size=25, prefetch=3)
+    assert np.allclose(reference.coef_, model.coef_, atol=5 * 10**-2)
+    assert 0 < model.solver_state_.iter_num <= 200
+
+
+@pytest.mark.parametrize(
+    "source, expectation",
+    [
+        ("memmap", does_not_raise()),
+        ("generator_function", does_not_raise()),
+        ("list", does_not_raise()),
+        ("tuple_of_chunks", does_not_raise()),
+        (
+            "generator",
+            pytest.raises(TypeError, match="Streaming requires multiple passes"),
+        ),
+        ("no_chunk_size", pytest.raises(ValueError, match="`chunk_size` must be")),
+    ],
+)
+def test_fit_streaming_sources(
+    source, expectation, tmp_path, poissonGLM_model_instantiation
+):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    chunk_size = None
+    if source == "memmap":
+        X_map = np.memmap(tmp_path / "X.dat", dtype=float, mode="w+", shape=X.shape)
+        X_map[:] = X
+        data, chunk_size = (X_map, y), 10
+    elif source == "no_chunk_size":
+        data = (X, y)
+    else:
+
+        def data():
+            for start in range(0, X.shape[0], 10):
+                yield X[start : start + 10], y[start : start + 10]
+
+        if source == "list":
+            data = list(data())
+        elif source == "tuple_of_chunks":
+            data = tuple(data())[:2]
+        elif source == "generator":
+            data = data()
+    with expectation:
+        model.fit_streaming(data, chunk_size=chunk_size)
+        assert model.coef_.shape == (X.shape[1],)
+
+
+def test_fit_streaming_invalid_solver(poissonGLM_model_instantiation):
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    model = nmo.glm.GLM(solver_name="LBFGS")
+    with pytest.raises(ValueError, match="does not support streaming"):
+        model.fit_streaming((X, y), chunk_size=10)
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("Ridge", "LBFGS"),
+        ("Ridge", "ProximalGradient"),
+        ("Lasso", "ProximalGradient"),
+        ("GroupLasso", "ProximalGradient"),
+    ],
+)
+@pytest.mark.parametrize("vectorize", [True, False])
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_fit_path_matches_fit(
+    regularizer,
+    solver_name,
+    vectorize,
+    glm_type,
+    request,
+    glm_class,
+    population_glm_class,
+):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model_class = population_glm_class
+    else:
+        X, y, _, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+        model_class = glm_class
+    strengths = np.array([1.0, 0.1, 0.01])
+    kwargs = dict(
+        regularizer=regularizer,
+        solver_name=solver_name,
+        solver_kwargs=dict(tol=10**-12, maxiter=5000),
+    )
+    path = model_class(**kwargs).fit_path(X, y, strengths, vectorize=vectorize)
+    assert path.coef.shape == (3, *X.shape[1:], *y.shape[1:])
+    assert path.score.shape == (3,)
+    assert path.n_iter.shape == (3,)
+    for i, strength in enumerate(strengths):
+        model = model_class(regularizer_strength=strength, **kwargs).fit(X, y)
+        assert path.intercept[i].shape == model.intercept_.shape
+        assert np.allclose(path.coef[i], model.coef_, atol=10**-6)
+        assert np.allclose(path.intercept[i], model.intercept_, atol=10**-6)
+        assert np.allclose(path.score[i], model.score(X, y))
+
+
+def test_fit_path_score_data(poissonGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    model = nmo.glm.GLM(
+        regularizer="Ridge", solver_name="LBFGS", solver_kwargs=dict(tol=10**-12)
+    )
+    path = model.fit_path(
+        X[:80],
+        y[:80],
+        [0.1, 0.01],
+        score_data=(X[80:], y[80:]),
+        score_type="pseudo-r2-McFadden",
+    )
+    model.set_params(regularizer_strength=0.01).fit(X[:80], y[:80])
+    assert np.allclose(
+        path.score[1], model.score(X[80:], y[80:], score_type="pseudo-r2-McFadden")
+    )
+    # the model attributes are not modified by the path
+    assert model.regularizer_strength == 0.01
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name, strengths, score_type, expectation",
+    [
+        (
+            "UnRegularized",
+            "GradientDescent",
+            [0.1],
+            "log-likelihood",
+            pytest.raises(ValueError, match="`fit_path` requires a regularizer"),
+        ),
+        (
+            "Ridge",
+            "SVRG",
+            [0.1],
+            "log-likelihood",
+            pytest.raises(ValueError, match="SVRG does not support `fit_path`"),
+        ),
+        (
+            "Ridge",
+            "GradientDescent",
+            [[0.1]],
+            "log-likelihood",
+            pytest.raises(ValueError, match="must be a non-empty 1-dimensional"),
+        ),
+        (
+            "Ridge",
+            "GradientDescent",
+            [],
+            "log-likelihood",
+            pytest.raises(ValueError, match="must be a non-empty 1-dimensional"),
+        ),
+        (
+            "Ridge",
+            "GradientDescent",
+            [0.1],
+            "not-implemented",
+            pytest.raises(NotImplementedError, match="Scoring method not-implemented"),
+        ),
+        (
+            "Ridge",
+            "GradientDescent",
+            [0.1, 0.01],
+            "log-likelihood",
+            does_not_raise(),
+        ),
+    ],
+)
+def test_fit_path_errors(
+    regularizer,
+    solver_name,
+    strengths,
+    score_type,
+    expectation,
+    poissonGLM_model_instantiation,
+):
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    model = nmo.glm.GLM(regularizer=regularizer, solver_name=solver_name)
+    with expectation:
+        model.fit_path(X, y, strengths, score_type=score_type)
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("UnRegularized", "LBFGS"),
+        ("Ridge", "GradientDescent"),
+        ("Lasso", "ProximalGradient"),
+    ],
+)
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_fit_stacked_matches_fit(
+    regularizer, solver_name, glm_type, request, glm_class, population_glm_class
+):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model_class = population_glm_class
+    else:
+        X, y, _, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+        model_class = glm_class
+    # three models with different subsets of the samples and some invalid entries
+    idx = [np.arange(0, 80), np.arange(10, 90), np.arange(20, 100)]
+    X_stack = np.stack([X[i] for i in idx]).astype(float)
+    y_stack = np.stack([y[i] for i in idx]).astype(float)
+    X_stack[1, :3] = np.nan
+    y_stack[2, 5] = np.nan
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+        solver_name=solver_name,
+        solver_kwargs=dict(tol=10**-12, maxiter=5000),
+    )
+    fits = model_class(**kwargs).fit_stacked(X_stack, y_stack)
+    assert fits.converged.shape == (3,)
+    for i in range(3):
+        model = model_class(**kwargs).fit(X_stack[i], y_stack[i])
+        assert np.allclose(fits.coef[i], model.coef_, atol=10**-6)
+        assert np.allclose(fits.intercept[i], model.intercept_, atol=10**-6)
+        assert np.allclose(fits.dof_resid[i], model.dof_resid_)
+        assert np.allclose(fits.scale[i], model.scale_)
+
+
+def test_fit_stacked_gamma_scale(gammaGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = gammaGLM_model_instantiation
+    model.set_params(solver_kwargs=dict(tol=10**-12))
+    X_stack = np.stack([X, X[::-1]]).astype(float)
+    y_stack = np.stack([y, y[::-1]]).astype(float)
+    X_stack[0, :2] = np.nan
+    fits = model.fit_stacked(X_stack, y_stack)
+    model.fit(X_stack[0], y_stack[0])
+    assert np.allclose(fits.scale[0], model.scale_)
+    assert np.allclose(fits.coef[0], model.coef_, atol=10**-6)
+
+
+def test_fit_stacked_init_params(poissonGLM_model_instantiation):
+    X, y, model, true_params, _ = poissonGLM_model_instantiation
+    init_params = (
+        np.stack([true_params[0], true_params[0]]),
+        np.stack([true_params[1], true_params[1]]),
+    )
+    model.set_params(solver_kwargs=dict(maxiter=1))
+    fits = model.fit_stacked(np.stack([X, X]), np.stack([y, y]), init_params)
+    assert fits.coef.shape == (2, X.shape[1])
+    assert np.all(fits.n_iter == 1)
+    assert not np.any(fits.converged)
+
+
+@pytest.mark.parametrize("n_models_coef, n_models_intercept", [(3, 2), (2, 3)])
+def test_fit_stacked_init_params_n_models(
+    n_models_coef, n_models_intercept, poissonGLM_model_instantiation
+):
+    X, y, model, true_params, _ = poissonGLM_model_instantiation
+    init_params = (
+        np.stack([true_params[0]] * n_models_coef),
+        np.stack([true_params[1]] * n_models_intercept),
+    )
+    with pytest.raises(
+        ValueError, match="must be stacked along a leading axis of size 2"
+    ):
+        model.fit_stacked(np.stack([X, X]), np.stack([y, y]), init_params)
+
+
+@pytest.mark.parametrize(
+    "n_models_y, invalid_model, expectation",
+    [
+        (2, False, does_not_raise()),
+        (
+            3,
+            False,
+            pytest.raises(ValueError, match="must have the same number of models"),
+        ),
+        (
+            2,
+            True,
+            pytest.raises(ValueError, match="at all sample points for models \\[1\\]"),
+        ),
+    ],
+)
+def test_fit_stacked_errors(
+    n_models_y, invalid_model, expectation, poissonGLM_model_instantiation
+):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    X_stack = np.stack([X, X]).astype(float)
+    if invalid_model:
+        X_stack[1] = np.nan
+    with expectation:
+        model.fit_stacked(X_stack, np.stack([y] * n_models_y))
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("UnRegularized", "LBFGS"),
+        ("Ridge", "GradientDescent"),
+        ("Lasso", "ProximalGradient"),
+    ],
+)
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+@pytest.mark.parametrize("vectorize", [True, False])
+def test_cross_validate_matches_fit(
+    regularizer,
+    solver_name,
+    glm_type,
+    vectorize,
+    request,
+    glm_class,
+    population_glm_class,
+):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model_class = population_glm_class
+    else:
+        X, y, _, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+        model_class = glm_class
+    X = X.astype(float)
+    X[3, 1] = np.nan
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+        solver_name=solver_name,
+        solver_kwargs=dict(tol=10**-12, maxiter=5000),
+    )
+    cv = model_class(**kwargs).cross_validate(
+        X, y, n_folds=3, score_type="pseudo-r2-McFadden", vectorize=vectorize
+    )
+    assert cv.score.shape == (3,)
+    for k, test in enumerate(np.array_split(np.arange(X.shape[0]), 3)):
+        assert np.all(cv.fold_labels[test] == k)
+        train = np.setdiff1d(np.arange(X.shape[0]), test)
+        model = model_class(**kwargs).fit(X[train], y[train])
+        assert np.allclose(cv.coef[k], model.coef_, atol=10**-6)
+        assert np.allclose(cv.intercept[k], model.intercept_, atol=10**-6)
+        assert np.allclose(cv.scale[k], model.scale_)
+        score = model.score(X[test], y[test], score_type="pseudo-r2-McFadden")
+        assert np.allclose(cv.score[k], score)
+
+
+def test_cross_validate_fold_labels(gammaGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = gammaGLM_model_instantiation
+    model.set_params(solver_name="LBFGS", solver_kwargs=dict(tol=10**-12))
+    # interleaved trials, labelled with arbitrary ids
+    fold_labels = np.tile([7, 3], X.shape[0] // 2)
+    cv = model.cross_validate(X, y, fold_labels=fold_labels)
+    assert cv.score.shape == (2,)
+    # sorted labels: trial 3 is fold 0
+    test = fold_labels == 3
+    model.fit(X[~test], y[~test])
+    assert np.allclose(cv.coef[0], model.coef_, atol=10**-6)
+    assert np.allclose(cv.scale[0], model.scale_)
+    assert np.allclose(cv.score[0], model.score(X[test], y[test]))
+
+
+@pytest.mark.parametrize(
+    "n_folds, fold_labels, expectation",
+    [
+        (2, None, does_not_raise()),
+        (1, None, pytest.raises(ValueError, match="`n_folds` must be an integer")),
+        (2.0, None, pytest.raises(ValueError, match="`n_folds` must be an integer")),
+        (
+            5,
+            np.zeros(10),
+            pytest.raises(ValueError, match="`fold_labels` must have one label"),
+        ),
+        (
+            5,
+            np.zeros(100),
+            pytest.raises(ValueError, match="must define at least two folds"),
+        ),
+        (
+            5,
+            np.tile([0, 1], 50),
+            pytest.raises(ValueError, match="Folds \\[0, 1\\] have no valid"),
+        ),
+    ],
+)
+def test_cross_validate_errors(
+    n_folds, fold_labels, expectation, poissonGLM_model_instantiation
+):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    X = X.astype(float)
+    # all the odd samples are invalid
+    X[1::2, 0] = np.nan
+    with expectation:
+        model.cross_validate(X, y, n_folds=n_folds, fold_labels=fold_labels)
+
+
+def test_cross_validate_score_type(poissonGLM_model_instantiation):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    with pytest.raises(NotImplementedError, match="Scoring method not-a-score"):
+        model.cross_validate(X, y, score_type="not-a-score")
+
+
+@pytest.mark.parametrize(
+    "model_fixture",
+    [
+        "poissonGLM_model_instantiation",
+        "gammaGLM_model_instantiation",
+        "poisson_population_GLM_model",
+        "poissonGLM_model_instantiation_pytree",
+    ],
+)
+@pytest.mark.parametrize(
+    "stack_X, stack_y", [(False, False), (True, True), (False, True)]
+)
+def test_score_stacked_matches_score(model_fixture, stack_X, stack_y, request):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = request.getfixturevalue(model_fixture)
+    if model_fixture == "poisson_population_GLM_model":
+        model = nmo.glm.PopulationGLM()
+    model.set_params(solver_name="LBFGS")
+    models = []
+    for seed in range(3):
+        sl = np.random.default_rng(seed).choice(y.shape[0], y.shape[0] // 2)
+        models.append(
+            deepcopy(model).fit(tree_slice(X, sl) if seed else X, y[sl] if seed else y)
+        )
+    params = jax.tree_util.tree_map(
+        lambda *p: jnp.stack(p),
+        *[(m.coef_, m.intercept_) for m in models],
+    )
+    scale = jnp.stack([jnp.asarray(m.scale_) for m in models])
+    X_in = jax.tree_util.tree_map(lambda x: jnp.stack([x] * 3), X) if stack_X else X
+    y_in = jnp.stack([y] * 3) if stack_y else y
+    scores = model.score_stacked(X_in, y_in, params, scale=scale)
+    for k, m in enumerate(models):
+        assert np.allclose(scores.log_likelihood[k], m.score(X, y))
+        for score_type in ["McFadden", "Cohen"]:
+            assert np.allclose(
+                getattr(scores, f"pseudo_r2_{score_type.lower()}")[k],
+                m.score(X, y, score_type=f"pseudo-r2-{score_type}"),
+            )
+        rate = m.predict(X)
+        assert np.allclose(
+            scores.deviance[k], jnp.mean(m.observation_model.deviance(y, rate))
+        )
+
+
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_score_stacked_cross_validation(glm_type, request):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model = nmo.glm.PopulationGLM(solver_name="LBFGS")
+    else:
+        X, y, model, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+        model.set_params(solver_name="LBFGS")
+    cv = model.cross_validate(X, y, n_folds=3, score_type="pseudo-r2-Cohen")
+    # each fold keeps only its held-out samples
+    is_test = cv.fold_labels == np.arange(3)[:, None]
+    y_folds = np.where(is_test.reshape(is_test.shape + (1,) * (y.ndim - 1)), y, np.nan)
+    scores = model.score_stacked(X, y_folds, cv)
+    assert np.allclose(scores.pseudo_r2_cohen, cv.score)
+
+
+def test_score_stacked_null_model_cache(poissonGLM_model_instantiation):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    nmo.model_selection._NULL_MODEL_CACHE.clear()
+    params = (np.zeros((4, X.shape[1])), np.zeros((4, 1)))
+    scores = model.score_stacked(X, y, params)
+    assert len(nmo.model_selection._NULL_MODEL_CACHE) == 1
+    # other models scored on the same data re-use the null model
+    params = (np.ones((4, X.shape[1])) * 0.01, np.zeros((4, 1)))
+    model.score_stacked(X, y, params)
+    assert len(nmo.model_selection._NULL_MODEL_CACHE) == 1
+    model.score_stacked(X, y + 1, params)
+    assert len(nmo.model_selection._NULL_MODEL_CACHE) == 2
+    # the null model matches a constant rate
+    ll_null = model.observation_model.log_likelihood(y, np.full(y.shape, y.mean()))
+    assert np.allclose(scores.pseudo_r2_mcfadden, 1 - scores.log_likelihood / ll_null)
+    nmo.model_selection._NULL_MODEL_CACHE.clear()
+
+
+@pytest.mark.parametrize(
+    "n_models_X, n_models_y, scale, nan_model, expectation",
+    [
+        (None, None, None, None, does_not_raise()),
+        (3, None, None, None, pytest.raises(ValueError, match="one entry per model")),
+        (None, 2, None, None, pytest.raises(ValueError, match="one entry per model")),
+        (
+            None,
+            None,
+            np.ones(2),
+            None,
+            pytest.raises(ValueError, match="The scale must"),
+        ),
+        (
+            None,
+            4,
+            None,
+            1,
+            pytest.raises(ValueError, match="sets \\[1\\] have no valid"),
+        ),
+    ],
+)
+def test_score_stacked_errors(
+    n_models_X,
+    n_models_y,
+    scale,
+    nan_model,
+    expectation,
+    poissonGLM_model_instantiation,
+):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    params = (np.zeros((4, X.shape[1])), np.zeros((4, 1)))
+    if n_models_X:
+        X = np.stack([X] * n_models_X)
+    if n_models_y:
+        y = np.stack([y] * n_models_y).astype(float)
+    if nan_model is not None:
+        y[nan_model] = np.nan
+    with expectation:
+        scores = model.score_stacked(X, y, params, scale=scale)
+        assert scores.log_likelihood.shape == (4,)
+
+
+@pytest.mark.parametrize("method", ["parametric", "block", "jackknife"])
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_resample_matches_fit(method, glm_type, request):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model = nmo.glm.PopulationGLM()
+    else:
+        X, y, model, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+    model.set_params(
+        regularizer="Ridge",
+        regularizer_strength=0.1,
+        solver_name="LBFGS",
+        solver_kwargs=dict(tol=10**-12),
+    )
+    model.fit(X, y)
+    key = jax.random.key(123)
+    res = model.resample(
+        X, y, n_replicates=4, method=method, block_size=10, random_key=key
+    )
+    n_replicates = X.shape[0] // 10 if method == "jackknife" else 4
+    assert res.coef.shape == (n_replicates, *model.coef_.shape)
+    assert res.intercept.shape == (n_replicates, *model.intercept_.shape)
+    assert np.all(res.converged)
+    # refit the resampled data of the second replicate from scratch
+    blocks = np.arange(X.shape[0]).reshape(-1, 10)
+    rep_key = jax.random.split(key, 4)[1]
+    if method == "parametric":
+        y_rep, _ = model.simulate(rep_key, X)
+        X_rep = X
+    else:
+        if method == "block":
+            draws = jax.random.randint(rep_key, (blocks.shape[0],), 0, blocks.shape[0])
+            samples = blocks[np.asarray(draws)].ravel()
+        else:
+            samples = np.delete(blocks, 1, axis=0).ravel()
+        X_rep, y_rep = X[samples], y[samples]
+    refit = deepcopy(model).fit(X_rep, y_rep)
+    assert np.allclose(res.coef[1], refit.coef_, atol=10**-6)
+    assert np.allclose(res.intercept[1], refit.intercept_, atol=10**-6)
+    if method == "jackknife":
+        assert np.allclose(res.scale[1], refit.scale_)
+
+
+def test_resample_batches_and_output(tmp_path, gammaGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = gammaGLM_model_instantiation
+    model.set_params(solver_name="LBFGS")
+    model.fit(X, y)
+    res = model.resample(X, y, n_replicates=7, method="block", block_size=5)
+    res_batched = model.resample(
+        X,
+        y,
+        n_replicates=7,
+        method="block",
+        block_size=5,
+        batch_size=3,
+        output=tmp_path,
+    )
+    for field in ["coef", "intercept", "scale", "n_iter", "converged"]:
+        assert np.allclose(getattr(res, field), getattr(res_batched, field))
+        assert np.array_equal(
+            np.load(tmp_path / f"{field}.npy"), getattr(res_batched, field)
+        )
+    assert res_batched.method == "block"
+
+
+def test_resample_confidence_intervals(poissonGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    model.fit(X, y)
+    boot = model.resample(X, y, n_replicates=20)
+    coef_se, intercept_se = boot.standard_error()
+    assert np.allclose(coef_se, np.std(boot.coef, axis=0, ddof=1))
+    (coef_low, _), (coef_high, _) = boot.percentile_interval(0.9)
+    assert np.all(coef_low <= np.median(boot.coef, axis=0))
+    assert np.all(coef_high >= np.median(boot.coef, axis=0))
+    jack = model.resample(X, y, method="jackknife", block_size=25)
+    coef_se, _ = jack.standard_error()
+    n = jack.coef.shape[0]
+    expected = np.sqrt((n - 1) / n * np.sum((jack.coef - jack.coef.mean(0)) ** 2, 0))
+    assert np.allclose(coef_se, expected)
+    with pytest.raises(ValueError, match="Percentile intervals require bootstrap"):
+        jack.percentile_interval()
+    with pytest.raises(ValueError, match="`confidence` must be in"):
+        boot.percentile_interval(1.5)
+
+
+@pytest.mark.parametrize(
+    "kwargs, expectation",
+    [
+        (dict(), does_not_raise()),
+        (dict(method="other"), pytest.raises(ValueError, match="Unknown resampling")),
+        (dict(n_replicates=0), pytest.raises(ValueError, match="`n_replicates` must")),
+        (dict(block_size=2.0), pytest.raises(ValueError, match="`block_size` must")),
+        (dict(batch_size=-1), pytest.raises(ValueError, match="`batch_size` must")),
+    ],
+)
+def test_resample_errors(kwargs, expectation, poissonGLM_model_instantiation):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    with pytest.raises(nmo.exceptions.NotFittedError):
+        model.resample(X, y)
+    model.fit(X, y)
+    with expectation:
+        model.resample(X, y, **dict(dict(n_replicates=2), **kwargs))
+
+
+@pytest.mark.parametrize(
+    "observation_model, family",
+    [
+        (
+            nmo.observation_models.PoissonObservations(),
+            sm.families.Poisson(),
+        ),
+        (
+            nmo.observation_models.GammaObservations(),
+            sm.families.Gamma(),
+        ),
+    ],
+)
+@pytest.mark.filterwarnings("ignore:The InversePower link function")
+def test_compute_covariance_against_statsmodels(observation_model, family):
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(123)
+    X = np.random.normal(size=(500, 3))
+    rate = 1 / (1 + 0.1 * X.sum(axis=1))
+    if isinstance(observation_model, nmo.observation_models.PoissonObservations):
+        y = np.random.poisson(rate)
+    else:
+        y = np.random.gamma(2.0, rate / 2.0)
+    model = nmo.glm.GLM(
+        observation_model=observation_model,
+        solver_name="LBFGS",
+        solver_kwargs=dict(tol=1e-12),
+    ).fit(X, y)
+    res = sm.GLM(y, sm.add_constant(X, prepend=False), family=family).fit()
+    covariance = model.compute_covariance(X, y)
+    assert covariance.shape == (4, 4)
+    assert np.allclose(np.sqrt(np.diag(covariance)), res.bse, rtol=1e-5)
+    assert np.allclose(covariance, res.cov_params(), rtol=1e-5, atol=1e-10)
+
+
+@pytest.mark.parametrize("regularizer", ["UnRegularized", "Ridge"])
+def test_compute_covariance_chunked_and_low_rank(
+    regularizer, poissonGLM_model_instantiation
+):
+    jax.config.update("jax_enable_x64", True)
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    X = X.copy()
+    X[3, 1] = np.nan
+    model.set_params(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+    )
+    model.fit(X, y)
+    covariance = model.compute_covariance(X, y)
+    # the penalty is included in the information
+    valid = ~np.isnan(X).any(axis=1)
+    Z = np.hstack([X[valid], np.ones((valid.sum(), 1))])
+    information = Z.T @ (model.predict(X[valid])[:, None] * Z)
+    if regularizer == "Ridge":
+        information += valid.sum() * 0.1 * np.diag([1.0] * X.shape[1] + [0.0])
+    assert np.allclose(covariance, np.linalg.inv(information))
+    assert np.allclose(model.compute_covariance(X, y, chunk_size=33), covariance)
+    # the Lanczos iteration is exact at full rank
+    full_rank = model.compute_covariance(X, y, chunk_size=33, rank=X.shape[1] + 1)
+    assert isinstance(full_rank, nmo.inference.LowRankCovariance)
+    assert np.allclose(full_rank.todense(), covariance)
+    assert np.allclose(full_rank.variance(), np.diag(covariance))
+    low_rank = model.compute_covariance(X, y, rank=2, random_key=jax.random.key(1))
+    assert low_rank.eigenvalues.shape == (2,)
+    assert low_rank.eigenvectors.shape == (X.shape[1] + 1, 2)
+    # the leading eigenvalue converges first, the Ritz values are lower bounds
+    eigenvalues = np.linalg.eigvalsh(information)[::-1][:2]
+    assert np.allclose(low_rank.eigenvalues[0], eigenvalues[0], rtol=1e-4)
+    assert np.all(low_rank.eigenvalues <= eigenvalues * (1 + 1e-8))
+
+
+def test_compute_covariance_population(poisson_population_GLM_model):
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, _, _ = poisson_population_GLM_model
+    feature_mask = np.ones((X.shape[1], y.shape[1]))
+    feature_mask[0, 1] = 0
+    model = nmo.glm.PopulationGLM(
+        feature_mask=feature_mask, solver_name="LBFGS", solver_kwargs=dict(tol=1e-12)
+    ).fit(X, y)
+    covariance = model.compute_covariance(X, y, chunk_size=40)
+    assert covariance.shape == (y.shape[1], X.shape[1] + 1, X.shape[1] + 1)
+    for neuron in range(y.shape[1]):
+        keep = np.append(feature_mask[:, neuron], 1).astype(bool)
+        single = nmo.glm.GLM(solver_name="LBFGS", solver_kwargs=dict(tol=1e-12)).fit(
+            X[:, keep[:-1]], y[:, neuron]
+        )
+        expected = single.compute_covariance(X[:, keep[:-1]], y[:, neuron])
+        assert np.allclose(covariance[neuron][np.ix_(keep, keep)], expected, rtol=1e-5)
+        # masked coefficients have no variance
+        assert np.all(covariance[neuron][~keep] == 0)
+        assert np.all(covariance[neuron][:, ~keep] == 0)
+    low_rank = model.compute_covariance(X, y, rank=X.shape[1] + 1)
+    assert low_rank.eigenvectors.shape == (y.shape[1], X.shape[1] + 1, X.shape[1] + 1)
+    assert np.allclose(low_rank.todense(), covariance, atol=1e-10)
+
+
+@pytest.mark.parametrize(
+    "kwargs, expectation",
+    [
+        ({}, does_not_raise()),
+        (
+            dict(rank=0),
+            pytest.raises(ValueError, match="`rank` must be a positive integer"),
+        ),
+        (
+            dict(rank=10),
+            pytest.raises(ValueError, match="`rank` must be at most the number"),
+        ),
+        (
+            dict(chunk_size=0),
+            pytest.raises(ValueError, match="`chunk_size` must be a positive integer"),
+        ),
+    ],
+)
+def test_compute_covariance_errors(kwargs, expectation, poissonGLM_model_instantiation):
+    X, y, model, _, _ = poissonGLM_model_instantiation
+    with pytest.raises(nmo.exceptions.NotFittedError):
+        model.compute_covariance(X, y)
+    model.fit(X, y)
+    with expectation:
+        model.compute_covariance(X, y, **kwargs)
+
+
+def test_compute_covariance_requires_closed_form_hessian(
+    poissonGLM_model_instantiation,
+):
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    model = nmo.glm.GLM(
+        observation_model=nmo.observation_models.PoissonObservations(
+            inverse_link_function=jax.nn.softplus
+        )
+    ).fit(X, y)
+    with pytest.raises(ValueError, match="available in closed form"):
+        model.compute_covariance(X, y)
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("UnRegularized", "LBFGS"),
+        ("Ridge", "GradientDescent"),
+        ("Lasso", "ProximalGradient"),
+    ],
+)
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_fit_sparse_matches_dense(
+    regularizer, solver_name, glm_type, request, glm_class, population_glm_class
+):
+    jax.config.update("jax_enable_x64", True)
+    if glm_type == "population_":
+        X, y, _, _, _ = request.getfixturevalue("poisson_population_GLM_model")
+        model_class = population_glm_class
+    else:
+        X, y, _, _, _ = request.getfixturevalue("poissonGLM_model_instantiation")
+        model_class = glm_class
+    X = np.where(np.abs(X) < 0.5, 0.0, X)
+    X[3, 1] = np.nan
+    X_sparse = sparse.BCOO.fromdense(X)
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+        solver_name=solver_name,
+    )
+    model = model_class(**kwargs).fit(X, y)
+    model_sparse = model_class(**kwargs).fit(X_sparse, y)
+    assert np.allclose(model_sparse.coef_, model.coef_)
+    assert np.allclose(model_sparse.intercept_, model.intercept_)
+    assert np.allclose(model_sparse.dof_resid_, model.dof_resid_)
+    assert np.allclose(model_sparse.predict(X_sparse), model.predict(X), equal_nan=True)
+    assert np.allclose(model_sparse.score(X_sparse, y), model.score(X, y))
+
+
+def test_fit_sparse_from_basis(poissonGLM_model_instantiation):
+    _, _, model, _, _ = poissonGLM_model_instantiation
+    bas = nmo.basis.BSplineEval(8) * nmo.basis.BSplineEval(8)
+    x, z = np.random.uniform(size=(2, 500))
+    y = np.random.poisson(np.exp(np.sin(6 * x) * np.cos(4 * z)))
+    model.fit(bas.compute_features(x, z, sparse=True), y)
+    assert model.coef_.shape == (64,)
+    rate = model.predict(bas.compute_features(x, z, sparse=True))
+    assert np.allclose(rate, model.predict(bas.compute_features(x, z)), rtol=10**-5)
+
+
+@pytest.mark.parametrize("solver_name", ["SVRG", "ProxSVRG"])
+def test_fit_sparse_svrg_not_supported(solver_name, poissonGLM_model_instantiation):
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    model = nmo.glm.GLM(
+        regularizer="Lasso" if solver_name == "ProxSVRG" else "UnRegularized",
+        regularizer_strength=0.1 if solver_name == "ProxSVRG" else None,
+        solver_name=solver_name,
+    )
+    with pytest.raises(ValueError, match="does not support sparse design matrices"):
+        model.fit(sparse.BCOO.fromdense(X), y)
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("Ridge", "LBFGS"),
+        ("Ridge", "GradientDescent"),
+        ("Lasso", "ProximalGradient"),
+    ],
+)
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_fit_lazy_matches_dense(
+    regularizer, solver_name, glm_type, glm_class, population_glm_class
+):
+    jax.config.update("jax_enable_x64", True)
+    bas = nmo.basis.RaisedCosineLogConv(6, window_size=20) + (
+        nmo.basis.BSplineEval(4) * nmo.basis.HistoryConv(5)
+    )
+    x, z, u = np.random.uniform(size=(3, 500))
+    x[100] = np.nan
+    X = bas.compute_features(x, z, u)
+    X_lazy = bas.compute_features(x, z, u, lazy=True)
+    rate = np.exp(np.sin(6 * np.nan_to_num(x)) * np.cos(4 * z))
+    if glm_type == "population_":
+        y = np.random.poisson(rate[:, None] * np.ones(3))
+        model_class = population_glm_class
+    else:
+        y = np.random.poisson(rate)
+        model_class = glm_class
+    kwargs = dict(
+        regularizer=regularizer, regularizer_strength=0.1, solver_name=solver_name
+    )
+    model = model_class(**kwargs).fit(X, y)
+    model_lazy = model_class(**kwargs).fit(X_lazy, y)
+    assert np.allclose(model_lazy.coef_, model.coef_)
+    assert np.allclose(model_lazy.intercept_, model.intercept_)
+    assert np.allclose(model_lazy.dof_resid_, model.dof_resid_)
+    assert np.allclose(model_lazy.predict(X_lazy), model.predict(X), equal_nan=True)
+    assert np.allclose(model_lazy.score(X_lazy, y), model.score(X, y))
+
+
+def test_fit_lazy_unregularized_dof(poissonGLM_model_instantiation):
+    jax.config.update("jax_enable_x64", True)
+    _, _, model, _, _ = poissonGLM_model_instantiation
+    bas = nmo.basis.BSplineConv(5, window_size=10) * nmo.basis.BSplineEval(4)
+    x, z = np.random.uniform(size=(2, 300))
+    y = np.random.poisson(np.exp(np.sin(6 * x)))
+    model.fit(bas.compute_features(x, z, lazy=True), y)
+    dof = model.dof_resid_
+    model.fit(bas.compute_features(x, z), y)
+    assert np.allclose(dof, model.dof_resid_)
+
+
+@pytest.mark.parametrize("solver_name", ["GramNewton", "IRLS"])
+def test_fit_lazy_newton_not_supported(solver_name, poissonGLM_model_instantiation):
+    bas = nmo.basis.BSplineConv(5, window_size=10)
+    x = np.random.uniform(size=100)
+    model = nmo.glm.GLM(solver_name=solver_name)
+    with pytest.raises(ValueError, match="does not support lazy design matrices"):
+        model.fit(bas.compute_features(x, lazy=True), np.random.poisson(size=100))
+
+
+@pytest.mark.parametrize("precision, rtol", [("float32", 10**-6), ("bfloat16", 10**-2)])
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+@pytest.mark.parametrize("solver_name", ["LBFGS", "GradientDescent"])
+def test_fit_precision_matches_float64(
+    precision, rtol, glm_type, solver_name, glm_class, population_glm_class
+):
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(123)
+    X = np.random.normal(size=(1000, 5))
+    rate = np.exp(X @ np.array([0.2, -0.1, 0.3, 0.0, 0.1]))
+    if glm_type == "population_":
+        y = np.random.poisson(rate[:, None] * np.ones(2))
+        model_class = population_glm_class
+    else:
+        y = np.random.poisson(rate)
+        model_class = glm_class
+    kwargs = dict(
+        regularizer="Ridge",
+        regularizer_strength=0.01,
+        solver_name=solver_name,
+        solver_kwargs=dict(tol=10**-12),
+    )
+    model = model_class(**kwargs).fit(X, y)
+    model_mixed = model_class(precision=precision, **kwargs).fit(X, y)
+    assert model_mixed.coef_.dtype == jnp.float64
+    assert model_mixed.intercept_.dtype == jnp.float64
+    assert np.allclose(model_mixed.coef_, model.coef_, rtol=rtol, atol=rtol)
+    assert np.allclose(model_mixed.intercept_, model.intercept_, rtol=rtol, atol=rtol)
+    assert np.allclose(model_mixed.predict(X), model.predict(X), rtol=10 * rtol)
+    assert np.allclose(model_mixed.score(X, y), model.score(X, y), rtol=10 * rtol)
+
+
+@pytest.mark.parametrize(
+    "precision, rtol", [("float32", 10**-12), ("bfloat16", 10**-4)]
+)
+def test_precision_design_dtype(precision, rtol):
+    jax.config.update("jax_enable_x64", True)
+    model = nmo.glm.GLM(precision=precision)
+    X = model._cast_design(np.random.normal(size=(100, 3)))
+    assert X.dtype == jnp.dtype(precision)
+    params = (jnp.asarray(np.random.normal(size=3)), jnp.zeros(1))
+    y = jnp.asarray(np.random.poisson(size=100), dtype=float)
+    grad = jax.grad(model._predict_and_compute_loss)(params, X, y)
+    assert model._predict(params, X).dtype == jnp.float64
+    assert all(g.dtype == jnp.float64 for g in grad)
+    # the coefficients are not rounded to the precision of the predictors
+    assert np.allclose(
+        model._predict(params, X), jnp.exp(X.astype(float) @ params[0]), rtol=rtol
+    )
+
+
+@pytest.mark.parametrize(
+    "precision, rtol", [("float32", 10**-12), ("bfloat16", 10**-4)]
+)
+@pytest.mark.parametrize("glm_type", ["", "population_"])
+def test_precision_gradient_matches_float64(precision, rtol, glm_type):
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(123)
+    X = np.random.normal(size=(1000, 5))
+    y = np.random.poisson(np.exp(X @ np.array([0.2, -0.1, 0.3, 0.0, 0.1])))
+    if glm_type == "population_":
+        y = np.stack([y, y[::-1]], axis=1)
+        coef = np.random.normal(scale=0.1, size=(5, 2))
+        model_class = nmo.glm.PopulationGLM
+    else:
+        coef = np.random.normal(scale=0.1, size=5)
+        model_class = nmo.glm.GLM
+    params = (jnp.asarray(coef), jnp.zeros(y.shape[1:] or (1,)))
+    y = jnp.asarray(y, dtype=float)
+    model = model_class(precision=precision)
+    X_low = model._cast_design(X)
+    model_64 = model_class()
+    if glm_type == "population_":
+        model._initialize_feature_mask(X_low, y)
+        model_64._initialize_feature_mask(X, y)
+    grad = jax.grad(model._predict_and_compute_loss)(params, X_low, y)
+    # the reference uses the same rounded predictors, and is accumulated in float64
+    expected = jax.grad(model_64._predict_and_compute_loss)(
+        params, X_low.astype(float), y
+    )
+    for g, e in zip(grad, expected):
+        assert g.dtype == jnp.float64
+        assert np.allclose(g, e, rtol=0, atol=rtol * np.abs(e).max())
+
+
+def test_precision_invalid():
+    with pytest.raises(ValueError, match="Unknown precision float16"):
+        nmo.glm.GLM(precision="float16")
+
+
+def test_precision_requires_x64():
+    x64 = jax.config.jax_enable_x64
+    jax.config.update("jax_enable_x64", False)
+    try:
+        model = nmo.glm.GLM(precision="float32")
+        with pytest.raises(ValueError, match="enable 64-bit floats"):
+            model.fit(np.random.normal(size=(100, 3)), np.random.poisson(size=100))
+    finally:
+        jax.config.update("jax_enable_x64", x64)
+
+
+@pytest.mark.parametrize(
+    "mesh",
+    [
+        1,
+        jax.sharding.Mesh(np.array(jax.devices()[:1]), ("neurons",)),
+        jax.sharding.Mesh(
+            np.array(jax.devices()[:1]).reshape(1, 1), ("samples", "neurons")
+        ),
+    ],
+)
+def test_fit_mesh_matches_fit(mesh, poisson_population_GLM_model):
+    X, y, _, _, _ = poisson_population_GLM_model
+    feature_mask = np.ones((X.shape[1], y.shape[1]))
+    feature_mask[0, 1] = 0
+    model = nmo.glm.PopulationGLM(feature_mask=feature_mask).fit(X, y)
+    model_mesh = nmo.glm.PopulationGLM(feature_mask=feature_mask).fit(X, y, mesh=mesh)
+    # the fit does not replace the feature mask of the model
+    assert np.all(model_mesh.feature_mask == feature_mask)
+    assert model_mesh.feature_mask.sharding == model.feature_mask.sharding
+    assert np.allclose(model_mesh.coef_, model.coef_)
+    assert np.allclose(model_mesh.intercept_, model.intercept_)
+    assert np.allclose(model_mesh.score(X, y), model.score(X, y))
+    model_glm = nmo.glm.GLM().fit(X, y[:, 0], mesh=mesh)
+    assert np.allclose(model_glm.coef_, nmo.glm.GLM().fit(X, y[:, 0]).coef_)
+
+
+@pytest.mark.parametrize(
+    "mesh, X_type, expectation",
+    [
+        (
+            "2",
+            "dense",
+            pytest.raises(TypeError, match="`mesh` must be the number of devices"),
+        ),
+        (
+            len(jax.devices()) + 1,
+            "dense",
+            pytest.raises(ValueError, match="Cannot split the neurons across"),
+        ),
+        (
+            jax.sharding.Mesh(np.array(jax.devices()[:1]), ("features",)),
+            "dense",
+            pytest.raises(ValueError, match="Invalid mesh axis names"),
+        ),
+        (
+            jax.sharding.Mesh(np.array(jax.devices()[:1]), ("samples",)),
+            "sparse",
+            pytest.raises(ValueError, match="Sparse predictors cannot be split"),
+        ),
+        (1, "sparse", does_not_raise()),
+    ],
+)
+def test_fit_mesh_errors(mesh, X_type, expectation, poisson_population_GLM_model):
+    X, y, _, _, _ = poisson_population_GLM_model
+    if X_type == "sparse":
+        X = sparse.BCOO.fromdense(X)
+    with expectation:
+        nmo.glm.PopulationGLM().fit(X, y, mesh=mesh)
+
+
+def test_fit_mesh_multi_device():
+    """Fit on several CPU devices, which must be configured before importing jax."""
+    code = textwrap.dedent("""
+        import jax
+        import numpy as np
+        from jax.sharding import Mesh
+        import nemos as nmo
+
+        jax.config.update("jax_enable_x64", True)
+        np.random.seed(123)
+        X = np.random.normal(size=(200, 3))
+        y = np.random.poisson(np.exp(X @ np.random.normal(scale=0.2, size=(3, 4))))
+        mask = {"a": np.array([1.0, 0.0, 1.0, 1.0]), "b": np.ones(4)}
+        X_tree = nmo.pytrees.FeaturePytree(a=X[:, :1], b=X[:, 1:])
+        meshes = [
+            4,
+            Mesh(np.array(jax.devices()).reshape(2, 2), ("samples", "neurons")),
+            Mesh(np.array(jax.devices()), ("samples",)),
+        ]
+        for solver_name in ["GradientDescent", "IRLS"]:
+            kwargs = dict(solver_name=solver_name, feature_mask=mask)
+            model = nmo.glm.PopulationGLM(**kwargs).fit(X_tree, y)
+            for mesh in meshes:
+                model_mesh = nmo.glm.PopulationGLM(**kwargs).fit(X_tree, y, mesh=mesh)
+                assert len(model_mesh.intercept_.sharding.device_set) == 4
+                assert len(model_mesh.feature_mask["a"].sharding.device_set) == 1
+                for key in ["a", "b"]:
+                    assert np.allclose(model_mesh.coef_[key], model.coef_[key])
+                assert np.allclose(model_mesh.intercept_, model.intercept_)
+        # a number of devices splits the samples of a single neuron
+        model = nmo.glm.GLM().fit(X, y[:, 0])
+        model_mesh = nmo.glm.GLM().fit(X, y[:, 0], mesh=4)
+        assert np.allclose(model_mesh.coef_, model.coef_)
+        try:
+            nmo.glm.GLM().fit(X[:198], y[:198, 0], mesh=4)
+        except ValueError as e:
+            assert "Cannot split 198 samples evenly" in str(e)
+        else:
+            raise AssertionError("expected a ValueError")
+        try:
+            nmo.glm.PopulationGLM().fit(X, y[:, :3], mesh=4)
+        except ValueError as e:
+            assert "Cannot split 3 neurons evenly" in str(e)
+        else:
+            raise AssertionError("expected a ValueError")
+        """)
+    env = dict(os.environ, XLA_FLAGS="--xla_force_host_platform_device_count=4")
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def _banded_mask(n_features, n_neurons, width):
+    mask = np.zeros((n_features, n_neurons))
+    for neuron in range(n_neurons):
+        mask[2 * neuron : 2 * neuron + width, neuron] = 1
+    return mask
+
+
+@pytest.mark.parametrize(
+    "mask, masked_path",
+    [
+        # few mask patterns, exact blocks
+        (np.repeat(np.eye(4), [10, 10, 10, 10], axis=0)[:, [0, 1, 1, 2, 3, 3]], True),
+        # more patterns than blocks, e.g. local coupling
+        (_banded_mask(80, 30, 6), True),
+        # neurons without active features
+        (np.hstack([_banded_mask(40, 5, 4), np.zeros((40, 2))]), True),
+        # non-contiguous active features
+        (np.tile(np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]]), (10, 3)), True),
+        # dense masks use the dense product
+        (np.ones((40, 6)), False),
+        (_banded_mask(12, 4, 8), False),
+    ],
+)
+def test_masked_design_matmul_matches_dense(mask, masked_path):
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(123)
+    X = jnp.asarray(np.random.normal(size=(50, mask.shape[0])))
+    coef = jnp.asarray(np.random.normal(size=mask.shape))
+    groups = nmo.glm._group_neurons_by_mask(mask, mask.shape[0])
+    assert (groups is not None) == masked_path
+    if masked_path:
+        # each neuron is in exactly one block
+        neurons = np.concatenate([neurons for _, neurons, _ in groups])
+        assert np.array_equal(np.sort(neurons), np.arange(mask.shape[1]))
+    out = nmo.glm._masked_design_matmul(X, coef, jnp.asarray(mask))
+    assert np.allclose(out, X @ (coef * mask))
+
+    def loss(coef, matmul):
+        return jnp.sum(jnp.sin(matmul(X, coef, jnp.asarray(mask))))
+
+    grad = jax.grad(loss)(coef, nmo.glm._masked_design_matmul)
+    expected = jax.grad(loss)(coef, lambda x, w, m: x @ (w * m))
+    assert np.allclose(grad, expected)
+
+
+def test_masked_design_matmul_pytree_mask():
+    np.random.seed(123)
+    X = jnp.asarray(np.random.normal(size=(50, 3)))
+    coef = jnp.asarray(np.random.normal(size=(3, 8)))
+    mask = jnp.asarray([1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0])
+    out = nmo.glm._masked_design_matmul(X, coef, mask)
+    assert np.allclose(out, X @ (coef * mask), atol=1e-6)
+
+
+def test_population_glm_sparse_feature_mask(poisson_population_GLM_model):
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, _, _ = poisson_population_GLM_model
+    X = np.hstack([X] * 4)
+    feature_mask = _banded_mask(X.shape[1], y.shape[1], 3)
+    kwargs = dict(solver_name="LBFGS", solver_kwargs=dict(tol=1e-12))
+    model = nmo.glm.PopulationGLM(feature_mask=feature_mask, **kwargs).fit(X, y)
+    # each neuron fit on its own features
+    for neuron in range(y.shape[1]):
+        keep = feature_mask[:, neuron].astype(bool)
+        single = nmo.glm.GLM(**kwargs).fit(X[:, keep], y[:, neuron])
+        assert np.allclose(model.coef_[keep, neuron], single.coef_, atol=1e-5)
+        assert np.all(model.coef_[~keep, neuron] == 0)
+    assert np.allclose(
+        model.predict(X), np.exp(X @ (model.coef_ * feature_mask) + model.intercept_)
+    )
+
+
+@pytest.mark.parametrize("regularizer", ["UnRegularized", "Ridge"])
+def test_pytree_design_is_not_concatenated(
+    regularizer, monkeypatch, poissonGLM_model_instantiation
+):
+    X, y, _, _, _ = poissonGLM_model_instantiation
+    # rank deficient design, the last column duplicates the first
+    X = np.hstack([X, X[:, :1]])
+    model = nmo.glm.GLM(
+        observation_model=nmo.observation_models.PoissonObservations(jax.nn.softplus),
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+        solver_name="SVRG",
+        solver_kwargs=dict(maxiter=5),
+    )
+    model.fit(X, y)
+    expected_dof = model.dof_resid_
+
+    def hstack(*args, **kwargs):
+        raise AssertionError("The design matrix was concatenated!")
+
+    monkeypatch.setattr(jnp, "hstack", hstack)
+    X_tree = FeaturePytree(a=X[:, :2], b=X[:, 2:])
+    model.fit(X_tree, y)
+    assert np.allclose(model.dof_resid_, expected_dof)
+    if regularizer == "UnRegularized":
+        assert np.allclose(model.dof_resid_, X.shape[0] - (X.shape[1] - 1) - 1)
+
+
+def test_pytree_design_dof_ill_conditioned():
+    np.random.seed(0)
+    X = np.random.normal(size=(500, 6))
+    # full rank design whose Gram matrix is numerically rank deficient
+    X[:, [2, 5]] *= 1e-9
+    y = np.random.poisson(np.exp(0.1 * X[:, :2].sum(axis=1)))
+    model = nmo.glm.GLM(solver_name="LBFGS", solver_kwargs=dict(maxiter=5))
+    model.fit(X, y)
+    assert np.allclose(model.dof_resid_, X.shape[0] - X.shape[1] - 1)
+    model.fit(FeaturePytree(a=X[:, :3], b=X[:, 3:]), y)
+    assert np.allclose(model.dof_resid_, X.shape[0] - X.shape[1] - 1)
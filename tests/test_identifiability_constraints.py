@@ -10,6 +10,7 @@ from nemos.basis.basis import BSplineConv, BSplineEval, RaisedCosineLinearEval
 from nemos.identifiability_constraints import (
     _WARN_FLOAT32_MESSAGE,
     _find_drop_column,
+    _find_drop_column_gram,
     _warn_if_not_float64,
     add_constant,
     apply_identifiability_constraints,
@@ -169,6 +170,54 @@ def test_find_drop_column(matrix, max_drop, expected_result, preproc):
     assert jnp.array_equal(result, expected_result)
 
 
+def _rank_deficient_matrices():
+    np.random.seed(123)
+    x = np.random.randn(50, 6)
+    x[:, 0] = x[:, 3] - 2 * x[:, 5]
+    x[:, 4] = 0.0
+    bas = BSplineEval(5) + BSplineEval(6) + RaisedCosineLinearEval(4)
+    bsplines = bas.compute_features(*np.random.randn(3, 100))
+    return [
+        np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]]),
+        np.array([[1, 0], [0, 0]]),
+        np.eye(3),
+        np.tile(np.random.randn(20, 2), (1, 3)),
+        x,
+        bsplines,
+    ]
+
+
+@pytest.mark.parametrize("matrix", _rank_deficient_matrices())
+@pytest.mark.parametrize("preproc", [add_constant, lambda x: x])
+def test_find_drop_column_gram(matrix, preproc):
+    """The Gram pass drops the same columns as the search column by column."""
+    jax.config.update("jax_enable_x64", True)
+    matrix = jnp.asarray(matrix, dtype=float)
+    processed = preproc(matrix)
+    rank = int(jnp.linalg.matrix_rank(processed))
+    expected = _find_drop_column(
+        matrix,
+        rank=rank,
+        max_drop=processed.shape[1] - rank,
+        preprocessing_func=preproc,
+    )
+    result = _find_drop_column_gram(matrix, preprocessing_func=preproc)
+    assert np.array_equal(result, expected)
+
+
+def test_apply_identifiability_constraints_nearly_collinear():
+    """Columns the Gram pass cannot resolve are checked column by column."""
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(123)
+    x = np.random.randn(100, 3)
+    x[:, 0] = x[:, 1] + 10**-7 * np.random.randn(100)
+    # dependent for the Gram pass, independent for the SVD rank
+    assert _find_drop_column_gram(x, add_constant)[0]
+    constrained_x, kept_columns = apply_identifiability_constraints(x)
+    assert np.array_equal(kept_columns, np.arange(3))
+    assert constrained_x.shape == x.shape
+
+
 @pytest.mark.parametrize(
     "dtype, expected_dtype",
     [
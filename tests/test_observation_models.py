@@ -310,6 +310,33 @@ class TestPoissonObservations:
             repr(obs) == f"PoissonObservations(inverse_link_function={link_func_name})"
         )
 
+    @pytest.mark.parametrize(
+        "link_func, expectation",
+        [
+            (jnp.exp, does_not_raise()),
+            (lambda x: jnp.exp(x), does_not_raise()),
+            (
+                jax.nn.softplus,
+                pytest.raises(ValueError, match="available in closed form only"),
+            ),
+        ],
+    )
+    def test_hessian_weights(self, link_func, expectation):
+        """The weights are the second derivative of the log-likelihood of each sample."""
+        obs = nmo.observation_models.PoissonObservations(
+            inverse_link_function=link_func
+        )
+        eta = np.linspace(-1, 1, 5)
+        y = np.array([0.0, 1.0, 3.0, 0.0, 2.0])
+
+        def sample_loss(eta, y):
+            return obs._negative_log_likelihood(y, link_func(eta))
+
+        with expectation:
+            weights = obs._hessian_weights(y, link_func(eta))
+            expected = jax.vmap(jax.hessian(sample_loss))(eta, y)
+            assert np.allclose(weights, expected, rtol=10**-5)
+
 
 class TestGammaObservations:
     @pytest.mark.parametrize("link_function", [jnp.exp, lambda x: 1 / x, 1])
@@ -605,3 +632,29 @@ class TestGammaObservations:
     def test_repr_out(self, link_func, link_func_name):
         obs = nmo.observation_models.GammaObservations(inverse_link_function=link_func)
         assert repr(obs) == f"GammaObservations(inverse_link_function={link_func_name})"
+
+    @pytest.mark.parametrize(
+        "link_func, expectation",
+        [
+            (lambda x: jnp.power(x, -1), does_not_raise()),
+            (lambda x: 1 / x, does_not_raise()),
+            (jnp.exp, does_not_raise()),
+            (
+                jax.nn.softplus,
+                pytest.raises(ValueError, match="available in closed form only"),
+            ),
+        ],
+    )
+    def test_hessian_weights(self, link_func, expectation):
+        """The weights are the second derivative of the log-likelihood of each sample."""
+        obs = nmo.observation_models.GammaObservations(inverse_link_function=link_func)
+        eta = np.linspace(0.5, 1.5, 5)
+        y = np.array([0.5, 1.0, 3.0, 0.2, 2.0])
+
+        def sample_loss(eta, y):
+            return obs._negative_log_likelihood(y, link_func(eta))
+
+        with expectation:
+            weights = obs._hessian_weights(y, link_func(eta))
+            expected = jax.vmap(jax.hessian(sample_loss))(eta, y)
+            assert np.allclose(weights, expected, rtol=10**-5)
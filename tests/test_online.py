@@ -0,0 +1,184 @@
+from contextlib import nullcontext as does_not_raise
+
+import jax
+import numpy as np
+import pytest
+
+import nemos as nmo
+from nemos.online import OnlineGLM
+
+
+@pytest.fixture
+def poisson_data():
+    np.random.seed(123)
+    X = 0.5 * np.random.normal(size=(3000, 4))
+    w = np.array([0.3, -0.2, 0.4, 0.1])
+    y = np.random.poisson(np.exp(X.dot(w) - 0.5)).astype(float)
+    return X, y
+
+
+@pytest.fixture
+def poisson_population_data(poisson_data):
+    X, _ = poisson_data
+    w = np.array([[0.3, -0.2, 0.4, 0.1], [0.0, 0.2, -0.4, 0.2]]).T
+    y = np.random.poisson(np.exp(X.dot(w) - 0.5)).astype(float)
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "forgetting_factor, expectation",
+    [
+        (1.0, does_not_raise()),
+        (0.99, does_not_raise()),
+        (0.0, pytest.raises(ValueError, match="`forgetting_factor` must be in")),
+        (1.1, pytest.raises(ValueError, match="`forgetting_factor` must be in")),
+    ],
+)
+def test_forgetting_factor(forgetting_factor, expectation):
+    with expectation:
+        OnlineGLM(nmo.glm.GLM(), forgetting_factor=forgetting_factor)
+
+
+@pytest.mark.parametrize(
+    "prior_precision, expectation",
+    [
+        (1.0, does_not_raise()),
+        (0.0, pytest.raises(ValueError, match="`prior_precision` must be positive")),
+        (-1, pytest.raises(ValueError, match="`prior_precision` must be positive")),
+    ],
+)
+def test_prior_precision(prior_precision, expectation):
+    with expectation:
+        OnlineGLM(nmo.glm.GLM(), prior_precision=prior_precision)
+
+
+def test_model_type():
+    with pytest.raises(TypeError, match="`model` must be a GLM or a PopulationGLM"):
+        OnlineGLM(nmo.observation_models.PoissonObservations())
+
+
+def test_partial_fit_before_initialize(poisson_data):
+    X, y = poisson_data
+    with pytest.raises(ValueError, match="must be initialized with `initialize`"):
+        OnlineGLM(nmo.glm.GLM()).partial_fit(X, y)
+
+
+def test_feature_pytree_not_supported(poisson_data):
+    X, y = poisson_data
+    X = nmo.pytrees.FeaturePytree(a=X[:, :2], b=X[:, 2:])
+    with pytest.raises(TypeError, match="FeaturePytree inputs are not supported"):
+        OnlineGLM(nmo.glm.GLM()).initialize(X, y)
+
+
+def test_inconsistent_inputs(poisson_data):
+    X, y = poisson_data
+    learner = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    with pytest.raises(ValueError, match="The model was initialized with 4 features"):
+        learner.partial_fit(X[200:300, :3], y[200:300])
+
+
+def test_converges_to_batch_fit(poisson_data):
+    """The recursive update should track the batch maximum likelihood estimate."""
+    jax.config.update("jax_enable_x64", True)
+    X, y = poisson_data
+    batch = nmo.glm.GLM(solver_name="LBFGS", solver_kwargs=dict(tol=10**-12))
+    batch.fit(X, y)
+    learner = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    learner.partial_fit(X[200:], y[200:])
+    assert learner.n_bins_ == X.shape[0]
+    assert np.allclose(learner.model.coef_, batch.coef_, atol=10**-2)
+    assert np.allclose(learner.model.intercept_, batch.intercept_, atol=10**-2)
+    assert learner.covariance_.shape == (5, 5)
+
+
+def test_split_invariance(poisson_data):
+    """Processing the bins one at the time or in a batch gives the same result."""
+    X, y = poisson_data
+    learner_batch = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    learner_batch.partial_fit(X[200:300], y[200:300])
+    learner_bins = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    for t in range(200, 300):
+        learner_bins.partial_fit(X[t : t + 1], y[t : t + 1])
+    assert np.allclose(learner_batch.model.coef_, learner_bins.model.coef_)
+    assert np.allclose(learner_batch.covariance_, learner_bins.covariance_)
+    assert learner_bins.throughput_ > 0
+
+
+def test_invalid_bins_are_skipped(poisson_data):
+    X, y = poisson_data
+    X_nan, y_nan = X[:400].copy(), y[:400].copy()
+    X_nan[250, 1] = np.nan
+    y_nan[300] = np.inf
+    learner_nan = OnlineGLM(nmo.glm.GLM()).initialize(X_nan[:200], y_nan[:200])
+    learner_nan.partial_fit(X_nan[200:], y_nan[200:])
+    is_valid = np.ones(400, dtype=bool)
+    is_valid[[250, 300]] = False
+    learner = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    learner.partial_fit(X[200:400][is_valid[200:]], y[200:400][is_valid[200:]])
+    assert learner_nan.n_bins_ == 398
+    assert np.allclose(learner_nan.model.coef_, learner.model.coef_)
+
+
+def test_init_params(poisson_data):
+    X, y = poisson_data
+    init_params = np.zeros(4), np.array([-0.5])
+    learner = OnlineGLM(nmo.glm.GLM()).initialize(
+        X[:200], y[:200], init_params=init_params
+    )
+    assert np.all(learner.model.coef_ == 0)
+    learner.partial_fit(X[200:], y[200:])
+    assert np.all(np.isfinite(learner.model.coef_))
+
+
+def test_population_glm_feature_mask(poisson_population_data):
+    X, y = poisson_population_data
+    feature_mask = np.ones((4, 2))
+    feature_mask[0, 1] = 0
+    model = nmo.glm.PopulationGLM(feature_mask=feature_mask)
+    learner = OnlineGLM(model).initialize(X[:200], y[:200])
+    learner.partial_fit(X[200:], y[200:])
+    assert learner.model.coef_.shape == (4, 2)
+    assert learner.model.intercept_.shape == (2,)
+    assert learner.covariance_.shape == (2, 5, 5)
+    assert learner.model.coef_[0, 1] == 0
+    assert learner.predict(X).shape == y.shape
+
+
+def test_forgetting_tracks_change(poisson_data):
+    """With forgetting, the parameters follow a change in the response."""
+    X, _ = poisson_data
+    np.random.seed(1)
+    w1, w2 = np.array([0.3, -0.2, 0.4, 0.1]), np.array([-0.3, 0.2, -0.4, -0.1])
+    y = np.hstack(
+        [
+            np.random.poisson(np.exp(X[:1500].dot(w1))),
+            np.random.poisson(np.exp(X[1500:].dot(w2))),
+        ]
+    )
+    error = []
+    for forgetting_factor in [1.0, 0.99]:
+        learner = OnlineGLM(nmo.glm.GLM(), forgetting_factor=forgetting_factor)
+        learner.initialize(X[:200], y[:200]).partial_fit(X[200:], y[200:])
+        error.append(np.linalg.norm(learner.model.coef_ - w2))
+    assert error[1] < error[0]
+
+
+def test_set_forgetting_factor_after_initialize(poisson_data):
+    X, y = poisson_data
+    learner = OnlineGLM(nmo.glm.GLM(), forgetting_factor=0.99)
+    learner.initialize(X[:200], y[:200]).partial_fit(X[200:300], y[200:300])
+    learner_set = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    learner_set.forgetting_factor = 0.99
+    learner_set.partial_fit(X[200:300], y[200:300])
+    assert np.allclose(learner_set.model.coef_, learner.model.coef_)
+    assert np.allclose(learner_set.covariance_, learner.covariance_)
+
+
+def test_set_model_requires_initialize(poisson_data):
+    X, y = poisson_data
+    learner = OnlineGLM(nmo.glm.GLM()).initialize(X[:200], y[:200])
+    learner.model = nmo.glm.GLM(
+        observation_model=nmo.observation_models.GammaObservations()
+    )
+    with pytest.raises(ValueError, match="must be initialized with `initialize`"):
+        learner.partial_fit(X[200:300], y[200:300])
@@ -1,12 +1,13 @@
 import itertools
 from contextlib import nullcontext as does_not_raise
 
+import jax
 import jax.numpy as jnp
 import numpy as np
 import pytest
 
 import nemos.simulation as simulation
-from nemos import basis
+from nemos import basis, convolve
 
 
 @pytest.mark.parametrize(
@@ -612,3 +613,222 @@ class TestSimulateRecurrent:
                 init_spikes,
                 inv_link_func,
             )
+
+    def test_simulate_rates_match_convolution(self, coupled_model_simulate):
+        """The ring buffer gives the rates of the convolved history of the activity."""
+        jax.config.update("jax_enable_x64", True)
+        (
+            coupling_coeff,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_input,
+            coupling_basis,
+            init_spikes,
+            inv_link_func,
+        ) = coupled_model_simulate
+        spikes, rates = simulation.simulate_recurrent(
+            coupling_coeff,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_input,
+            coupling_basis,
+            init_spikes,
+            inv_link_func,
+        )
+        activity = np.vstack([init_spikes, spikes])
+        # history of the samples 0, ..., n_time_bins - 1
+        conv = convolve.tensor_convolve(activity[:-1], coupling_basis)
+        expected = inv_link_func(
+            np.einsum("ijb,tjb->ti", coupling_coeff, conv)
+            + np.einsum("ik,tik->ti", feedforward_coeff, feedforward_input)
+            + intercepts
+        )
+        assert spikes.shape == rates.shape == (feedforward_input.shape[0], 2)
+        assert np.allclose(rates, expected, rtol=10**-8)
+
+    @pytest.mark.parametrize("window_size", [1, 2, 50])
+    def test_simulate_exponential_decay_rates(
+        self, window_size, coupled_model_simulate
+    ):
+        """The recursive filter matches the ring buffer for exponential bases."""
+        (
+            _,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_input,
+            _,
+            _,
+            inv_link_func,
+        ) = coupled_model_simulate
+        decay_rates = np.array([1.0, 4.0])
+        coupling_basis = np.exp(
+            -np.outer(np.linspace(0, 1, window_size), decay_rates)
+        ) @ np.array([[1.0, 0.5], [0.5, 1.0]])
+        # inhibitory coupling for a stable simulation
+        coupling_coeff = -0.2 * np.abs(np.random.default_rng(1).normal(size=(2, 2, 2)))
+        init_spikes = np.random.default_rng(0).poisson(0.5, size=(window_size, 2))
+        out_ring, out_exp = [
+            simulation.simulate_recurrent(
+                coupling_coeff,
+                feedforward_coeff,
+                intercepts,
+                random_key,
+                feedforward_input,
+                coupling_basis,
+                init_spikes,
+                inv_link_func,
+                decay_rates=rates,
+            )
+            for rates in [None, decay_rates]
+        ]
+        assert np.allclose(out_ring[1], out_exp[1], rtol=10**-4)
+        assert np.mean(out_ring[0] == out_exp[0]) > 0.99
+
+    def test_simulate_orth_exponential_basis(self, coupled_model_simulate):
+        (
+            _,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_input,
+            _,
+            init_spikes,
+            inv_link_func,
+        ) = coupled_model_simulate
+        decay_rates = np.array([1.0, 3.0, 10.0])
+        bas = basis.OrthExponentialEval(3, decay_rates=decay_rates)
+        _, coupling_basis = bas.evaluate_on_grid(init_spikes.shape[0])
+        coupling_coeff = 0.1 * np.random.default_rng(1).normal(size=(2, 2, 3))
+        out_ring, out_exp = [
+            simulation.simulate_recurrent(
+                coupling_coeff,
+                feedforward_coeff,
+                intercepts,
+                random_key,
+                feedforward_input,
+                coupling_basis,
+                init_spikes,
+                inv_link_func,
+                decay_rates=rates,
+            )
+            for rates in [None, decay_rates]
+        ]
+        assert np.allclose(out_ring[1], out_exp[1], rtol=10**-4)
+
+    def test_simulate_decay_rates_not_spanning_basis(self, coupled_model_simulate):
+        (
+            coupling_coeff,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_input,
+            coupling_basis,
+            init_spikes,
+            inv_link_func,
+        ) = coupled_model_simulate
+        with pytest.raises(ValueError, match="not a linear combination of decaying"):
+            simulation.simulate_recurrent(
+                coupling_coeff,
+                feedforward_coeff,
+                intercepts,
+                random_key,
+                feedforward_input,
+                coupling_basis,
+                init_spikes,
+                inv_link_func,
+                decay_rates=[1.0, 2.0],
+            )
+
+
+class TestSimulateRecurrentTrials:
+    @pytest.mark.parametrize("shared_init", [True, False])
+    def test_trials_match_single_simulation(self, shared_init, coupled_model_simulate):
+        (
+            coupling_coeff,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_input,
+            coupling_basis,
+            init_spikes,
+            inv_link_func,
+        ) = coupled_model_simulate
+        n_trials = 3
+        feedforward_trials = jnp.stack([feedforward_input * k for k in range(n_trials)])
+        if not shared_init:
+            init_spikes = jnp.stack([init_spikes + k for k in range(n_trials)])
+        spikes, rates = simulation.simulate_recurrent_trials(
+            coupling_coeff,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            feedforward_trials,
+            coupling_basis,
+            init_spikes,
+            inv_link_func,
+        )
+        assert spikes.shape == rates.shape == (n_trials, feedforward_input.shape[0], 2)
+        keys = jax.random.split(random_key, n_trials)
+        for k in range(n_trials):
+            spikes_k, rates_k = simulation.simulate_recurrent(
+                coupling_coeff,
+                feedforward_coeff,
+                intercepts,
+                keys[k],
+                feedforward_trials[k],
+                coupling_basis,
+                init_spikes if shared_init else init_spikes[k],
+                inv_link_func,
+            )
+            assert np.allclose(rates[k], rates_k, rtol=10**-4)
+            assert np.mean(spikes[k] == spikes_k) > 0.99
+
+    @pytest.mark.parametrize(
+        "feedforward_shape, init_shape, expectation",
+        [
+            ((2, 10, 2, 2), (100, 2), does_not_raise()),
+            ((2, 10, 2, 2), (2, 100, 2), does_not_raise()),
+            (
+                (10, 2, 2),
+                (100, 2),
+                pytest.raises(ValueError, match="must be four-dimensional"),
+            ),
+            (
+                (2, 10, 2, 2),
+                (3, 100, 2),
+                pytest.raises(ValueError, match="`init_y` must have shape"),
+            ),
+            (
+                (2, 10, 3, 2),
+                (100, 3),
+                pytest.raises(ValueError, match="The number of neurons"),
+            ),
+        ],
+    )
+    def test_trials_input_shapes(
+        self, feedforward_shape, init_shape, expectation, coupled_model_simulate
+    ):
+        (
+            coupling_coeff,
+            feedforward_coeff,
+            intercepts,
+            random_key,
+            _,
+            coupling_basis,
+            _,
+            inv_link_func,
+        ) = coupled_model_simulate
+        with expectation:
+            simulation.simulate_recurrent_trials(
+                coupling_coeff,
+                feedforward_coeff,
+                intercepts,
+                random_key,
+                np.zeros(feedforward_shape),
+                coupling_basis,
+                np.zeros(init_shape),
+                inv_link_func,
+            )
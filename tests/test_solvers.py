@@ -7,6 +7,10 @@ import numpy as np
 import pytest
 
 import nemos as nmo
+from nemos.solvers._gram_newton import _GRAM_CACHE, GramNewton
+from nemos._chunking import prefetch_to_device
+from nemos.solvers._irls import IRLS
+from nemos.solvers._minibatch import SGD, Adam
 from nemos.solvers._svrg import SVRG, ProxSVRG, SVRGState
 from nemos.tree_utils import pytree_map_and_reduce, tree_l2_norm, tree_slice, tree_sub
 
@@ -135,7 +139,7 @@ def test_svrg_glm_instantiate_solver(regularizer_name, solver_class, mask):
     )
     glm.instantiate_solver()
 
-    solver = inspect.getclosurevars(glm._solver_run).nonlocals["solver"]
+    solver = inspect.getclosurevars(inspect.unwrap(glm._solver_run)).nonlocals["solver"]
     assert glm.solver_name == solver_name
     assert isinstance(solver, solver_class)
 
@@ -170,7 +174,7 @@ def test_svrg_glm_passes_solver_kwargs(regularizer_name, solver_name, mask, glm_
     )
     glm.instantiate_solver()
 
-    solver = inspect.getclosurevars(glm._solver_run).nonlocals["solver"]
+    solver = inspect.getclosurevars(inspect.unwrap(glm._solver_run)).nonlocals["solver"]
     assert solver.stepsize == solver_kwargs["stepsize"]
     assert solver.maxiter == solver_kwargs["maxiter"]
 
@@ -226,7 +230,9 @@ def test_svrg_glm_initialize_state(
     assert state.reference_point == init_params
 
     for f in (glm._solver_init_state, glm._solver_update, glm._solver_run):
-        assert isinstance(inspect.getclosurevars(f).nonlocals["solver"], solver_class)
+        assert isinstance(
+            inspect.getclosurevars(inspect.unwrap(f)).nonlocals["solver"], solver_class
+        )
     assert isinstance(state, SVRGState)
 
 
@@ -357,7 +363,7 @@ def test_svrg_glm_fit(
 
     glm.fit(X, y)
 
-    solver = inspect.getclosurevars(glm._solver_run).nonlocals["solver"]
+    solver = inspect.getclosurevars(inspect.unwrap(glm._solver_run)).nonlocals["solver"]
     assert solver.maxiter == maxiter
     assert glm.solver_state_.iter_num == maxiter
 
@@ -605,3 +611,338 @@ def test_svrg_wrong_shapes(shapes, expected_context):
     with expected_context:
         svrg = SVRG(loss_fn)
         svrg.run(init_params, X, y)
+
+
+@pytest.fixture
+def gram_newton_data():
+    np.random.seed(123)
+    X = np.random.normal(size=(500, 4))
+    w = np.array([[0.3, -0.2], [0.1, 0.2], [-0.4, 0.0], [0.2, -0.1]])
+    y = np.random.poisson(np.exp(X @ w - 0.5)).astype(float)
+    return X, y
+
+
+@pytest.mark.parametrize("regularizer", ["UnRegularized", "Ridge"])
+@pytest.mark.parametrize(
+    "glm_class, mask",
+    [
+        (nmo.glm.GLM, None),
+        (nmo.glm.PopulationGLM, None),
+        (nmo.glm.PopulationGLM, np.array([[1, 0], [1, 1], [0, 1], [1, 1]])),
+    ],
+)
+def test_gram_newton_glm_fit(regularizer, glm_class, mask, gram_newton_data):
+    """GramNewton converges to the same solution as LBFGS."""
+    jax.config.update("jax_enable_x64", True)
+    X, y = gram_newton_data
+    if glm_class is nmo.glm.GLM:
+        y = y[:, 0]
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+    )
+    if mask is not None:
+        kwargs["feature_mask"] = mask
+    model = glm_class(solver_name="GramNewton", **kwargs).fit(X, y)
+    model_lbfgs = glm_class(
+        solver_name="LBFGS", solver_kwargs=dict(tol=10**-12), **kwargs
+    ).fit(X, y)
+    assert model.solver_state_.error < 10**-6
+    assert np.allclose(model.coef_, model_lbfgs.coef_, atol=10**-6)
+    assert np.allclose(model.intercept_, model_lbfgs.intercept_, atol=10**-6)
+    if mask is not None:
+        assert np.all(model.coef_[mask == 0] == 0)
+
+
+def test_gram_newton_fewer_iterations(gram_newton_data):
+    X, y = gram_newton_data
+    # ill-conditioned design
+    X = X @ np.array(
+        [[1.0, 0.9, 0.0, 0.0], [0.0, 0.1, 0.0, 0.0], [0, 0, 1, 0], [0, 0, 0, 5]]
+    )
+    model = nmo.glm.GLM(solver_name="GramNewton").fit(X, y[:, 0])
+    model_gd = nmo.glm.GLM(solver_kwargs=dict(tol=10**-6)).fit(X, y[:, 0])
+    assert model.solver_state_.iter_num < model_gd.solver_state_.iter_num / 10
+
+
+def test_gram_matrix_cache(gram_newton_data):
+    X, y = gram_newton_data
+    nmo.solvers.clear_gram_cache()
+    gram = nmo.solvers.gram_matrix(X)
+    assert np.allclose(gram[:-1, :-1], X.T @ X / X.shape[0])
+    assert np.allclose(gram[-1], np.r_[X.mean(axis=0), 1.0])
+    # the same design with different targets re-uses the matrix
+    for k in range(2):
+        nmo.glm.GLM(solver_name="GramNewton").fit(X, y[:, k])
+    assert len(_GRAM_CACHE) == 1
+    assert nmo.solvers.gram_matrix(X.copy()) is gram
+    # a modified design computes a new matrix
+    X[0, 0] += 1.0
+    assert nmo.solvers.gram_matrix(X) is not gram
+    assert len(_GRAM_CACHE) == 2
+    nmo.solvers.clear_gram_cache()
+    assert len(_GRAM_CACHE) == 0
+
+
+def test_gram_matrix_cache_does_not_hash_design(monkeypatch, gram_newton_data):
+    X, _ = gram_newton_data
+    nmo.solvers.clear_gram_cache()
+
+    def blake2b(*args, **kwargs):
+        raise AssertionError("The design was hashed!")
+
+    monkeypatch.setattr(nmo.solvers._gram_newton.hashlib, "blake2b", blake2b)
+    gram = nmo.solvers.gram_matrix(jax.numpy.asarray(X))
+    assert nmo.solvers.gram_matrix(jax.numpy.asarray(X)) is gram
+    nmo.solvers.clear_gram_cache()
+
+
+def test_gram_matrix_pytree_and_sparse(gram_newton_data):
+    X, _ = gram_newton_data
+    gram = nmo.solvers.gram_matrix(X)
+    # the leaves are stacked in the order of their keys
+    X_tree = nmo.pytrees.FeaturePytree(a=X[:, :1], b=X[:, 1:])
+    assert np.allclose(nmo.solvers.gram_matrix(X_tree.data), gram)
+    X_sparse = jax.experimental.sparse.BCOO.fromdense(X)
+    assert np.allclose(nmo.solvers.gram_matrix(X_sparse), gram)
+
+
+def test_gram_newton_solver():
+    """The solver runs on a generic GLM-like loss."""
+    np.random.seed(123)
+    X = np.random.normal(size=(200, 3))
+    y = X @ np.array([1.0, -2.0, 0.5]) + 1.0
+
+    def loss(params, X, y):
+        return 0.5 * np.mean((X @ params[0] + params[1] - y) ** 2)
+
+    solver = GramNewton(
+        loss, np.linalg.cholesky(nmo.solvers.gram_matrix(X)), tol=10**-5
+    )
+    params, state = solver.run((np.zeros(3), np.zeros(1)), X, y)
+    # the curvature of a least-squares loss is the Gram matrix, a single step suffices
+    assert state.iter_num == 1
+    assert np.allclose(params[0], [1.0, -2.0, 0.5], atol=10**-4)
+    assert np.allclose(params[1], 1.0, atol=10**-4)
+
+
+@pytest.mark.parametrize("regularizer", ["UnRegularized", "Ridge"])
+@pytest.mark.parametrize(
+    "glm_class, mask",
+    [
+        (nmo.glm.GLM, None),
+        (nmo.glm.PopulationGLM, None),
+        (nmo.glm.PopulationGLM, np.array([[1, 0], [1, 1], [0, 1], [1, 1]])),
+    ],
+)
+def test_irls_glm_fit(regularizer, glm_class, mask, gram_newton_data):
+    """IRLS converges to the same solution as LBFGS in a few iterations."""
+    jax.config.update("jax_enable_x64", True)
+    X, y = gram_newton_data
+    if glm_class is nmo.glm.GLM:
+        y = y[:, 0]
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+    )
+    if mask is not None:
+        kwargs["feature_mask"] = mask
+    model = glm_class(solver_name="IRLS", **kwargs).fit(X, y)
+    model_lbfgs = glm_class(
+        solver_name="LBFGS", solver_kwargs=dict(tol=10**-12), **kwargs
+    ).fit(X, y)
+    assert model.solver_state_.iter_num < 10
+    assert np.allclose(model.coef_, model_lbfgs.coef_, atol=10**-6)
+    assert np.allclose(model.intercept_, model_lbfgs.intercept_, atol=10**-6)
+    if mask is not None:
+        assert np.all(model.coef_[mask == 0] == 0)
+
+
+@pytest.mark.parametrize(
+    "inverse_link_function, link_function",
+    [(jax.numpy.exp, np.log), (lambda x: jax.numpy.power(x, -1), lambda x: 1 / x)],
+)
+def test_irls_gamma(inverse_link_function, link_function):
+    jax.config.update("jax_enable_x64", True)
+    np.random.seed(123)
+    X = np.random.uniform(0.1, 1, size=(500, 3))
+    y = np.random.gamma(2.0, size=500) * (1 + X.sum(axis=1)) / 2.0
+    init_params = (np.zeros(3), link_function(np.atleast_1d(y.mean())))
+    obs = nmo.observation_models.GammaObservations(
+        inverse_link_function=inverse_link_function
+    )
+    model = nmo.glm.GLM(observation_model=obs, solver_name="IRLS")
+    model.fit(X, y, init_params=init_params)
+    model_lbfgs = nmo.glm.GLM(
+        observation_model=obs, solver_name="LBFGS", solver_kwargs=dict(tol=10**-12)
+    ).fit(X, y, init_params=init_params)
+    assert model.solver_state_.iter_num < 10
+    assert np.allclose(model.coef_, model_lbfgs.coef_, atol=10**-6)
+
+
+def test_irls_pytree_sparse_and_weighted(gram_newton_data):
+    """The Hessian supports pytree and sparse designs and the weighted losses."""
+    X, y = gram_newton_data
+    model = nmo.glm.PopulationGLM(solver_name="IRLS").fit(X, y)
+    X_tree = nmo.pytrees.FeaturePytree(a=X[:, :1], b=X[:, 1:])
+    model_tree = nmo.glm.PopulationGLM(solver_name="IRLS").fit(X_tree, y)
+    assert np.allclose(model_tree.coef_["a"], model.coef_[:1], atol=10**-5)
+    assert np.allclose(model_tree.coef_["b"], model.coef_[1:], atol=10**-5)
+    X_sparse = jax.experimental.sparse.BCOO.fromdense(X)
+    model_sparse = nmo.glm.PopulationGLM(solver_name="IRLS").fit(X_sparse, y)
+    assert np.allclose(model_sparse.coef_, model.coef_, atol=10**-5)
+    # cross-validation fits weighted losses, with a Hessian restricted to the train samples
+    cv = nmo.glm.GLM(solver_name="IRLS").cross_validate(X, y[:, 0], n_folds=2)
+    fold = nmo.glm.GLM(solver_name="IRLS").fit(X[250:], y[250:, 0])
+    assert np.allclose(cv.coef[0], fold.coef_, atol=10**-5)
+
+
+def test_irls_unsupported_link(gram_newton_data):
+    X, y = gram_newton_data
+    obs = nmo.observation_models.PoissonObservations(jax.nn.softplus)
+    model = nmo.glm.GLM(observation_model=obs, solver_name="IRLS")
+    with pytest.raises(ValueError, match="available in closed form only"):
+        model.fit(X, y[:, 0])
+
+
+def test_irls_solver():
+    """The solver runs on a generic GLM-like loss with a user-provided Hessian."""
+    np.random.seed(123)
+    X = np.random.normal(size=(200, 3))
+    y = X @ np.array([1.0, -2.0, 0.5]) + 1.0
+    Z = np.hstack((X, np.ones((200, 1))))
+
+    def loss(params, X, y):
+        return 0.5 * jax.numpy.mean((X @ params[0] + params[1] - y) ** 2)
+
+    def hessian(params, X, y):
+        return (Z.T @ Z / X.shape[0])[None]
+
+    solver = IRLS(loss, hessian, tol=10**-5)
+    params, state = solver.run((np.zeros(3), np.zeros(1)), X, y)
+    # a least-squares loss is minimized by a single Newton step
+    assert state.iter_num == 1
+    assert np.allclose(params[0], [1.0, -2.0, 0.5], atol=10**-4)
+    assert np.allclose(params[1], 1.0, atol=10**-4)
+
+
+@pytest.mark.parametrize(
+    "solver_class, stepsize", [(SGD, 10**-3), (Adam, 10**-3), (Adam, 10**-2)]
+)
+@pytest.mark.parametrize("regr_setup", ["linear_regression", "linear_regression_tree"])
+def test_minibatch_linear_regression(request, regr_setup, solver_class, stepsize):
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, params, loss = request.getfixturevalue(regr_setup)
+    param_init = jax.tree_util.tree_map(np.zeros_like, params)
+    solver = solver_class(loss, stepsize=stepsize, batch_size=10, maxiter=3000)
+    sol, state = solver.run(param_init, X, y)
+    assert pytree_map_and_reduce(
+        lambda a, b: np.allclose(a, b, atol=10**-2), all, params, sol
+    )
+    assert 0 < state.iter_num <= 3000
+
+
+@pytest.mark.parametrize("solver_class", [SGD, Adam])
+@pytest.mark.parametrize("batch_size, n_steps", [(10, 5), (16, 3), (100, 1)])
+def test_minibatch_run_epoch(linear_regression, solver_class, batch_size, n_steps):
+    X, y, _, params, loss = linear_regression
+    solver = solver_class(loss, batch_size=batch_size)
+    state = solver.init_state(np.zeros_like(params))
+    new_params, new_state = solver.run_epoch(np.zeros_like(params), state, X, y)
+    assert new_state.iter_num == 1
+    assert new_state.num_steps == n_steps
+    assert np.isfinite(new_state.error)
+    assert not np.array_equal(
+        jax.random.key_data(new_state.key), jax.random.key_data(state.key)
+    )
+    # the shuffling is reproducible
+    assert np.array_equal(
+        new_params, solver.run_epoch(np.zeros_like(params), state, X, y)[0]
+    )
+
+
+@pytest.mark.parametrize("solver_class", [SGD, Adam])
+def test_minibatch_update_matches_epoch(linear_regression, solver_class):
+    """An epoch is a sequence of updates on the permuted mini-batches."""
+    jax.config.update("jax_enable_x64", True)
+    X, y, _, params, loss = linear_regression
+    solver = solver_class(loss, stepsize=10**-2, batch_size=10)
+    params = np.zeros_like(params)
+    state = solver.init_state(params)
+    epoch_params, _ = solver.run_epoch(params, state, X, y)
+    _, subkey = jax.random.split(state.key)
+    perm = np.asarray(jax.random.permutation(subkey, X.shape[0]))
+    for idx in perm.reshape(5, 10):
+        params, state = solver.update(params, state, X[idx], y[idx])
+    assert state.iter_num == 5
+    assert np.allclose(params, epoch_params)
+
+
+def test_minibatch_wrong_shapes():
+    loss = lambda params, X, y: ((X.dot(params) - y) ** 2).mean()
+    with pytest.raises(ValueError, match="All arguments must have the same sized"):
+        SGD(loss).run(np.zeros(2), np.ones((10, 2)), np.zeros(9))
+
+
+@pytest.mark.parametrize("solver_name", ["SGD", "Adam"])
+@pytest.mark.parametrize("glm_class", [nmo.glm.GLM, nmo.glm.PopulationGLM])
+@pytest.mark.parametrize("regularizer", ["UnRegularized", "Ridge"])
+def test_minibatch_glm_fit(solver_name, glm_class, regularizer, gram_newton_data):
+    jax.config.update("jax_enable_x64", True)
+    X, y = gram_newton_data
+    if glm_class is nmo.glm.GLM:
+        y = y[:, 0]
+    kwargs = dict(
+        regularizer=regularizer,
+        regularizer_strength=None if regularizer == "UnRegularized" else 0.1,
+    )
+    model = glm_class(
+        solver_name=solver_name,
+        solver_kwargs=dict(stepsize=10**-2, batch_size=25, maxiter=200),
+        **kwargs,
+    ).fit(X, y)
+    reference = glm_class(
+        solver_name="LBFGS", solver_kwargs=dict(tol=10**-12), **kwargs
+    ).fit(X, y)
+    assert np.allclose(model.coef_, reference.coef_, atol=5 * 10**-2)
+    assert np.allclose(model.intercept_, reference.intercept_, atol=5 * 10**-2)
+
+
+@pytest.mark.parametrize("solver_name", ["SGD", "Adam"])
+def test_minibatch_glm_update(solver_name, gram_newton_data):
+    X, y = gram_newton_data
+    model = nmo.glm.GLM(solver_name=solver_name, solver_kwargs=dict(stepsize=0.1))
+    params = model.initialize_params(X, y[:, 0])
+    state = model.initialize_state(X, y[:, 0], params)
+    for start in range(0, 100, 25):
+        params, state = model.update(
+            params, state, X[start : start + 25], y[start : start + 25, 0]
+        )
+    assert state.iter_num == 4
+    assert state.num_steps == 4
+    assert model.coef_.shape == (X.shape[1],)
+
+
+@pytest.mark.parametrize("solver_name", ["SGD", "Adam"])
+def test_minibatch_glm_sparse_not_supported(solver_name, gram_newton_data):
+    X, y = gram_newton_data
+    X_sparse = jax.experimental.sparse.BCOO.fromdense(X)
+    model = nmo.glm.GLM(solver_name=solver_name)
+    with pytest.raises(ValueError, match="does not support sparse design"):
+        model.fit(X_sparse, y[:, 0])
+
+
+@pytest.mark.parametrize("size", [1, 2, 5])
+def test_prefetch_to_device(size):
+    chunks = [(np.full((3, 2), k), np.full(3, k)) for k in range(4)]
+    prefetched = list(prefetch_to_device(chunks, size=size))
+    assert len(prefetched) == 4
+    for k, (X, y) in enumerate(prefetched):
+        assert isinstance(X, jax.Array)
+        assert np.all(X == k) and np.all(y == k)
+
+
+@pytest.mark.parametrize("size", [0, -1, 1.5])
+def test_prefetch_to_device_invalid_size(size):
+    with pytest.raises(ValueError, match="`size` must be a positive integer"):
+        list(prefetch_to_device([], size=size))
@@ -1,8 +1,10 @@
+import warnings
 from contextlib import nullcontext as does_not_raise
 
 import jax.numpy as jnp
 import pytest
 
+from nemos.pytrees import FeaturePytree
 from nemos.solvers import _svrg_defaults
 
 
@@ -322,3 +324,18 @@ def test_calculate_optimal_batch_size_svrg_all_config(
     assert (
         batch_size == expected_batch_size
     ), f"Expected batch_size {expected_batch_size}, got {batch_size}"
+
+
+@pytest.mark.parametrize("n_power_iters", [None, 20])
+def test_glm_softplus_poisson_l_max_and_l_pytree(n_power_iters, x_sample, y_sample):
+    """Pytree predictors match the concatenated design."""
+    tree = FeaturePytree(a=x_sample[:, :1], b=x_sample[:, 1:])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        result = _svrg_defaults.glm_softplus_poisson_l_max_and_l(
+            tree, y_sample, n_power_iters=n_power_iters, batch_size=2
+        )
+        expected = _svrg_defaults.glm_softplus_poisson_l_max_and_l(
+            x_sample, y_sample, n_power_iters=n_power_iters, batch_size=2
+        )
+    assert jnp.allclose(jnp.asarray(result), jnp.asarray(expected))
@@ -0,0 +1,149 @@
+import json
+
+import jax
+import numpy as np
+import pytest
+
+import nemos as nmo
+
+
+@pytest.fixture
+def poisson_data():
+    np.random.seed(123)
+    X = np.random.normal(size=(200, 3))
+    y = np.random.poisson(np.exp(X.dot([0.2, -0.1, 0.3])))
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "regularizer, solver_name",
+    [
+        ("UnRegularized", "GradientDescent"),
+        ("Ridge", "LBFGS"),
+        ("Ridge", "NonlinearCG"),
+        ("Lasso", "ProximalGradient"),
+        ("Ridge", "GramNewton"),
+        ("UnRegularized", "IRLS"),
+    ],
+)
+@pytest.mark.parametrize("model_class", [nmo.glm.GLM, nmo.glm.PopulationGLM])
+def test_telemetry_matches_fit(regularizer, solver_name, model_class, poisson_data):
+    X, y = poisson_data
+    if model_class is nmo.glm.PopulationGLM:
+        y = np.stack([y, y], axis=1)
+    strength = None if regularizer == "UnRegularized" else 0.1
+    kwargs = dict(
+        regularizer=regularizer, regularizer_strength=strength, solver_name=solver_name
+    )
+    model = model_class(**kwargs).fit(X, y)
+    model_traced = model_class(**kwargs).enable_telemetry().fit(X, y)
+    trace = model_traced.solver_trace_
+    assert model.solver_trace_ is None
+    assert np.allclose(model_traced.coef_, model.coef_)
+    assert np.allclose(model_traced.intercept_, model.intercept_)
+    assert trace.n_iter == model.solver_state_.iter_num
+    assert trace.stop_reason in ("converged", "maxiter")
+    assert trace.solver_name == solver_name
+    assert [rec.iter_num for rec in trace.iterations] == list(
+        range(1, trace.n_iter + 1)
+    )
+    # the objective includes the penalty for all the solvers
+    objective = model.regularizer.penalized_loss(
+        model._predict_and_compute_loss, model.regularizer_strength
+    )
+    assert np.allclose(
+        trace.objective[-1], objective((model.coef_, model.intercept_), X, y)
+    )
+    assert np.all(trace.step_time >= 0)
+    assert 0 <= trace.compile_time <= trace.total_time
+
+
+def test_telemetry_maxiter(poisson_data):
+    X, y = poisson_data
+    model = nmo.glm.GLM(solver_kwargs=dict(maxiter=3, tol=10**-12))
+    model.enable_telemetry().fit(X, y)
+    assert model.solver_trace_.n_iter == 3
+    assert model.solver_trace_.stop_reason == "maxiter"
+
+
+def test_telemetry_callbacks(poisson_data):
+    X, y = poisson_data
+    records = []
+
+    def record(rec, params, state):
+        records.append((rec, params, state))
+
+    def stop(rec, params, state):
+        return rec.error < 10**-2
+
+    model = nmo.glm.GLM(solver_kwargs=dict(tol=10**-12))
+    model.enable_telemetry(record, stop).fit(X, y)
+    trace = model.solver_trace_
+    assert trace.stop_reason == "callback"
+    assert trace.error[-1] < 10**-2
+    assert all(err >= 10**-2 for err in trace.error[:-1])
+    # all the callbacks are called at the last iteration
+    assert [rec for rec, _, _ in records] == trace.iterations
+    assert np.allclose(records[-1][1][0], model.coef_)
+
+
+def test_telemetry_callback_not_callable():
+    with pytest.raises(TypeError, match="The `callback` must be a Callable"):
+        nmo.glm.GLM().enable_telemetry(1)
+
+
+def test_telemetry_disable(poisson_data):
+    X, y = poisson_data
+    model = nmo.glm.GLM().enable_telemetry().fit(X, y)
+    assert isinstance(model.solver_trace_, nmo.telemetry.SolverTrace)
+    model.disable_telemetry().fit(X, y)
+    assert model.solver_trace_ is None
+
+
+@pytest.mark.parametrize("solver_name", ["SVRG", "ProxSVRG"])
+def test_telemetry_svrg_not_supported(solver_name, poisson_data):
+    X, y = poisson_data
+    model = nmo.glm.GLM(
+        regularizer="Ridge", regularizer_strength=0.1, solver_name=solver_name
+    )
+    with pytest.raises(ValueError, match="Telemetry is not available"):
+        model.enable_telemetry().fit(X, y)
+
+
+def test_telemetry_compile_time(poisson_data):
+    X, y = poisson_data
+    nmo.compilation_cache.clear_cache()
+    jax.clear_caches()
+    model = nmo.glm.GLM(solver_name="LBFGS").enable_telemetry()
+    cold = model.fit(X, y).solver_trace_
+    warm = model.fit(X, y).solver_trace_
+    assert cold.compile_time > 0
+    assert len(cold.compile_events) > 0
+    assert warm.compile_time == 0
+    assert np.isclose(warm.run_time, warm.total_time)
+
+
+def test_telemetry_json(poisson_data, tmp_path):
+    X, y = poisson_data
+    trace = nmo.glm.GLM().enable_telemetry().fit(X, y).solver_trace_
+    out = trace.to_json(tmp_path / "trace.json")
+    loaded = json.loads((tmp_path / "trace.json").read_text())
+    assert loaded == json.loads(out)
+    assert loaded["n_iter"] == trace.n_iter
+    assert loaded["stop_reason"] == trace.stop_reason
+    assert np.allclose(
+        [rec["objective"] for rec in loaded["iterations"]], trace.objective
+    )
+
+
+def test_telemetry_chrome_trace(poisson_data, tmp_path):
+    X, y = poisson_data
+    trace = nmo.glm.GLM().enable_telemetry().fit(X, y).solver_trace_
+    chrome = trace.to_chrome_trace(tmp_path / "trace.json")
+    assert json.loads((tmp_path / "trace.json").read_text()) == chrome
+    events = chrome["traceEvents"]
+    iterations = [ev for ev in events if ev["name"].startswith("iteration")]
+    assert len(iterations) == trace.n_iter
+    assert all(ev["ph"] == "X" and ev["dur"] >= 0 for ev in iterations)
+    counters = [ev for ev in events if ev["name"] == "objective"]
+    assert [ev["args"]["objective"] for ev in counters] == list(trace.objective)
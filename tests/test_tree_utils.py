@@ -1,8 +1,10 @@
 import jax.numpy as jnp
 import numpy as np
 import pytest
+from jax.experimental import sparse
 
 from nemos import tree_utils
+from nemos.pytrees import FeaturePytree
 
 
 @pytest.mark.parametrize(
@@ -129,3 +131,73 @@ def test_tree_slice(idx):
     for key in mydict:
         expected = mydict[key][idx]
         assert jnp.all(result[key] == expected)
+
+
+def test_get_valid_tree_sparse():
+    array = np.array([[1.0, 0.0], [0.0, np.nan], [np.inf, 0.0], [0.0, 0.0]])
+    tree = {"a": sparse.BCOO.fromdense(array), "b": jnp.ones((4, 2))}
+    assert jnp.array_equal(
+        tree_utils._get_valid_tree(tree), jnp.array([True, False, False, True])
+    )
+
+
+@pytest.mark.parametrize(
+    "idx",
+    [
+        slice(2, 5),
+        np.array([1, 3, 5]),
+        np.array([True, False, True, False, True, False, True, False, True, False]),
+    ],
+)
+def test_tree_slice_sparse(idx):
+    array = np.random.rand(10, 3)
+    array[array < 0.5] = 0
+    result = tree_utils.tree_slice(sparse.BCOO.fromdense(array), idx)
+    assert isinstance(result, sparse.BCOO)
+    assert np.allclose(result.todense(), array[idx])
+
+
+@pytest.mark.parametrize(
+    "design",
+    [
+        lambda X: X,
+        lambda X: {"a": X[:, :2], "b": X[:, 2:3], "c": X[:, 3:]},
+        lambda X: FeaturePytree(a=X[:, :1], b=X[:, 1:]),
+        lambda X: {"a": sparse.BCOO.fromdense(X[:, :2]), "b": X[:, 2:]},
+        lambda X: {
+            "a": sparse.BCOO.fromdense(X[:, :2]),
+            "b": sparse.BCOO.fromdense(X[:, 2:]),
+        },
+    ],
+)
+def test_design_products_match_concatenated(design):
+    np.random.seed(123)
+    X = np.random.normal(size=(20, 5))
+    X[X < 0] = 0
+    weights = np.random.uniform(size=20)
+    v, u = np.random.normal(size=(5, 2)), np.random.normal(size=20)
+    tree = design(jnp.asarray(X))
+    assert tree_utils.design_n_features(tree) == 5
+    assert np.allclose(tree_utils.design_matvec(tree, v), X @ v, atol=1e-5)
+    assert np.allclose(tree_utils.design_matvec(tree, v[:, 0]), X @ v[:, 0], atol=1e-5)
+    assert np.allclose(tree_utils.design_rmatvec(tree, u), X.T @ u, atol=1e-5)
+    assert np.allclose(tree_utils.design_gram(tree), X.T @ X, atol=1e-5)
+    assert np.allclose(
+        tree_utils.design_gram(tree, jnp.asarray(weights)),
+        X.T @ (weights[:, None] * X),
+        atol=1e-5,
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 50])
+def test_design_r_factor(chunk_size):
+    np.random.seed(123)
+    X = np.random.normal(size=(20, 5))
+    tree = FeaturePytree(a=jnp.asarray(X[:, :2]), b=jnp.asarray(X[:, 2:]))
+    r_factor = tree_utils.design_r_factor(tree, chunk_size=chunk_size)
+    assert r_factor.shape == (5, 5)
+    assert np.allclose(r_factor.T @ r_factor, X.T @ X, atol=1e-5)
+    # update a factor with the remaining samples
+    r_factor = tree_utils.design_r_factor(jnp.asarray(X[:12]), chunk_size=chunk_size)
+    r_factor = tree_utils.design_r_factor(jnp.asarray(X[12:]), r_factor, chunk_size)
+    assert np.allclose(r_factor.T @ r_factor, X.T @ X, atol=1e-5)
@@ -7,6 +7,8 @@ import jax.numpy as jnp
 import numpy as np
 import pynapple as nap
 import pytest
+import scipy.sparse
+from jax.experimental import sparse
 from scipy.interpolate import splev
 
 import nemos as nmo
@@ -97,6 +99,39 @@ def test_concatenate_type(arrays, dtype):
     )
 
 
+@pytest.mark.parametrize("transpose", [True, False])
+@pytest.mark.parametrize(
+    "to_sparse_a, to_sparse_c, output_type",
+    [
+        (scipy.sparse.csr_array, scipy.sparse.csr_array, scipy.sparse.csr_array),
+        (scipy.sparse.csr_array, np.asarray, scipy.sparse.csr_array),
+        (sparse.BCOO.fromdense, scipy.sparse.csr_array, sparse.BCOO),
+        (sparse.BCOO.fromdense, sparse.BCOO.fromdense, sparse.BCOO),
+    ],
+)
+def test_row_wise_kron_sparse(to_sparse_a, to_sparse_c, output_type, transpose):
+    np.random.seed(123)
+    A, C = np.random.normal(size=(2, 20, 4))
+    A[A < 0.5] = 0
+    C[C < 0] = 0
+    C[3] = 0
+    if transpose:
+        A, C = A.T, C.T
+    expected = utils.row_wise_kron(A, C, transpose=transpose)
+    out = utils.row_wise_kron(to_sparse_a(A), to_sparse_c(C), transpose=transpose)
+    assert isinstance(out, output_type)
+    out = out.todense() if isinstance(out, sparse.BCOO) else out.toarray()
+    assert np.allclose(out, expected, atol=10**-6)
+
+
+def test_row_wise_kron_sparse_stores_non_zeros():
+    A = scipy.sparse.csr_array(np.array([[1.0, 0.0, 2.0], [0.0, 0.0, 0.0]]))
+    C = scipy.sparse.csr_array(np.array([[0.0, 3.0], [1.0, 1.0]]))
+    out = utils.row_wise_kron(A, C, transpose=False)
+    assert out.nnz == 2
+    assert np.array_equal(out.toarray(), [[0, 3, 0, 0, 0, 6], [0, 0, 0, 0, 0, 0]])
+
+
 class TestPadding:
 
     @pytest.mark.parametrize(